@@ -0,0 +1,69 @@
+"""
+Latency of loading functions from the on-disk cache, as on a process
+startup: importing a module and calling its cached functions.
+"""
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+
+from numba.core import config
+
+
+MODULE_SOURCE = """
+import numpy as np
+from numba import njit
+
+@njit(cache=True)
+def scalar(x, y):
+    return x * y + 1
+
+@njit(cache=True)
+def array(a):
+    return np.sqrt(a * a + 1.0).sum()
+
+def run():
+    scalar(1, 2)
+    scalar(1.0, 2.0)
+    array(np.zeros(3))
+    array(np.zeros(3, dtype=np.float32))
+"""
+
+
+class TimeCacheLoad:
+    params = ['index', 'packed']
+    param_names = ['format']
+    number = 1
+    repeat = 10
+    warmup_time = 0
+
+    def setup(self, cache_format):
+        self.tempdir = tempfile.mkdtemp(prefix='numba-bench-cache-')
+        self.modname = 'numba_bench_cached_module'
+        with open(os.path.join(self.tempdir, self.modname + '.py'), 'w') as f:
+            f.write(MODULE_SOURCE)
+        self.old_format = os.environ.get('NUMBA_CACHE_FORMAT')
+        os.environ['NUMBA_CACHE_FORMAT'] = cache_format
+        config.reload_config()
+        sys.path.insert(0, self.tempdir)
+        # Populate the cache
+        self.import_and_run()
+
+    def teardown(self, cache_format):
+        sys.modules.pop(self.modname, None)
+        sys.path.remove(self.tempdir)
+        if self.old_format is None:
+            del os.environ['NUMBA_CACHE_FORMAT']
+        else:
+            os.environ['NUMBA_CACHE_FORMAT'] = self.old_format
+        config.reload_config()
+        shutil.rmtree(self.tempdir, ignore_errors=True)
+
+    def import_and_run(self):
+        sys.modules.pop(self.modname, None)
+        mod = importlib.import_module(self.modname)
+        mod.run()
+
+    def time_import_and_load(self, cache_format):
+        self.import_and_run()
@@ -0,0 +1,73 @@
+"""
+Compilation latency of representative functions.  Each timing compiles a
+fresh dispatcher, so only the functions' callees may be already compiled.
+"""
+import numpy as np
+
+from numba import njit, prange, types
+from numba.typed import Dict
+
+
+def scalar_loop(n):
+    acc = 0.0
+    for i in range(n):
+        if i % 3:
+            acc += i * 0.5
+        else:
+            acc -= i
+    return acc
+
+
+def array_expr(a, b):
+    return np.sqrt(a * a + b * b) / (1.0 + np.exp(-a))
+
+
+def numpy_calls(a):
+    m = a.mean()
+    s = a.std()
+    c = np.cumsum(a)
+    return np.dot(c, c) + m + s + np.sort(a)[0]
+
+
+def typed_dict_counts(keys):
+    d = Dict.empty(types.int64, types.int64)
+    for k in keys:
+        d[k] = d.get(k, 0) + 1
+    return len(d)
+
+
+def parallel_sum(a):
+    acc = 0.0
+    for i in prange(a.shape[0]):
+        acc += a[i] * a[i]
+    return acc
+
+
+_arr = types.float64[::1]
+
+FUNCTIONS = {
+    'scalar loop': (scalar_loop, (types.int64,), {}),
+    'array expr': (array_expr, (_arr, _arr), {}),
+    'numpy calls': (numpy_calls, (_arr,), {}),
+    'typed dict': (typed_dict_counts, (types.int64[::1],), {}),
+    'parallel': (parallel_sum, (_arr,), {'parallel': True}),
+}
+
+
+class TimeCompile:
+    params = list(FUNCTIONS)
+    param_names = ['function']
+    # Compiling is slow and deterministic enough
+    number = 1
+    repeat = 5
+    warmup_time = 0
+    timeout = 300
+
+    def setup(self, name):
+        # Compile once to exclude the compilation of the callees, and of
+        # the internal helper libraries, from the timings
+        self.time_compile(name)
+
+    def time_compile(self, name):
+        pyfunc, sig, options = FUNCTIONS[name]
+        njit(sig, **options)(pyfunc)
@@ -0,0 +1,151 @@
+"""
+Per-call overhead of the dispatcher (_dispatcher.c, _typeof.c) for various
+argument kinds.  The jitted functions do nothing, so that the timings
+measure argument typing, overload selection, unboxing and boxing.
+"""
+import numpy as np
+
+from numba import njit, types
+from numba.experimental import jitclass
+from numba.typed import Dict, List
+
+
+@njit
+def nop(x):
+    pass
+
+
+@njit
+def nop2(x, y):
+    pass
+
+
+@njit
+def nop4(x, y, z, w):
+    pass
+
+
+@njit
+def nop_defaults(x, y=1, z=2.0):
+    pass
+
+
+@jitclass([('x', types.int64)])
+class Box(object):
+    def __init__(self, x):
+        self.x = x
+
+
+def _typed_dict():
+    d = Dict.empty(types.int64, types.float64)
+    d[1] = 1.0
+    return d
+
+
+def _typed_list():
+    lst = List()
+    lst.append(1.0)
+    return lst
+
+
+_arr = np.zeros((10, 10))
+
+ARGUMENTS = {
+    'none': lambda: None,
+    'bool': lambda: True,
+    'int': lambda: 1,
+    'float': lambda: 1.0,
+    'complex': lambda: 1j,
+    'np.float32': lambda: np.float32(1.0),
+    'str': lambda: 'abc',
+    'array 1d': lambda: np.zeros(10),
+    'array 2d C': lambda: _arr,
+    'array 2d F': lambda: np.asfortranarray(_arr),
+    'array 2d A': lambda: _arr[::2, ::2],
+    'array readonly': lambda: np.frombuffer(b'\0' * 80),
+    'array record': lambda: np.zeros(3, dtype=[('a', np.int32),
+                                              ('b', np.float64)]),
+    'tuple homogeneous': lambda: (1, 2, 3, 4),
+    'tuple heterogeneous': lambda: (1, 2.0, 3j, True),
+    'tuple nested': lambda: ((1, 2.0), (np.zeros(3), 4)),
+    'typed Dict': _typed_dict,
+    'typed List': _typed_list,
+    'jitclass': lambda: Box(1),
+}
+
+
+class TimeDispatchArgument:
+    """
+    Calling a function with a single argument of the given kind.
+    """
+    params = list(ARGUMENTS)
+    param_names = ['argument']
+
+    def setup(self, kind):
+        self.arg = ARGUMENTS[kind]()
+        # Compile outside of the timings
+        nop(self.arg)
+
+    def time_call(self, kind):
+        nop(self.arg)
+
+
+class TimeDispatchArity:
+    """
+    Calling functions with several scalar and array arguments.
+    """
+
+    def setup(self):
+        self.arr = np.zeros(10)
+        nop2(1, self.arr)
+        nop4(1, 2.0, self.arr, self.arr)
+
+    def time_call_2_args(self):
+        nop2(1, self.arr)
+
+    def time_call_4_args(self):
+        nop4(1, 2.0, self.arr, self.arr)
+
+
+class TimeDispatchKeywords:
+    """
+    Calling a function with omitted, positional and keyword arguments.
+    """
+
+    def setup(self):
+        nop_defaults(1)
+        nop_defaults(1, 2)
+        nop_defaults(1, 2, 3.0)
+
+    def time_omitted_args(self):
+        nop_defaults(1)
+
+    def time_positional_args(self):
+        nop_defaults(1, 2, 3.0)
+
+    def time_keyword_args(self):
+        nop_defaults(1, y=2, z=3.0)
+
+    def time_all_keyword_args(self):
+        nop_defaults(x=1, y=2, z=3.0)
+
+
+class TimeDispatchManyOverloads:
+    """
+    Overload selection among many compiled signatures.
+    """
+    params = [1, 10, 50]
+    param_names = ['overloads']
+
+    dtypes = ['f8', 'i8', 'f4', 'i4', 'c16', 'c8', 'u1', 'u2', 'i2', 'b1']
+
+    def setup(self, n):
+        self.func = njit(lambda x: None)
+        # n distinct array types, the last one being called
+        for i in range(n):
+            self.arg = np.zeros((1,) * (i // len(self.dtypes) + 1),
+                                dtype=self.dtypes[i % len(self.dtypes)])
+            self.func(self.arg)
+
+    def time_call(self, n):
+        self.func(self.arg)
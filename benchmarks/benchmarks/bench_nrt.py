@@ -0,0 +1,70 @@
+"""
+Throughput of the Numba runtime (NRT) allocations and reference counting.
+"""
+import numpy as np
+
+from numba import njit
+from numba.typed import List
+
+
+@njit
+def allocate_arrays(n, size):
+    acc = 0.0
+    for i in range(n):
+        a = np.empty(size)
+        a[0] = i
+        acc += a[0]
+    return acc
+
+
+@njit
+def allocate_temporaries(a, n):
+    # Each iteration allocates two temporaries for the array expression
+    acc = 0.0
+    for i in range(n):
+        acc += (a * 2.0 + 1.0).sum()
+    return acc
+
+
+@njit
+def fill_typed_list(n):
+    lst = List()
+    for i in range(n):
+        lst.append(i)
+    return len(lst)
+
+
+@njit
+def return_array(size):
+    return np.empty(size)
+
+
+class TimeNRTAllocation:
+    params = [[1, 100, 10000]]
+    param_names = ['size']
+    n = 10000
+
+    def setup(self, size):
+        self.a = np.ones(size)
+        allocate_arrays(1, size)
+        allocate_temporaries(self.a, 1)
+        return_array(size)
+
+    def time_allocate_arrays(self, size):
+        allocate_arrays(self.n, size)
+
+    def time_allocate_temporaries(self, size):
+        allocate_temporaries(self.a, self.n // 10)
+
+    def time_return_array(self, size):
+        # Allocation, boxing and release from the interpreter
+        return_array(size)
+
+
+class TimeTypedListAppend:
+
+    def setup(self):
+        fill_typed_list(1)
+
+    def time_append(self):
+        fill_typed_list(100000)
@@ -0,0 +1,430 @@
+"""
+Scaling of parallel loops with the number of threads.
+"""
+import numpy as np
+
+import numba
+from numba import njit, prange, stencil
+
+
+@njit(parallel=True)
+def parallel_sum(a):
+    acc = 0.0
+    for i in prange(a.shape[0]):
+        acc += a[i]
+    return acc
+
+
+@njit(parallel=True)
+def parallel_map(a, out):
+    for i in prange(a.shape[0]):
+        out[i] = np.sin(a[i]) * np.cos(a[i])
+
+
+@njit(parallel=True)
+def parallel_array_expr(a, b):
+    return np.sqrt(a * a + b * b)
+
+
+@njit(parallel=True)
+def parallel_small(a):
+    # Too little work to benefit from the threads
+    acc = 0.0
+    for i in prange(a.shape[0]):
+        acc += a[i]
+    return acc
+
+
+def skewed_sum(a):
+    # The cost of an iteration grows with its index
+    acc = 0.0
+    for i in prange(a.shape[0]):
+        for j in range(i // 64):
+            acc += a[i] * j
+    return acc
+
+
+@njit(parallel=True)
+def parallel_histogram(a, nbins):
+    hist = np.zeros(nbins, np.int64)
+    for i in prange(a.shape[0]):
+        hist[a[i]] += 1
+    return hist
+
+
+@njit(parallel=True)
+def parallel_row_sum(a):
+    acc = np.zeros(a.shape[1])
+    for i in prange(a.shape[0]):
+        acc += a[i]
+    return acc
+
+
+@njit(parallel=True)
+def parallel_cumsum(a):
+    return np.cumsum(a)
+
+
+@njit(parallel=True)
+def parallel_cumsum_axis(a, axis):
+    return np.cumsum(a, axis=axis)
+
+
+@njit(parallel=True)
+def parallel_sort(a):
+    return np.sort(a)
+
+
+@njit(parallel=True)
+def parallel_argsort(a):
+    return np.argsort(a)
+
+
+@njit
+def serial_sort(a):
+    return np.sort(a)
+
+
+def laplace_kernel_2d(a):
+    return 0.25 * (a[0, 1] + a[0, -1] + a[-1, 0] + a[1, 0])
+
+
+def laplace_kernel_3d(a):
+    return (a[-1, 0, 0] + a[1, 0, 0] + a[0, -1, 0] + a[0, 1, 0] +
+            a[0, 0, -1] + a[0, 0, 1]) * (1. / 6.)
+
+
+def _stencil_runner(kernel, tile):
+    kernel = stencil(kernel, tile=tile)
+
+    @njit(parallel=True)
+    def run(a):
+        return kernel(a)
+    return run
+
+
+# Stencils in tiles of the default shape, and untiled
+laplace_by_tiling = {
+    (2, True): _stencil_runner(laplace_kernel_2d, (64, 512)),
+    (2, False): _stencil_runner(laplace_kernel_2d, None),
+    (3, True): _stencil_runner(laplace_kernel_3d, (8, 8, 512)),
+    (3, False): _stencil_runner(laplace_kernel_3d, None),
+}
+
+
+def _stencil_mode_runner(kernel, mode):
+    kernel = stencil(kernel, func_or_mode=mode)
+
+    @njit(parallel=True)
+    def run(a):
+        return kernel(a)
+    return run
+
+
+# 2D stencils in each boundary mode
+laplace_by_mode = {mode: _stencil_mode_runner(laplace_kernel_2d, mode)
+                   for mode in ('constant', 'nearest', 'wrap', 'reflect',
+                                'mirror')}
+
+
+def gradient_kernel_2d(a):
+    return a[0, 1] - a[0, -1]
+
+
+def _stencil_pipeline_runner(consumer_kernel, fusion):
+    smooth = stencil(laplace_kernel_2d)
+    consumer = stencil(consumer_kernel)
+
+    @njit(parallel={'stencil_fusion': fusion})
+    def run(a):
+        return consumer(smooth(a))
+    return run
+
+
+# A 2-read gradient and a 4-read Laplace stencil of a smoothed 2D grid, with
+# stencil fusion enabled and disabled
+smooth_pipeline_by_consumer = {
+    (name, fusion): _stencil_pipeline_runner(kernel, fusion)
+    for name, kernel in (('gradient', gradient_kernel_2d),
+                         ('laplace', laplace_kernel_2d))
+    for fusion in (True, False)}
+
+
+def small_sum(a):
+    acc = 0.0
+    for i in prange(a.shape[0]):
+        acc += a[i]
+    return acc
+
+
+SCHEDULES = ['static', 'dynamic', 'guided']
+
+SERIAL_THRESHOLDS = [0, 10000, 'adaptive']
+
+small_sum_by_threshold = {
+    threshold: njit(parallel={'serial_threshold': threshold})(small_sum)
+    for threshold in SERIAL_THRESHOLDS
+}
+
+skewed_sum_by_schedule = {
+    schedule: njit(parallel={'schedule': schedule})(skewed_sum)
+    for schedule in SCHEDULES
+}
+
+
+def _thread_counts():
+    counts = [1, 2, 4, 8, 16]
+    return [n for n in counts if n <= numba.config.NUMBA_NUM_THREADS]
+
+
+class TimeParforScaling:
+    params = [_thread_counts(), [10 ** 4, 10 ** 6, 10 ** 7]]
+    param_names = ['threads', 'size']
+
+    def setup(self, nthreads, size):
+        self.a = np.arange(size, dtype=np.float64)
+        self.b = np.ones(size)
+        self.out = np.empty(size)
+        parallel_sum(self.a)
+        parallel_map(self.a, self.out)
+        parallel_array_expr(self.a, self.b)
+        self.old_threads = numba.get_num_threads()
+        numba.set_num_threads(nthreads)
+
+    def teardown(self, nthreads, size):
+        numba.set_num_threads(self.old_threads)
+
+    def time_reduction(self, nthreads, size):
+        parallel_sum(self.a)
+
+    def time_map(self, nthreads, size):
+        parallel_map(self.a, self.out)
+
+    def time_array_expr(self, nthreads, size):
+        parallel_array_expr(self.a, self.b)
+
+
+class TimeParforOverhead:
+    """
+    The fixed cost of launching a parallel region.
+    """
+    params = [_thread_counts()]
+    param_names = ['threads']
+
+    def setup(self, nthreads):
+        self.a = np.ones(16)
+        parallel_small(self.a)
+        self.old_threads = numba.get_num_threads()
+        numba.set_num_threads(nthreads)
+
+    def teardown(self, nthreads):
+        numba.set_num_threads(self.old_threads)
+
+    def time_small_region(self, nthreads):
+        parallel_small(self.a)
+
+
+class TimeParforSerialFallback:
+    """
+    Loops of various trip counts with and without the serial fallback.
+    """
+    params = [SERIAL_THRESHOLDS, [16, 1000, 10 ** 6]]
+    param_names = ['threshold', 'size']
+
+    def setup(self, threshold, size):
+        self.a = np.ones(size)
+        # warm up adaptive mode too
+        for i in range(100):
+            small_sum_by_threshold[threshold](self.a)
+
+    def time_sum(self, threshold, size):
+        small_sum_by_threshold[threshold](self.a)
+
+
+class TimeParforSchedule:
+    """
+    Load imbalance of a loop with skewed iteration costs, per schedule.
+    """
+    params = [SCHEDULES, _thread_counts()]
+    param_names = ['schedule', 'threads']
+
+    def setup(self, schedule, nthreads):
+        self.a = np.ones(20000)
+        skewed_sum_by_schedule[schedule](self.a)
+        self.old_threads = numba.get_num_threads()
+        numba.set_num_threads(nthreads)
+
+    def teardown(self, schedule, nthreads):
+        numba.set_num_threads(self.old_threads)
+
+    def time_skewed_loop(self, schedule, nthreads):
+        skewed_sum_by_schedule[schedule](self.a)
+
+
+class TimeParforArrayReduction:
+    """
+    Array and scatter reductions, including the combine of the per-thread
+    copies, for small and large reduction arrays.
+    """
+    params = [_thread_counts(), [16, 10 ** 5]]
+    param_names = ['threads', 'width']
+
+    def setup(self, nthreads, width):
+        self.bins = np.arange(10 ** 6) * 7919 % width
+        self.rows = np.ones((10 ** 6 // width, width))
+        parallel_histogram(self.bins, width)
+        parallel_row_sum(self.rows)
+        self.old_threads = numba.get_num_threads()
+        numba.set_num_threads(nthreads)
+
+    def teardown(self, nthreads, width):
+        numba.set_num_threads(self.old_threads)
+
+    def time_histogram(self, nthreads, width):
+        parallel_histogram(self.bins, width)
+
+    def time_row_sum(self, nthreads, width):
+        parallel_row_sum(self.rows)
+
+
+class TimeParforScan:
+    """
+    Blocked parallel prefix sums of a flat array and along each axis of a
+    2D array.
+    """
+    params = [_thread_counts(), [10 ** 5, 10 ** 7]]
+    param_names = ['threads', 'size']
+
+    def setup(self, nthreads, size):
+        self.a = np.ones(size)
+        self.b = self.a.reshape((100, size // 100))
+        parallel_cumsum(self.a)
+        parallel_cumsum_axis(self.b, 0)
+        self.old_threads = numba.get_num_threads()
+        numba.set_num_threads(nthreads)
+
+    def teardown(self, nthreads, size):
+        numba.set_num_threads(self.old_threads)
+
+    def time_cumsum(self, nthreads, size):
+        parallel_cumsum(self.a)
+
+    def time_cumsum_axis0(self, nthreads, size):
+        parallel_cumsum_axis(self.b, 0)
+
+    def time_cumsum_axis1(self, nthreads, size):
+        parallel_cumsum_axis(self.b, 1)
+
+
+class TimeParforSort:
+    """
+    Parallel merge sort of random floats, against the serial quicksort.
+    """
+    params = [_thread_counts(), [10 ** 5, 10 ** 7]]
+    param_names = ['threads', 'size']
+
+    def setup(self, nthreads, size):
+        self.a = np.random.RandomState(0).random_sample(size)
+        parallel_sort(self.a[:10])
+        parallel_argsort(self.a[:10])
+        serial_sort(self.a[:10])
+        self.old_threads = numba.get_num_threads()
+        numba.set_num_threads(nthreads)
+
+    def teardown(self, nthreads, size):
+        numba.set_num_threads(self.old_threads)
+
+    def time_sort(self, nthreads, size):
+        parallel_sort(self.a)
+
+    def time_argsort(self, nthreads, size):
+        parallel_argsort(self.a)
+
+    def time_serial_sort(self, nthreads, size):
+        serial_sort(self.a)
+
+
+class TimeParforStencil:
+    """
+    Laplace stencils over 2D and 3D grids of 32M points, in tiles and
+    untiled.
+    """
+    params = [_thread_counts(), [2, 3], [True, False]]
+    param_names = ['threads', 'ndim', 'tiled']
+
+    def setup(self, nthreads, ndim, tiled):
+        shape = (4096, 8192) if ndim == 2 else (256, 256, 512)
+        self.a = np.random.RandomState(0).random_sample(shape)
+        self.func = laplace_by_tiling[ndim, tiled]
+        self.func(np.ascontiguousarray(self.a[(slice(0, 4),) * ndim]))
+        self.old_threads = numba.get_num_threads()
+        numba.set_num_threads(nthreads)
+
+    def teardown(self, nthreads, ndim, tiled):
+        numba.set_num_threads(self.old_threads)
+
+    def time_laplace(self, nthreads, ndim, tiled):
+        self.func(self.a)
+
+
+class TimeParforStencilMidSize:
+    """
+    2D Laplace stencils over grids with fewer tiles than threads, in tiles
+    and untiled.
+    """
+    params = [_thread_counts(), [256, 500], [True, False]]
+    param_names = ['threads', 'size', 'tiled']
+
+    def setup(self, nthreads, size, tiled):
+        self.a = np.random.RandomState(0).random_sample((size, size))
+        self.func = laplace_by_tiling[2, tiled]
+        self.func(np.ascontiguousarray(self.a[:4, :4]))
+        self.old_threads = numba.get_num_threads()
+        numba.set_num_threads(nthreads)
+
+    def teardown(self, nthreads, size, tiled):
+        numba.set_num_threads(self.old_threads)
+
+    def time_laplace(self, nthreads, size, tiled):
+        self.func(self.a)
+
+
+class TimeParforStencilModes:
+    """
+    2D Laplace stencils over a grid of 32M points in each boundary mode,
+    and in mode 'constant' over a copy of the grid padded by np.pad.
+    """
+    params = [['constant', 'nearest', 'wrap', 'reflect', 'mirror']]
+    param_names = ['mode']
+
+    def setup(self, mode):
+        self.a = np.random.RandomState(0).random_sample((4096, 8192))
+        self.func = laplace_by_mode[mode]
+        self.func(np.ascontiguousarray(self.a[:4, :4]))
+
+    def time_laplace(self, mode):
+        self.func(self.a)
+
+    def time_laplace_padded(self, mode):
+        pad_mode = {'constant': 'constant', 'nearest': 'edge', 'wrap': 'wrap',
+                    'reflect': 'symmetric', 'mirror': 'reflect'}[mode]
+        laplace_by_mode['constant'](np.pad(self.a, 1, mode=pad_mode))
+
+
+class TimeParforStencilFusion:
+    """
+    A gradient and a Laplace stencil of a Laplace stencil over a grid of
+    32M points, with stencil fusion enabled and disabled.  The gradient
+    reads two elements of the smoothed grid and is fused; the Laplace
+    stencil reads four and must not be slower with fusion enabled.
+    """
+    params = [['gradient', 'laplace'], [True, False]]
+    param_names = ['consumer', 'fusion']
+
+    def setup(self, consumer, fusion):
+        self.a = np.random.RandomState(0).random_sample((4096, 8192))
+        self.func = smooth_pipeline_by_consumer[consumer, fusion]
+        self.func(np.ascontiguousarray(self.a[:4, :4]))
+
+    def time_smooth_pipeline(self, consumer, fusion):
+        self.func(self.a)
@@ -0,0 +1,90 @@
+"""
+Serial sorts of Numpy arrays: the radix sort against the quicksort and
+Numpy's own sorts.
+"""
+import numpy as np
+
+from numba import njit
+
+
+@njit
+def radix_sort(a):
+    return np.sort(a, kind='radix')
+
+
+@njit
+def radix_argsort(a):
+    return np.argsort(a, kind='radix')
+
+
+@njit
+def radix_sort_axis(a, axis):
+    return np.sort(a, axis=axis, kind='radix')
+
+
+@njit
+def quicksort(a):
+    return np.sort(a)
+
+
+@njit
+def quicksort_argsort(a):
+    return np.argsort(a)
+
+
+def _random_array(dtype, size):
+    rnd = np.random.RandomState(0)
+    if dtype == 'datetime64[s]':
+        return rnd.randint(0, 2 ** 40, size=size).astype(dtype)
+    if np.issubdtype(dtype, np.integer):
+        info = np.iinfo(dtype)
+        return rnd.randint(info.min, info.max, size=size, dtype=dtype)
+    return (rnd.standard_normal(size) * 1000).astype(dtype)
+
+
+class TimeRadixSort:
+    params = [['int32', 'int64', 'float32', 'float64', 'datetime64[s]'],
+              [10 ** 3, 10 ** 6]]
+    param_names = ['dtype', 'size']
+
+    def setup(self, dtype, size):
+        self.a = _random_array(dtype, size)
+        for func in (radix_sort, radix_argsort, quicksort, quicksort_argsort):
+            func(self.a[:10])
+
+    def time_radix_sort(self, dtype, size):
+        radix_sort(self.a)
+
+    def time_radix_argsort(self, dtype, size):
+        radix_argsort(self.a)
+
+    def time_quicksort(self, dtype, size):
+        quicksort(self.a)
+
+    def time_quicksort_argsort(self, dtype, size):
+        quicksort_argsort(self.a)
+
+    def time_numpy_sort(self, dtype, size):
+        np.sort(self.a)
+
+    def time_numpy_stable_sort(self, dtype, size):
+        # Numpy's radix sort for 16 bits or less, timsort otherwise
+        np.sort(self.a, kind='stable')
+
+    def time_numpy_argsort(self, dtype, size):
+        np.argsort(self.a)
+
+
+class TimeRadixSortAxis:
+    params = [[0, 1]]
+    param_names = ['axis']
+
+    def setup(self, axis):
+        self.a = _random_array('int64', (1000, 1000))
+        radix_sort_axis(self.a[:2, :2], axis)
+
+    def time_radix_sort(self, axis):
+        radix_sort_axis(self.a, axis)
+
+    def time_numpy_sort(self, axis):
+        np.sort(self.a, axis=axis)
@@ -0,0 +1,62 @@
+from __future__ import absolute_import, print_function, division
+
+import numpy as np
+from numba import njit, stencil
+from numba.core.utils import benchmark
+
+
+def laplace_kernel(a):
+    return 0.25 * (a[0, 1] + a[0, -1] + a[-1, 0] + a[1, 0])
+
+
+# Run in tiles of the default shape in parallel mode
+laplace_stencil = stencil(laplace_kernel)
+
+laplace_stencil_untiled = stencil(laplace_kernel, tile=None)
+
+
+def laplace_numpy(A):
+    Anew = np.zeros_like(A)
+    Anew[1:-1, 1:-1] = 0.25 * (A[1:-1, 2:] + A[1:-1, :-2] +
+                               A[:-2, 1:-1] + A[2:, 1:-1])
+    return Anew
+
+
+@njit(parallel=True)
+def laplace_tiled(A):
+    return laplace_stencil(A)
+
+
+@njit(parallel=True)
+def laplace_untiled(A):
+    return laplace_stencil_untiled(A)
+
+
+def run(fn):
+    NN = 4096
+    NM = 4096
+    iter_max = 10
+
+    A = np.zeros((NN, NM), dtype=np.float64)
+    A[:, 0] = 1.0
+
+    for it in range(iter_max):
+        A = fn(A)
+
+
+def python_main():
+    run(laplace_numpy)
+
+
+def numba_main():
+    run(laplace_tiled)
+
+
+def numba_untiled_main():
+    run(laplace_untiled)
+
+
+if __name__ == '__main__':
+    print(benchmark(python_main))
+    print(benchmark(numba_main))
+    print(benchmark(numba_untiled_main))
@@ -0,0 +1,76 @@
+"""
+Per-call dispatch overhead of a trivial jitted function taking a typed
+container or a jitclass instance, compared with an ndarray argument.
+
+Run directly to print the overhead per call of each argument kind.
+"""
+from __future__ import print_function, division, absolute_import
+import numpy as np
+from numba import njit, types
+from numba.core.utils import benchmark
+from numba.experimental import jitclass
+from numba.typed import Dict, List
+
+
+NCALLS = 10000
+
+
+@jitclass([('x', types.int64)])
+class Box(object):
+    def __init__(self, x):
+        self.x = x
+
+
+def py_identity(x):
+    return None
+
+
+@njit
+def identity(x):
+    return None
+
+
+def make_dict():
+    d = Dict.empty(types.int64, types.float64)
+    d[1] = 1.0
+    return d
+
+
+def make_list():
+    lst = List()
+    lst.append(1.0)
+    return lst
+
+
+ARGUMENTS = [
+    ('ndarray', np.zeros(1)),
+    ('typed Dict', make_dict()),
+    ('typed List', make_list()),
+    ('jitclass', Box(1)),
+]
+
+
+def call_loop(func, arg):
+    for _ in range(NCALLS):
+        func(arg)
+
+
+def python_main():
+    call_loop(py_identity, ARGUMENTS[1][1])
+
+
+def numba_main():
+    call_loop(identity, ARGUMENTS[1][1])
+
+
+def main():
+    baseline = benchmark(lambda: call_loop(py_identity, None)).best
+    for name, arg in ARGUMENTS:
+        # Compile outside the timing
+        identity(arg)
+        best = benchmark(lambda: call_loop(identity, arg)).best
+        print('%-12s %8.1f ns/call' % (name, (best - baseline) / NCALLS * 1e9))
+
+
+if __name__ == '__main__':
+    main()
@@ -32,11 +32,21 @@ from numba.core.types import *
 
 # Re-export decorators
 from numba.core.decorators import (cfunc, generated_jit, jit, njit, stencil,
-                                   jit_module)
+                                   jit_module, reduction)
 
 # Re-export vectorize decorators and the thread layer querying function
 from numba.np.ufunc import (vectorize, guvectorize, threading_layer,
-                            get_num_threads, set_num_threads)
+                            get_num_threads, set_num_threads,
+                            get_thread_affinity)
+
+# Re-export the atomic array updates usable in parallel loops
+from numba.np import atomic
+
+# Re-export the scan of reduction operators
+from numba.parfors.reduction import scan
+
+# Re-export the cache warm-up function
+from numba.core.warmup import warmup
 
 # Re-export Numpy helpers
 from numba.np.numpy_support import carray, farray, from_dtype
@@ -64,6 +74,7 @@ __all__ = """
     njit
     stencil
     jit_module
+    reduction
     typeof
     prange
     gdb
@@ -74,6 +85,10 @@ __all__ = """
     literal_unroll
     get_num_threads
     set_num_threads
+    get_thread_affinity
+    atomic
+    scan
+    warmup
     """.split() + types.__all__ + errors.__all__
 
 
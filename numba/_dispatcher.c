@@ -98,6 +98,22 @@ else                                                            \
 }
 
 
+/* Number of keyword binding layouts cached per dispatcher */
+#define KWLAYOUT_CACHE_SIZE 8
+
+/*
+ * How the arguments of a call with the given number of positional
+ * arguments and keyword names (in call order) bind to the parameters.
+ * For each parameter not passed positionally, the layout holds either the
+ * index of the keyword argument providing it (>= 0), or the index of its
+ * default value encoded as -1 - index.
+ */
+typedef struct {
+    Py_ssize_t pos_args;
+    PyObject *kwnames;      /* NULL for an unused slot */
+    Py_ssize_t *layout;
+} kwlayout_t;
+
 typedef struct DispatcherObject{
     PyObject_HEAD
     /* Holds borrowed references to PyCFunction objects */
@@ -115,6 +131,9 @@ typedef struct DispatcherObject{
     PyObject *argnames;
     /* Tuple of default values */
     PyObject *defargs;
+    /* Cache of keyword binding layouts, replaced in round-robin order */
+    kwlayout_t kwlayouts[KWLAYOUT_CACHE_SIZE];
+    int next_kwlayout;
 } DispatcherObject;
 
 
@@ -125,9 +144,20 @@ Dispatcher_traverse(DispatcherObject *self, visitproc visit, void *arg)
     return 0;
 }
 
+static void
+clear_kwlayout(kwlayout_t *entry)
+{
+    Py_CLEAR(entry->kwnames);
+    free(entry->layout);
+    entry->layout = NULL;
+}
+
 static void
 Dispatcher_dealloc(DispatcherObject *self)
 {
+    int i;
+    for (i = 0; i < KWLAYOUT_CACHE_SIZE; i++)
+        clear_kwlayout(&self->kwlayouts[i]);
     Py_XDECREF(self->argnames);
     Py_XDECREF(self->defargs);
     dispatcher_del(self->dispatcher);
@@ -166,6 +196,8 @@ Dispatcher_init(DispatcherObject *self, PyObject *args, PyObject *kwds)
     self->interpdef = NULL;
     self->has_stararg = has_stararg;
     self->exact_match_required = exact_match_required;
+    memset(self->kwlayouts, 0, sizeof(self->kwlayouts));
+    self->next_kwlayout = 0;
     return 0;
 }
 
@@ -378,8 +410,148 @@ compile_and_invoke(DispatcherObject *self, PyObject *args, PyObject *kws, PyObje
     return retval;
 }
 
+/*
+ * Bind the arguments of a call using a cached keyword binding layout.
+ * Returns 1 and sets *pnewargs on a cache hit, 0 on a cache miss, and -1
+ * with an exception set on error.
+ */
 static int
-find_named_args(DispatcherObject *self, PyObject **pargs, PyObject **pkws)
+fold_args_cached(DispatcherObject *self, PyObject *oldargs, PyObject *kws,
+                 PyObject **pnewargs)
+{
+    Py_ssize_t pos_args = PyTuple_GET_SIZE(oldargs);
+    Py_ssize_t named_args = PyDict_Size(kws);
+    Py_ssize_t func_args = PyTuple_GET_SIZE(self->argnames);
+    PyObject *prealloc[16];
+    PyObject **values;
+    PyObject *key, *value, *newargs;
+    kwlayout_t *entry = NULL;
+    Py_ssize_t i, j, pos;
+    int k, res = 0;
+
+    if (named_args <= (Py_ssize_t) (sizeof(prealloc) / sizeof(PyObject *)))
+        values = prealloc;
+    else {
+        values = malloc(named_args * sizeof(PyObject *));
+        if (values == NULL) {
+            PyErr_NoMemory();
+            return -1;
+        }
+    }
+    for (k = 0; k < KWLAYOUT_CACHE_SIZE && entry == NULL; k++) {
+        kwlayout_t *candidate = &self->kwlayouts[k];
+        if (candidate->kwnames == NULL ||
+            candidate->pos_args != pos_args ||
+            PyTuple_GET_SIZE(candidate->kwnames) != named_args)
+            continue;
+        /* Check the keyword names against the cached ones, in call order */
+        pos = 0;
+        j = 0;
+        entry = candidate;
+        while (PyDict_Next(kws, &pos, &key, &value)) {
+            PyObject *name = PyTuple_GET_ITEM(candidate->kwnames, j);
+            if (key != name) {
+                int eq = PyObject_RichCompareBool(key, name, Py_EQ);
+                if (eq < 0) {
+                    res = -1;
+                    goto CLEANUP;
+                }
+                if (!eq) {
+                    entry = NULL;
+                    break;
+                }
+            }
+            values[j++] = value;
+        }
+    }
+    if (entry == NULL)
+        goto CLEANUP;
+
+    newargs = PyTuple_New(func_args);
+    if (!newargs) {
+        res = -1;
+        goto CLEANUP;
+    }
+    for (i = 0; i < pos_args; i++) {
+        value = PyTuple_GET_ITEM(oldargs, i);
+        Py_INCREF(value);
+        PyTuple_SET_ITEM(newargs, i, value);
+    }
+    for (i = pos_args; i < func_args; i++) {
+        Py_ssize_t slot = entry->layout[i - pos_args];
+        if (slot >= 0)
+            value = values[slot];
+        else
+            value = PyTuple_GET_ITEM(self->defargs, -1 - slot);
+        Py_INCREF(value);
+        PyTuple_SET_ITEM(newargs, i, value);
+    }
+    *pnewargs = newargs;
+    res = 1;
+
+CLEANUP:
+    if (values != prealloc)
+        free(values);
+    return res;
+}
+
+/*
+ * Record the keyword binding layout of a successfully bound call.
+ * Errors are not fatal: the call simply won't be cached.
+ */
+static void
+record_kwlayout(DispatcherObject *self, Py_ssize_t pos_args, PyObject *kws)
+{
+    Py_ssize_t named_args = PyDict_Size(kws);
+    Py_ssize_t func_args = PyTuple_GET_SIZE(self->argnames);
+    Py_ssize_t first_def = func_args - PyTuple_GET_SIZE(self->defargs);
+    kwlayout_t *entry;
+    PyObject *kwnames, *key, *value;
+    Py_ssize_t *layout;
+    Py_ssize_t i, j, pos;
+
+    kwnames = PyTuple_New(named_args);
+    layout = malloc(Py_MAX(func_args - pos_args, 1) * sizeof(Py_ssize_t));
+    if (kwnames == NULL || layout == NULL)
+        goto ERROR;
+    /* Parameters not found in the keywords take their default value */
+    for (i = pos_args; i < func_args; i++)
+        layout[i - pos_args] = -1 - (i - first_def);
+    pos = 0;
+    j = 0;
+    while (PyDict_Next(kws, &pos, &key, &value)) {
+        Py_INCREF(key);
+        PyTuple_SET_ITEM(kwnames, j, key);
+        for (i = pos_args; i < func_args; i++) {
+            int eq = PyObject_RichCompareBool(
+                key, PyTuple_GET_ITEM(self->argnames, i), Py_EQ);
+            if (eq < 0)
+                goto ERROR;
+            if (eq) {
+                layout[i - pos_args] = j;
+                break;
+            }
+        }
+        j++;
+    }
+
+    entry = &self->kwlayouts[self->next_kwlayout];
+    self->next_kwlayout = (self->next_kwlayout + 1) % KWLAYOUT_CACHE_SIZE;
+    clear_kwlayout(entry);
+    entry->pos_args = pos_args;
+    entry->kwnames = kwnames;
+    entry->layout = layout;
+    return;
+
+ERROR:
+    PyErr_Clear();
+    Py_XDECREF(kwnames);
+    free(layout);
+}
+
+static int
+find_named_args_slow(DispatcherObject *self, PyObject **pargs, PyObject **pkws,
+                     int record_layout)
 {
     PyObject *oldargs = *pargs, *newargs;
     PyObject *kws = *pkws;
@@ -487,11 +659,34 @@ find_named_args(DispatcherObject *self, PyObject **pargs, PyObject **pkws)
         Py_DECREF(newargs);
         return -1;
     }
+    if (record_layout)
+        record_kwlayout(self, pos_args, kws);
     *pargs = newargs;
     *pkws = NULL;
     return 0;
 }
 
+static int
+find_named_args(DispatcherObject *self, PyObject **pargs, PyObject **pkws)
+{
+    PyObject *oldargs = *pargs, *newargs;
+    PyObject *kws = *pkws;
+    /* Fast path for keyword calls with an already seen binding layout */
+    int use_kwlayouts = (kws != NULL && !self->has_stararg &&
+                         PyDict_Size(kws) > 0);
+    if (use_kwlayouts) {
+        int res = fold_args_cached(self, oldargs, kws, &newargs);
+        if (res < 0)
+            return -1;
+        if (res > 0) {
+            *pargs = newargs;
+            *pkws = NULL;
+            return 0;
+        }
+    }
+    return find_named_args_slow(self, pargs, pkws, use_kwlayouts);
+}
+
 static PyObject*
 Dispatcher_call(DispatcherObject *self, PyObject *args, PyObject *kws)
 {
@@ -36,10 +36,16 @@ static PyObject *omittedarg_type;
 static PyObject *typecache;
 static PyObject *ndarray_typecache;
 static PyObject *structured_dtypes;
+/* A {Python class -> (Numba type, typecode)} cache for the classes
+ * whose instances all have the Numba type given by their class'
+ * "_numba_type_" attribute (e.g. jitclass boxes).
+ */
+static PyObject *class_typecache;
 
 static PyObject *str_typeof_pyval = NULL;
 static PyObject *str_value = NULL;
 static PyObject *str_numba_type = NULL;
+static PyObject *str_numba_typecode = NULL;
 
 
 /*
@@ -763,6 +769,60 @@ int typecode_arrayscalar(PyObject *dispatcher, PyObject* aryscalar) {
     return BASIC_TYPECODES[typecode];
 }
 
+/*
+ * Fast path for values carrying their Numba type, as signalled by a
+ * "_numba_type_" attribute on their class:
+ * - if the class attribute is a Numba type (e.g. jitclass boxes), its
+ *   typecode is cached per class;
+ * - otherwise (e.g. a property of typed containers), the typecode may be
+ *   stored in the "_numba_typecode_" instance attribute.
+ * -1 is returned if the fast path doesn't apply, without an exception set.
+ */
+static int
+typecode_numba_type(PyObject *val)
+{
+    PyTypeObject *tyobj = Py_TYPE(val);
+    PyObject *attr, *cached, *tmpcode;
+    int typecode;
+
+    /* Borrowed reference, doesn't raise */
+    attr = _PyType_Lookup(tyobj, str_numba_type);
+    if (attr == NULL)
+        return -1;
+    if (Py_TYPE(attr)->tp_descr_get == NULL) {
+        /* A plain class attribute */
+        cached = PyDict_GetItem(class_typecache, (PyObject *) tyobj);
+        if (cached != NULL && PyTuple_GET_ITEM(cached, 0) == attr)
+            return PyLong_AsLong(PyTuple_GET_ITEM(cached, 1));
+        typecode = _typecode_from_type_object(attr);
+        if (typecode < 0) {
+            PyErr_Clear();
+            return -1;
+        }
+        /* The cache keeps the Numba type alive, hence its typecode valid */
+        cached = Py_BuildValue("(Oi)", attr, typecode);
+        if (cached == NULL ||
+            PyDict_SetItem(class_typecache, (PyObject *) tyobj, cached)) {
+            Py_XDECREF(cached);
+            PyErr_Clear();
+            return -1;
+        }
+        Py_DECREF(cached);
+        return typecode;
+    }
+    else {
+        /* Look up the instance dict directly, as the class attribute may
+           be a data descriptor */
+        PyObject **dictptr = _PyObject_GetDictPtr(val);
+        if (dictptr == NULL || *dictptr == NULL)
+            return -1;
+        tmpcode = PyDict_GetItem(*dictptr, str_numba_typecode);
+        if (tmpcode == NULL || !PyLong_CheckExact(tmpcode))
+            return -1;
+        return PyLong_AsLong(tmpcode);
+    }
+}
+
 int
 typeof_typecode(PyObject *dispatcher, PyObject *val)
 {
@@ -796,6 +856,12 @@ typeof_typecode(PyObject *dispatcher, PyObject *val)
     else if (PyType_IsSubtype(tyobj, &PyArray_Type)) {
         return typecode_ndarray(dispatcher, (PyArrayObject*)val);
     }
+    /* Typed containers, jitclass instances... */
+    else {
+        int typecode = typecode_numba_type(val);
+        if (typecode >= 0)
+            return typecode;
+    }
 
     return typecode_using_fingerprint(dispatcher, val);
 }
@@ -873,8 +939,9 @@ typeof_init(PyObject *self, PyObject *args)
     typecache = PyDict_New();
     ndarray_typecache = PyDict_New();
     structured_dtypes = PyDict_New();
+    class_typecache = PyDict_New();
     if (typecache == NULL || ndarray_typecache == NULL ||
-        structured_dtypes == NULL) {
+        structured_dtypes == NULL || class_typecache == NULL) {
         PyErr_SetString(PyExc_RuntimeError, "failed to create type cache");
         return NULL;
     }
@@ -893,7 +960,9 @@ typeof_init(PyObject *self, PyObject *args)
     str_typeof_pyval = PyString_InternFromString("typeof_pyval");
     str_value = PyString_InternFromString("value");
     str_numba_type = PyString_InternFromString("_numba_type_");
-    if (!str_value || !str_typeof_pyval || !str_numba_type)
+    str_numba_typecode = PyString_InternFromString("_numba_typecode_");
+    if (!str_value || !str_typeof_pyval || !str_numba_type ||
+        !str_numba_typecode)
         return NULL;
 
     Py_RETURN_NONE;
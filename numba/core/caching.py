@@ -4,15 +4,22 @@ Caching mechanism for compiled functions.
 
 
 from abc import ABCMeta, abstractmethod, abstractproperty
+import collections
 import contextlib
 import errno
 import hashlib
 import inspect
+import io
 import itertools
+import mmap
 import os
 import pickle
+import struct
 import sys
 import tempfile
+import threading
+import time
+import types as pytypes
 import warnings
 
 from numba.misc.appdirs import AppDirs
@@ -96,6 +103,15 @@ class NullCache(_Cache):
     def load_overload(self, sig, target_context):
         pass
 
+    def cached_signatures(self, target_context):
+        return []
+
+    def read_overload(self, sig, target_context):
+        pass
+
+    def rebuild_overload(self, target_context, payload):
+        pass
+
     def save_overload(self, sig, cres):
         pass
 
@@ -186,6 +202,15 @@ class _SourceFileBackedLocatorMixin(object):
         return self
 
 
+def _get_mirrored_cache_path(cache_dir, py_file):
+    """
+    Return the path mirroring the directory of *py_file* under *cache_dir*.
+    """
+    drive, path = os.path.splitdrive(os.path.abspath(py_file))
+    subpath = os.path.dirname(path).lstrip(os.path.sep)
+    return os.path.join(cache_dir, subpath)
+
+
 class _UserProvidedCacheLocator(_SourceFileBackedLocatorMixin, _CacheLocator):
     """
     A locator that always point to the user provided directory in
@@ -194,9 +219,7 @@ class _UserProvidedCacheLocator(_SourceFileBackedLocatorMixin, _CacheLocator):
     def __init__(self, py_func, py_file):
         self._py_file = py_file
         self._lineno = py_func.__code__.co_firstlineno
-        drive, path = os.path.splitdrive(os.path.abspath(self._py_file))
-        subpath = os.path.dirname(path).lstrip(os.path.sep)
-        self._cache_path = os.path.join(config.CACHE_DIR, subpath)
+        self._cache_path = _get_mirrored_cache_path(config.CACHE_DIR, py_file)
 
     def get_cache_path(self):
         return self._cache_path
@@ -209,6 +232,49 @@ class _UserProvidedCacheLocator(_SourceFileBackedLocatorMixin, _CacheLocator):
         return parent.from_function(py_func, py_file)
 
 
+class _SiteCacheLocator(_SourceFileBackedLocatorMixin, _CacheLocator):
+    """
+    A read-only locator pointing to one of the site cache directories in
+    `numba.config.CACHE_SITE_DIRS`, laid out like `numba.config.CACHE_DIR`.
+    These are looked up after the function's (writable) cache directory.
+    """
+    def __init__(self, py_func, py_file, site_dir):
+        self._py_file = py_file
+        self._lineno = py_func.__code__.co_firstlineno
+        self._cache_path = _get_mirrored_cache_path(site_dir, py_file)
+
+    def ensure_cache_path(self):
+        raise OSError(errno.EROFS, "site cache directories are read-only",
+                      self._cache_path)
+
+    def get_cache_path(self):
+        return self._cache_path
+
+    @classmethod
+    def from_function(cls, py_func, py_file, site_dir):
+        """
+        Create a locator instance for the given function located in the
+        given file, or None if the site cache directory *site_dir* holds no
+        cache for that file.
+        """
+        if not os.path.exists(py_file):
+            return
+        self = cls(py_func, py_file, site_dir)
+        if not os.path.isdir(self.get_cache_path()):
+            return
+        return self
+
+    @classmethod
+    def site_locators(cls, py_func, py_file):
+        """
+        Return the locators for all the site cache directories containing a
+        cache for the given function's file.
+        """
+        locators = [cls.from_function(py_func, py_file, site_dir)
+                    for site_dir in config.CACHE_SITE_DIRS]
+        return [loc for loc in locators if loc is not None]
+
+
 class _InTreeCacheLocator(_SourceFileBackedLocatorMixin, _CacheLocator):
     """
     A locator for functions backed by a regular Python module with a
@@ -316,6 +382,136 @@ class _IPythonCacheLocator(_CacheLocator):
         return self
 
 
+class _ContentHasher(object):
+    """
+    Computes a digest of the contents of a Python function that affect its
+    compilation: its bytecode and constants, its default arguments and
+    closure variables, the global values it references and, transitively,
+    the contents of the jitted functions it calls.
+
+    Unlike the source file stamp, the digest is independent from the file
+    modification time and from the other functions defined in the file.
+    """
+
+    def __init__(self):
+        # Memoized digests of the functions hashed so far, keyed by code
+        # object.  A function currently being hashed maps to None, which
+        # breaks recursion cycles.
+        self._functions = {}
+
+    def function_digest(self, py_func):
+        code = py_func.__code__
+        try:
+            digest = self._functions[code]
+        except KeyError:
+            pass
+        else:
+            return digest if digest is not None else b'<recursive>'
+        self._functions[code] = None
+        h = hashlib.sha256()
+        self._update_code(h, code)
+        self._update_value(h, py_func.__defaults__)
+        self._update_value(h, py_func.__kwdefaults__)
+        for cell in py_func.__closure__ or ():
+            try:
+                self._update_value(h, cell.cell_contents)
+            except ValueError:
+                # Empty cell
+                h.update(b'<empty cell>')
+        self._update_globals(h, code, py_func.__globals__)
+        digest = self._functions[code] = h.digest()
+        return digest
+
+    def code_digest(self, code):
+        """
+        The digest of the code object alone, ignoring line numbers.
+        """
+        h = hashlib.sha256()
+        self._update_code(h, code)
+        return h.digest()
+
+    def _update_code(self, h, code):
+        for attr in ('co_argcount', 'co_kwonlyargcount', 'co_flags',
+                     'co_names', 'co_varnames', 'co_freevars', 'co_cellvars'):
+            h.update(repr(getattr(code, attr, None)).encode('utf-8'))
+        h.update(code.co_code)
+        for const in code.co_consts:
+            self._update_const(h, const)
+
+    def _update_const(self, h, const):
+        if isinstance(const, pytypes.CodeType):
+            self._update_code(h, const)
+        elif isinstance(const, tuple):
+            h.update(b'tuple')
+            for item in const:
+                self._update_const(h, item)
+        elif isinstance(const, frozenset):
+            # The iteration order of a frozenset isn't deterministic
+            h.update(repr(sorted(map(repr, const))).encode('utf-8'))
+        else:
+            h.update(repr(const).encode('utf-8'))
+
+    def _global_names(self, code):
+        names = set(code.co_names)
+        for const in code.co_consts:
+            if isinstance(const, pytypes.CodeType):
+                names |= self._global_names(const)
+        return names
+
+    def _update_globals(self, h, code, func_globals):
+        names = self._global_names(code)
+        for name in sorted(names):
+            try:
+                value = func_globals[name]
+            except KeyError:
+                # Either a builtin, an attribute name or an undefined global
+                continue
+            h.update(name.encode('utf-8'))
+            self._update_value(h, value)
+            if isinstance(value, pytypes.ModuleType):
+                # Also hash the functions accessed as module attributes,
+                # e.g. "mod.func(x)"
+                for attr in sorted(names):
+                    func = getattr(value, attr, None)
+                    if self._is_function(func):
+                        h.update(attr.encode('utf-8'))
+                        self._update_value(h, func)
+
+    def _is_function(self, value):
+        from numba.core.dispatcher import _DispatcherBase
+        return isinstance(value, (pytypes.FunctionType, _DispatcherBase))
+
+    def _update_value(self, h, value):
+        from numba.core.dispatcher import _DispatcherBase
+
+        if isinstance(value, _DispatcherBase):
+            h.update(b'dispatcher')
+            h.update(self.function_digest(value.py_func))
+        elif isinstance(value, pytypes.FunctionType):
+            h.update(b'function')
+            h.update(self.function_digest(value))
+        elif isinstance(value, pytypes.ModuleType):
+            h.update(b'module')
+            h.update(value.__name__.encode('utf-8'))
+        elif isinstance(value, (type, pytypes.BuiltinFunctionType)):
+            h.update(b'qualname')
+            h.update(('%s.%s' % (getattr(value, '__module__', None),
+                                 value.__qualname__)).encode('utf-8'))
+        elif isinstance(value, (tuple, list)):
+            h.update(b'sequence')
+            for item in value:
+                self._update_value(h, item)
+        else:
+            # Numbers, strings, arrays, enums...  If the value can't be
+            # pickled, its repr may depend on the object identity, which
+            # errs on the side of invalidating the cache.
+            try:
+                data = pickle.dumps(value, protocol=4)
+            except Exception:
+                data = repr(value).encode('utf-8')
+            h.update(data)
+
+
 @add_metaclass(ABCMeta)
 class _CacheImpl(object):
     """
@@ -330,6 +526,7 @@ class _CacheImpl(object):
                         _IPythonCacheLocator]
 
     def __init__(self, py_func):
+        self._py_func = py_func
         self._is_closure = bool(py_func.__closure__)
         self._lineno = py_func.__code__.co_firstlineno
         # Get qualname
@@ -347,6 +544,8 @@ class _CacheImpl(object):
             raise RuntimeError("cannot cache function %r: no locator available "
                                "for file %r" % (qualname, source_path))
         self._locator = locator
+        self._site_locators = _SiteCacheLocator.site_locators(py_func,
+                                                              source_path)
         # Use filename base name as module name to avoid conflict between
         # foo/__init__.py and foo/foo.py
         filename = inspect.getfile(py_func)
@@ -360,9 +559,27 @@ class _CacheImpl(object):
         # are forbidden in Windows filenames
         fixed_fullname = fullname.replace('<', '').replace('>', '')
         fmt = '%s-%s.py%d%d%s'
-        return fmt % (fixed_fullname, self.locator.get_disambiguator(),
+        return fmt % (fixed_fullname, self.get_disambiguator(),
                       sys.version_info[0], sys.version_info[1], abiflags)
 
+    def get_disambiguator(self):
+        if (config.CACHE_STAMP == 'content' and
+                isinstance(self._locator, _SourceFileBackedLocatorMixin)):
+            # The line number changes whenever code above the function is
+            # edited, use the function's own code instead.
+            digest = _ContentHasher().code_digest(self._py_func.__code__)
+            return digest.hex()[:10]
+        return self.locator.get_disambiguator()
+
+    def get_source_stamp(self):
+        """
+        Get a stamp representing the freshness of the function, as selected
+        by NUMBA_CACHE_STAMP.
+        """
+        if config.CACHE_STAMP == 'content':
+            return _ContentHasher().function_digest(self._py_func).hex()
+        return self.locator.get_source_stamp()
+
     @property
     def filename_base(self):
         return self._filename_base
@@ -371,6 +588,13 @@ class _CacheImpl(object):
     def locator(self):
         return self._locator
 
+    @property
+    def site_locators(self):
+        """
+        The locators of the read-only site caches, in lookup order.
+        """
+        return self._site_locators
+
     @abstractmethod
     def reduce(self, data):
         "Returns the serialized form the data"
@@ -456,17 +680,126 @@ class CodeLibraryCacheImpl(_CacheImpl):
         return '-'.join([self._filename_prefix, res])
 
 
+def _is_usage_tracked():
+    """
+    Whether the cache usage (access times, hits, misses...) is recorded,
+    which costs an index update on every cache access.
+    """
+    return bool(config.CACHE_STATS or config.CACHE_MAX_SIZE or
+                config.CACHE_MAX_ENTRIES)
+
+
+class _CacheUsage(object):
+    """
+    Usage statistics of a function's cache, stored in its index.
+    """
+
+    def __init__(self):
+        # {data name -> (last access time, number of hits)}
+        self.access = {}
+        self.misses = 0
+        self.evictions = 0
+
+
+# Statistics about a function's cache entries
+FunctionCacheStats = collections.namedtuple(
+    'FunctionCacheStats',
+    ('name', 'entries', 'size', 'last_access', 'hits'))
+
+# Statistics about a cache directory.  *stale_size* is the size of the data
+# not belonging to any function known to this Numba version.
+CacheDirStats = collections.namedtuple(
+    'CacheDirStats',
+    ('path', 'format', 'functions', 'misses', 'evictions', 'stale_size'))
+
+
+def _summarize_functions(entries):
+    """
+    Summarize (function name, size, last access, hits) tuples into a list
+    of FunctionCacheStats.
+    """
+    by_name = collections.OrderedDict()
+    for name, size, last_access, hits in sorted(entries):
+        by_name.setdefault(name, []).append((size, last_access, hits))
+    return [FunctionCacheStats(name=name,
+                               entries=len(values),
+                               size=sum(v[0] for v in values),
+                               last_access=max(v[1] for v in values),
+                               hits=sum(v[2] for v in values))
+            for name, values in by_name.items()]
+
+
+def _select_evictions(candidates, max_size, max_entries):
+    """
+    Given (priority, size, item) *candidates*, return the items to evict,
+    lowest priority first, so that the remaining ones fit in *max_size*
+    bytes and *max_entries* entries (0 means unbounded).
+    """
+    candidates = sorted(candidates, key=lambda c: c[0])
+    total_size = sum(size for _, size, _ in candidates)
+    count = len(candidates)
+    evicted = []
+    for _, size, item in candidates:
+        if not ((max_size and total_size > max_size) or
+                (max_entries and count > max_entries)):
+            break
+        evicted.append(item)
+        total_size -= size
+        count -= 1
+    return evicted
+
+
+def get_cache_stats(root):
+    """
+    Return a list of CacheDirStats for all the cache directories found under
+    *root*.
+    """
+    stats = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        if any(fn.endswith('.nbi') for fn in filenames):
+            stats.append(IndexDataCacheFile.directory_stats(dirpath))
+        if any(fn.endswith('.nbp') for fn in filenames):
+            stats.append(PackedCacheFile.directory_stats(dirpath))
+    return stats
+
+
 class IndexDataCacheFile(object):
     """
     Implements the logic for the index file and data file used by a cache.
+
+    When the cache usage is tracked (see _is_usage_tracked()), the index also
+    records the last access time and the hit count of each data file, as
+    well as the number of misses and evictions of the function.  The indices
+    of a directory are then only updated with its index lock held, as loads
+    and evictions update them too.  *read_only* cache files never record
+    their usage.
     """
-    def __init__(self, cache_path, filename_base, source_stamp):
+    def __init__(self, cache_path, filename_base, source_stamp,
+                 read_only=False):
         self._cache_path = cache_path
         self._index_name = '%s.nbi' % (filename_base,)
         self._index_path = os.path.join(self._cache_path, self._index_name)
         self._data_name_pattern = '%s.{number:d}.nbc' % (filename_base,)
         self._source_stamp = source_stamp
         self._version = numba.__version__
+        self._read_only = read_only
+
+    @staticmethod
+    def _lock_path(cache_path):
+        return os.path.join(cache_path, 'numba-cache-index.lock')
+
+    @contextlib.contextmanager
+    def _updating_index(self):
+        """
+        Hold the index lock of the cache directory, if the usage is tracked,
+        for the duration of the context.
+        """
+        if _is_usage_tracked():
+            with _locked_file(self._lock_path(self._cache_path)):
+                yield
+        else:
+            yield
 
     def flush(self):
         self._save_index({})
@@ -475,21 +808,35 @@ class IndexDataCacheFile(object):
         """
         Save a new cache entry with *key* and *data*.
         """
-        overloads = self._load_index()
-        try:
-            # If key already exists, we will overwrite the file
-            data_name = overloads[key]
-        except KeyError:
-            # Find an available name for the data file
-            existing = set(overloads.values())
-            for i in itertools.count(1):
-                data_name = self._data_name(i)
-                if data_name not in existing:
-                    break
-            overloads[key] = data_name
-            self._save_index(overloads)
+        tracked = _is_usage_tracked()
+        with self._updating_index():
+            overloads, usage = self._load_index_and_usage()
+            try:
+                # If key already exists, we will overwrite the file
+                data_name = overloads[key]
+            except KeyError:
+                # Find an available name for the data file
+                existing = set(overloads.values())
+                for i in itertools.count(1):
+                    data_name = self._data_name(i)
+                    if data_name not in existing:
+                        break
+                overloads[key] = data_name
+                if tracked:
+                    usage.access[data_name] = (time.time(), 0)
+                self._save_index(overloads, usage)
+            else:
+                if tracked:
+                    usage.access[data_name] = (time.time(), 0)
+                    self._save_index(overloads, usage)
         self._save_data(data_name, data)
 
+    def keys(self):
+        """
+        Return the keys of all the fresh cache entries.
+        """
+        return list(self._load_index())
+
     def load(self, key):
         """
         Load a cache entry with *key*.
@@ -499,45 +846,252 @@ class IndexDataCacheFile(object):
         if data_name is None:
             return
         try:
-            return self._load_data(data_name)
+            data = self._load_data(data_name)
         except EnvironmentError:
             # File could have been removed while the index still refers it.
             return
+        if _is_usage_tracked() and not self._read_only:
+            self._record_hit(data_name)
+        return data
+
+    def _record_hit(self, data_name):
+        with self._updating_index():
+            overloads, usage = self._load_index_and_usage()
+            # The entry may have been evicted meanwhile
+            if data_name in overloads.values():
+                _, hits = usage.access.get(data_name, (None, 0))
+                usage.access[data_name] = (time.time(), hits + 1)
+                self._save_index(overloads, usage)
+
+    def record_miss(self):
+        """
+        Record a lookup of an entry found in none of the cache tiers.
+        """
+        if self._read_only:
+            return
+        with self._updating_index():
+            overloads, usage = self._load_index_and_usage()
+            usage.misses += 1
+            self._save_index(overloads, usage)
 
     def _load_index(self):
         """
         Load the cache index and return it as a dictionary (possibly
         empty if cache is empty or obsolete).
         """
+        return self._load_index_and_usage()[0]
+
+    def _load_index_and_usage(self):
+        """
+        Load the cache index and return it as a (dictionary, _CacheUsage)
+        tuple.  The dictionary is possibly empty if cache is empty or
+        obsolete.
+        """
+        contents = self._read_index_file(self._index_path, self._version)
+        if contents is None:
+            return {}, _CacheUsage()
+        stamp, overloads, usage = contents
+        _cache_log("[cache] index loaded from %r", self._index_path)
+        if stamp != self._source_stamp:
+            # Cache is not fresh.  Stale data files will be eventually
+            # overwritten, since they are numbered in incrementing order.
+            return {}, usage
+        else:
+            return overloads, usage
+
+    @classmethod
+    def _read_index_file(cls, index_path, version):
+        """
+        Return the (stamp, overloads, usage) contents of the index file at
+        *index_path*, or None if it doesn't exist or belongs to another
+        version.
+        """
         try:
-            with open(self._index_path, "rb") as f:
-                version = pickle.load(f)
+            with open(index_path, "rb") as f:
+                index_version = pickle.load(f)
                 data = f.read()
         except EnvironmentError as e:
             # Index doesn't exist yet?
             if e.errno in (errno.ENOENT,):
-                return {}
+                return None
             raise
-        if version != self._version:
+        if index_version != version:
             # This is another version.  Avoid trying to unpickling the
             # rest of the stream, as that may fail.
-            return {}
-        stamp, overloads = pickle.loads(data)
-        _cache_log("[cache] index loaded from %r", self._index_path)
-        if stamp != self._source_stamp:
-            # Cache is not fresh.  Stale data files will be eventually
-            # overwritten, since they are numbered in incrementing order.
-            return {}
-        else:
-            return overloads
+            return None
+        return pickle.loads(data)
 
-    def _save_index(self, overloads):
-        data = self._source_stamp, overloads
-        data = self._dump(data)
-        with self._open_for_write(self._index_path) as f:
-            pickle.dump(self._version, f, protocol=-1)
+    def _save_index(self, overloads, usage=None):
+        if usage is None:
+            usage = _CacheUsage()
+        self._write_index_file(self._index_path, self._version,
+                               self._source_stamp, overloads, usage)
+
+    @classmethod
+    def _write_index_file(cls, index_path, version, stamp, overloads, usage):
+        # Forget about the data files not referenced anymore
+        data_names = set(overloads.values())
+        usage.access = dict((k, v) for k, v in usage.access.items()
+                            if k in data_names)
+        data = stamp, overloads, usage
+        data = pickle.dumps(data, protocol=-1)
+        with cls._open_for_write(index_path) as f:
+            pickle.dump(version, f, protocol=-1)
             f.write(data)
-        _cache_log("[cache] index saved to %r", self._index_path)
+        _cache_log("[cache] index saved to %r", index_path)
+
+    @classmethod
+    def _scan_directory(cls, cache_path):
+        """
+        Scan the cache directory.  A (entries, stale, usages) tuple is
+        returned where *entries* is a list of (last access, size, hits,
+        index path, data name) tuples for the data files referenced by an
+        index of this version, *stale* a list of (mtime, size, path) tuples
+        for the other cache files and *usages* the list of _CacheUsage of
+        the indices.
+        """
+        version = numba.__version__
+        entries = []
+        stale = []
+        usages = []
+        referenced = set()
+        files = {}
+        for name in os.listdir(cache_path):
+            if name.endswith(('.nbi', '.nbc')):
+                try:
+                    files[name] = os.stat(os.path.join(cache_path, name))
+                except OSError:
+                    # Removed meanwhile
+                    pass
+        for name in files:
+            if not name.endswith('.nbi'):
+                continue
+            index_path = os.path.join(cache_path, name)
+            try:
+                contents = cls._read_index_file(index_path, version)
+            except Exception:
+                contents = None
+            if contents is None:
+                continue
+            referenced.add(name)
+            _, overloads, usage = contents
+            usages.append(usage)
+            for data_name in overloads.values():
+                st = files.get(data_name)
+                if st is None:
+                    continue
+                referenced.add(data_name)
+                last_access, hits = usage.access.get(data_name,
+                                                     (st.st_mtime, 0))
+                entries.append((last_access, st.st_size, hits, index_path,
+                                data_name))
+        for name, st in files.items():
+            if name not in referenced:
+                stale.append((st.st_mtime, st.st_size,
+                              os.path.join(cache_path, name)))
+        return entries, stale, usages
+
+    @classmethod
+    def directory_stats(cls, cache_path):
+        """
+        Return the CacheDirStats of the given cache directory.
+        """
+        entries, stale, usages = cls._scan_directory(cache_path)
+        functions = _summarize_functions(
+            (os.path.basename(index_path)[:-len('.nbi')], size, last_access,
+             hits)
+            for last_access, size, hits, index_path, _ in entries)
+        return CacheDirStats(path=cache_path,
+                             format='index',
+                             functions=functions,
+                             misses=sum(u.misses for u in usages),
+                             evictions=sum(u.evictions for u in usages),
+                             stale_size=sum(s[1] for s in stale))
+
+    @classmethod
+    def evict_directory(cls, cache_path, max_size, max_entries,
+                        grace_period=60):
+        """
+        Evict the least recently used entries of the cache directory so that
+        its data files fit in *max_size* bytes and *max_entries* files (0
+        means unbounded).  Stale files, which were last modified more than
+        *grace_period* seconds ago, are evicted first.  Return the number of
+        evicted entries.
+        """
+        if cls._within_bounds(cache_path, max_size, max_entries):
+            return 0
+        with _locked_file(cls._lock_path(cache_path)):
+            evicted = cls._evict_locked(cache_path, max_size, max_entries,
+                                        grace_period)
+        if evicted:
+            _cache_log("[cache] evicted %d entries from %r", len(evicted),
+                       cache_path)
+        return len(evicted)
+
+    @staticmethod
+    def _within_bounds(cache_path, max_size, max_entries):
+        """
+        Whether the cache directory fits in *max_size* bytes and
+        *max_entries* data files, judging from the file sizes alone so that
+        the indices needn't be read on every save.
+        """
+        size = 0
+        count = 0
+        for entry in os.scandir(cache_path):
+            if not entry.name.endswith(('.nbi', '.nbc')):
+                continue
+            try:
+                size += entry.stat().st_size
+            except OSError:
+                # Removed meanwhile
+                continue
+            # Stale index files are only evicted along data files
+            if entry.name.endswith('.nbc'):
+                count += 1
+        return ((not max_size or size <= max_size) and
+                (not max_entries or count <= max_entries))
+
+    @classmethod
+    def _evict_locked(cls, cache_path, max_size, max_entries, grace_period):
+        """
+        Evict entries as evict_directory() with the index lock held, return
+        the evicted entries.
+        """
+        entries, stale, _ = cls._scan_directory(cache_path)
+        recent = time.time() - grace_period
+        # Stale files still being written by another process are kept
+        candidates = [((0, mtime), size, (path, None))
+                      for mtime, size, path in stale if mtime < recent]
+        candidates += [((1, last_access), size, (index_path, data_name))
+                       for last_access, size, _, index_path, data_name
+                       in entries]
+        evicted = _select_evictions(candidates, max_size, max_entries)
+        by_index = collections.defaultdict(set)
+        for path, data_name in evicted:
+            if data_name is None:
+                cls._remove_file(path)
+            else:
+                by_index[path].add(data_name)
+        version = numba.__version__
+        for index_path, data_names in by_index.items():
+            contents = cls._read_index_file(index_path, version)
+            if contents is not None:
+                stamp, overloads, usage = contents
+                overloads = dict((k, v) for k, v in overloads.items()
+                                 if v not in data_names)
+                usage.evictions += len(data_names)
+                cls._write_index_file(index_path, version, stamp, overloads,
+                                      usage)
+            for data_name in data_names:
+                cls._remove_file(os.path.join(cache_path, data_name))
+        return evicted
+
+    @staticmethod
+    def _remove_file(path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
 
     def _load_data(self, name):
         path = self._data_path(name)
@@ -563,8 +1117,9 @@ class IndexDataCacheFile(object):
     def _dump(self, obj):
         return pickle.dumps(obj, protocol=-1)
 
+    @staticmethod
     @contextlib.contextmanager
-    def _open_for_write(self, filepath):
+    def _open_for_write(filepath):
         """
         Open *filepath* for writing in a race condition-free way
         (hopefully).
@@ -583,6 +1138,510 @@ class IndexDataCacheFile(object):
             raise
 
 
+def _digest(data, size):
+    """
+    Return the first *size* bytes of the SHA-256 digest of *data*.
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).digest()[:size]
+
+
+@contextlib.contextmanager
+def _locked_file(path):
+    """
+    Hold an exclusive inter-process lock on the file at *path* (created if
+    necessary) for the duration of the context.
+    """
+    with open(path, 'a+b') as f:
+        if os.name == 'nt':
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class _PackFile(object):
+    """
+    A single append-only file holding the cached data of every function
+    cached in a given directory.
+
+    The file starts with a fixed-size header followed by an open-addressing
+    hash table of fixed-size slots; the data records are appended after the
+    table.  The file is memory-mapped so that looking up an entry is a hash
+    probe rather than reading and unpickling an index.
+
+    Writers serialize on a sidecar lock file.  New records are appended
+    before their slot is published, so that concurrent readers never see a
+    slot pointing to incomplete data.  When the table gets too full, the
+    live records are copied to a new, larger file which atomically replaces
+    the old one.
+    """
+
+    _magic = b'NBPACK01'
+    # magic, numba version digest, number of slots, number of used slots,
+    # number of misses, number of evictions
+    _header = struct.Struct('<8s16sQQQQ')
+    _header_counters = struct.Struct('<QQ')
+    _header_counters_offset = 40
+    # key digest, function digest, source stamp digest, data offset,
+    # data size (0 for a deleted entry), last access time, number of hits
+    _slot = struct.Struct('<16s8s8sQQdQ')
+    _slot_usage = struct.Struct('<dQ')
+    _slot_usage_offset = 48
+    _empty_key = b'\x00' * 16
+    _initial_slots = 1024
+    _max_load = 0.5
+
+    # A {path -> instance} mapping, so that a pack file is only mapped once
+    # per process
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path):
+        self._path = path
+        self._lock_path = path + '.lock'
+        self._version = _digest(numba.__version__, 16)
+        self._lock = threading.RLock()
+        self._file = None
+        self._map = None
+        self._map_stat = None
+
+    @classmethod
+    def from_path(cls, path):
+        with cls._instances_lock:
+            try:
+                return cls._instances[path]
+            except KeyError:
+                self = cls._instances[path] = cls(path)
+                return self
+
+    @property
+    def path(self):
+        return self._path
+
+    def load(self, key, stamp):
+        """
+        Return the data stored for *key* under the given source *stamp*,
+        or None if there is none.
+        """
+        with self._lock:
+            data = self._lookup(key, stamp)
+            if data is None and self._remap():
+                # The file was modified or replaced by another writer
+                data = self._lookup(key, stamp)
+            return data
+
+    def store(self, key, func, stamp, data):
+        """
+        Store *data* for *key*, belonging to the function *func*, under the
+        given source *stamp*.
+        """
+        with self._lock, _locked_file(self._lock_path):
+            self._remap()
+            header = self._read_header()
+            if header is None:
+                # Missing or incompatible file
+                self._rewrite(self._initial_slots, (), (0, 0))
+                self._remap()
+                header = self._read_header()
+            nslots, used, misses, evictions = header
+            index, slot = self._find_slot(key, nslots)
+            if slot is None and used + 1 > nslots * self._max_load:
+                live = self._live_slots(nslots)
+                self._rewrite(max(nslots, 4 * len(live)), live,
+                              (misses, evictions))
+                self._remap()
+                nslots, used, misses, evictions = self._read_header()
+                index, slot = self._find_slot(key, nslots)
+            with open(self._path, 'r+b') as f:
+                f.seek(0, os.SEEK_END)
+                offset = f.tell()
+                f.write(key)
+                f.write(data)
+                f.flush()
+                # Publish the new record
+                f.seek(self._slot_offset(index))
+                f.write(self._slot.pack(key, func, stamp, offset + len(key),
+                                        len(data), time.time(), 0))
+                if slot is None:
+                    f.seek(0)
+                    f.write(self._header.pack(self._magic, self._version,
+                                              nslots, used + 1, misses,
+                                              evictions))
+            self._remap()
+        _cache_log("[cache] data saved to %r", self._path)
+
+    def entries(self, func, stamp):
+        """
+        Return the data of all entries belonging to the function *func*
+        under the given source *stamp*.
+        """
+        with self._lock:
+            self._remap()
+            header = self._read_header()
+            if header is None:
+                return []
+            return [self._map[slot[3]:slot[3] + slot[4]]
+                    for slot in self._live_slots(header[0])
+                    if slot[1] == func and slot[2] == stamp]
+
+    def delete(self, func):
+        """
+        Delete all entries belonging to the function *func*.
+        """
+        with self._lock, _locked_file(self._lock_path):
+            self._remap()
+            header = self._read_header()
+            if header is None:
+                return
+            nslots = header[0]
+            with open(self._path, 'r+b') as f:
+                for index in range(nslots):
+                    slot = self._read_slot(index)
+                    if slot[1] == func and slot[4]:
+                        f.seek(self._slot_offset(index))
+                        f.write(self._slot.pack(*slot[:4] + (0,) + slot[5:]))
+            self._remap()
+
+    def record_hit(self, key):
+        """
+        Record an access to the entry for *key*.
+        """
+        with self._lock, _locked_file(self._lock_path):
+            self._remap()
+            header = self._read_header()
+            if header is None:
+                return
+            index, slot = self._find_slot(key, header[0])
+            if slot is not None:
+                self._write_at(self._slot_offset(index) +
+                               self._slot_usage_offset,
+                               self._slot_usage.pack(time.time(),
+                                                     slot[6] + 1))
+
+    def record_miss(self):
+        """
+        Record a lookup of an entry not in the file.
+        """
+        with self._lock, _locked_file(self._lock_path):
+            self._remap()
+            header = self._read_header()
+            if header is not None:
+                _, _, misses, evictions = header
+                self._write_at(self._header_counters_offset,
+                               self._header_counters.pack(misses + 1,
+                                                          evictions))
+
+    def scan(self):
+        """
+        Return a (live entries, misses, evictions, records size) tuple,
+        where each live entry is a (record, last access, hits) tuple and
+        the records size includes the dead records.
+        """
+        with self._lock:
+            self._remap()
+            header = self._read_header()
+            if header is None:
+                return [], 0, 0, len(self._map) if self._map else 0
+            nslots, _, misses, evictions = header
+            live = [(self._map[slot[3]:slot[3] + slot[4]], slot[5], slot[6])
+                    for slot in self._live_slots(nslots)]
+            records_size = len(self._map) - self._slot_offset(nslots)
+            return live, misses, evictions, records_size
+
+    def evict(self, max_size, max_entries):
+        """
+        Evict the least recently used entries so that the file fits in
+        *max_size* bytes and *max_entries* entries (0 means unbounded), and
+        compact it.  Return the number of evicted entries.
+        """
+        with self._lock, _locked_file(self._lock_path):
+            self._remap()
+            header = self._read_header()
+            if header is None:
+                return 0
+            nslots, used, misses, evictions = header
+            table_size = self._slot_offset(nslots)
+            if max_size:
+                # The records must fit in what remains after the table
+                max_size = max(max_size - table_size, 1)
+            live = self._live_slots(nslots)
+            candidates = [(slot[5], len(slot[0]) + slot[4], slot)
+                          for slot in live]
+            evicted = _select_evictions(candidates, max_size, max_entries)
+            dead_size = len(self._map) - table_size - sum(c[1]
+                                                          for c in candidates)
+            if not evicted and dead_size <= len(self._map) // 2:
+                return 0
+            evicted_keys = set(slot[0] for slot in evicted)
+            live = [slot for slot in live if slot[0] not in evicted_keys]
+            self._rewrite(nslots, live, (misses, evictions + len(evicted)))
+            self._remap()
+        if evicted:
+            _cache_log("[cache] evicted %d entries from %r", len(evicted),
+                       self._path)
+        return len(evicted)
+
+    def close(self):
+        with self._lock:
+            self._unmap()
+
+    def _slot_offset(self, index):
+        return self._header.size + index * self._slot.size
+
+    def _write_at(self, offset, data):
+        with open(self._path, 'r+b') as f:
+            f.seek(offset)
+            f.write(data)
+
+    def _unmap(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._map = self._file = self._map_stat = None
+
+    def _remap(self):
+        """
+        Ensure the mapping reflects the current file on disk.  True is
+        returned if the mapping changed.
+        """
+        try:
+            st = os.stat(self._path)
+        except FileNotFoundError:
+            st = None
+        stat_key = st and (st.st_ino, st.st_dev, st.st_size)
+        if stat_key == self._map_stat:
+            return False
+        self._unmap()
+        if st is None or st.st_size < self._header.size:
+            return True
+        self._file = open(self._path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self._file.close()
+            self._file = None
+            return True
+        # Use the size actually mapped, in case the file grew meanwhile
+        self._map_stat = (st.st_ino, st.st_dev, len(self._map))
+        return True
+
+    def _read_header(self):
+        """
+        Return a (number of slots, number of used slots, number of misses,
+        number of evictions) tuple, or None if the file is missing or
+        incompatible.
+        """
+        if self._map is None:
+            return None
+        (magic, version, nslots, used,
+         misses, evictions) = self._header.unpack_from(self._map)
+        if (magic != self._magic or version != self._version or
+                len(self._map) < self._slot_offset(nslots)):
+            return None
+        return nslots, used, misses, evictions
+
+    def _read_slot(self, index):
+        return self._slot.unpack_from(self._map, self._slot_offset(index))
+
+    def _find_slot(self, key, nslots):
+        """
+        Probe the table for *key*.  An (index, slot) tuple is returned, where
+        *slot* is None if *key* is absent and *index* is where it would be
+        inserted.
+        """
+        index = int.from_bytes(key[:8], 'little') % nslots
+        for _ in range(nslots):
+            slot = self._read_slot(index)
+            if slot[0] == key:
+                return index, slot
+            if slot[0] == self._empty_key:
+                return index, None
+            index = (index + 1) % nslots
+        raise RuntimeError("cache pack file %r is full" % (self._path,))
+
+    def _lookup(self, key, stamp):
+        if self._map is None:
+            self._remap()
+        header = self._read_header()
+        if header is None:
+            return None
+        _, slot = self._find_slot(key, header[0])
+        if slot is None:
+            return None
+        _, _, slot_stamp, offset, size, _, _ = slot
+        if not size or slot_stamp != stamp:
+            return None
+        start = offset - len(key)
+        if (offset + size > len(self._map) or
+                self._map[start:offset] != key):
+            return None
+        _cache_log("[cache] data loaded from %r", self._path)
+        return self._map[offset:offset + size]
+
+    def _live_slots(self, nslots):
+        return [slot for slot in map(self._read_slot, range(nslots))
+                if slot[0] != self._empty_key and slot[4]]
+
+    def _rewrite(self, nslots, live, counters):
+        """
+        Replace the file with a new one having *nslots* slots and holding
+        the records of the *live* slots of the current file.  *counters*
+        are the (misses, evictions) counts to carry over.
+        """
+        table = bytearray(nslots * self._slot.size)
+        tmpname = '%s.tmp.%d' % (self._path, os.getpid())
+        try:
+            with open(tmpname, 'wb') as f:
+                f.write(self._header.pack(self._magic, self._version,
+                                          nslots, len(live), *counters))
+                f.write(table)
+                for slot in live:
+                    key, offset, size = slot[0], slot[3], slot[4]
+                    index = int.from_bytes(key[:8], 'little') % nslots
+                    while (table[index * self._slot.size:
+                                 index * self._slot.size + len(key)] !=
+                           self._empty_key):
+                        index = (index + 1) % nslots
+                    new_offset = f.tell() + len(key)
+                    f.write(key)
+                    f.write(self._map[offset:offset + size])
+                    self._slot.pack_into(table, index * self._slot.size,
+                                         *slot[:3] + (new_offset,) + slot[4:])
+                f.seek(self._header.size)
+                f.write(table)
+            # Release our own mapping before replacing the file (required
+            # on Windows)
+            self._unmap()
+            file_replace(tmpname, self._path)
+        except Exception:
+            try:
+                os.unlink(tmpname)
+            except OSError:
+                pass
+            raise
+        _cache_log("[cache] pack file rewritten to %r", self._path)
+
+
+class PackedCacheFile(object):
+    """
+    Implements the same interface as IndexDataCacheFile, but stores the
+    data in a pack file shared by all functions cached in the directory
+    (see _PackFile).
+    """
+    def __init__(self, cache_path, filename_base, source_stamp,
+                 read_only=False):
+        self._cache_path = cache_path
+        self._pack = _PackFile.from_path(self._pack_path(cache_path))
+        self._read_only = read_only
+        self._filename_base = filename_base
+        self._func_digest = _digest(filename_base, 8)
+        self._stamp_digest = _digest(pickle.dumps(source_stamp, protocol=2),
+                                     8)
+
+    @classmethod
+    def _pack_path(cls, cache_path):
+        abiflags = getattr(sys, 'abiflags', '')
+        pack_name = 'numba-cache.py%d%d%s.nbp' % (sys.version_info[0],
+                                                  sys.version_info[1],
+                                                  abiflags)
+        return os.path.join(cache_path, pack_name)
+
+    def flush(self):
+        self._pack.delete(self._func_digest)
+
+    def save(self, key, data):
+        """
+        Save a new cache entry with *key* and *data*.
+        """
+        # The function name and the key are stored along the data so that
+        # they can be listed
+        self._pack.store(self._key_digest(key), self._func_digest,
+                         self._stamp_digest,
+                         self._dump((self._filename_base, key)) +
+                         self._dump(data))
+
+    def load(self, key):
+        """
+        Load a cache entry with *key*.
+        """
+        key_digest = self._key_digest(key)
+        data = self._pack.load(key_digest, self._stamp_digest)
+        if data is None:
+            return
+        if _is_usage_tracked() and not self._read_only:
+            self._pack.record_hit(key_digest)
+        unpickler = pickle.Unpickler(io.BytesIO(data))
+        unpickler.load()
+        return unpickler.load()
+
+    def record_miss(self):
+        """
+        Record a lookup of an entry found in none of the cache tiers.
+        """
+        if not self._read_only:
+            self._pack.record_miss()
+
+    def keys(self):
+        """
+        Return the keys of all the fresh cache entries.
+        """
+        # pickle.loads() ignores the data trailing the key
+        return [pickle.loads(data)[1]
+                for data in self._pack.entries(self._func_digest,
+                                               self._stamp_digest)]
+
+    @classmethod
+    def directory_stats(cls, cache_path):
+        """
+        Return the CacheDirStats of the given cache directory.
+        """
+        pack = _PackFile.from_path(cls._pack_path(cache_path))
+        live, misses, evictions, records_size = pack.scan()
+        entries = []
+        for record, last_access, hits in live:
+            name, _ = pickle.loads(record)
+            entries.append((name, len(record), last_access, hits))
+        functions = _summarize_functions(entries)
+        live_size = sum(f.size for f in functions)
+        return CacheDirStats(path=cache_path,
+                             format='packed',
+                             functions=functions,
+                             misses=misses,
+                             evictions=evictions,
+                             stale_size=max(records_size - live_size, 0))
+
+    @classmethod
+    def evict_directory(cls, cache_path, max_size, max_entries):
+        """
+        Evict the least recently used entries of the cache directory so that
+        its pack file fits in *max_size* bytes and *max_entries* entries (0
+        means unbounded).  Return the number of evicted entries.
+        """
+        pack = _PackFile.from_path(cls._pack_path(cache_path))
+        return pack.evict(max_size, max_entries)
+
+    def _key_digest(self, key):
+        # The type objects making up the key have a stable repr
+        return _digest('%s:%r' % (self._filename_base, key), 16)
+
+    def _dump(self, obj):
+        return pickle.dumps(obj, protocol=-1)
+
+
 class Cache(_Cache):
     """
     A per-function compilation cache.  The cache saves data in separate
@@ -600,6 +1659,10 @@ class Cache(_Cache):
     Separate index and data files per Python version avoid pickle
     compatibility problems.
 
+    Alternatively, when NUMBA_CACHE_FORMAT is "packed", all functions cached
+    in a given directory share a single memory-mapped pack file
+    ("numba-cache.pyXY.nbp"); see PackedCacheFile.
+
     Note:
     This contains the driver logic only.  The core logic is provided
     by a subclass of ``_CacheImpl`` specified as *_impl_class* in the subclass.
@@ -608,18 +1671,53 @@ class Cache(_Cache):
     # The following class variables must be overridden by subclass.
     _impl_class = None
 
+    # The classes implementing the on-disk formats selectable with
+    # NUMBA_CACHE_FORMAT
+    _cache_file_classes = {
+        'index': IndexDataCacheFile,
+        'packed': PackedCacheFile,
+        }
+
     def __init__(self, py_func):
         self._name = repr(py_func)
         self._impl = self._impl_class(py_func)
         self._cache_path = self._impl.locator.get_cache_path()
-        # This may be a bit strict but avoids us maintaining a magic number
-        source_stamp = self._impl.locator.get_source_stamp()
-        filename_base = self._impl.filename_base
-        self._cache_file = IndexDataCacheFile(cache_path=self._cache_path,
-                                              filename_base=filename_base,
-                                              source_stamp=source_stamp)
+        self._cache_file_class = self._cache_file_classes[config.CACHE_FORMAT]
+        self._cache_file_instance = None
+        if config.CACHE_STAMP != 'content':
+            # The source file must be stamped when the function is defined.
+            # By contrast, the content stamp is computed on first use since
+            # the globals referenced by the function may not be defined yet.
+            self._cache_file
         self.enable()
 
+    @property
+    def _cache_file(self):
+        if self._cache_file_instance is None:
+            # This may be a bit strict but avoids us maintaining a magic number
+            source_stamp = self._impl.get_source_stamp()
+            filename_base = self._impl.filename_base
+            self._site_cache_files = [
+                self._cache_file_class(cache_path=loc.get_cache_path(),
+                                       filename_base=filename_base,
+                                       source_stamp=source_stamp,
+                                       read_only=True)
+                for loc in self._impl.site_locators]
+            self._cache_file_instance = self._cache_file_class(
+                cache_path=self._cache_path,
+                filename_base=filename_base,
+                source_stamp=source_stamp)
+        return self._cache_file_instance
+
+    def _iter_cache_files(self):
+        """
+        Iterate over the cache files in lookup order: the writable cache
+        file first, then the read-only site cache files.
+        """
+        yield self._cache_file
+        for cache_file in self._site_cache_files:
+            yield cache_file
+
     def __repr__(self):
         return "<%s py_func=%r>" % (self.__class__.__name__, self._name)
 
@@ -635,6 +1733,8 @@ class Cache(_Cache):
 
     def flush(self):
         self._cache_file.flush()
+        # The read-only site caches can't be flushed, ignore them instead
+        self._site_cache_files = []
 
     def load_overload(self, sig, target_context):
         """
@@ -648,13 +1748,55 @@ class Cache(_Cache):
         # None returned if the `with` block swallows an exception
 
     def _load_overload(self, sig, target_context):
+        payload = self._read_overload(sig, target_context)
+        if payload is not None:
+            return self._impl.rebuild(target_context, payload)
+
+    def cached_signatures(self, target_context):
+        """
+        Return the signatures for which an overload compiled with the
+        *target_context*'s codegen is available in the cache.
+        """
+        with self._guard_against_spurious_io_errors():
+            if not self._enabled:
+                return []
+            magic_tuple = _get_codegen(target_context).magic_tuple()
+            sigs = []
+            for cache_file in self._iter_cache_files():
+                sigs.extend(sig for sig, magic in cache_file.keys()
+                            if magic == magic_tuple and sig not in sigs)
+            return sigs
+        return []
+
+    def read_overload(self, sig, target_context):
+        """
+        Read the cached data for the given signature, without recreating
+        the cached object.  Unlike load_overload(), this needn't be called
+        with the compiler lock held.  The returned payload must be passed
+        to rebuild_overload(); None is returned if not found in the cache.
+        """
+        with self._guard_against_spurious_io_errors():
+            return self._read_overload(sig, target_context)
+
+    def _read_overload(self, sig, target_context):
         if not self._enabled:
             return
         key = self._index_key(sig, _get_codegen(target_context))
-        data = self._cache_file.load(key)
-        if data is not None:
-            data = self._impl.rebuild(target_context, data)
-        return data
+        for cache_file in self._iter_cache_files():
+            payload = cache_file.load(key)
+            if payload is not None:
+                return payload
+        if _is_usage_tracked():
+            # Only count the lookups missing in all the tiers
+            self._cache_file.record_miss()
+
+    def rebuild_overload(self, target_context, payload):
+        """
+        Recreate the cached object from a *payload* returned by
+        read_overload(), using the *target_context*.
+        """
+        target_context.refresh()
+        return self._impl.rebuild(target_context, payload)
 
     def save_overload(self, sig, data):
         """
@@ -672,6 +1814,10 @@ class Cache(_Cache):
         key = self._index_key(sig, _get_codegen(data))
         data = self._impl.reduce(data)
         self._cache_file.save(key, data)
+        if config.CACHE_MAX_SIZE or config.CACHE_MAX_ENTRIES:
+            self._cache_file_class.evict_directory(self._cache_path,
+                                                   config.CACHE_MAX_SIZE,
+                                                   config.CACHE_MAX_ENTRIES)
 
     @contextlib.contextmanager
     def _guard_against_spurious_io_errors(self):
@@ -1,8 +1,10 @@
 import warnings
 import functools
 import locale
+import threading
 import weakref
 import ctypes
+from contextlib import contextmanager
 
 import llvmlite.llvmpy.core as lc
 import llvmlite.llvmpy.passes as lp
@@ -10,14 +12,61 @@ import llvmlite.binding as ll
 import llvmlite.ir as llvmir
 
 from numba.core import utils, config, cgutils
+from numba.core.compile_profile import stage_record, timer
 from numba.core.runtime.nrtopt import remove_redundant_nrt_refct
 from numba.core.runtime import rtsys
-from numba.core.compiler_lock import require_global_compiler_lock
+from numba.core.compiler_lock import (global_compiler_lock,
+                                     require_global_compiler_lock)
 
 _x86arch = frozenset(['x86', 'i386', 'i486', 'i586', 'i686', 'i786',
                       'i886', 'i986'])
 
 
+# The number of acquisitions of the global compiler lock the current thread
+# keeps while optimizing and emitting machine code, or None if it keeps the
+# lock (see parallel_codegen())
+_codegen_state = threading.local()
+
+
+@contextmanager
+def parallel_codegen():
+    """
+    Within this context, the JIT code libraries finalized by the outermost
+    compiler pipeline of the current thread are optimized and compiled to
+    machine code with the global compiler lock released down to the number
+    of times the thread held it on entering the context, so that other
+    threads can compile meanwhile.  The pipelines nested in it (e.g. of the
+    callees compiled while typing the function) keep the lock, as the
+    outer pipeline is still running.
+    """
+    old = (getattr(_codegen_state, 'release_depth', None),
+           getattr(_codegen_state, 'in_pipeline', False))
+    _codegen_state.release_depth = global_compiler_lock.depth
+    _codegen_state.in_pipeline = False
+    try:
+        yield
+    finally:
+        _codegen_state.release_depth, _codegen_state.in_pipeline = old
+
+
+@contextmanager
+def compiler_pipeline():
+    """
+    Wraps the run of a compiler pipeline by the current thread, so that the
+    pipelines nested in it keep the global compiler lock while generating
+    machine code.
+    """
+    old = (getattr(_codegen_state, 'release_depth', None),
+           getattr(_codegen_state, 'in_pipeline', False))
+    if old[1]:
+        _codegen_state.release_depth = None
+    _codegen_state.in_pipeline = True
+    try:
+        yield
+    finally:
+        _codegen_state.release_depth, _codegen_state.in_pipeline = old
+
+
 def _is_x86(triple):
     arch = triple.split('-')[0]
     return arch in _x86arch
@@ -81,6 +130,7 @@ class CodeLibrary(object):
     _finalized = False
     _object_caching_enabled = False
     _disable_inspection = False
+    _emitted_object = None
 
     def __init__(self, codegen, name):
         self._codegen = codegen
@@ -92,6 +142,8 @@ class CodeLibrary(object):
         self._shared_module = None
         # Track names of the dynamic globals
         self._dynamic_globals = []
+        # The stage records of NUMBA_COMPILE_PROFILE
+        self.compile_stages = []
 
     @property
     def has_dynamic_globals(self):
@@ -117,6 +169,20 @@ class CodeLibrary(object):
         if not self._finalized:
             self.finalize()
 
+    @contextmanager
+    def _profile_stage(self, name, **info):
+        """
+        Record the wall time of the stage run in the context, if compile
+        profiling is enabled.
+        """
+        if not config.COMPILE_PROFILE:
+            yield
+            return
+        start = timer()
+        yield
+        self.compile_stages.append(stage_record(name, 'llvm', start,
+                                                timer() - start, info))
+
     def _optimize_functions(self, ll_module):
         """
         Internal: run function-level optimizations inside *ll_module*.
@@ -202,7 +268,8 @@ class CodeLibrary(object):
         self.add_llvm_module(ll_module)
 
     def add_llvm_module(self, ll_module):
-        self._optimize_functions(ll_module)
+        with self._profile_stage('llvm_optimize_functions'):
+            self._optimize_functions(ll_module)
         # TODO: we shouldn't need to recreate the LLVM module object
         ll_module = remove_redundant_nrt_refct(ll_module)
         self._final_module.link_in(ll_module)
@@ -234,10 +301,18 @@ class CodeLibrary(object):
 
         # Optimize the module after all dependences are linked in above,
         # to allow for inlining.
-        self._optimize_final_module()
+        with self._profile_stage('llvm_optimize_module'):
+            self._optimize_final_module()
 
         self._final_module.verify()
-        self._finalize_final_module()
+        if config.COMPILE_PROFILE:
+            info = dict(llvm_functions=sum(1 for fn in
+                                           self.get_defined_functions()),
+                        llvm_bitcode_size=len(self._final_module.as_bitcode()))
+        else:
+            info = {}
+        with self._profile_stage('llvm_codegen', **info):
+            self._finalize_final_module()
 
     def _finalize_dyanmic_globals(self):
         # Scan for dynamic globals
@@ -397,6 +472,14 @@ class CodeLibrary(object):
             self = ll_module.__library
         except AttributeError:
             return
+        if self._emitted_object is not None:
+            # The machine code was emitted outside the compiler lock
+            buf = self._emitted_object
+            self._emitted_object = None
+            if self._object_caching_enabled:
+                self._compiled = True
+                self._compiled_object = buf
+            return buf
         if self._object_caching_enabled and self._compiled_object:
             buf = self._compiled_object
             self._compiled_object = None
@@ -470,6 +553,21 @@ class AOTCodeLibrary(CodeLibrary):
 
 class JITCodeLibrary(CodeLibrary):
 
+    def _optimize_final_module(self):
+        release_depth = getattr(_codegen_state, 'release_depth', None)
+        if release_depth is None:
+            return super(JITCodeLibrary, self)._optimize_final_module()
+        # The final module is private to this library until it is
+        # finalized, so it can be optimized and compiled while other threads
+        # compile other functions.  Note llvmlite serializes the calls into
+        # LLVM, so this overlaps with their type inference and lowering
+        # rather than with their own code generation.
+        with global_compiler_lock.released(release_depth):
+            super(JITCodeLibrary, self)._optimize_final_module()
+            # Handed to the execution engine by _object_getbuffer_hook()
+            self._emitted_object = self._codegen._tm.emit_object(
+                self._final_module)
+
     def get_pointer_to_function(self, name):
         """
         Generate native code for function named *name* and return a pointer
@@ -0,0 +1,155 @@
+"""
+Opt-in compile-time profiling, enabled with NUMBA_COMPILE_PROFILE.
+
+The wall time of each compiler pass and LLVM stage, along with the size of
+the Numba IR after each pass and of the LLVM module, is recorded for every
+compiled function and signature.  The resulting CompileProfile is available
+as the 'compile_profile' entry of the dispatcher's get_metadata(), and all
+the recorded profiles can be dumped as a Chrome trace (see
+dump_chrome_trace()) to be viewed in chrome://tracing or Perfetto.
+"""
+
+import json
+import os
+import threading
+import timeit
+from collections import namedtuple
+
+
+timer = timeit.default_timer
+
+# A timed compilation stage.  *start* and *duration* are in seconds (*start*
+# is relative to an arbitrary origin), *info* is a dict of sizes measured at
+# the end of the stage.
+stage_record = namedtuple('stage_record',
+                          'name category start duration info')
+
+# All the profiles recorded so far, in order of creation
+_profiles = []
+_profiles_lock = threading.Lock()
+
+
+class CompileProfile(object):
+    """
+    The compile-time profile of a function for a given signature.
+    """
+
+    def __init__(self, func_name, args):
+        self.func_name = func_name
+        self.args = tuple(args)
+        self.thread_id = threading.get_ident()
+        self.stages = []
+        with _profiles_lock:
+            _profiles.append(self)
+
+    def add_stage(self, name, category, start, duration, **info):
+        self.stages.append(stage_record(name, category, start, duration,
+                                        info))
+
+    def add_pass(self, pipeline_name, pass_name, start, duration, func_ir):
+        """
+        Record a compiler pass run in the given pipeline.
+        """
+        info = {'pipeline': pipeline_name}
+        if func_ir is not None:
+            info.update(count_ir_nodes(func_ir))
+        self.add_stage(pass_name, 'pass', start, duration, **info)
+
+    def add_library(self, library):
+        """
+        Record the LLVM stages run by the given code library.
+        """
+        self.stages.extend(library.compile_stages)
+
+    @property
+    def total_time(self):
+        """
+        The wall time from the start of the first stage to the end of the
+        last one.
+        """
+        if not self.stages:
+            return 0.0
+        start = min(s.start for s in self.stages)
+        end = max(s.start + s.duration for s in self.stages)
+        return end - start
+
+    def summary(self):
+        """
+        Return a list of (stage name, total duration) pairs, slowest first.
+        """
+        durations = {}
+        for s in self.stages:
+            durations[s.name] = durations.get(s.name, 0.0) + s.duration
+        return sorted(durations.items(), key=lambda item: -item[1])
+
+    def __repr__(self):
+        return "<%s %s%s: %.3f s>" % (self.__class__.__name__,
+                                      self.func_name, self.args,
+                                      self.total_time)
+
+
+def count_ir_nodes(func_ir):
+    """
+    Return a dict of the number of blocks and statements of *func_ir*.
+    """
+    blocks = func_ir.blocks
+    return {'ir_blocks': len(blocks),
+            'ir_stmts': sum(len(block.body) for block in blocks.values())}
+
+
+def get_profiles():
+    """
+    Return the list of all the CompileProfiles recorded so far.
+    """
+    with _profiles_lock:
+        return list(_profiles)
+
+
+def clear_profiles():
+    """
+    Forget the CompileProfiles recorded so far.
+    """
+    with _profiles_lock:
+        del _profiles[:]
+
+
+def chrome_trace(profiles=None):
+    """
+    Return the given CompileProfiles (by default, all the recorded ones) in
+    the Chrome trace event format, as a JSON-serializable dict.
+    """
+    if profiles is None:
+        profiles = get_profiles()
+    pid = os.getpid()
+    events = []
+
+    def add_event(name, category, start, duration, tid, args):
+        events.append({'name': name,
+                       'cat': category,
+                       'ph': 'X',
+                       'ts': start * 1e6,
+                       'dur': duration * 1e6,
+                       'pid': pid,
+                       'tid': tid,
+                       'args': args})
+
+    for profile in profiles:
+        if not profile.stages:
+            continue
+        start = min(s.start for s in profile.stages)
+        signature = ', '.join(str(a) for a in profile.args)
+        add_event('%s(%s)' % (profile.func_name, signature), 'function',
+                  start, profile.total_time, profile.thread_id, {})
+        for s in profile.stages:
+            add_event(s.name, s.category, s.start, s.duration,
+                      profile.thread_id, s.info)
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def dump_chrome_trace(path, profiles=None):
+    """
+    Write the given CompileProfiles (by default, all the recorded ones) as
+    a Chrome trace JSON file at *path*.
+    """
+    with open(path, 'w') as f:
+        json.dump(chrome_trace(profiles), f)
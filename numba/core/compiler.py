@@ -9,7 +9,9 @@ from numba.parfors.parfor import ParforDiagnostics
 from numba.core.inline_closurecall import InlineClosureCallPass
 from numba.core.errors import CompilerError
 
+from numba.core.codegen import compiler_pipeline
 from numba.core.compiler_machinery import PassManager
+from numba.core.compile_profile import CompileProfile
 
 from numba.core.untyped_passes import (ExtractByteCode, TranslateByteCode,
                                        FixupArgs, IRProcessing, DeadBranchPrune,
@@ -306,6 +308,9 @@ class CompilerBase(object):
         self.state.parfor_diagnostics = ParforDiagnostics()
         self.state.metadata['parfor_diagnostics'] = \
             self.state.parfor_diagnostics
+        if config.PARFOR_PROFILE:
+            # filled by the lowering of the parfors
+            self.state.metadata['parfor_profile'] = []
 
         self.state.status = _CompileStatus(
             can_fallback=self.state.flags.enable_pyobject,
@@ -347,6 +352,11 @@ class CompilerBase(object):
         Populate and run compiler pipeline
         """
         pms = self.define_pipelines()
+        if config.COMPILE_PROFILE:
+            self.state.metadata['compile_profile'] = CompileProfile(
+                "%s.%s" % (self.state.func_id.modname,
+                           self.state.func_id.func_qualname),
+                self.state.args)
         for pm in pms:
             pipeline_name = pm.pipeline_name
             func_name = "%s.%s" % (self.state.func_id.modname,
@@ -374,6 +384,10 @@ class CompilerBase(object):
         # Pipeline is done, remove self reference to release refs to user code
         self.state.pipeline = None
 
+        profile = self.state.metadata.get('compile_profile')
+        if profile is not None and self.state.library is not None:
+            profile.add_library(self.state.library)
+
         # organise a return
         if res is not None:
             # Early pipeline completion
@@ -387,14 +401,16 @@ class CompilerBase(object):
         Populate and run pipeline for bytecode input
         """
         assert self.state.func_ir is None
-        return self._compile_core()
+        with compiler_pipeline():
+            return self._compile_core()
 
     def _compile_ir(self):
         """
         Populate and run pipeline for IR input
         """
         assert self.state.func_ir is not None
-        return self._compile_core()
+        with compiler_pipeline():
+            return self._compile_core()
 
 
 class Compiler(CompilerBase):
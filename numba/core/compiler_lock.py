@@ -1,3 +1,4 @@
+import contextlib
 import threading
 import functools
 
@@ -6,11 +7,16 @@ import functools
 class _CompilerLock(object):
     def __init__(self):
         self._lock = threading.RLock()
+        # The number of times the owning thread acquired the lock, only
+        # updated by that thread
+        self._depth = 0
 
     def acquire(self):
         self._lock.acquire()
+        self._depth += 1
 
     def release(self):
+        self._depth -= 1
         self._lock.release()
 
     def __enter__(self):
@@ -19,6 +25,30 @@ class _CompilerLock(object):
     def __exit__(self, exc_val, exc_type, traceback):
         self.release()
 
+    @property
+    def depth(self):
+        """
+        The number of times the current thread holds the lock.
+        """
+        return self._depth if self.is_locked() else 0
+
+    @contextlib.contextmanager
+    def released(self, depth=0):
+        """
+        Release the acquisitions of the lock by the current thread beyond
+        *depth* for the duration of the context, and reacquire them on exit.
+        The lock is only given up if *depth* is zero.  The code running in
+        the context mustn't touch any shared compiler state.
+        """
+        count = self.depth - depth
+        for _ in range(count):
+            self.release()
+        try:
+            yield
+        finally:
+            for _ in range(count):
+                self.acquire()
+
     def is_locked(self):
         is_owned = getattr(self._lock, '_is_owned')
         if not callable(is_owned):
@@ -306,6 +306,11 @@ class PassManager(object):
                           finalize_time.elapsed)
         self.exec_times["%s_%s" % (index, pss.name())] = pt
 
+        profile = internal_state.get('metadata', {}).get('compile_profile')
+        if profile is not None:
+            profile.add_pass(self.pipeline_name, pss.name(), init_time.ts,
+                             sum(pt), internal_state.get('func_ir'))
+
         # debug print after this pass?
         debug_print(pss.name(), self._print_after + self._print_wrap, "AFTER")
 
@@ -42,6 +42,53 @@ def _parse_cc(text):
         return int(grp[0]), int(grp[1])
 
 
+def _parse_paths(text):
+    """
+    Parse a list of paths separated by os.pathsep.
+    """
+    return [path for path in text.split(os.pathsep) if path]
+
+
+def _parse_choice(*choices):
+    """
+    Return a parser accepting any of the given (lowercase) names.
+    """
+    def parse(text):
+        value = text.strip().lower()
+        if value not in choices:
+            raise ValueError("%r is not one of %s" % (text, choices))
+        return value
+    return parse
+
+
+def _parse_size(text):
+    """
+    Parse a size in bytes, optionally suffixed with K, M or G.
+    """
+    text = text.strip().upper().rstrip('B')
+    multiplier = 1
+    for suffix, factor in (('K', 1 << 10), ('M', 1 << 20), ('G', 1 << 30)):
+        if text.endswith(suffix):
+            text = text[:-1]
+            multiplier = factor
+            break
+    return int(float(text) * multiplier)
+
+
+def _parse_serial_threshold(text):
+    """
+    Parse the trip count below which parallel regions run serially, or
+    'adaptive'.
+    """
+    value = text.strip().lower()
+    if value == 'adaptive':
+        return value
+    value = int(value)
+    if value < 0:
+        raise ValueError("%r is negative" % (text,))
+    return value
+
+
 def _os_supports_avx():
     """
     Whether the current OS supports AVX, regardless of the CPU.
@@ -180,6 +227,50 @@ class _EnvReloader(object):
         # Contains path to the directory
         CACHE_DIR = _readenv("NUMBA_CACHE_DIR", str, "")
 
+        # Read-only cache directories, separated by os.pathsep, laid out like
+        # CACHE_DIR and looked up after the writable cache directory (e.g.
+        # populated with "numba --precompile-cache" when building an image)
+        CACHE_SITE_DIRS = _readenv("NUMBA_CACHE_SITE_DIRS", _parse_paths, [])
+
+        # On-disk format of the cache, either "index" (one index file per
+        # function plus one data file per overload) or "packed" (a single
+        # memory-mapped file per cache directory)
+        CACHE_FORMAT = _readenv("NUMBA_CACHE_FORMAT",
+                                _parse_choice('index', 'packed'), "index")
+
+        # How the freshness of cached functions is checked, either "mtime"
+        # (modification time and size of the source file) or "content" (hash
+        # of the function's bytecode, referenced globals and callees)
+        CACHE_STAMP = _readenv("NUMBA_CACHE_STAMP",
+                               _parse_choice('mtime', 'content'), "mtime")
+
+        # Number of background threads used to load eagerly the cached
+        # overloads of functions as they are decorated with cache=True,
+        # 0 disables it
+        CACHE_WARMUP = _readenv("NUMBA_CACHE_WARMUP", int, 0)
+
+        # Maximum size in bytes (with an optional K, M or G suffix) and
+        # number of entries of a cache directory, 0 means unbounded.  The
+        # least recently used entries are evicted beyond that.
+        CACHE_MAX_SIZE = _readenv("NUMBA_CACHE_MAX_SIZE", _parse_size, 0)
+        CACHE_MAX_ENTRIES = _readenv("NUMBA_CACHE_MAX_ENTRIES", int, 0)
+
+        # Record the cache usage (hits, misses, access times) even if the
+        # cache size is unbounded
+        CACHE_STATS = _readenv("NUMBA_CACHE_STATS", int, 0)
+
+        # Record the wall time of each compiler pass and LLVM stage, and the
+        # IR sizes, in the compile_profile metadata of compiled functions
+        COMPILE_PROFILE = _readenv("NUMBA_COMPILE_PROFILE", int, 0)
+
+        # Count the calls of every parfor and time them, along with the
+        # chunks run by each thread, see the dispatcher's parfor_profile()
+        PARFOR_PROFILE = _readenv("NUMBA_PARFOR_PROFILE", int, 0)
+
+        # Approximate number of iterations in the tiles of the stencils in
+        # parallel mode without a tile option, 0 disables their tiling
+        STENCIL_TILE_SIZE = _readenv("NUMBA_STENCIL_TILE_SIZE", int, 32768)
+
         # Enable tracing support
         TRACE = _readenv("NUMBA_TRACE", int, 0)
 
@@ -286,6 +377,21 @@ class _EnvReloader(object):
         # choose parallel backend to use
         THREADING_LAYER = _readenv("NUMBA_THREADING_LAYER", str, 'default')
 
+        # pin the threads of the threading layer to CPUs, 'compact',
+        # 'scatter' or a list of CPUs, e.g. '0-7,16-23'; by default the
+        # threads are not pinned
+        THREAD_AFFINITY = _readenv("NUMBA_THREAD_AFFINITY", str, '')
+
+        # run the same part of the iteration space of parallel loops on the
+        # same thread from one loop to the next
+        FIRST_TOUCH = _readenv("NUMBA_FIRST_TOUCH", int, 0)
+
+        # run parallel regions with fewer iterations than this serially on
+        # the calling thread, or learn when to with 'adaptive'; 0 disables
+        # the serial fallback
+        PARALLEL_SERIAL_THRESHOLD = _readenv(
+            "NUMBA_PARALLEL_SERIAL_THRESHOLD", _parse_serial_threshold, 0)
+
         # CUDA Configs
 
         # Force CUDA compute capability to a specific version
@@ -45,7 +45,18 @@ class ParallelOptions(object):
     Options for controlling auto parallelization.
     """
 
+    schedules = ('static', 'dynamic', 'guided')
+
     def __init__(self, value):
+        # How the iterations of parallel loops are distributed to threads
+        self.schedule = 'static'
+        self.chunksize = 0
+        # Upper bound on the memory used by the private copies of an array
+        # reduction, 0 means one copy per thread
+        self.reduction_max_bytes = 0
+        # Trip count below which parallel regions run serially, or
+        # 'adaptive', None for NUMBA_PARALLEL_SERIAL_THRESHOLD
+        self.serial_threshold = None
         if isinstance(value, bool):
             self.enabled = value
             self.comprehension = value
@@ -54,6 +65,7 @@ class ParallelOptions(object):
             self.numpy = value
             self.stencil = value
             self.fusion = value
+            self.stencil_fusion = value
             self.prange = value
         elif isinstance(value, dict):
             self.enabled = True
@@ -63,10 +75,40 @@ class ParallelOptions(object):
             self.numpy = value.pop('numpy', True)
             self.stencil = value.pop('stencil', True)
             self.fusion = value.pop('fusion', True)
+            self.stencil_fusion = value.pop('stencil_fusion', True)
             self.prange = value.pop('prange', True)
+            self.schedule = value.pop('schedule', 'static')
+            self.chunksize = value.pop('chunksize', 0)
+            self.reduction_max_bytes = value.pop('reduction_max_bytes', 0)
+            self.serial_threshold = value.pop('serial_threshold', None)
             if value:
                 msg = "Unrecognized parallel options: %s" % value.keys()
                 raise NameError(msg)
+            if self.schedule not in self.schedules:
+                msg = ("Expected parallel schedule to be one of %s, got %r"
+                       % (", ".join(map(repr, self.schedules)),
+                          self.schedule))
+                raise ValueError(msg)
+            if (not isinstance(self.chunksize, int) or
+                    isinstance(self.chunksize, bool) or self.chunksize < 0):
+                msg = ("Expected parallel chunksize to be a non-negative "
+                       "integer, got %r" % (self.chunksize,))
+                raise ValueError(msg)
+            if (not isinstance(self.reduction_max_bytes, int) or
+                    isinstance(self.reduction_max_bytes, bool) or
+                    self.reduction_max_bytes < 0):
+                msg = ("Expected parallel reduction_max_bytes to be a "
+                       "non-negative integer, got %r"
+                       % (self.reduction_max_bytes,))
+                raise ValueError(msg)
+            threshold = self.serial_threshold
+            if not (threshold is None or threshold == 'adaptive' or
+                    (isinstance(threshold, int) and
+                     not isinstance(threshold, bool) and threshold >= 0)):
+                msg = ("Expected parallel serial_threshold to be a "
+                       "non-negative integer or 'adaptive', got %r"
+                       % (threshold,))
+                raise ValueError(msg)
         else:
             msg = "Expect parallel option to be either a bool or a dict"
             raise ValueError(msg)
@@ -10,6 +10,7 @@ import logging
 
 from numba.core.errors import DeprecationError, NumbaDeprecationWarning
 from numba.stencils.stencil import stencil
+from numba.parfors.reduction import reduction
 from numba.core import config, sigutils, registry
 
 
@@ -6,13 +6,16 @@ import functools
 import os
 import struct
 import sys
+import threading
 import types as pytypes
 import uuid
 import weakref
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 
 from numba import _dispatcher
 from numba.core import utils, types, errors, typing, serialize, config, compiler, sigutils
+from numba.core.codegen import parallel_codegen
 from numba.core.compiler_lock import global_compiler_lock
 from numba.core.typeconv.rules import default_type_manager
 from numba.core.typing.templates import fold_arguments
@@ -29,13 +32,17 @@ class OmittedArg(object):
 
     def __init__(self, value):
         self.value = value
+        # Holding the type keeps its typecode valid, which allows the
+        # dispatcher to type omitted arguments without calling back here
+        self._type = types.Omitted(value)
+        self._numba_typecode_ = self._type._code
 
     def __repr__(self):
         return "omitted arg(%r)" % (self.value,)
 
     @property
     def _numba_type_(self):
-        return types.Omitted(self.value)
+        return self._type
 
 
 class _FunctionCompiler(object):
@@ -167,17 +174,23 @@ _CompileStats = collections.namedtuple(
 class _CompilingCounter(object):
     """
     A simple counter that increment in __enter__ and decrement in __exit__.
+    The count is per-thread, as the compiler lock may be released while
+    compiling (see Dispatcher.compile_many()).
     """
 
     def __init__(self):
-        self.counter = 0
+        self._local = threading.local()
+
+    @property
+    def counter(self):
+        return getattr(self._local, 'counter', 0)
 
     def __enter__(self):
         assert self.counter >= 0
-        self.counter += 1
+        self._local.counter = self.counter + 1
 
     def __exit__(self, *args, **kwargs):
-        self.counter -= 1
+        self._local.counter = self.counter - 1
         assert self.counter >= 0
 
     def __bool__(self):
@@ -677,6 +690,9 @@ class Dispatcher(_DispatcherBase):
 
     def enable_caching(self):
         self._cache = FunctionCache(self.py_func)
+        if config.CACHE_WARMUP:
+            from numba.core.warmup import schedule_warmup
+            schedule_warmup(self)
 
     def __get__(self, obj, objtype=None):
         '''Allow a JIT function to be bound as a method to an object'''
@@ -755,12 +771,7 @@ class Dispatcher(_DispatcherBase):
             # Try to load from disk cache
             cres = self._cache.load_overload(sig, self.targetctx)
             if cres is not None:
-                self._cache_hits[sig] += 1
-                # XXX fold this in add_overload()? (also see compiler.py)
-                if not cres.objectmode and not cres.interpmode:
-                    self.targetctx.insert_user_function(cres.entry_point,
-                                                cres.fndesc, [cres.library])
-                self.add_overload(cres)
+                self._add_cached_overload(sig, cres)
                 return cres.entry_point
 
             self._cache_misses[sig] += 1
@@ -774,6 +785,71 @@ class Dispatcher(_DispatcherBase):
             self._cache.save_overload(sig, cres)
             return cres.entry_point
 
+    def compile_many(self, sigs, workers=None):
+        """
+        Compile the given signatures concurrently, in a pool of *workers*
+        threads (by default, one per CPU).  Each thread releases the
+        compiler lock while optimizing and generating machine code, letting
+        the other threads type and lower their own signatures meanwhile.
+        The entry points are returned in the order of *sigs*.
+        """
+        sigs = list(sigs)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(sigs))
+        if workers <= 1:
+            return [self.compile(sig) for sig in sigs]
+
+        def compile_one(sig):
+            with parallel_codegen():
+                return self.compile(sig)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(compile_one, sigs))
+
+    def _add_cached_overload(self, sig, cres):
+        self._cache_hits[sig] += 1
+        # XXX fold this in add_overload()? (also see compiler.py)
+        if not cres.objectmode and not cres.interpmode:
+            self.targetctx.insert_user_function(cres.entry_point,
+                                                cres.fndesc, [cres.library])
+        self.add_overload(cres)
+
+    def cached_signatures(self):
+        """
+        Return the signatures having an overload in the on-disk cache for
+        the current target.
+        """
+        return self._cache.cached_signatures(self.targetctx)
+
+    def load_cached_overload(self, sig):
+        """
+        Load the overload for the given signature from the on-disk cache,
+        without ever compiling it.  The cache data is read without holding
+        the compiler lock, so that several overloads can be loaded from
+        different threads at once.  Return whether the overload is
+        available.
+        """
+        args, return_type = sigutils.normalize_signature(sig)
+        if tuple(args) in self.overloads:
+            return True
+        payload = self._cache.read_overload(sig, self.targetctx)
+        if payload is None:
+            return False
+        with global_compiler_lock:
+            if tuple(args) not in self.overloads:
+                cres = self._cache.rebuild_overload(self.targetctx, payload)
+                self._add_cached_overload(sig, cres)
+        return True
+
+    def warmup(self):
+        """
+        Load all the overloads of this function available in the on-disk
+        cache.  Return the number of such overloads.
+        """
+        return sum(self.load_cached_overload(sig)
+                   for sig in self.cached_signatures())
+
     def recompile(self):
         """
         Recompile all signatures afresh.
@@ -818,6 +894,25 @@ class Dispatcher(_DispatcherBase):
         else:
             [dump(sig) for sig in self.signatures]
 
+    def parfor_profile(self, signature=None):
+        """
+        Get the runtime profiles of the parfors of the function compiled for
+        the given signature, as a list of ParforProfile, or a dict of such
+        lists for all the known signatures if no signature is given.  The
+        profiles are only recorded with NUMBA_PARFOR_PROFILE set.
+        """
+        def get(sig):
+            ol = self.overloads[sig]
+            profiles = ol.metadata.get('parfor_profile', None)
+            if profiles is None:
+                msg = "No parfor profile available, is NUMBA_PARFOR_PROFILE set?"
+                raise ValueError(msg)
+            return list(profiles)
+        if signature is not None:
+            return get(signature)
+        else:
+            return dict((sig, get(sig)) for sig in self.signatures)
+
     def get_metadata(self, signature=None):
         """
         Obtain the compilation metadata for a given signature.
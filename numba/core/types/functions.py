@@ -206,13 +206,20 @@ class BoundFunction(Callable, Opaque):
         # Try with Literal
         try:
             out = template.apply(args, kws)
-        except Exception:
+        except Exception as exc:
             out = None
+            e = exc
         # If that doesn't work, remove literals
         if out is None:
             args = [unliteral(a) for a in args]
             kws = {k: unliteral(v) for k, v in kws.items()}
-            out = template.apply(args, kws)
+            try:
+                out = template.apply(args, kws)
+            except Exception:
+                # the error with literals is the more informative
+                if e is None:
+                    raise
+                out = None
         if out is None and e is not None:
             raise e
         return out
@@ -220,6 +220,49 @@ class SetItemBuffer(AbstractTemplate):
         return signature(types.none, ary, idx, res)
 
 
+# The kinds of sort supported by np.sort(), np.argsort() and the array
+# methods, 'parallel' sorts on the threading layer, 'radix' only supports
+# boolean, integer, floating point and datetime arrays and 'stable' is
+# 'radix' where supported, 'mergesort' otherwise
+sort_kinds = ('quicksort', 'mergesort', 'parallel', 'radix', 'stable')
+
+
+def check_sort_kind(kind, dtype):
+    if not isinstance(kind, types.StringLiteral):
+        raise TypingError("sort kind must be a string literal, got %s"
+                          % (kind,))
+    if kind.literal_value not in sort_kinds:
+        raise TypingError("Unsupported sort kind %r, expected one of %s"
+                          % (kind.literal_value,
+                             ", ".join(map(repr, sort_kinds))))
+    if kind.literal_value == 'radix':
+        from numba.misc.radixsort import is_radix_sortable
+        if not is_radix_sortable(dtype):
+            raise TypingError("Unsupported dtype %s for radix sort" % (dtype,))
+
+
+def _sort_stub(axis=-1, kind='quicksort'):
+    pass
+
+
+def fold_sort_arguments(ary, args, kws):
+    """
+    Fold the axis and kind arguments of a sort of ary, return a tuple of
+    their types, or None if the sort of ary is not supported.
+    """
+    try:
+        bound = utils.pysignature(_sort_stub).bind(*args, **dict(kws))
+    except TypeError as e:
+        raise TypingError(str(e))
+    axis = bound.arguments.get('axis', types.intp)
+    kind = bound.arguments.get('kind', types.StringLiteral('quicksort'))
+    if not isinstance(axis, types.Integer):
+        raise TypingError("sort axis must be an integer, got %s" % (axis,))
+    check_sort_kind(kind, ary.dtype)
+    if ary.ndim in (1, 2):
+        return types.unliteral(axis), kind
+
+
 def normalize_shape(shape):
     if isinstance(shape, types.UniTuple):
         if isinstance(shape.dtype, types.Integer):
@@ -406,25 +449,18 @@ class ArrayAttribute(AttributeTemplate):
 
     @bound_function("array.sort")
     def resolve_sort(self, ary, args, kws):
-        assert not args
-        assert not kws
-        if ary.ndim == 1:
-            return signature(types.none)
+        sortargs = fold_sort_arguments(ary, args, kws)
+        if sortargs is not None:
+            pysig = utils.pysignature(_sort_stub)
+            return signature(types.none, *sortargs).replace(pysig=pysig)
 
     @bound_function("array.argsort")
     def resolve_argsort(self, ary, args, kws):
-        assert not args
-        kwargs = dict(kws)
-        kind = kwargs.pop('kind', types.StringLiteral('quicksort'))
-        if kwargs:
-            msg = "Unsupported keywords: {!r}"
-            raise TypingError(msg.format([k for k in kwargs.keys()]))
-        if ary.ndim == 1:
-            def argsort_stub(kind='quicksort'):
-                pass
-            pysig = utils.pysignature(argsort_stub)
-            sig = signature(types.Array(types.intp, 1, 'C'), kind).replace(pysig=pysig)
-            return sig
+        sortargs = fold_sort_arguments(ary, args, kws)
+        if sortargs is not None:
+            pysig = utils.pysignature(_sort_stub)
+            retty = types.Array(types.intp, ary.ndim, 'C')
+            return signature(retty, *sortargs).replace(pysig=pysig)
 
     @bound_function("array.view")
     def resolve_view(self, ary, args, kws):
@@ -681,12 +717,29 @@ def sum_expand(self, args, kws):
 
 
 def generic_expand_cumulative(self, args, kws):
-    assert not args
-    assert not kws
+    """
+    cumsum and cumprod can be called with or without an axis parameter
+    """
+    pysig = None
+    if 'axis' in kws:
+        def cumulative_stub(axis):
+            pass
+        pysig = utils.pysignature(cumulative_stub)
+        # rewrite args
+        args = list(args) + [kws['axis']]
+    assert len(args) <= 1
     assert isinstance(self.this, types.Array)
-    return_type = types.Array(dtype=_expand_integer(self.this.dtype),
-                              ndim=1, layout='C')
-    return signature(return_type, recvr=self.this)
+    dtype = _expand_integer(self.this.dtype)
+    if not args or isinstance(args[0], types.NoneType):
+        # The array is flattened
+        return_type = types.Array(dtype=dtype, ndim=1, layout='C')
+    elif isinstance(args[0], types.Integer) and self.this.ndim > 0:
+        # The result has the shape of the array
+        return_type = types.Array(dtype=dtype, ndim=self.this.ndim,
+                                  layout='C')
+    else:
+        return
+    return signature(return_type, *args, recvr=self.this).replace(pysig=pysig)
 
 
 def generic_hetero_real(self, args, kws):
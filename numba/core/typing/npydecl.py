@@ -13,6 +13,7 @@ from numba.np.numpy_support import (ufunc_find_matching_loop,
                              carray, farray)
 from numba.core.errors import TypingError, NumbaPerformanceWarning
 from numba import pndindex
+from numba.core.typing.arraydecl import fold_sort_arguments
 
 registry = Registry()
 infer = registry.register
@@ -367,7 +368,12 @@ class Numpy_method_redirection(AbstractTemplate):
 
     def generic(self, args, kws):
         pysig = None
-        if kws:
+        if self.method_name == 'argsort':
+            # the omitted axis and kind are folded by the method
+            def argsort_stub(arr, axis=-1, kind='quicksort'):
+                pass
+            pysig = utils.pysignature(argsort_stub)
+        elif kws:
             if self.method_name == 'sum':
                 if 'axis' in kws and 'dtype' not in kws:
                     def sum_stub(arr, axis):
@@ -381,10 +387,10 @@ class Numpy_method_redirection(AbstractTemplate):
                     def sum_stub(arr, axis, dtype):
                         pass
                     pysig = utils.pysignature(sum_stub)
-            elif self.method_name == 'argsort':
-                def argsort_stub(arr, kind='quicksort'):
+            elif self.method_name in ('cumsum', 'cumprod'):
+                def cumulative_stub(arr, axis):
                     pass
-                pysig = utils.pysignature(argsort_stub)
+                pysig = utils.pysignature(cumulative_stub)
             else:
                 fmt = "numba doesn't support kwarg for {}"
                 raise TypingError(fmt.format(self.method_name))
@@ -664,14 +670,19 @@ class NdFromBuffer(CallableTemplate):
 
 
 @infer_global(np.sort)
-class NdSort(CallableTemplate):
+class NdSort(AbstractTemplate):
 
-    def generic(self):
-        def typer(a):
-            if isinstance(a, types.Array) and a.ndim == 1:
-                return a
-
-        return typer
+    def generic(self, args, kws):
+        if not args or not isinstance(args[0], types.Array):
+            return
+        a = args[0]
+        sortargs = fold_sort_arguments(a, args[1:], kws)
+        if sortargs is not None:
+            def sort_stub(a, axis=-1, kind='quicksort'):
+                pass
+            pysig = utils.pysignature(sort_stub)
+            retty = a.copy(layout='C', readonly=False)
+            return signature(retty, a, *sortargs).replace(pysig=pysig)
 
 
 @infer_global(np.asfortranarray)
@@ -0,0 +1,83 @@
+"""
+Eager loading of the cached overloads of ``cache=True`` functions.
+
+Dispatchers only load their cached overloads lazily, when first called with
+matching arguments.  The functions here load them ahead of time, in
+background threads, so that the first calls don't pay for reading the
+cache and linking the object code.
+"""
+
+import concurrent.futures
+import threading
+import types as pytypes
+
+from numba.core import config
+
+
+def _iter_dispatchers(targets):
+    from numba.core.dispatcher import Dispatcher
+
+    if isinstance(targets, (Dispatcher, pytypes.ModuleType)):
+        targets = [targets]
+    for target in targets:
+        if isinstance(target, pytypes.ModuleType):
+            for value in vars(target).values():
+                if isinstance(value, Dispatcher):
+                    yield value
+        elif isinstance(target, Dispatcher):
+            yield target
+        else:
+            raise TypeError("cannot warm up %r: expected a module or a "
+                            "dispatcher" % (target,))
+
+
+def _gather(futures):
+    return sum(fut.result() for fut in futures)
+
+
+def warmup(targets, threads=None):
+    """
+    Load the overloads available in the on-disk cache for the given
+    dispatchers in a pool of *threads* background threads (default:
+    ``NUMBA_CACHE_WARMUP`` or 1).  *targets* is a dispatcher, a module (all
+    the dispatchers defined in the module are warmed up) or an iterable of
+    those.
+
+    The cache data is read and unpickled without holding the compiler lock,
+    so that several dispatchers are loaded concurrently.  LLVM releases the
+    GIL while linking the object code, so that the calling thread can
+    proceed in the meantime.
+
+    A :class:`concurrent.futures.Future` is returned, whose result is the
+    number of overloads loaded.
+    """
+    dispatchers = list(_iter_dispatchers(targets))
+    if threads is None:
+        threads = max(config.CACHE_WARMUP, 1)
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=threads, thread_name_prefix='numba-warmup')
+    futures = [executor.submit(disp.warmup) for disp in dispatchers]
+    # Tasks are run in submission order, hence this one only waits for
+    # tasks already started by other threads and can't deadlock the pool.
+    result = executor.submit(_gather, futures)
+    executor.shutdown(wait=False)
+    return result
+
+
+_shared_executor = None
+_shared_executor_lock = threading.Lock()
+
+
+def schedule_warmup(disp):
+    """
+    Schedule the warm-up of the dispatcher *disp* in a process-wide pool of
+    ``NUMBA_CACHE_WARMUP`` threads.  This is called when caching is enabled
+    on a dispatcher if ``NUMBA_CACHE_WARMUP`` is set.
+    """
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=config.CACHE_WARMUP,
+                thread_name_prefix='numba-warmup')
+    return _shared_executor.submit(disp.warmup)
@@ -360,6 +360,59 @@ def get_sys_info():
             "=============================================================\n")
 
 
+def precompile_cache(package_name, cache_dir):
+    from numba.core import config
+    from numba.misc.precompile import precompile_package
+
+    if cache_dir is None:
+        if not config.CACHE_SITE_DIRS:
+            print("numba: error: --precompile-cache requires --cache-dir or "
+                  "NUMBA_CACHE_SITE_DIRS to be set")
+            sys.exit(1)
+        cache_dir = config.CACHE_SITE_DIRS[0]
+    results = precompile_package(package_name, cache_dir)
+    fmt = "%-60s : %s"
+    for name, nsigs in results:
+        if nsigs:
+            print(fmt % (name, "%d signature(s)" % nsigs))
+        else:
+            print(fmt % (name, "skipped (no declared signatures)"))
+    print("Cache written to %s" % (cache_dir,))
+
+
+def cache_stats(root):
+    import time
+    from numba.core import config
+    from numba.core.caching import get_cache_stats
+
+    if not root:
+        # The in-tree caches are found by walking the current directory
+        root = config.CACHE_DIR or os.getcwd()
+    stats = get_cache_stats(root)
+    if not stats:
+        print("No cache found under %s" % (root,))
+        return
+    fmt = "%-50s %7s %10s %7s  %s"
+    total_size = total_hits = misses = evictions = stale_size = 0
+    for dir_stats in stats:
+        print("%s (%s format)" % (dir_stats.path, dir_stats.format))
+        print(fmt % ("function", "entries", "size", "hits", "last access"))
+        for func in dir_stats.functions:
+            last_access = time.strftime("%Y-%m-%d %H:%M:%S",
+                                        time.localtime(func.last_access))
+            print(fmt % (func.name, func.entries, func.size, func.hits,
+                         last_access))
+            total_size += func.size
+            total_hits += func.hits
+        misses += dir_stats.misses
+        evictions += dir_stats.evictions
+        stale_size += dir_stats.stale_size
+        print()
+    print("Total size: %d bytes (%d bytes stale)" % (total_size, stale_size))
+    print("Hits: %d, misses: %d, evictions: %d" % (total_hits, misses,
+                                                  evictions))
+
+
 def make_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument('--annotate', help='Annotate source',
@@ -378,6 +431,18 @@ def make_parser():
                         help='Output source annotation as html')
     parser.add_argument('-s', '--sysinfo', action="store_true",
                         help='Output system information for bug reporting')
+    parser.add_argument('--precompile-cache', metavar='PACKAGE',
+                        help='Compile the cache=True functions of PACKAGE '
+                             'for their declared signatures into the '
+                             'cache directory')
+    parser.add_argument('--cache-dir',
+                        help='Cache directory written by --precompile-cache '
+                             '(default: the first NUMBA_CACHE_SITE_DIRS '
+                             'entry)')
+    parser.add_argument('--cache-stats', nargs='?', const='', metavar='DIR',
+                        help='Print the usage statistics of the caches found '
+                             'under DIR (default: NUMBA_CACHE_DIR or the '
+                             'current directory)')
     parser.add_argument('filename', nargs='?', help='Python source filename')
     return parser
 
@@ -398,6 +463,14 @@ def main():
         get_sys_info()
         sys.exit(0)
 
+    if args.precompile_cache:
+        precompile_cache(args.precompile_cache, args.cache_dir)
+        sys.exit(0)
+
+    if args.cache_stats is not None:
+        cache_stats(args.cache_stats)
+        sys.exit(0)
+
     os.environ['NUMBA_DUMP_ANNOTATION'] = str(int(args.annotate))
     if args.annotate_html is not None:
         try:
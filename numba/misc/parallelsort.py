@@ -0,0 +1,227 @@
+"""
+A parallel merge sort on the threading layer.
+
+The array is split into one block per thread and the blocks are sorted
+concurrently with the serial quicksort or mergesort.  The sorted runs are
+then merged pairwise in rounds.  To keep all the threads busy when only a
+few large runs are left, the output of every round is split into chunks of
+equal size, and the inputs of each chunk are found by a binary search along
+the merge path of its pair of runs, so that the chunks are merged
+independently.  The merges are stable: on ties, the element of the left run
+comes first.
+"""
+import numpy as np
+from collections import namedtuple
+
+from numba.misc import quicksort, mergesort
+
+# Arrays are split into blocks of at least this many elements, smaller
+# arrays are sorted serially
+MIN_PARALLEL_BLOCK = 1 << 14
+
+
+ParallelSortImplementation = namedtuple('ParallelSortImplementation', [
+    'block_sort',
+    'plan_blocks',
+    'sort_block',
+    'plan_merge',
+    'merge_chunk',
+    'run_parallel_sort',
+])
+
+
+def make_jit_parallel_sort(lt=None, is_argsort=False, is_stable=False):
+    """
+    Make a parallel sort comparing with *lt*, whose blocks are sorted with
+    mergesort if *is_stable*, quicksort otherwise.  The stages of the sort
+    are exposed so that they can be inlined in parallel loops.
+    """
+    from numba import njit, prange, get_num_threads
+
+    if is_stable:
+        block_sort = mergesort.make_jit_mergesort(
+            lt=lt, is_argsort=is_argsort).run_mergesort
+    else:
+        block_sort = quicksort.make_jit_quicksort(
+            lt=lt, is_argsort=is_argsort).run_quicksort
+
+    kwargs_lite = dict(no_cpython_wrapper=True, _nrt=False)
+
+    # The less than
+    if lt is None:
+        @njit(**kwargs_lite)
+        def lt(a, b):
+            return a < b
+    else:
+        lt = njit(**kwargs_lite)(lt)
+
+    if is_argsort:
+        @njit(**kwargs_lite)
+        def lessthan(a, b, vals):
+            return lt(vals[a], vals[b])
+    else:
+        @njit(**kwargs_lite)
+        def lessthan(a, b, vals):
+            return lt(a, b)
+
+    @njit(no_cpython_wrapper=True)
+    def plan_blocks(n):
+        """
+        Split n elements in one block per thread, return the bounds of the
+        blocks.
+        """
+        nblocks = max(1, min(get_num_threads(), n // MIN_PARALLEL_BLOCK))
+        bounds = np.empty(nblocks + 1, np.intp)
+        for b in range(nblocks + 1):
+            bounds[b] = b * n // nblocks
+        return bounds
+
+    if is_argsort:
+        @njit(no_cpython_wrapper=True)
+        def sort_block(arr, vals, bounds, b):
+            "Sort block b of the indices arr of vals"
+            lo = bounds[b]
+            hi = bounds[b + 1]
+            res = block_sort(vals[lo:hi])
+            for i in range(hi - lo):
+                arr[lo + i] = res[i] + lo
+    else:
+        @njit(no_cpython_wrapper=True)
+        def sort_block(arr, vals, bounds, b):
+            "Sort block b of arr inplace"
+            block_sort(arr[bounds[b]:bounds[b + 1]])
+
+    @njit(no_cpython_wrapper=True)
+    def plan_merge(bounds, chunk):
+        """
+        Plan a round merging the runs of the given bounds pairwise, with
+        outputs split in chunks of at most chunk elements.  Return the
+        chunks, as rows of (start of the left run, start of the right run,
+        end of the right run, start of the chunk, end of the chunk), and
+        the bounds of the merged runs.
+        """
+        nruns = len(bounds) - 1
+        npairs = (nruns + 1) // 2
+        ntasks = 0
+        for p in range(npairs):
+            size = bounds[min(2 * p + 2, nruns)] - bounds[2 * p]
+            ntasks += max(1, (size + chunk - 1) // chunk)
+        tasks = np.empty((ntasks, 5), np.intp)
+        new_bounds = np.empty(npairs + 1, np.intp)
+        t = 0
+        for p in range(npairs):
+            lo = bounds[2 * p]
+            mid = bounds[min(2 * p + 1, nruns)]
+            hi = bounds[min(2 * p + 2, nruns)]
+            new_bounds[p] = lo
+            k = lo
+            while True:
+                tasks[t, 0] = lo
+                tasks[t, 1] = mid
+                tasks[t, 2] = hi
+                tasks[t, 3] = k
+                tasks[t, 4] = min(k + chunk, hi)
+                t += 1
+                k += chunk
+                if k >= hi:
+                    break
+        new_bounds[npairs] = bounds[nruns]
+        return tasks, new_bounds
+
+    @njit(no_cpython_wrapper=True)
+    def co_rank(src, vals, lo, mid, hi, k):
+        """
+        The number of elements of the left run src[lo:mid] among the first
+        k elements of its merge with the right run src[mid:hi].
+        """
+        i_lo = max(0, k - (hi - mid))
+        i_hi = min(k, mid - lo)
+        while i_lo < i_hi:
+            i = (i_lo + i_hi) // 2
+            # the left element i is merged before the right element k - i - 1
+            if not lessthan(src[mid + k - i - 1], src[lo + i], vals):
+                i_lo = i + 1
+            else:
+                i_hi = i
+        return i_lo
+
+    @njit(no_cpython_wrapper=True)
+    def merge_chunk(src, dst, vals, tasks, t):
+        "Merge the chunk t of a round planned by plan_merge from src to dst"
+        lo = tasks[t, 0]
+        mid = tasks[t, 1]
+        hi = tasks[t, 2]
+        k = tasks[t, 3]
+        k_end = tasks[t, 4]
+        i = lo + co_rank(src, vals, lo, mid, hi, k - lo)
+        i_end = lo + co_rank(src, vals, lo, mid, hi, k_end - lo)
+        j = mid + k - i
+        j_end = mid + k_end - i_end
+        while i < i_end and j < j_end:
+            if lessthan(src[j], src[i], vals):
+                dst[k] = src[j]
+                j += 1
+            else:
+                dst[k] = src[i]
+                i += 1
+            k += 1
+        while i < i_end:
+            dst[k] = src[i]
+            i += 1
+            k += 1
+        while j < j_end:
+            dst[k] = src[j]
+            j += 1
+            k += 1
+
+    @njit(parallel=True, no_cpython_wrapper=True)
+    def parallel_sort_inner(arr, vals):
+        n = arr.size
+        bounds = plan_blocks(n)
+        nblocks = len(bounds) - 1
+        for b in prange(nblocks):
+            sort_block(arr, vals, bounds, b)
+        chunk = (n + nblocks - 1) // nblocks
+        ws = np.empty_like(arr)
+        rounds = 0
+        while len(bounds) > 2:
+            tasks, bounds = plan_merge(bounds, chunk)
+            if rounds % 2 == 0:
+                for t in prange(tasks.shape[0]):
+                    merge_chunk(arr, ws, vals, tasks, t)
+            else:
+                for t in prange(tasks.shape[0]):
+                    merge_chunk(ws, arr, vals, tasks, t)
+            rounds += 1
+        if rounds % 2 == 1:
+            for i in prange(n):
+                arr[i] = ws[i]
+
+    # The top-level entry points
+
+    @njit(no_cpython_wrapper=True)
+    def parallel_sort(arr):
+        "Inplace"
+        if arr.size < 2 * MIN_PARALLEL_BLOCK:
+            block_sort(arr)
+        else:
+            parallel_sort_inner(arr, arr)
+        return arr
+
+    @njit(no_cpython_wrapper=True)
+    def parallel_argsort(arr):
+        "Out-of-place"
+        if arr.size < 2 * MIN_PARALLEL_BLOCK:
+            return block_sort(arr)
+        idxs = np.empty(arr.size, np.intp)
+        parallel_sort_inner(idxs, arr)
+        return idxs
+
+    return ParallelSortImplementation(
+        block_sort=block_sort,
+        plan_blocks=plan_blocks,
+        sort_block=sort_block,
+        plan_merge=plan_merge,
+        merge_chunk=merge_chunk,
+        run_parallel_sort=(parallel_argsort if is_argsort else parallel_sort),
+        )
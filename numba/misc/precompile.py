@@ -0,0 +1,56 @@
+"""
+Populate a cache directory with the compiled code of the ``cache=True``
+functions of a package, e.g. to build a read-only site cache (see
+``NUMBA_CACHE_SITE_DIRS``).
+"""
+
+import importlib
+import os
+import pkgutil
+
+from numba.core import config
+
+
+def _iter_modules(package_name):
+    package = importlib.import_module(package_name)
+    yield package
+    path = getattr(package, '__path__', None)
+    if path is None:
+        # A plain module
+        return
+    for info in pkgutil.walk_packages(path, prefix=package_name + '.'):
+        yield importlib.import_module(info.name)
+
+
+def precompile_package(package_name, cache_dir):
+    """
+    Import the package (or module) *package_name* and all its submodules,
+    so that the ``cache=True`` functions declared with explicit signatures
+    are compiled and saved into *cache_dir*.
+
+    A list of (function name, number of compiled signatures) tuples is
+    returned, one for each ``cache=True`` function found.
+    """
+    from numba.core.caching import NullCache
+    from numba.core.dispatcher import Dispatcher
+
+    cache_dir = os.path.abspath(cache_dir)
+    old_environ = dict(os.environ)
+    # Write into *cache_dir* only, without looking up other site caches
+    os.environ['NUMBA_CACHE_DIR'] = cache_dir
+    os.environ['NUMBA_CACHE_SITE_DIRS'] = ''
+    config.reload_config()
+    try:
+        results = []
+        for mod in _iter_modules(package_name):
+            for name, value in sorted(vars(mod).items()):
+                if (isinstance(value, Dispatcher) and
+                        not isinstance(value._cache, NullCache) and
+                        value.py_func.__module__ == mod.__name__):
+                    qualname = '%s.%s' % (mod.__name__, name)
+                    results.append((qualname, len(value.overloads)))
+        return results
+    finally:
+        os.environ.clear()
+        os.environ.update(old_environ)
+        config.reload_config()
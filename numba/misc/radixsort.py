@@ -0,0 +1,248 @@
+"""
+A least significant digit radix sort for boolean, integer, floating point
+and datetime arrays.
+
+The elements are first mapped to unsigned integer keys of the same width
+whose order is the order of the elements: the sign bit of signed integers
+is flipped, floats get all their bits flipped if negative and their sign
+bit set otherwise, and NaNs and NaTs get the largest key so that they sort
+at the end, as in NumPy.  The keys are then sorted 8 bits at a time with a
+counting sort, skipping the digits that all the keys share, which is stable.
+"""
+import numpy as np
+from collections import namedtuple
+
+from numba.core import types
+from numba.core.extending import overload, register_jitable
+
+# The number of bits sorted by each pass
+RADIX_BITS = 8
+RADIX = 1 << RADIX_BITS
+
+
+RadixsortImplementation = namedtuple('RadixsortImplementation', [
+    'run_radixsort',
+])
+
+
+def is_radix_sortable(dtype):
+    """
+    Whether arrays of the given Numba dtype can be radix sorted.
+    """
+    return isinstance(dtype, (types.Boolean, types.Integer, types.Float,
+                              types.NPDatetime, types.NPTimedelta))
+
+
+def _key_dtype(dtype):
+    if isinstance(dtype, types.Boolean):
+        return np.uint8
+    if isinstance(dtype, (types.NPDatetime, types.NPTimedelta)):
+        return np.uint64
+    return getattr(np, 'uint%d' % dtype.bitwidth)
+
+
+def make_keys(arr):
+    """
+    Map the elements of the 1D array arr to unsigned integer keys sorting
+    in the same order.
+    """
+    pass
+
+
+def keys_to_values(keys, out):
+    """
+    Store in out the elements of the keys made by make_keys(), for the
+    dtypes where the mapping is one to one.
+    """
+    pass
+
+
+@overload(make_keys)
+def _make_keys_impl(arr):
+    dtype = arr.dtype
+    ktype = _key_dtype(dtype)
+    width = np.dtype(ktype).itemsize * 8
+    sign = ktype(1 << (width - 1))
+    last = ktype((1 << width) - 1)
+
+    if isinstance(dtype, types.Boolean):
+        def impl(arr):
+            keys = np.empty(arr.size, ktype)
+            for i in range(arr.size):
+                keys[i] = ktype(arr[i])
+            return keys
+    elif isinstance(dtype, types.Integer) and not dtype.signed:
+        def impl(arr):
+            keys = np.empty(arr.size, ktype)
+            for i in range(arr.size):
+                keys[i] = arr[i]
+            return keys
+    elif isinstance(dtype, types.Integer):
+        def impl(arr):
+            keys = np.empty(arr.size, ktype)
+            for i in range(arr.size):
+                keys[i] = ktype(arr[i]) ^ sign
+            return keys
+    elif isinstance(dtype, types.Float):
+        def impl(arr):
+            bits = np.ascontiguousarray(arr).view(ktype)
+            keys = np.empty(arr.size, ktype)
+            for i in range(arr.size):
+                x = arr[i]
+                if np.isnan(x):
+                    keys[i] = last
+                elif x == 0:
+                    # -0.0 and 0.0 compare equal
+                    keys[i] = sign
+                elif bits[i] & sign:
+                    keys[i] = ~bits[i]
+                else:
+                    keys[i] = bits[i] | sign
+            return keys
+    elif isinstance(dtype, (types.NPDatetime, types.NPTimedelta)):
+        nat = np.iinfo(np.int64).min
+
+        def impl(arr):
+            vals = np.ascontiguousarray(arr).view(np.int64)
+            keys = np.empty(arr.size, ktype)
+            for i in range(arr.size):
+                if vals[i] == nat:
+                    keys[i] = last
+                else:
+                    keys[i] = ktype(vals[i]) ^ sign
+            return keys
+    else:
+        return None
+    return impl
+
+
+@overload(keys_to_values)
+def _keys_to_values_impl(keys, out):
+    dtype = out.dtype
+    if isinstance(dtype, types.Boolean):
+        def impl(keys, out):
+            for i in range(keys.size):
+                out[i] = keys[i] != 0
+    elif isinstance(dtype, types.Integer) and not dtype.signed:
+        def impl(keys, out):
+            for i in range(keys.size):
+                out[i] = keys[i]
+    elif isinstance(dtype, types.Integer):
+        vtype = getattr(np, 'int%d' % dtype.bitwidth)
+        sign = _key_dtype(dtype)(1 << (dtype.bitwidth - 1))
+
+        def impl(keys, out):
+            for i in range(keys.size):
+                out[i] = vtype(keys[i] ^ sign)
+    else:
+        return None
+    return impl
+
+
+@register_jitable
+def radix_counts(keys):
+    """
+    Count the keys having each value of each digit.
+    """
+    mask = np.uint64(RADIX - 1)
+    ndigits = keys.itemsize * 8 // RADIX_BITS
+    counts = np.zeros((ndigits, RADIX), np.intp)
+    for i in range(keys.size):
+        k = np.uint64(keys[i])
+        for d in range(ndigits):
+            counts[d, (k >> np.uint64(d * RADIX_BITS)) & mask] += 1
+    return counts
+
+
+@register_jitable
+def radix_offsets(counts, d, offsets):
+    """
+    Compute in offsets where the keys of each value of digit d start, return
+    False if all the keys have the same digit.
+    """
+    n = 0
+    for v in range(RADIX):
+        offsets[v] = n
+        n += counts[d, v]
+    for v in range(RADIX):
+        if counts[d, v] == n:
+            return False
+    return True
+
+
+@register_jitable
+def radix_sort_keys(keys):
+    """
+    Sort the keys, return the sorted keys, in keys or in a new array.
+    """
+    mask = np.uint64(RADIX - 1)
+    counts = radix_counts(keys)
+    offsets = np.empty(RADIX, np.intp)
+    buf = np.empty_like(keys)
+    for d in range(counts.shape[0]):
+        if not radix_offsets(counts, d, offsets):
+            continue
+        shift = np.uint64(d * RADIX_BITS)
+        for i in range(keys.size):
+            k = keys[i]
+            v = (np.uint64(k) >> shift) & mask
+            buf[offsets[v]] = k
+            offsets[v] += 1
+        keys, buf = buf, keys
+    return keys
+
+
+@register_jitable
+def radix_sort_pairs(keys, payload):
+    """
+    Sort the payload by the keys, return the sorted payload, in payload or
+    in a new array.
+    """
+    mask = np.uint64(RADIX - 1)
+    counts = radix_counts(keys)
+    offsets = np.empty(RADIX, np.intp)
+    buf = np.empty_like(keys)
+    payload_buf = np.empty_like(payload)
+    for d in range(counts.shape[0]):
+        if not radix_offsets(counts, d, offsets):
+            continue
+        shift = np.uint64(d * RADIX_BITS)
+        for i in range(keys.size):
+            k = keys[i]
+            v = (np.uint64(k) >> shift) & mask
+            buf[offsets[v]] = k
+            payload_buf[offsets[v]] = payload[i]
+            offsets[v] += 1
+        keys, buf = buf, keys
+        payload, payload_buf = payload_buf, payload
+    return payload
+
+
+def make_jit_radixsort(dtype, is_argsort=False):
+    """
+    Make a radix sort of 1D arrays of the given Numba dtype.
+    """
+    assert is_radix_sortable(dtype)
+
+    if is_argsort:
+        @register_jitable
+        def run_radixsort(arr):
+            "Out-of-place"
+            return radix_sort_pairs(make_keys(arr), np.arange(arr.size))
+    elif isinstance(dtype, (types.Boolean, types.Integer)):
+        # the keys map back to the values, no need to move them
+        @register_jitable
+        def run_radixsort(arr):
+            "Inplace"
+            keys_to_values(radix_sort_keys(make_keys(arr)), arr)
+            return arr
+    else:
+        @register_jitable
+        def run_radixsort(arr):
+            "Inplace"
+            res = radix_sort_pairs(make_keys(arr), arr.copy())
+            for i in range(arr.size):
+                arr[i] = res[i]
+            return arr
+
+    return RadixsortImplementation(run_radixsort=run_radixsort)
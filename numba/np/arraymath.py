@@ -23,6 +23,7 @@ from numba.core.imputils import (lower_builtin, impl_ret_borrowed,
 from numba.core.typing import signature
 from numba.np.arrayobj import make_array, load_item, store_item, _empty_nd_impl
 from numba.np.linalg import ensure_blas
+from numba.parfors.reduction import scan, get_reduction_identity
 
 from numba.core.extending import intrinsic
 from numba.core.errors import RequireLiteralValue, TypingError
@@ -399,6 +400,126 @@ def array_cumprod(context, builder, sig, args):
     return impl_ret_new_ref(context, builder, sig.return_type, res)
 
 
+@lower_builtin(np.cumsum, types.Array, types.NoneType)
+@lower_builtin("array.cumsum", types.Array, types.NoneType)
+def array_cumsum_none_axis(context, builder, sig, args):
+    sig = signature(sig.return_type, sig.args[0])
+    return array_cumsum(context, builder, sig, args[:1])
+
+
+@lower_builtin(np.cumprod, types.Array, types.NoneType)
+@lower_builtin("array.cumprod", types.Array, types.NoneType)
+def array_cumprod_none_axis(context, builder, sig, args):
+    sig = signature(sig.return_type, sig.args[0])
+    return array_cumprod(context, builder, sig, args[:1])
+
+
+@generated_jit
+def _cumulative_view(arr, axis):
+    """
+    Get a C contiguous 3D view of *arr* whose middle dimension is the
+    scanned *axis*, or the whole array if *axis* is None, together with the
+    three dimensions of the view and the shape of the scan result.
+    """
+    if is_nonelike(axis):
+        def impl(arr, axis):
+            n = arr.size
+            a = np.ascontiguousarray(arr).reshape((1, n, 1))
+            return a, 1, n, 1, (n,)
+    else:
+        def impl(arr, axis):
+            ndim = arr.ndim
+            if axis < 0:
+                axis += ndim
+            if axis < 0 or axis >= ndim:
+                raise ValueError("axis is out of bounds for array")
+            shape = arr.shape
+            outer = 1
+            for i in range(axis):
+                outer *= shape[i]
+            inner = 1
+            for i in range(axis + 1, ndim):
+                inner *= shape[i]
+            n = shape[axis]
+            a = np.ascontiguousarray(arr).reshape((outer, n, inner))
+            return a, outer, n, inner, shape
+    return impl
+
+
+@lower_builtin(np.cumsum, types.Array, types.Integer)
+@lower_builtin("array.cumsum", types.Array, types.Integer)
+def array_cumsum_axis(context, builder, sig, args):
+    dtype = as_dtype(sig.return_type.dtype)
+
+    def array_cumsum_axis_impl(arr, axis):
+        a, outer, n, inner, shape = _cumulative_view(arr, axis)
+        out = np.empty((outer, n, inner), dtype)
+        for i in range(outer):
+            if n > 0:
+                for k in range(inner):
+                    out[i, 0, k] = a[i, 0, k]
+            for j in range(1, n):
+                for k in range(inner):
+                    out[i, j, k] = out[i, j - 1, k] + a[i, j, k]
+        return out.reshape(shape)
+
+    res = context.compile_internal(builder, array_cumsum_axis_impl, sig, args)
+    return impl_ret_new_ref(context, builder, sig.return_type, res)
+
+
+@lower_builtin(np.cumprod, types.Array, types.Integer)
+@lower_builtin("array.cumprod", types.Array, types.Integer)
+def array_cumprod_axis(context, builder, sig, args):
+    dtype = as_dtype(sig.return_type.dtype)
+
+    def array_cumprod_axis_impl(arr, axis):
+        a, outer, n, inner, shape = _cumulative_view(arr, axis)
+        out = np.empty((outer, n, inner), dtype)
+        for i in range(outer):
+            if n > 0:
+                for k in range(inner):
+                    out[i, 0, k] = a[i, 0, k]
+            for j in range(1, n):
+                for k in range(inner):
+                    out[i, j, k] = out[i, j - 1, k] * a[i, j, k]
+        return out.reshape(shape)
+
+    res = context.compile_internal(builder, array_cumprod_axis_impl, sig, args)
+    return impl_ret_new_ref(context, builder, sig.return_type, res)
+
+
+@overload(scan)
+def np_scan(func, a, axis=None):
+    if not isinstance(func, types.Dispatcher):
+        raise TypingError("scan() first argument must be a reduction "
+                          "operator, got %s" % (func,))
+    try:
+        get_reduction_identity(func.dispatcher)
+    except KeyError:
+        raise TypingError("scan() needs a reduction operator declared with "
+                          "numba.reduction()")
+    if not isinstance(a, types.Array):
+        raise TypingError("scan() second argument must be an array, got %s"
+                          % (a,))
+    if not (is_nonelike(axis) or
+            (isinstance(axis, types.Integer) and a.ndim > 0)):
+        raise TypingError("scan() axis must be None or an integer")
+
+    def scan_impl(func, a, axis=None):
+        b, outer, n, inner, shape = _cumulative_view(a, axis)
+        out = np.empty((outer, n, inner), a.dtype)
+        for i in range(outer):
+            if n > 0:
+                for k in range(inner):
+                    out[i, 0, k] = b[i, 0, k]
+            for j in range(1, n):
+                for k in range(inner):
+                    out[i, j, k] = func(out[i, j - 1, k], b[i, j, k])
+        return out.reshape(shape)
+
+    return scan_impl
+
+
 @lower_builtin(np.mean, types.Array)
 @lower_builtin("array.mean", types.Array)
 def array_mean(context, builder, sig, args):
@@ -28,7 +28,7 @@ from numba.core.imputils import (lower_builtin, lower_getattr,
                                  RefType)
 from numba.core.typing import signature
 from numba.core.extending import register_jitable, overload, overload_method
-from numba.misc import quicksort, mergesort
+from numba.misc import quicksort, mergesort, parallelsort, radixsort
 from numba.cpython import slicing
 
 
@@ -4884,11 +4884,32 @@ def lt_floats(a, b):
     return math.isnan(b) or a < b
 
 
-def get_sort_func(kind, is_float, is_argsort=False):
+def get_parallel_sort(is_float, is_argsort=False, is_stable=False):
     """
-    Get a sort implementation of the given kind.
+    Get the parallel sort implementation, see numba.misc.parallelsort.
     """
-    key = kind, is_float, is_argsort
+    key = 'parallel', is_float, is_argsort, is_stable
+    try:
+        return _sorts[key]
+    except KeyError:
+        sort = parallelsort.make_jit_parallel_sort(
+            lt=lt_floats if is_float else None,
+            is_argsort=is_argsort,
+            is_stable=is_stable)
+        _sorts[key] = sort
+        return sort
+
+
+def get_sort_func(kind, dtype, is_argsort=False):
+    """
+    Get a sort implementation of the given kind for arrays of dtype, the
+    'stable' sort is the radix sort where supported, mergesort otherwise.
+    """
+    if kind == 'stable':
+        kind = 'radix' if radixsort.is_radix_sortable(dtype) else 'mergesort'
+    is_float = isinstance(dtype, types.Float)
+    # the radix sort depends on the bit layout of the dtype
+    key = kind, (dtype if kind == 'radix' else is_float), is_argsort
     try:
         return _sorts[key]
     except KeyError:
@@ -4902,47 +4923,94 @@ def get_sort_func(kind, is_float, is_argsort=False):
                 lt=lt_floats if is_float else None,
                 is_argsort=is_argsort)
             func = sort.run_mergesort
+        elif kind == 'parallel':
+            sort = get_parallel_sort(is_float, is_argsort=is_argsort)
+            func = sort.run_parallel_sort
+        elif kind == 'radix':
+            sort = radixsort.make_jit_radixsort(dtype, is_argsort=is_argsort)
+            func = sort.run_radixsort
         _sorts[key] = func
         return func
 
 
-@lower_builtin("array.sort", types.Array)
-def array_sort(context, builder, sig, args):
-    arytype = sig.args[0]
-    sort_func = get_sort_func(kind='quicksort',
-                              is_float=isinstance(arytype.dtype, types.Float))
+@register_jitable
+def normalize_sort_axis(axis, ndim):
+    if axis < -ndim or axis >= ndim:
+        raise ValueError("axis is out of bounds for array")
+    if axis < 0:
+        axis += ndim
+    return axis
 
-    def array_sort_impl(arr):
-        # Note we clobber the return value
-        sort_func(arr)
 
-    return context.compile_internal(builder, array_sort_impl, sig, args)
+@lower_builtin("array.sort", types.Array, types.Integer, types.StringLiteral)
+def array_sort(context, builder, sig, args):
+    arytype, axistype, kind = sig.args
+    sort_func = get_sort_func(kind=kind.literal_value, dtype=arytype.dtype)
+
+    if arytype.ndim == 1:
+        def array_sort_impl(arr, axis):
+            normalize_sort_axis(axis, 1)
+            # Note we clobber the return value
+            sort_func(arr)
+    else:
+        def array_sort_impl(arr, axis):
+            if normalize_sort_axis(axis, 2) == 1:
+                for i in range(arr.shape[0]):
+                    sort_func(arr[i])
+            else:
+                # sort a contiguous copy of each column
+                col = np.empty(arr.shape[0], arr.dtype)
+                for j in range(arr.shape[1]):
+                    col[:] = arr[:, j]
+                    sort_func(col)
+                    arr[:, j] = col
+
+    innersig = sig.replace(args=sig.args[:2])
+    innerargs = args[:2]
+    return context.compile_internal(builder, array_sort_impl,
+                                    innersig, innerargs)
 
 
-@lower_builtin(np.sort, types.Array)
+@lower_builtin(np.sort, types.Array, types.Integer, types.StringLiteral)
 def np_sort(context, builder, sig, args):
+    kind = sig.args[2].literal_value
 
-    def np_sort_impl(a):
+    def np_sort_impl(a, axis):
         res = a.copy()
-        res.sort()
+        res.sort(axis, kind)
         return res
 
-    return context.compile_internal(builder, np_sort_impl, sig, args)
+    innersig = sig.replace(args=sig.args[:2])
+    innerargs = args[:2]
+    return context.compile_internal(builder, np_sort_impl,
+                                    innersig, innerargs)
 
 
-@lower_builtin("array.argsort", types.Array, types.StringLiteral)
-@lower_builtin(np.argsort, types.Array, types.StringLiteral)
+@lower_builtin("array.argsort", types.Array, types.Integer,
+               types.StringLiteral)
+@lower_builtin(np.argsort, types.Array, types.Integer, types.StringLiteral)
 def array_argsort(context, builder, sig, args):
-    arytype, kind = sig.args
-    sort_func = get_sort_func(kind=kind.literal_value,
-                              is_float=isinstance(arytype.dtype, types.Float),
+    arytype, axistype, kind = sig.args
+    sort_func = get_sort_func(kind=kind.literal_value, dtype=arytype.dtype,
                               is_argsort=True)
 
-    def array_argsort_impl(arr):
-        return sort_func(arr)
+    if arytype.ndim == 1:
+        def array_argsort_impl(arr, axis):
+            normalize_sort_axis(axis, 1)
+            return sort_func(arr)
+    else:
+        def array_argsort_impl(arr, axis):
+            out = np.empty(arr.shape, np.intp)
+            if normalize_sort_axis(axis, 2) == 1:
+                for i in range(arr.shape[0]):
+                    out[i] = sort_func(arr[i])
+            else:
+                for j in range(arr.shape[1]):
+                    out[:, j] = sort_func(arr[:, j])
+            return out
 
-    innersig = sig.replace(args=sig.args[:1])
-    innerargs = args[:1]
+    innersig = sig.replace(args=sig.args[:2])
+    innerargs = args[:2]
     return context.compile_internal(builder, array_argsort_impl,
                                     innersig, innerargs)
 
@@ -0,0 +1,221 @@
+"""
+Atomic updates of array elements on the CPU, for use in parallel regions
+such as ``prange`` loops where several threads update the same elements.
+
+Every function updates a single element ``ary[idx]`` atomically and returns
+the value the element had before the update, like ``numba.cuda.atomic``.
+Called from the interpreter they perform the same update non-atomically.
+"""
+
+import builtins
+
+from llvmlite import ir as llvmir
+
+from numba.core import types, cgutils, errors
+from numba.core.extending import overload, intrinsic
+from numba.core.typing import signature
+
+
+def add(ary, idx, val):
+    """
+    Perform ``ary[idx] += val`` atomically and return the old value of
+    ``ary[idx]``.
+    """
+    old = ary[idx]
+    ary[idx] = old + val
+    return old
+
+
+def max(ary, idx, val):
+    """
+    Perform ``ary[idx] = max(ary[idx], val)`` atomically and return the old
+    value of ``ary[idx]``.
+    """
+    old = ary[idx]
+    ary[idx] = builtins.max(old, val)
+    return old
+
+
+def min(ary, idx, val):
+    """
+    Perform ``ary[idx] = min(ary[idx], val)`` atomically and return the old
+    value of ``ary[idx]``.
+    """
+    old = ary[idx]
+    ary[idx] = builtins.min(old, val)
+    return old
+
+
+def cas(ary, idx, old, val):
+    """
+    Perform ``if ary[idx] == old: ary[idx] = val`` atomically and return the
+    old value of ``ary[idx]``.  Only integer arrays are supported.
+    """
+    cur = ary[idx]
+    if cur == old:
+        ary[idx] = val
+    return cur
+
+
+# The functions whose first argument is the array they update
+atomic_functions = (add, max, min, cas)
+
+
+def _check_index(fname, ary, idx):
+    if isinstance(idx, types.Integer):
+        count = 1
+    elif (isinstance(idx, types.BaseTuple)
+            and all(isinstance(i, types.Integer) for i in idx)):
+        count = len(idx)
+    else:
+        raise errors.TypingError("atomic.%s() index must be an integer or a "
+                                 "tuple of integers, got %s" % (fname, idx))
+    if count != ary.ndim:
+        raise errors.TypingError("atomic.%s() needs %d indices for a %dD "
+                                 "array, got %d" % (fname, ary.ndim, ary.ndim,
+                                                    count))
+
+
+def _check_args(fname, ary, idx, *vals):
+    if not isinstance(ary, types.Array):
+        raise errors.TypingError("atomic.%s() first argument must be an "
+                                 "array, got %s" % (fname, ary))
+    if not ary.mutable:
+        raise errors.TypingError("atomic.%s() cannot update a readonly "
+                                 "array" % (fname,))
+    dtype = ary.dtype
+    if not isinstance(dtype, (types.Integer, types.Float)):
+        raise errors.TypingError("atomic.%s() is only supported for integer "
+                                 "and floating point arrays, got %s"
+                                 % (fname, dtype))
+    _check_index(fname, ary, idx)
+    for val in vals:
+        if not isinstance(val, (types.Integer, types.Float, types.Boolean)):
+            raise errors.TypingError("atomic.%s() value must be a number, "
+                                     "got %s" % (fname, val))
+        if isinstance(dtype, types.Integer) and isinstance(val, types.Float):
+            raise errors.TypingError("atomic.%s() cannot update an integer "
+                                     "array with a floating point value"
+                                     % (fname,))
+
+
+def _get_element_ptr(context, builder, aryty, ary, idxty, idx):
+    if isinstance(idxty, types.BaseTuple):
+        indices = cgutils.unpack_tuple(builder, idx, len(idxty))
+        idxtys = list(idxty)
+    else:
+        indices = [idx]
+        idxtys = [idxty]
+    indices = [context.cast(builder, i, ity, types.intp)
+               for i, ity in zip(indices, idxtys)]
+    ary = context.make_array(aryty)(context, builder, ary)
+    return cgutils.get_item_pointer(context, builder, aryty, ary, indices,
+                                    wraparound=True, boundscheck=True)
+
+
+def _float_cas_loop(builder, ptr, bitwidth, update):
+    """
+    Atomically replace the float at *ptr* with update(old), by retrying a
+    compare-and-swap of its bits, and return the old value.
+    """
+    fltty = ptr.type.pointee
+    intty = llvmir.IntType(bitwidth)
+    iptr = builder.bitcast(ptr, intty.as_pointer())
+    entry = builder.basic_block
+    loop = builder.append_basic_block("atomic.cas.loop")
+    done = builder.append_basic_block("atomic.cas.done")
+    initial = builder.load(iptr)
+    builder.branch(loop)
+
+    builder.position_at_end(loop)
+    oldbits = builder.phi(intty)
+    oldbits.add_incoming(initial, entry)
+    old = builder.bitcast(oldbits, fltty)
+    newbits = builder.bitcast(update(old), intty)
+    res = builder.cmpxchg(iptr, oldbits, newbits, 'seq_cst', 'seq_cst')
+    loaded = builder.extract_value(res, 0)
+    swapped = builder.extract_value(res, 1)
+    oldbits.add_incoming(loaded, builder.basic_block)
+    builder.cbranch(swapped, done, loop)
+
+    builder.position_at_end(done)
+    return old
+
+
+def _make_atomic_rmw(op):
+    """
+    Make the intrinsic applying the read-modify-write *op* ('add', 'max' or
+    'min') to an array element.
+    """
+    def codegen(context, builder, sig, args):
+        aryty, idxty, valty = sig.args
+        ary, idx, val = args
+        dtype = aryty.dtype
+        ptr = _get_element_ptr(context, builder, aryty, ary, idxty, idx)
+        val = context.cast(builder, val, valty, dtype)
+        if isinstance(dtype, types.Integer):
+            rmwop = op
+            if op in ('max', 'min') and not dtype.signed:
+                rmwop = 'u' + op
+            return builder.atomic_rmw(rmwop, ptr, val, 'seq_cst')
+
+        if op == 'add':
+            update = lambda old: builder.fadd(old, val)
+        else:
+            cmp = '>' if op == 'max' else '<'
+            update = lambda old: builder.select(
+                builder.fcmp_ordered(cmp, val, old), val, old)
+        return _float_cas_loop(builder, ptr, dtype.bitwidth, update)
+
+    def atomic_rmw(typingctx, ary, idx, val):
+        return signature(ary.dtype, ary, idx, val), codegen
+
+    atomic_rmw.__name__ = 'atomic_%s' % op
+    return intrinsic(atomic_rmw)
+
+
+_atomic_add = _make_atomic_rmw('add')
+_atomic_max = _make_atomic_rmw('max')
+_atomic_min = _make_atomic_rmw('min')
+
+
+@intrinsic
+def _atomic_cas(typingctx, ary, idx, old, val):
+    def codegen(context, builder, sig, args):
+        aryty, idxty, oldty, valty = sig.args
+        ary, idx, old, val = args
+        dtype = aryty.dtype
+        ptr = _get_element_ptr(context, builder, aryty, ary, idxty, idx)
+        old = context.cast(builder, old, oldty, dtype)
+        val = context.cast(builder, val, valty, dtype)
+        res = builder.cmpxchg(ptr, old, val, 'seq_cst', 'seq_cst')
+        return builder.extract_value(res, 0)
+
+    return signature(ary.dtype, ary, idx, old, val), codegen
+
+
+@overload(add)
+def ol_add(ary, idx, val):
+    _check_args('add', ary, idx, val)
+    return lambda ary, idx, val: _atomic_add(ary, idx, val)
+
+
+@overload(max)
+def ol_max(ary, idx, val):
+    _check_args('max', ary, idx, val)
+    return lambda ary, idx, val: _atomic_max(ary, idx, val)
+
+
+@overload(min)
+def ol_min(ary, idx, val):
+    _check_args('min', ary, idx, val)
+    return lambda ary, idx, val: _atomic_min(ary, idx, val)
+
+
+@overload(cas)
+def ol_cas(ary, idx, old, val):
+    _check_args('cas', ary, idx, old, val)
+    if not isinstance(ary.dtype, types.Integer):
+        raise errors.TypingError("atomic.cas() is only supported for integer "
+                                 "arrays, got %s" % (ary.dtype,))
+    return lambda ary, idx, old, val: _atomic_cas(ary, idx, old, val)
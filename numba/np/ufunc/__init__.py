@@ -4,7 +4,8 @@ from numba.np.ufunc.decorators import Vectorize, GUVectorize, vectorize, guvecto
 from numba.np.ufunc._internal import PyUFunc_None, PyUFunc_Zero, PyUFunc_One
 from numba.np.ufunc import _internal, array_exprs
 from numba.np.ufunc.parallel import (threading_layer, get_num_threads,
-                                     set_num_threads, _get_thread_id)
+                                     set_num_threads, get_thread_affinity,
+                                     _get_thread_id)
 
 
 if hasattr(_internal, 'PyUFunc_ReorderableNone'):
@@ -6,11 +6,19 @@
 #include <vector>
 #include <assert.h>
 #include <algorithm>
+#include <chrono>
 #include <cmath>
 #include <iostream>
 #include <stdio.h>
 #include "gufunc_scheduler.h"
 
+#if defined(_WIN32)
+    #define NOMINMAX
+    #include <windows.h>
+#elif defined(__linux__)
+    #include <sched.h>
+#endif
+
 // round not available on VS2010.
 double guround (double number) {
 	return number < 0.0 ? ceil(number - 0.5) : floor(number + 0.5);
@@ -360,3 +368,326 @@ extern "C" void do_scheduling_unsigned(uintp num_dim, intp *starts, intp *ends,
     std::vector<RangeActual> ret = create_schedule(full_space, num_threads);
     flatten_schedule(ret, sched);
 }
+
+/*
+ * Dynamic and guided schedules.
+ *
+ * Rather than a static partition, all threads share a single schedule of
+ * the form: start_dim0, ..., start_dimN, end_dim0, ..., end_dimN, next,
+ * chunksize, num_threads, guided.  Threads repeatedly claim chunks of the
+ * outermost dimension by atomically advancing "next", see get_sched_chunk().
+ */
+
+#define DYNSCHED_NEXT 0
+#define DYNSCHED_CHUNKSIZE 1
+#define DYNSCHED_NUM_THREADS 2
+#define DYNSCHED_GUIDED 3
+
+#ifdef _MSC_VER
+    #include <intrin.h>
+    #if defined(_WIN64)
+        #define sched_atomic_load(ptr) \
+            ((intp)_InterlockedOr64((volatile __int64 *)(ptr), 0))
+        #define sched_atomic_fetch_add(ptr, val) \
+            ((intp)_InterlockedExchangeAdd64((volatile __int64 *)(ptr), (val)))
+        #define sched_atomic_cas(ptr, expected, desired) \
+            (_InterlockedCompareExchange64((volatile __int64 *)(ptr), \
+                                           (desired), (expected)) == (expected))
+    #else
+        #define sched_atomic_load(ptr) \
+            ((intp)_InterlockedOr((volatile long *)(ptr), 0))
+        #define sched_atomic_fetch_add(ptr, val) \
+            ((intp)_InterlockedExchangeAdd((volatile long *)(ptr), (val)))
+        #define sched_atomic_cas(ptr, expected, desired) \
+            (_InterlockedCompareExchange((volatile long *)(ptr), \
+                                         (desired), (expected)) == (expected))
+    #endif
+#else
+    #define sched_atomic_load(ptr) __atomic_load_n((ptr), __ATOMIC_RELAXED)
+    #define sched_atomic_fetch_add(ptr, val) \
+        __atomic_fetch_add((ptr), (val), __ATOMIC_RELAXED)
+    static inline bool sched_atomic_cas(intp *ptr, intp expected, intp desired) {
+        return __atomic_compare_exchange_n(ptr, &expected, desired, false,
+                                           __ATOMIC_RELAXED, __ATOMIC_RELAXED);
+    }
+#endif
+
+/*
+    num_dim, starts, ends and num_threads are as for do_scheduling_signed().
+    sched is pre-allocated memory of size 2xD+4 for the shared schedule.
+    chunksize is the number of iterations of the outermost dimension claimed
+    at once by a thread (the minimum number for guided schedules), or 0 to
+    choose one from the number of iterations and threads.
+    guided is non-zero for chunks decreasing in size with the remaining work.
+*/
+extern "C" void do_dynamic_scheduling(uintp num_dim, intp *starts, intp *ends, uintp num_threads, intp *sched, intp chunksize, intp guided, intp debug) {
+    if (num_threads == 0) num_threads = 1;
+    if (chunksize <= 0) {
+        if (guided) {
+            chunksize = 1;
+        } else {
+            // Enough chunks per thread to balance the work while keeping
+            // the contention on the shared counter low.
+            intp len = ends[0] - starts[0] + 1;
+            chunksize = len / (intp)(num_threads * 8);
+            if (chunksize < 1) chunksize = 1;
+        }
+    }
+    for (uintp i = 0; i < num_dim; ++i) {
+        sched[i] = starts[i];
+        sched[i + num_dim] = ends[i];
+    }
+    intp *state = sched + 2 * num_dim;
+    state[DYNSCHED_NEXT] = starts[0];
+    state[DYNSCHED_CHUNKSIZE] = chunksize;
+    state[DYNSCHED_NUM_THREADS] = (intp)num_threads;
+    state[DYNSCHED_GUIDED] = guided;
+
+    if (debug) {
+        printf("dynamic schedule: num_dim = %d, chunksize = %d, guided = %d\n",
+               (int)num_dim, (int)chunksize, (int)guided);
+    }
+}
+
+#ifdef _MSC_VER
+#define THREAD_LOCAL(ty) __declspec(thread) ty
+#else
+/* Non-standard C99 extension that's understood by gcc and clang */
+#define THREAD_LOCAL(ty) __thread ty
+#endif
+
+// The number of chunks claimed by the thread, for parfor profiling
+static THREAD_LOCAL(intp) sched_chunks_claimed = 0;
+
+/*
+    Claim the next chunk of the outermost dimension of a schedule set up by
+    do_dynamic_scheduling().  The chunk's inclusive range is stored in
+    chunk[0] and chunk[1].  Returns 0 once all chunks have been claimed.
+*/
+extern "C" intp get_sched_chunk(uintp num_dim, intp *sched, intp *chunk) {
+    intp end = sched[num_dim];
+    intp *state = sched + 2 * num_dim;
+    intp chunksize = state[DYNSCHED_CHUNKSIZE];
+    intp lo, size;
+
+    if (!state[DYNSCHED_GUIDED]) {
+        // Avoid growing the counter once exhausted
+        if (sched_atomic_load(&state[DYNSCHED_NEXT]) > end) return 0;
+        lo = sched_atomic_fetch_add(&state[DYNSCHED_NEXT], chunksize);
+        if (lo > end) return 0;
+        size = std::min(chunksize, end - lo + 1);
+    } else {
+        intp num_threads = state[DYNSCHED_NUM_THREADS];
+        while (true) {
+            lo = sched_atomic_load(&state[DYNSCHED_NEXT]);
+            intp remaining = end - lo + 1;
+            if (remaining <= 0) return 0;
+            // Each chunk is a share of the remaining work
+            size = (remaining + num_threads - 1) / num_threads;
+            size = std::max(size, chunksize);
+            size = std::min(size, remaining);
+            if (sched_atomic_cas(&state[DYNSCHED_NEXT], lo, lo + size)) break;
+        }
+    }
+    chunk[0] = lo;
+    chunk[1] = lo + size - 1;
+    sched_chunks_claimed++;
+    return 1;
+}
+
+/*
+ * Placement of the threads of the threading layer.
+ *
+ * The CPUs the threads are pinned to, in the order of their slots, and
+ * whether the chunks of parallel loops are run by the same threads from one
+ * loop to the next.  Set once before the threads are launched.
+ */
+
+static std::vector<int> affinity_cpus;
+static int first_touch = 0;
+
+extern "C" void set_thread_affinity(int *cpus, int ncpus, int ft) {
+    affinity_cpus.assign(cpus, cpus + ncpus);
+    first_touch = ft;
+}
+
+extern "C" int get_first_touch(void) {
+    return first_touch;
+}
+
+/*
+    Pin the calling thread to the CPU of the given slot, cycling through the
+    CPUs if there are more slots than CPUs.  Returns 0 on success or if no
+    affinity was set, and -1 if the thread could not be pinned.
+*/
+extern "C" int pin_thread(int slot) {
+    if (affinity_cpus.empty()) return 0;
+    int cpu = affinity_cpus[slot % affinity_cpus.size()];
+#if defined(_WIN32)
+    if (cpu >= (int)(8 * sizeof(DWORD_PTR))) return -1;
+    return SetThreadAffinityMask(GetCurrentThread(),
+                                 (DWORD_PTR)1 << cpu) ? 0 : -1;
+#elif defined(__linux__)
+    cpu_set_t set;
+    CPU_ZERO(&set);
+    CPU_SET(cpu, &set);
+    // pid 0 is the calling thread
+    return sched_setaffinity(0, sizeof(set), &set) == 0 ? 0 : -1;
+#else
+    // No thread pinning on this platform, e.g. macOS
+    return -1;
+#endif
+}
+
+/*
+ * Adaptive serial fallback of parallel regions.
+ *
+ * Launching a parallel region on the thread pool costs microseconds, more
+ * than the work of a small region.  Every region compiled in adaptive mode
+ * has a serial_state, zero-initialized, learning the cost of an iteration
+ * when it runs serially and the overhead of running it in parallel, from
+ * which the trip count above which running it in parallel pays off follows.
+ * Concurrent updates of the state by several threads only lose samples.
+ */
+
+typedef struct {
+    // Nanoseconds per iteration when run serially, 0 if not measured yet
+    double iter_cost;
+    // Nanoseconds lost in parallel, besides the work shared by the threads
+    double overhead;
+    // Number of decisions taken
+    int64_t calls;
+} serial_state;
+
+// Decisions close to the break-even trip count are reversed every so often,
+// to keep both costs up to date
+#define SERIAL_EXPLORE_PERIOD 64
+
+// Weight of a new sample in the running averages of the costs
+#define SERIAL_SAMPLE_WEIGHT 0.25
+
+extern "C" int64_t get_region_clock(void) {
+    return std::chrono::duration_cast<std::chrono::nanoseconds>(
+        std::chrono::steady_clock::now().time_since_epoch()).count();
+}
+
+/*
+    Return 1 if a region of count iterations, with the given serial_state,
+    should run serially on the calling thread rather than on num_threads
+    threads.  threshold is the
+    trip count below which it runs serially until both costs are known.
+*/
+extern "C" intp choose_serial(void *state_ptr, intp count,
+                              intp num_threads, intp threshold) {
+    serial_state *state = (serial_state *)state_ptr;
+    if (num_threads <= 1) return 1;
+    int64_t calls = state->calls++;
+    double break_even = (double)threshold;
+    if (state->iter_cost > 0.0 && state->overhead > 0.0) {
+        break_even = state->overhead /
+                     (state->iter_cost * (1.0 - 1.0 / num_threads));
+    }
+    intp serial = count < break_even;
+    if (calls % SERIAL_EXPLORE_PERIOD == SERIAL_EXPLORE_PERIOD - 1 &&
+        count > break_even / 4 && count < break_even * 4) {
+        serial = !serial;
+    }
+    return serial;
+}
+
+/*
+    Record the run time of a region of count iterations started at start,
+    as given by get_region_clock(), that ran serially or on num_threads
+    threads.
+*/
+extern "C" void record_region_time(void *state_ptr, intp count,
+                                   intp num_threads, intp serial,
+                                   int64_t start) {
+    serial_state *state = (serial_state *)state_ptr;
+    double elapsed = (double)(get_region_clock() - start);
+    if (count <= 0) return;
+    if (serial) {
+        double sample = std::max(elapsed / count, 1e-3);
+        if (state->iter_cost > 0.0)
+            sample = state->iter_cost +
+                     SERIAL_SAMPLE_WEIGHT * (sample - state->iter_cost);
+        state->iter_cost = sample;
+    } else if (state->iter_cost > 0.0) {
+        double work = state->iter_cost * count / num_threads;
+        double sample = std::max(elapsed - work, 1.0);
+        if (state->overhead > 0.0)
+            sample = state->overhead +
+                     SERIAL_SAMPLE_WEIGHT * (sample - state->overhead);
+        state->overhead = sample;
+    }
+}
+
+/*
+ * Runtime profiling of parfors, enabled with NUMBA_PARFOR_PROFILE.
+ *
+ * Each profiled parfor has a record of int64 counters: the number of calls,
+ * the number of calls run serially, the total wall time in nanoseconds,
+ * then for each of nslots thread slots the time spent running chunks and
+ * the number of chunks run.  Threads get a slot the first time they run a
+ * profiled chunk, those beyond nslots share slots.
+ */
+
+#define PROFILE_CALLS 0
+#define PROFILE_SERIAL_CALLS 1
+#define PROFILE_WALL_TIME 2
+#define PROFILE_SLOTS 3
+
+#ifdef _MSC_VER
+    #define profile_atomic_add(ptr, val) \
+        _InterlockedExchangeAdd64((volatile __int64 *)(ptr), (val))
+#else
+    #define profile_atomic_add(ptr, val) \
+        __atomic_fetch_add((ptr), (val), __ATOMIC_RELAXED)
+#endif
+
+typedef void (*kernel_func)(char **args, intp *dims, intp *steps,
+                            void *data);
+
+/* The data the kernel of a profiled parfor is called with */
+typedef struct {
+    kernel_func kernel;
+    int64_t *record;
+    intp nslots;
+} profile_data;
+
+static intp next_profile_slot = 0;
+static THREAD_LOCAL(intp) profile_slot = -1;
+
+/*
+    Run the kernel of a profiled parfor, given as the data of the call, and
+    record its run time for the calling thread.
+*/
+extern "C" void run_profiled_kernel(char **args, intp *dims, intp *steps,
+                                    void *data) {
+    profile_data *pd = (profile_data *)data;
+    if (profile_slot < 0) {
+        profile_slot = sched_atomic_fetch_add(&next_profile_slot, 1);
+    }
+    intp claimed = sched_chunks_claimed;
+    int64_t start = get_region_clock();
+    pd->kernel(args, dims, steps, NULL);
+    int64_t elapsed = get_region_clock() - start;
+    // The kernel claims chunks with dynamic schedules, it is one otherwise
+    claimed = sched_chunks_claimed - claimed;
+    intp slot = profile_slot % pd->nslots;
+    profile_atomic_add(&pd->record[PROFILE_SLOTS + slot], elapsed);
+    profile_atomic_add(&pd->record[PROFILE_SLOTS + pd->nslots + slot],
+                       (int64_t)(claimed > 0 ? claimed : 1));
+}
+
+/*
+    Record a call of a profiled parfor started at start, as given by
+    get_region_clock().
+*/
+extern "C" void record_parfor_call(int64_t *record, intp serial,
+                                   int64_t start) {
+    int64_t elapsed = get_region_clock() - start;
+    profile_atomic_add(&record[PROFILE_CALLS], (int64_t)1);
+    profile_atomic_add(&record[PROFILE_SERIAL_CALLS], (int64_t)(serial != 0));
+    profile_atomic_add(&record[PROFILE_WALL_TIME], elapsed);
+}
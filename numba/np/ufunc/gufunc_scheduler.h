@@ -40,6 +40,16 @@ extern "C"
 
 void do_scheduling_signed(uintp num_dim, intp *starts, intp *ends, uintp num_threads, intp *sched, intp debug);
 void do_scheduling_unsigned(uintp num_dim, intp *starts, intp *ends, uintp num_threads, uintp *sched, intp debug);
+void do_dynamic_scheduling(uintp num_dim, intp *starts, intp *ends, uintp num_threads, intp *sched, intp chunksize, intp guided, intp debug);
+intp get_sched_chunk(uintp num_dim, intp *sched, intp *chunk);
+void set_thread_affinity(int *cpus, int ncpus, int first_touch);
+int get_first_touch(void);
+int pin_thread(int slot);
+int64_t get_region_clock(void);
+intp choose_serial(void *state, intp count, intp num_threads, intp threshold);
+void record_region_time(void *state, intp count, intp num_threads, intp serial, int64_t start);
+void run_profiled_kernel(char **args, intp *dims, intp *steps, void *data);
+void record_parfor_call(int64_t *record, intp serial, int64_t start);
 
 #ifdef __cplusplus
 }
@@ -163,7 +163,9 @@ parallel_for(void *fn, char **args, size_t *dimensions, size_t *steps, void *dat
         // tell the active thread team about the number of threads
         set_num_threads(agreed_nthreads);
 
-        #pragma omp for
+        // A static schedule runs the same iterations on the same threads
+        // from one loop to the next, as needed by first-touch placement
+        #pragma omp for schedule(static)
         for(ptrdiff_t r = 0; r < size; r++)
         {
             memcpy(count_space, dimensions, arg_len * sizeof(size_t));
@@ -226,6 +228,18 @@ static void launch_threads(int count)
     omp_set_num_threads(count);
     omp_set_nested(0x1); // enable nesting, control depth with OMP env var
     _INIT_NUM_THREADS = count;
+
+    // Pin the threads of the team, which the OpenMP runtime keeps for the
+    // later parallel regions of this thread.  Slot 0 is the launching
+    // thread's, which isn't pinned.
+    #pragma omp parallel num_threads(count)
+    {
+        int slot = omp_get_thread_num();
+        if (slot > 0 && pin_thread(slot) && _DEBUG)
+        {
+            printf("thread %d: could not be pinned\n", slot);
+        }
+    }
 }
 
 static void synchronize(void)
@@ -257,6 +271,22 @@ MOD_INIT(omppool)
                            PyLong_FromVoidPtr((void*)&do_scheduling_signed));
     PyObject_SetAttrString(m, "do_scheduling_unsigned",
                            PyLong_FromVoidPtr((void*)&do_scheduling_unsigned));
+    PyObject_SetAttrString(m, "do_dynamic_scheduling",
+                           PyLong_FromVoidPtr((void*)&do_dynamic_scheduling));
+    PyObject_SetAttrString(m, "get_sched_chunk",
+                           PyLong_FromVoidPtr((void*)&get_sched_chunk));
+    PyObject_SetAttrString(m, "set_thread_affinity",
+                           PyLong_FromVoidPtr((void*)&set_thread_affinity));
+    PyObject_SetAttrString(m, "get_region_clock",
+                           PyLong_FromVoidPtr((void*)&get_region_clock));
+    PyObject_SetAttrString(m, "choose_serial",
+                           PyLong_FromVoidPtr((void*)&choose_serial));
+    PyObject_SetAttrString(m, "record_region_time",
+                           PyLong_FromVoidPtr((void*)&record_region_time));
+    PyObject_SetAttrString(m, "run_profiled_kernel",
+                           PyLong_FromVoidPtr((void*)&run_profiled_kernel));
+    PyObject_SetAttrString(m, "record_parfor_call",
+                           PyLong_FromVoidPtr((void*)&record_parfor_call));
     PyObject_SetAttrString(m, "openmp_vendor",
                            PyString_FromString(_OMP_VENDOR));
     PyObject_SetAttrString(m, "set_num_threads",
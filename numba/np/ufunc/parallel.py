@@ -11,11 +11,13 @@ to steal works from other threads.
 """
 
 import os
+import re
 import sys
+import glob
 import warnings
 from threading import RLock as threadRLock
 import multiprocessing
-from ctypes import CFUNCTYPE, c_int, CDLL
+from ctypes import CFUNCTYPE, POINTER, c_int, CDLL
 
 import numpy as np
 
@@ -47,7 +49,63 @@ def get_thread_count():
 NUM_THREADS = get_thread_count()
 
 
-def build_gufunc_kernel(library, ctx, info, sig, inner_ndim):
+# The trip count below which parallel regions run serially in adaptive mode,
+# until their cost is measured
+ADAPTIVE_SERIAL_THRESHOLD = 1000
+
+
+def emit_serial_check(builder, count, num_threads, threshold):
+    """
+    Emit the choice of running a parallel region of *count* iterations
+    serially on the calling thread rather than on *num_threads* threads,
+    when *count* is below the integer *threshold* or, if *threshold* is
+    'adaptive', from the run times of the region measured so far.
+
+    Return the boolean result and a function emitting, with a builder
+    positioned after the region, the recording of its run time.
+    """
+    mod = builder.module
+    intp_t = count.type
+    if threshold != 'adaptive':
+        is_serial = builder.or_(
+            builder.icmp_signed('<', count, intp_t(threshold)),
+            builder.icmp_signed('<=', num_threads, num_threads.type(1)))
+        return is_serial, lambda builder: None
+
+    int64_t = lc.Type.int(64)
+    byte_ptr_t = lc.Type.pointer(lc.Type.int(8))
+    # double iter_cost, double overhead, int64_t calls; see serial_state
+    state_t = lc.Type.array(int64_t, 3)
+    state = mod.add_global_variable(state_t,
+                                    name=mod.get_unique_name('serial_state'))
+    state.linkage = 'internal'
+    state.initializer = lc.Constant.null(state_t)
+    state_ptr = builder.bitcast(state, byte_ptr_t)
+
+    choose_serial = mod.get_or_insert_function(
+        lc.Type.function(intp_t, [byte_ptr_t, intp_t, intp_t, intp_t]),
+        name='choose_serial')
+    get_region_clock = mod.get_or_insert_function(
+        lc.Type.function(int64_t, []), name='get_region_clock')
+    record_region_time = mod.get_or_insert_function(
+        lc.Type.function(lc.Type.void(),
+                         [byte_ptr_t, intp_t, intp_t, intp_t, int64_t]),
+        name='record_region_time')
+
+    serial = builder.call(choose_serial,
+                          [state_ptr, count, num_threads,
+                           intp_t(ADAPTIVE_SERIAL_THRESHOLD)])
+    start = builder.call(get_region_clock, [])
+
+    def record(builder):
+        builder.call(record_region_time,
+                     [state_ptr, count, num_threads, serial, start])
+
+    return builder.icmp_signed('!=', serial, intp_t(0)), record
+
+
+def build_gufunc_kernel(library, ctx, info, sig, inner_ndim,
+                        serial_threshold=0, profiled=False):
     """Wrap the original CPU ufunc/gufunc with a parallel dispatcher.
     This function will wrap gufuncs and ufuncs something like.
 
@@ -66,6 +124,14 @@ def build_gufunc_kernel(library, ctx, info, sig, inner_ndim):
         inner dimension of the gufunc (this is len(sig.args) in the case of a
         ufunc)
 
+    serial_threshold
+        the loop count below which the kernel runs serially on the calling
+        thread, or 'adaptive', see emit_serial_check()
+
+    profiled
+        whether the kernel runs through run_profiled_kernel(), which gets
+        the kernel and the counters of a parfor profile as data
+
     Returns
     -------
     wrapper_info : (library, env, name)
@@ -154,12 +220,32 @@ def build_gufunc_kernel(library, ctx, info, sig, inner_ndim):
 
     num_threads = builder.call(get_num_threads, [])
 
+    if profiled:
+        tmp_voidptr = mod.get_or_insert_function(
+            innerfunc_fnty, name='run_profiled_kernel')
+
     # Prepare call
     fnptr = builder.bitcast(tmp_voidptr, byte_ptr_t)
     innerargs = [as_void_ptr(x) for x
                  in [args, dimensions, steps, data]]
-    builder.call(parallel_for, [fnptr] + innerargs +
-                 [intp_t(x) for x in (inner_ndim, array_count)] + [num_threads])
+
+    def call_parallel_for():
+        builder.call(parallel_for, [fnptr] + innerargs +
+                     [intp_t(x) for x in (inner_ndim, array_count)] +
+                     [num_threads])
+
+    if serial_threshold:
+        # Small loops run inline, the thread pool launch would cost more
+        is_serial, record = emit_serial_check(
+            builder, builder.load(dimensions), num_threads, serial_threshold)
+        with builder.if_else(is_serial) as (serial, parallel):
+            with serial:
+                builder.call(tmp_voidptr, [args, dimensions, steps, data])
+            with parallel:
+                call_parallel_for()
+        record(builder)
+    else:
+        call_parallel_for()
 
     # Release the GIL
     pyapi.restore_thread(thread_state)
@@ -197,8 +283,10 @@ def build_ufunc_wrapper(library, ctx, fname, signature, cres):
     innerfunc = ufuncbuilder.build_ufunc_wrapper(library, ctx, fname,
                                                  signature, objmode=False,
                                                  cres=cres)
-    info = build_gufunc_kernel(library, ctx, innerfunc, signature,
-                               len(signature.args))
+    info = build_gufunc_kernel(
+        library, ctx, innerfunc, signature, len(signature.args),
+        serial_threshold=config.PARALLEL_SERIAL_THRESHOLD,
+    )
     return info
 
 # ---------------------------------------------------------------------------
@@ -265,6 +353,7 @@ def build_gufunc_wrapper(py_func, cres, sin, sout, cache, is_parfors):
 
     info = build_gufunc_kernel(
         library, ctx, innerinfo, signature, inner_ndim,
+        serial_threshold=config.PARALLEL_SERIAL_THRESHOLD,
     )
     return info
 
@@ -314,6 +403,7 @@ _is_initialized = False
 
 # this is set by _launch_threads
 _threading_layer = None
+_thread_affinity = None
 
 
 def threading_layer():
@@ -326,6 +416,98 @@ def threading_layer():
         return _threading_layer
 
 
+def get_thread_affinity():
+    """
+    Get the CPUs the threads of the threading layer are pinned to, as set by
+    :envvar:`NUMBA_THREAD_AFFINITY`.  The thread launching a parallel region
+    is not pinned and has the first slot of the list, the worker threads
+    take the following slots, cycling through the list if there are more
+    threads than CPUs.  The list is empty if the threads are not pinned
+    (always on macOS).
+    """
+    if _thread_affinity is None:
+        raise ValueError("Threading layer is not initialized.")
+    return list(_thread_affinity)
+
+
+def _parse_cpu_list(text):
+    """
+    Parse a list of CPUs such as '0-3,8,10-11' into a list of CPU numbers.
+    """
+    cpus = []
+    for item in text.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        first, sep, last = item.partition('-')
+        if sep:
+            cpus.extend(range(int(first), int(last) + 1))
+        else:
+            cpus.append(int(first))
+    return cpus
+
+
+def _get_available_cpus():
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(multiprocessing.cpu_count()))
+
+
+def _get_numa_nodes(cpus):
+    """
+    Group the CPUs by NUMA node.  All the CPUs form a single node if the
+    topology is unknown.
+    """
+    def node_number(path):
+        return int(re.search(r'node(\d+)', path).group(1))
+
+    available = set(cpus)
+    nodes = []
+    paths = glob.glob('/sys/devices/system/node/node[0-9]*/cpulist')
+    for path in sorted(paths, key=node_number):
+        try:
+            with open(path) as f:
+                node = [c for c in _parse_cpu_list(f.read()) if c in available]
+        except (OSError, ValueError):
+            continue
+        if node:
+            nodes.append(node)
+    return nodes or [list(cpus)]
+
+
+def _compute_thread_affinity(policy):
+    """
+    Get the CPUs of the thread slots for the given NUMBA_THREAD_AFFINITY
+    value: 'compact' fills the CPUs in order, 'scatter' alternates between
+    the NUMA nodes, otherwise the value is an explicit list of CPUs.
+    """
+    policy = policy.strip().lower()
+    if not policy:
+        return []
+    available = _get_available_cpus()
+    if policy == 'compact':
+        return available
+    if policy == 'scatter':
+        nodes = _get_numa_nodes(available)
+        cpus = []
+        for i in range(max(len(node) for node in nodes)):
+            cpus.extend(node[i] for node in nodes if i < len(node))
+        return cpus
+    try:
+        cpus = _parse_cpu_list(policy)
+    except ValueError:
+        cpus = []
+    if not cpus:
+        raise ValueError("Invalid thread affinity %r: expected 'compact', "
+                         "'scatter' or a list of CPUs such as '0-3,8'"
+                         % (policy,))
+    unavailable = sorted(set(cpus) - set(available))
+    if unavailable:
+        raise ValueError("Invalid thread affinity %r: CPUs %s are not "
+                         "available" % (policy, unavailable))
+    return cpus
+
+
 def _check_tbb_version_compatible():
     """
     Checks that if TBB is present it is of a compatible version.
@@ -446,13 +628,15 @@ def _launch_threads():
                 available = ['tbb']
                 requirements.append('TBB')
                 if t == "safe":
-                    # "safe" is TBB, which is fork and threadsafe everywhere
-                    pass
+                    # "safe" is TBB, which is fork and threadsafe everywhere,
+                    # with workqueue as a fallback, which is too
+                    available.append('workqueue')
                 elif t == "threadsafe":
                     if _IS_OSX:
                         requirements.append('OSX_OMP')
-                    # omp is threadsafe everywhere
+                    # omp and workqueue are threadsafe everywhere
                     available.append('omp')
+                    available.append('workqueue')
                 elif t == "forksafe":
                     # everywhere apart from linux (GNU OpenMP) has a guaranteed
                     # forksafe OpenMP, as OpenMP has better performance, prefer
@@ -488,6 +672,25 @@ def _launch_threads():
             ll.add_symbol('numba_parallel_for', lib.parallel_for)
             ll.add_symbol('do_scheduling_signed', lib.do_scheduling_signed)
             ll.add_symbol('do_scheduling_unsigned', lib.do_scheduling_unsigned)
+            ll.add_symbol('do_dynamic_scheduling',
+                          lib.do_dynamic_scheduling)
+            ll.add_symbol('get_sched_chunk', lib.get_sched_chunk)
+            ll.add_symbol('get_region_clock', lib.get_region_clock)
+            ll.add_symbol('choose_serial', lib.choose_serial)
+            ll.add_symbol('record_region_time', lib.record_region_time)
+            ll.add_symbol('run_profiled_kernel', lib.run_profiled_kernel)
+            ll.add_symbol('record_parfor_call', lib.record_parfor_call)
+
+            affinity = _compute_thread_affinity(config.THREAD_AFFINITY)
+            if affinity and _IS_OSX:
+                warnings.warn("Threads cannot be pinned to CPUs on macOS, "
+                              "NUMBA_THREAD_AFFINITY is ignored.",
+                              errors.NumbaWarning)
+                affinity = []
+            set_thread_affinity = CFUNCTYPE(None, POINTER(c_int), c_int,
+                                            c_int)(lib.set_thread_affinity)
+            set_thread_affinity((c_int * len(affinity))(*affinity),
+                                len(affinity), int(config.FIRST_TOUCH))
 
             launch_threads = CFUNCTYPE(None, c_int)(lib.launch_threads)
             launch_threads(NUM_THREADS)
@@ -495,8 +698,9 @@ def _launch_threads():
             _load_num_threads_funcs(lib)  # load late
 
             # set library name so it can be queried
-            global _threading_layer
+            global _threading_layer, _thread_affinity
             _threading_layer = libname
+            _thread_affinity = affinity
             _is_initialized = True
 
 
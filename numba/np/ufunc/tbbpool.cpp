@@ -13,6 +13,7 @@ Implement parallel vectorize workqueue on top of Intel TBB.
 #endif
 
 #include <tbb/tbb.h>
+#include <atomic>
 #include <string.h>
 #include <stdio.h>
 #include "workqueue.h"
@@ -80,8 +81,14 @@ get_thread_id(void)
     return tbb::task_arena::current_thread_index();
 }
 
+// The next slot to pin a worker thread to, slot 0 is the launching thread's,
+// which isn't pinned
+static std::atomic<int> next_pin_slot(1);
+static THREAD_LOCAL(bool) _TLS_pinned = false;
+
 // watch the arena, if it decides to create more threads/add threads into the
-// arena then make sure they get the right thread count
+// arena then make sure they get the right thread count, and pin the worker
+// threads entering an arena for the first time
 class fix_tls_observer: public tbb::task_scheduler_observer {
     int mask_val;
     void on_scheduler_entry( bool is_worker ) override;
@@ -94,6 +101,14 @@ public:
 
 void fix_tls_observer::on_scheduler_entry(bool worker) {
     set_num_threads(mask_val);
+    if (worker && !_TLS_pinned)
+    {
+        _TLS_pinned = true;
+        if (pin_thread(next_pin_slot++) && _DEBUG)
+        {
+            puts("A TBB worker thread could not be pinned");
+        }
+    }
 }
 
 static void
@@ -157,7 +172,7 @@ parallel_for(void *fn, char **args, size_t *dimensions, size_t *steps, void *dat
 
     limited.execute([&]{
         using range_t = tbb::blocked_range<size_t>;
-        tbb::parallel_for(range_t(0, dimensions[0]), [=](const range_t &range)
+        auto body = [=](const range_t &range)
         {
             size_t * count_space = (size_t *)alloca(sizeof(size_t) * arg_len);
             char ** array_arg_space = (char**)alloca(sizeof(char*) * array_count);
@@ -198,7 +213,19 @@ parallel_for(void *fn, char **args, size_t *dimensions, size_t *steps, void *dat
             }
             auto func = reinterpret_cast<void (*)(char **args, size_t *dims, size_t *steps, void *data)>(fn);
             func(array_arg_space, count_space, steps, data);
-        });
+        };
+        if (get_first_touch())
+        {
+            // Split the iterations evenly and in the same way for every
+            // loop of the same size, though which thread runs a part is up
+            // to TBB
+            tbb::parallel_for(range_t(0, dimensions[0]), body,
+                              tbb::static_partitioner());
+        }
+        else
+        {
+            tbb::parallel_for(range_t(0, dimensions[0]), body);
+        }
     });
 }
 
@@ -311,6 +338,22 @@ MOD_INIT(tbbpool)
                            PyLong_FromVoidPtr((void*)&do_scheduling_signed));
     PyObject_SetAttrString(m, "do_scheduling_unsigned",
                            PyLong_FromVoidPtr((void*)&do_scheduling_unsigned));
+    PyObject_SetAttrString(m, "do_dynamic_scheduling",
+                           PyLong_FromVoidPtr((void*)&do_dynamic_scheduling));
+    PyObject_SetAttrString(m, "get_sched_chunk",
+                           PyLong_FromVoidPtr((void*)&get_sched_chunk));
+    PyObject_SetAttrString(m, "set_thread_affinity",
+                           PyLong_FromVoidPtr((void*)&set_thread_affinity));
+    PyObject_SetAttrString(m, "get_region_clock",
+                           PyLong_FromVoidPtr((void*)&get_region_clock));
+    PyObject_SetAttrString(m, "choose_serial",
+                           PyLong_FromVoidPtr((void*)&choose_serial));
+    PyObject_SetAttrString(m, "record_region_time",
+                           PyLong_FromVoidPtr((void*)&record_region_time));
+    PyObject_SetAttrString(m, "run_profiled_kernel",
+                           PyLong_FromVoidPtr((void*)&run_profiled_kernel));
+    PyObject_SetAttrString(m, "record_parfor_call",
+                           PyLong_FromVoidPtr((void*)&record_parfor_call));
     PyObject_SetAttrString(m, "set_num_threads",
                            PyLong_FromVoidPtr((void*)&set_num_threads));
     PyObject_SetAttrString(m, "get_num_threads",
@@ -2,11 +2,16 @@
 Implement parallel vectorize workqueue.
 
 This keeps a set of worker threads running all the time.
-They wait and spin on a task queue for jobs.
-
-**WARNING**
-This module is not thread-safe.  Adding task to queue is not protected from
-race conditions.
+They wait on a shared list of jobs, each job being a parallel_for() call
+split into chunks of its outer loop.  Idle workers claim chunks from any
+pending job, and the thread that launched a job also runs chunks of it
+while waiting for its completion.  As a result, parallel_for() can be
+called concurrently from several threads, and from within a chunk (nested
+parallelism), without creating any more threads than the pool holds.
+
+With first-touch scheduling, chunk c > 0 of a job is reserved for worker
+c - 1, so that the same thread processes the same part of the iteration
+space in consecutive loops of the same size.
 */
 #include "../../_pymodule.h"
 #ifdef _POSIX_C_SOURCE
@@ -42,16 +47,6 @@ race conditions.
 
 #define _DEBUG 0
 
-/* workqueue is not threadsafe, so we use DSO globals to flag and update various
- * states.
- */
-/* This variable is the nesting level, it's incremented at the start of each
- * parallel region and decremented at the end, if parallel regions are nested
- * on entry the value == 1 and workqueue will abort (this in preference to just
- * hanging or segfaulting).
- */
-static int _nesting_level = 0;
-
 /* As the thread-pool isn't inherited by children,
    free the task-queue, too. */
 static void reset_after_fork(void);
@@ -91,10 +86,10 @@ queue_condition_unlock(queue_condition_t *qc)
 }
 
 static void
-queue_condition_signal(queue_condition_t *qc)
+queue_condition_broadcast(queue_condition_t *qc)
 {
     /* XXX errors? */
-    pthread_cond_signal(&qc->cond);
+    pthread_cond_broadcast(&qc->cond);
 }
 
 static void
@@ -166,9 +161,9 @@ queue_condition_unlock(queue_condition_t *qc)
 }
 
 static void
-queue_condition_signal(queue_condition_t *qc)
+queue_condition_broadcast(queue_condition_t *qc)
 {
-    WakeConditionVariable(&qc->cv);
+    WakeAllConditionVariable(&qc->cv);
 }
 
 static void
@@ -227,40 +222,39 @@ get_thread_id(void)
 
 #endif
 
-typedef struct Task
+typedef struct Job
 {
-    void (*func)(void *args, void *dims, void *steps, void *data);
-    void *args, *dims, *steps, *data;
-} Task;
-
-typedef struct
-{
-    queue_condition_t cond;
-    int state;
-    Task task;
-} Queue;
-
-
-static Queue *queues = NULL;
-static int queue_count;
-static int queue_pivot = 0;
+    void (*func)(char **args, size_t *dims, size_t *steps, void *data);
+    char **args;
+    size_t *dims, *steps;
+    void *data;
+    size_t inner_ndim, array_count;
+    /* The thread mask in effect in the launching thread */
+    int num_threads;
+    /* The outer loop is split in nchunks chunks of count iterations, the
+       last chunk taking the remainder */
+    size_t total, count;
+    int nchunks;
+    /* Which chunks are claimed, the number of chunks not yet claimed and the
+       first chunk that may not be claimed */
+    char *claimed;
+    int unclaimed;
+    int next_chunk;
+    /* Whether chunks are reserved for workers, see find_chunk() */
+    int first_touch;
+    /* Number of chunks not yet completed */
+    int pending;
+    /* Next job with chunks to be claimed */
+    struct Job *next;
+} Job;
+
+/* All fields below are protected by pool_cond's lock.  The condition is
+   broadcast whenever a job is added or completed. */
+static queue_condition_t pool_cond;
+/* Jobs with chunks to be claimed, in launch order */
+static Job *jobs_head = NULL, *jobs_tail = NULL;
 static int NUM_THREADS = -1;
 
-static void
-queue_state_wait(Queue *queue, int old, int repl)
-{
-    queue_condition_t *cond = &queue->cond;
-
-    queue_condition_lock(cond);
-    while (queue->state != old)
-    {
-        queue_condition_wait(cond);
-    }
-    queue->state = repl;
-    queue_condition_signal(cond);
-    queue_condition_unlock(cond);
-}
-
 // break on this for debug
 void debug_marker(void);
 void debug_marker() {};
@@ -303,18 +297,108 @@ get_num_threads(void)
 }
 
 
-// this complies to a launchable function from `add_task` like:
-// add_task(nopfn, NULL, NULL, NULL, NULL)
-// useful if you want to limit the number of threads locally
-// static void nopfn(void *args, void *dims, void *steps, void *data) {};
+/* Find a chunk of a job that a worker, or the launching thread if worker
+   is -1, may claim, and return -1 if there is none.  pool_cond's lock must
+   be held.  With first-touch scheduling, the launching thread runs chunk 0,
+   worker w runs chunk w + 1, and once done with its own chunk the launching
+   thread takes over those still unclaimed rather than waiting for busy
+   workers. */
+static int
+find_chunk(Job *job, int worker)
+{
+    int chunk;
+    if (job->first_touch && worker >= 0)
+    {
+        chunk = worker + 1;
+        if (chunk < job->nchunks && !job->claimed[chunk])
+            return chunk;
+        return -1;
+    }
+    for (chunk = job->next_chunk; chunk < job->nchunks; chunk++)
+    {
+        if (!job->claimed[chunk])
+            return chunk;
+    }
+    return -1;
+}
+
+/* Claim a chunk of a job, pool_cond's lock must be held */
+static void
+claim_chunk(Job *job, int chunk)
+{
+    job->claimed[chunk] = 1;
+    while (job->next_chunk < job->nchunks && job->claimed[job->next_chunk])
+    {
+        job->next_chunk++;
+    }
+    if (--job->unclaimed == 0)
+    {
+        /* All chunks are claimed, unlink the job.  It isn't necessarily the
+           head, as launching threads claim chunks of their own job. */
+        Job *prev = NULL, *cur = jobs_head;
+        while (cur != job)
+        {
+            prev = cur;
+            cur = cur->next;
+        }
+        if (prev)
+            prev->next = job->next;
+        else
+            jobs_head = job->next;
+        if (jobs_tail == job)
+            jobs_tail = prev;
+        job->next = NULL;
+    }
+}
+
+/* Run a chunk of a job, without holding pool_cond's lock */
+static void
+run_chunk(Job *job, int chunk)
+{
+    const size_t arg_len = job->inner_ndim + 1;
+    size_t *count_space = (size_t *)alloca(sizeof(size_t) * arg_len);
+    char **array_arg_space = (char **)alloca(sizeof(char*) * job->array_count);
+    size_t start = job->count * chunk;
+    size_t j;
+    int old_num_threads = _TLS_num_threads;
+
+    memcpy(count_space, job->dims, arg_len * sizeof(size_t));
+    if (chunk == job->nchunks - 1)
+    {
+        // Last chunk takes all leftover
+        count_space[0] = job->total - start;
+    }
+    else
+    {
+        count_space[0] = job->count;
+    }
+    for (j = 0; j < job->array_count; j++)
+    {
+        array_arg_space[j] = job->args[j] + job->steps[j] * start;
+    }
 
+    if (_DEBUG)
+    {
+        printf("thread %d: chunk %d of %d, start %ld, count %ld\n",
+               get_thread_id(), chunk, job->nchunks, (long)start,
+               (long)count_space[0]);
+    }
 
-// synchronize the TLS num_threads slot to value args[0]
-static void sync_tls(void *args, void *dims, void *steps, void *data) {
-    int nthreads = *((int *)(args));
-    _TLS_num_threads = nthreads;
-};
+    // Nested parallel regions see the launching thread's mask
+    _TLS_num_threads = job->num_threads;
+    job->func(array_arg_space, count_space, job->steps, job->data);
+    _TLS_num_threads = old_num_threads;
+}
 
+/* Mark a chunk of a job completed, pool_cond's lock must be held */
+static void
+complete_chunk(Job *job)
+{
+    if (--job->pending == 0)
+    {
+        queue_condition_broadcast(&pool_cond);
+    }
+}
 
 static void
 parallel_for(void *fn, char **args, size_t *dimensions, size_t *steps, void *data,
@@ -326,236 +410,128 @@ parallel_for(void *fn, char **args, size_t *dimensions, size_t *steps, void *dat
     //     steps = <ir.Argument '.3' of type i64*>
     //     data = <ir.Argument '.4' of type i8*>
 
-    // check the nesting level, if it's already 1, abort, workqueue cannot
-    // handle nesting.
-    if (_nesting_level >= 1){
-        fprintf(stderr, "%s", "Terminating: Nested parallel kernel launch "
-                              "detected, the workqueue threading layer does "
-                              "not supported nested parallelism. Try the TBB "
-                              "threading layer.\n");
-        raise(SIGABRT);
-        return;
-    }
-
-    // increment the nest level
-    _nesting_level += 1;
-
-    size_t * count_space = NULL;
-    char ** array_arg_space = NULL;
-    const size_t arg_len = (inner_ndim + 1);
-    int i; // induction var for chunking, thread count unlikely to overflow int
-    size_t j, count, remain, total;
-
-    ptrdiff_t offset;
-    char * base;
-    int old_queue_count = -1;
-
-    size_t step;
+    Job job;
+    int chunk;
 
     debug_marker();
 
-    total = *((size_t *)dimensions);
-    count = total / num_threads;
-    remain = total;
+    job.func = (void (*)(char **, size_t *, size_t *, void *))fn;
+    job.args = args;
+    job.dims = dimensions;
+    job.steps = steps;
+    job.data = data;
+    job.inner_ndim = inner_ndim;
+    job.array_count = array_count;
+    job.num_threads = num_threads;
+    job.total = *((size_t *)dimensions);
+    job.nchunks = num_threads > 0 ? num_threads : 1;
+    job.count = job.total / job.nchunks;
+    job.claimed = (char *)alloca(job.nchunks);
+    memset(job.claimed, 0, job.nchunks);
+    job.unclaimed = job.nchunks;
+    job.next_chunk = 0;
+    job.first_touch = get_first_touch();
+    job.pending = job.nchunks;
+    job.next = NULL;
 
     if(_DEBUG)
     {
-        printf("inner_ndim: %ld\n",inner_ndim);
-        printf("arg_len: %ld\n", arg_len);
-        printf("total: %ld\n", total);
-        printf("count: %ld\n", count);
-
-        printf("dimensions: ");
-        for(j = 0; j < arg_len; j++)
-        {
-            printf("%ld, ", ((size_t *)dimensions)[j]);
-        }
-        printf("\n");
-
-        printf("steps: ");
-        for(j = 0; j < array_count; j++)
-        {
-            printf("%ld, ", steps[j]);
-        }
-        printf("\n");
-
-        printf("*args: ");
-        for(j = 0; j < array_count; j++)
-        {
-            printf("%p, ", (void *)args[j]);
-        }
+        printf("inner_ndim: %ld\n", (long)inner_ndim);
+        printf("total: %ld\n", (long)job.total);
+        printf("count: %ld\n", (long)job.count);
     }
 
-    // sync the thread pool TLS slots, sync all slots, we don't know which
-    // threads will end up running.
-    for (i = 0; i < NUM_THREADS; i++)
-    {
-        add_task(sync_tls, (void *)(&num_threads), NULL, NULL, NULL);
-    }
-    ready();
-    synchronize();
+    queue_condition_lock(&pool_cond);
+    if (jobs_tail)
+        jobs_tail->next = &job;
+    else
+        jobs_head = &job;
+    jobs_tail = &job;
+    queue_condition_broadcast(&pool_cond);
 
-    // This backend isn't threadsafe so just mutate the global
-    old_queue_count = queue_count;
-    queue_count = num_threads;
-
-    for (i = 0; i < num_threads; i++)
+    // Help with the job rather than idling
+    while ((chunk = find_chunk(&job, -1)) >= 0)
     {
-        count_space = (size_t *)alloca(sizeof(size_t) * arg_len);
-        memcpy(count_space, dimensions, arg_len * sizeof(size_t));
-        if(i == num_threads - 1)
-        {
-            // Last thread takes all leftover
-            count_space[0] = remain;
-        }
-        else
-        {
-            count_space[0] = count;
-            remain = remain - count;
-        }
-
-        if(_DEBUG)
-        {
-            printf("\n=================== THREAD %d ===================\n", i);
-            printf("\ncount_space: ");
-            for(j = 0; j < arg_len; j++)
-            {
-                printf("%ld, ", count_space[j]);
-            }
-            printf("\n");
-        }
-
-        array_arg_space = alloca(sizeof(char*) * array_count);
-
-        for(j = 0; j < array_count; j++)
-        {
-            base = args[j];
-            step = steps[j];
-            offset = step * count * i;
-            array_arg_space[j] = (char *)(base + offset);
-
-            if(_DEBUG)
-            {
-                printf("Index %ld\n", j);
-                printf("-->Got base %p\n", (void *)base);
-                printf("-->Got step %ld\n", step);
-                printf("-->Got offset %ld\n", offset);
-                printf("-->Got addr %p\n", (void *)array_arg_space[j]);
-            }
-        }
-
-        if(_DEBUG)
-        {
-            printf("\narray_arg_space: ");
-            for(j = 0; j < array_count; j++)
-            {
-                printf("%p, ", (void *)array_arg_space[j]);
-            }
-        }
-        add_task(fn, (void *)array_arg_space, (void *)count_space, steps, data);
+        claim_chunk(&job, chunk);
+        queue_condition_unlock(&pool_cond);
+        run_chunk(&job, chunk);
+        queue_condition_lock(&pool_cond);
+        complete_chunk(&job);
     }
-
-    ready();
-    synchronize();
-
-    queue_count = old_queue_count;
-    // decrement the nest level
-    _nesting_level -= 1;
-}
-
-static void
-add_task(void *fn, void *args, void *dims, void *steps, void *data)
-{
-    void (*func)(void *args, void *dims, void *steps, void *data) = fn;
-
-    Queue *queue = &queues[queue_pivot];
-
-    Task *task = &queue->task;
-    task->func = func;
-    task->args = args;
-    task->dims = dims;
-    task->steps = steps;
-    task->data = data;
-
-    /* Move pivot */
-    if ( ++queue_pivot == queue_count )
+    // Wait for the chunks claimed by other threads
+    while (job.pending > 0)
     {
-        queue_pivot = 0;
+        queue_condition_wait(&pool_cond);
     }
+    queue_condition_unlock(&pool_cond);
 }
 
 static
 void thread_worker(void *arg)
 {
-    Queue *queue = (Queue*)arg;
-    Task *task;
+    /* The worker's index in the pool */
+    int worker = (int)(intptr_t)arg;
+    Job *job;
+    int chunk = -1;
+
+    /* Slot 0 is the launching thread's, which isn't pinned */
+    if (pin_thread(worker + 1) && _DEBUG)
+    {
+        printf("thread %d: could not be pinned\n", get_thread_id());
+    }
 
+    queue_condition_lock(&pool_cond);
     while (1)
     {
-        /* Wait for the queue to be in READY state (i.e. for some task
-         * to need running), and switch it to RUNNING.
-         */
-        queue_state_wait(queue, READY, RUNNING);
+        /* Wait for a job with a chunk this worker may claim */
+        for (job = jobs_head; job != NULL; job = job->next)
+        {
+            chunk = find_chunk(job, worker);
+            if (chunk >= 0)
+                break;
+        }
+        if (job == NULL)
+        {
+            queue_condition_wait(&pool_cond);
+            continue;
+        }
+        claim_chunk(job, chunk);
+        queue_condition_unlock(&pool_cond);
 
-        task = &queue->task;
-        task->func(task->args, task->dims, task->steps, task->data);
+        run_chunk(job, chunk);
 
-        /* Task is done. */
-        queue_state_wait(queue, RUNNING, DONE);
+        queue_condition_lock(&pool_cond);
+        complete_chunk(job);
     }
 }
 
 static void launch_threads(int count)
 {
-    if (!queues)
+    if (NUM_THREADS < 0)
     {
-        /* If queues are not yet allocated,
-           create them, one for each thread. */
+        /* If the pool is not yet created, create it */
         int i;
-        size_t sz = sizeof(Queue) * count;
 
         /* set for use in parallel_for */
         NUM_THREADS = count;
-        queues = malloc(sz);     /* this memory will leak */
-        /* Note this initializes the state to IDLE */
-        memset(queues, 0, sz);
-        queue_count = count;
+        jobs_head = jobs_tail = NULL;
+        queue_condition_init(&pool_cond);
 
         for (i = 0; i < count; ++i)
         {
-            queue_condition_init(&queues[i].cond);
-            numba_new_thread(thread_worker, &queues[i]);
+            numba_new_thread(thread_worker, (void *)(intptr_t)i);
         }
 
         _INIT_NUM_THREADS = count;
     }
 }
 
-static void synchronize(void)
-{
-    int i;
-    for (i = 0; i < queue_count; ++i)
-    {
-        queue_state_wait(&queues[i], DONE, IDLE);
-    }
-}
-
-static void ready(void)
-{
-    int i;
-    for (i = 0; i < queue_count; ++i)
-    {
-        queue_state_wait(&queues[i], IDLE, READY);
-    }
-}
-
 static void reset_after_fork(void)
 {
-    free(queues);
-    queues = NULL;
+    /* The jobs belong to threads of the parent process */
+    jobs_head = jobs_tail = NULL;
     NUM_THREADS = -1;
     _INIT_NUM_THREADS = -1;
-    _nesting_level = 0;
 }
 
 MOD_INIT(workqueue)
@@ -567,18 +543,28 @@ MOD_INIT(workqueue)
 
     PyObject_SetAttrString(m, "launch_threads",
                            PyLong_FromVoidPtr(&launch_threads));
-    PyObject_SetAttrString(m, "synchronize",
-                           PyLong_FromVoidPtr(&synchronize));
-    PyObject_SetAttrString(m, "ready",
-                           PyLong_FromVoidPtr(&ready));
-    PyObject_SetAttrString(m, "add_task",
-                           PyLong_FromVoidPtr(&add_task));
     PyObject_SetAttrString(m, "parallel_for",
                            PyLong_FromVoidPtr(&parallel_for));
     PyObject_SetAttrString(m, "do_scheduling_signed",
                            PyLong_FromVoidPtr(&do_scheduling_signed));
     PyObject_SetAttrString(m, "do_scheduling_unsigned",
                            PyLong_FromVoidPtr(&do_scheduling_unsigned));
+    PyObject_SetAttrString(m, "do_dynamic_scheduling",
+                           PyLong_FromVoidPtr(&do_dynamic_scheduling));
+    PyObject_SetAttrString(m, "get_sched_chunk",
+                           PyLong_FromVoidPtr(&get_sched_chunk));
+    PyObject_SetAttrString(m, "set_thread_affinity",
+                           PyLong_FromVoidPtr(&set_thread_affinity));
+    PyObject_SetAttrString(m, "get_region_clock",
+                           PyLong_FromVoidPtr(&get_region_clock));
+    PyObject_SetAttrString(m, "choose_serial",
+                           PyLong_FromVoidPtr(&choose_serial));
+    PyObject_SetAttrString(m, "record_region_time",
+                           PyLong_FromVoidPtr(&record_region_time));
+    PyObject_SetAttrString(m, "run_profiled_kernel",
+                           PyLong_FromVoidPtr(&run_profiled_kernel));
+    PyObject_SetAttrString(m, "record_parfor_call",
+                           PyLong_FromVoidPtr(&record_parfor_call));
     PyObject_SetAttrString(m, "set_num_threads",
                            PyLong_FromVoidPtr((void*)&set_num_threads));
     PyObject_SetAttrString(m, "get_num_threads",
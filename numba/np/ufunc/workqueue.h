@@ -1,39 +1,11 @@
 typedef struct opaque_thread * thread_pointer;
 
-enum QUEUE_STATE
-{
-    /*
-    The queue has 4 states:
-
-    IDLE: not doing anything
-    READY: tasks enqueued; signal workers to start
-    RUNNING: workers running
-    DONE: workers completed
-    */
-    IDLE = 0, READY, RUNNING, DONE
-};
-
-/* Launch `count` number of threads and create the associated thread queue.
-Must invoke once before each add_task() is used.
-*Warning* queues memory are leaked at interpreter tear down!
+/* Launch `count` number of worker threads.
+Must invoke once before parallel_for() is used.
 */
 static
 void launch_threads(int count);
 
-/* Add task to queue
-Automatically assigned to queues of different thread in a round robin fashion.
-*/
-static
-void add_task(void *fn, void *args, void *dims, void *steps, void *data);
-
-/* Wait until all tasks are done */
-static
-void synchronize(void);
-
-/* Signal worker threads that tasks are added and it is ready to run */
-static
-void ready(void);
-
 /* parallel for loop with 1d tiling.
 
  Args:
@@ -49,7 +21,11 @@ void ready(void);
  inner_ndim - inner dimension of the gufunc
  array_count - the number of arrays in the signature (Python: len(sig.args) + 1)
  the +1 is for the output array.
+ num_threads - the number of chunks the outer loop is split in, and so the
+ maximum number of threads working on it.
 
+ This may be called concurrently from several threads, and from within a
+ running chunk, in which case the chunks of all the calls share the pool.
  */
 static void
 parallel_for(void *fn, char **args, size_t *dims, size_t *steps, void *data,\
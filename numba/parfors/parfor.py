@@ -90,7 +90,7 @@ from numba.core.extending import overload
 import copy
 import numpy
 import numpy as np
-from numba.parfors import array_analysis
+from numba.parfors import array_analysis, reduction
 import numba.cpython.builtins
 from numba.stencils import stencilparfor
 # circular dependency: import numba.npyufunc.dufunc.DUFunc
@@ -412,6 +412,213 @@ def linspace_parallel_impl(return_type, *args):
     else:
         raise ValueError("parallel linspace with types {}".format(args))
 
+@reduction.reduction(0)
+def _scan_add(a, b):
+    return a + b
+
+@reduction.reduction(1)
+def _scan_mul(a, b):
+    return a * b
+
+@register_jitable
+def scan_blocks(outer, n):
+    """Split the scanned axis of length n into blocks so that, together
+       with the outer dimension, every thread has a block to scan.  Returns
+       the number of blocks and the block size.
+    """
+    if n == 0:
+        return 0, 1
+    nthreads = numba.get_num_threads()
+    nblocks = min(n, max(1, (nthreads + outer - 1) // outer))
+    bsize = (n + nblocks - 1) // nblocks
+    return (n + bsize - 1) // bsize, bsize
+
+@register_jitable
+def scan_block(op, a, out, sums, b, bsize):
+    """First pass of the blocked scan: scan block b on its own and store its
+       total in sums.
+    """
+    nblocks = sums.shape[1]
+    i = b // nblocks
+    blk = b % nblocks
+    start = blk * bsize
+    stop = min(start + bsize, a.shape[1])
+    for k in range(a.shape[2]):
+        out[i, start, k] = a[i, start, k]
+    for j in range(start + 1, stop):
+        for k in range(a.shape[2]):
+            out[i, j, k] = op(out[i, j - 1, k], a[i, j, k])
+    for k in range(a.shape[2]):
+        sums[i, blk, k] = out[i, stop - 1, k]
+
+@register_jitable
+def scan_block_totals(op, sums):
+    """Scan the block totals so that sums holds the total of every block
+       and the blocks before it.
+    """
+    for i in range(sums.shape[0]):
+        for blk in range(1, sums.shape[1]):
+            for k in range(sums.shape[2]):
+                sums[i, blk, k] = op(sums[i, blk - 1, k], sums[i, blk, k])
+
+@register_jitable
+def scan_add_offset(op, out, sums, r, bsize):
+    """Second pass of the blocked scan: combine row r with the total of the
+       blocks before its own.
+    """
+    i = r // out.shape[1]
+    j = r % out.shape[1]
+    blk = j // bsize
+    if blk > 0:
+        for k in range(out.shape[2]):
+            out[i, j, k] = op(sums[i, blk - 1, k], out[i, j, k])
+
+def cumulative_parallel_impl(op):
+    def cumulative_impl(return_type, arg, axis=None):
+        dtype = as_dtype(return_type.dtype)
+
+        def cumulative_1(in_arr, axis=None):
+            numba.parfors.parfor.init_prange()
+            a, outer, n, inner, shape = numba.np.arraymath._cumulative_view(
+                in_arr, axis)
+            out = np.empty((outer, n, inner), dtype)
+            nblocks, bsize = numba.parfors.parfor.scan_blocks(outer, n)
+            sums = np.empty((outer, nblocks, inner), dtype)
+            for b in numba.parfors.parfor.internal_prange(outer * nblocks):
+                numba.parfors.parfor.scan_block(op, a, out, sums, b, bsize)
+            if nblocks > 1:
+                numba.parfors.parfor.scan_block_totals(op, sums)
+                for r in numba.parfors.parfor.internal_prange(outer * n):
+                    numba.parfors.parfor.scan_add_offset(op, out, sums, r,
+                                                         bsize)
+            return out.reshape(shape)
+        return cumulative_1
+    return cumulative_impl
+
+def scan_parallel_impl(return_type, func, arg, axis=None):
+    op = func.dispatcher
+    dtype = as_dtype(return_type.dtype)
+
+    def scan_1(func, in_arr, axis=None):
+        numba.parfors.parfor.init_prange()
+        a, outer, n, inner, shape = numba.np.arraymath._cumulative_view(
+            in_arr, axis)
+        out = np.empty((outer, n, inner), dtype)
+        nblocks, bsize = numba.parfors.parfor.scan_blocks(outer, n)
+        sums = np.empty((outer, nblocks, inner), dtype)
+        for b in numba.parfors.parfor.internal_prange(outer * nblocks):
+            numba.parfors.parfor.scan_block(op, a, out, sums, b, bsize)
+        if nblocks > 1:
+            numba.parfors.parfor.scan_block_totals(op, sums)
+            for r in numba.parfors.parfor.internal_prange(outer * n):
+                numba.parfors.parfor.scan_add_offset(op, out, sums, r, bsize)
+        return out.reshape(shape)
+    return scan_1
+
+def _is_parallel_sort(arr, axis, kind):
+    """Whether a sort of arr along axis of the given kind is replaced by the
+       parallel sort, the radix sorts are kept as they are.
+    """
+    if arr.ndim != 1 or axis is not None:
+        return False
+    return not (isinstance(kind, types.StringLiteral) and
+                kind.literal_value in ('radix', 'stable'))
+
+def _get_parallel_sort(arr, kind, is_argsort):
+    """Get the parallel sort of the elements of arr, whose blocks are sorted
+       with mergesort if kind is 'mergesort', so that argsort is stable.
+    """
+    is_stable = (isinstance(kind, types.StringLiteral) and
+                 kind.literal_value == 'mergesort')
+    return numba.np.arrayobj.get_parallel_sort(
+        isinstance(arr.dtype, types.Float), is_argsort=is_argsort,
+        is_stable=is_stable)
+
+def sort_parallel_impl(return_type, arr, axis=None, kind=None):
+    """Parallel implementation of np.sort and ndarray.sort, a merge sort of
+       blocks sorted concurrently, see numba.misc.parallelsort.
+    """
+    if not _is_parallel_sort(arr, axis, kind):
+        return None
+    if return_type != types.none:
+        # np.sort copies then sorts inplace, which is replaced in turn, the
+        # kind does not matter as the sorted values are the same
+        def sort_1(in_arr, axis=None, kind=None):
+            res = in_arr.copy()
+            res.sort()
+            return res
+        return sort_1
+
+    impl = _get_parallel_sort(arr, None, False)
+    plan_blocks = impl.plan_blocks
+    sort_block = impl.sort_block
+    plan_merge = impl.plan_merge
+    merge_chunk = impl.merge_chunk
+
+    def sort_inplace_1(in_arr, axis=None, kind=None):
+        numba.parfors.parfor.init_prange()
+        n = in_arr.size
+        bounds = plan_blocks(n)
+        nblocks = len(bounds) - 1
+        for b in numba.parfors.parfor.internal_prange(nblocks):
+            sort_block(in_arr, in_arr, bounds, b)
+        chunk = (n + nblocks - 1) // nblocks
+        ws = np.empty(n if nblocks > 1 else 0, in_arr.dtype)
+        rounds = 0
+        while len(bounds) > 2:
+            tasks, bounds = plan_merge(bounds, chunk)
+            if rounds % 2 == 0:
+                for t in numba.parfors.parfor.internal_prange(tasks.shape[0]):
+                    merge_chunk(in_arr, ws, in_arr, tasks, t)
+            else:
+                for t in numba.parfors.parfor.internal_prange(tasks.shape[0]):
+                    merge_chunk(ws, in_arr, in_arr, tasks, t)
+            rounds += 1
+        if rounds % 2 == 1:
+            for i in numba.parfors.parfor.internal_prange(n):
+                in_arr[i] = ws[i]
+        return None
+    return sort_inplace_1
+
+def argsort_parallel_impl(return_type, arr, axis=None, kind=None):
+    """Parallel implementation of np.argsort and ndarray.argsort, see
+       sort_parallel_impl.
+    """
+    if not _is_parallel_sort(arr, axis, kind):
+        return None
+    impl = _get_parallel_sort(arr, kind, True)
+    plan_blocks = impl.plan_blocks
+    sort_block = impl.sort_block
+    plan_merge = impl.plan_merge
+    merge_chunk = impl.merge_chunk
+
+    def argsort_1(in_arr, axis=None, kind=None):
+        numba.parfors.parfor.init_prange()
+        n = in_arr.size
+        idxs = np.empty(n, np.intp)
+        bounds = plan_blocks(n)
+        nblocks = len(bounds) - 1
+        for b in numba.parfors.parfor.internal_prange(nblocks):
+            sort_block(idxs, in_arr, bounds, b)
+        chunk = (n + nblocks - 1) // nblocks
+        ws = np.empty(n if nblocks > 1 else 0, np.intp)
+        rounds = 0
+        while len(bounds) > 2:
+            tasks, bounds = plan_merge(bounds, chunk)
+            if rounds % 2 == 0:
+                for t in numba.parfors.parfor.internal_prange(tasks.shape[0]):
+                    merge_chunk(idxs, ws, in_arr, tasks, t)
+            else:
+                for t in numba.parfors.parfor.internal_prange(tasks.shape[0]):
+                    merge_chunk(ws, idxs, in_arr, tasks, t)
+            rounds += 1
+        if rounds % 2 == 1:
+            for i in numba.parfors.parfor.internal_prange(n):
+                idxs[i] = ws[i]
+        return idxs
+
+    return argsort_1
+
 replace_functions_map = {
     ('argmin', 'numpy'): lambda r,a: argmin_parallel_impl,
     ('argmax', 'numpy'): lambda r,a: argmax_parallel_impl,
@@ -427,6 +634,12 @@ replace_functions_map = {
     ('dot', 'numpy'): dot_parallel_impl,
     ('arange', 'numpy'): arange_parallel_impl,
     ('linspace', 'numpy'): linspace_parallel_impl,
+    ('cumsum', 'numpy'): cumulative_parallel_impl(_scan_add),
+    ('cumprod', 'numpy'): cumulative_parallel_impl(_scan_mul),
+    ('scan', 'numba'): scan_parallel_impl,
+    ('scan', 'numba.parfors.reduction'): scan_parallel_impl,
+    ('sort', 'numpy'): sort_parallel_impl,
+    ('argsort', 'numpy'): argsort_parallel_impl,
 }
 
 def fill_parallel_impl(return_type, arr, val):
@@ -450,6 +663,8 @@ def fill_parallel_impl(return_type, arr, val):
 
 replace_functions_ndarray = {
     'fill': fill_parallel_impl,
+    'sort': sort_parallel_impl,
+    'argsort': argsort_parallel_impl,
 }
 
 @register_jitable
@@ -530,7 +745,8 @@ class Parfor(ir.Expr, ir.Stmt):
             pattern,
             flags,
             no_sequential_lowering=False,
-            races=set()):
+            races=set(),
+            tile_shape=None):
         super(Parfor, self).__init__(
             op='parfor',
             loc=loc
@@ -556,6 +772,10 @@ class Parfor(ir.Expr, ir.Stmt):
         # sequential lowering option
         self.no_sequential_lowering = no_sequential_lowering
         self.races = races
+        # if not None, the loop nests are run in tiles of this shape, a tuple
+        # with one size per loop, to reuse the data of neighbouring iterations
+        # from the cache
+        self.tile_shape = tile_shape
         if config.DEBUG_ARRAY_OPT_STATS:
             fmt = 'Parallel for-loop #{} is produced from pattern \'{}\' at {}'
             print(fmt.format(
@@ -631,6 +851,16 @@ def _analyze_parfor(parfor, equiv_set, typemap, array_analysis):
 
 array_analysis.array_analysis_extensions[Parfor] = _analyze_parfor
 
+# The explanations of the reasons for not hoisting an instruction out of a
+# parallel loop, see parfor_lowering.hoist()
+_hoist_failure_reasons = {
+    'dependency': "it depends on values computed in the loop",
+    'stored array': ("the array is stored in a container, which would then "
+                     "hold the same array for several iterations"),
+    'not pure': "it may not return the same result every time",
+}
+
+
 class ParforDiagnostics(object):
     """Holds parfor diagnostic info, this is accumulated throughout the
     PreParforPass and ParforPass, also in the closure inlining!
@@ -692,16 +922,47 @@ class ParforDiagnostics(object):
         self._get_parfors(self.func_ir.blocks, parfors_list)
         return parfors_list
 
+    def _is_allocation(self, inst):
+        if isinstance(inst.value, ir.Expr):
+            if inst.value.op == 'call':
+                try:
+                    call = guard(find_callname, self.func_ir, inst.value)
+                except KeyError:
+                    # the callee was defined by the parfor passes
+                    return False
+                if call is not None and call == ('empty', 'numpy'):
+                    return True
+        return False
+
+    def _print_source_line(self, loc, prefix):
+        try:
+            path = os.path.relpath(loc.filename)
+        except ValueError:
+            path = os.path.abspath(loc.filename)
+        lines = linecache.getlines(path)
+        if lines and loc.line:
+            print_wrapped(prefix + lines[0 if loc.line < 2 else loc.line - 1].strip())
+
     def hoisted_allocations(self):
         allocs = []
         for pf_id, data in self.hoist_info.items():
             stmt = data.get('hoisted', [])
             for inst in stmt:
-                if isinstance(inst.value, ir.Expr):
-                    if inst.value.op == 'call':
-                        call = guard(find_callname, self.func_ir, inst.value)
-                        if call is not None and call == ('empty', 'numpy'):
-                            allocs.append(inst)
+                if self._is_allocation(inst):
+                    allocs.append(inst)
+        return allocs
+
+    def not_hoisted_allocations(self):
+        """
+        The allocations left in the body of the parallel loops, as
+        (instruction, reason) pairs.
+        """
+        allocs = []
+        for pf_id, data in self.hoist_info.items():
+            stmt = data.get('not_hoisted', [])
+            for inst, reason in stmt:
+                if self._is_allocation(inst):
+                    allocs.append((inst, reason))
         return allocs
 
     def compute_graph_info(self, _a):
@@ -1253,28 +1514,28 @@ class ParforDiagnostics(object):
                 for pf_id, data in self.hoist_info.items():
                     stmt = data.get('hoisted', [])
                     for inst in stmt:
-                        if isinstance(inst.value, ir.Expr):
-                            try:
-                                attr = inst.value.attr
-                                if attr == 'empty':
-                                    msg = ("The memory allocation derived from the "
-                                        "instruction at %s is hoisted out of the "
-                                        "parallel loop labelled #%s (it will be "
-                                        "performed before the loop is executed and "
-                                        "reused inside the loop):")
-                                    loc = inst.loc
-                                    print_wrapped(msg % (loc, pf_id))
-                                    try:
-                                        path = os.path.relpath(loc.filename)
-                                    except ValueError:
-                                        path = os.path.abspath(loc.filename)
-                                    lines = linecache.getlines(path)
-                                    if lines and loc.line:
-                                        print_wrapped("   Allocation:: " + lines[0 if loc.line < 2 else loc.line - 1].strip())
-                                    print_wrapped("    - numpy.empty() is used for the allocation.\n")
-                                    found = True
-                            except (KeyError, AttributeError):
-                                pass
+                        if self._is_allocation(inst):
+                            msg = ("The memory allocation derived from the "
+                                "instruction at %s is hoisted out of the "
+                                "parallel loop labelled #%s (it will be "
+                                "performed once by each thread before it "
+                                "runs its iterations and reused by them):")
+                            print_wrapped(msg % (inst.loc, pf_id))
+                            self._print_source_line(inst.loc, "   Allocation:: ")
+                            print_wrapped("    - numpy.empty() is used for the allocation.\n")
+                            found = True
+                    stmt = data.get('not_hoisted', [])
+                    for inst, reason in stmt:
+                        if self._is_allocation(inst):
+                            msg = ("The memory allocation derived from the "
+                                "instruction at %s is performed in every "
+                                "iteration of the parallel loop labelled #%s, "
+                                "it could not be hoisted as %s:")
+                            reason = _hoist_failure_reasons.get(reason, reason)
+                            print_wrapped(msg % (inst.loc, pf_id, reason))
+                            self._print_source_line(inst.loc, "   Allocation:: ")
+                            print_wrapped("")
+                            found = True
                 if not found:
                     print_wrapped('No allocation hoisting found')
             if print_instruction_hoist:
@@ -1367,17 +1628,34 @@ class PreParforPass(object):
                                 isinstance(self.typemap[callname[1].name],
                                            types.npytypes.Array)):
                                 repl_func = replace_functions_ndarray.get(callname[0], None)
-                                if repl_func is not None:
-                                    # Add the array that the method is on to the arg list.
-                                    expr.args.insert(0, callname[1])
+                                is_method = True
+                            else:
+                                is_method = False
 
                             require(repl_func != None)
-                            typs = tuple(self.typemap[x.name] for x in expr.args)
+                            args = expr.args
+                            if is_method:
+                                # Add the array that the method is on to the arg list.
+                                args = [callname[1]] + args
+                            typs = tuple(self.typemap[x.name] for x in args)
+                            kwtyps = {name: self.typemap[x.name]
+                                      for name, x in expr.kws}
                             try:
-                                new_func =  repl_func(lhs_typ, *typs)
+                                new_func =  repl_func(lhs_typ, *typs, **kwtyps)
                             except:
                                 new_func = None
                             require(new_func != None)
+                            # only rewrite the call once it is replaced
+                            expr.args = args
+                            # keyword and default arguments are folded into
+                            # the arguments of the inlined implementation
+                            params = utils.pysignature(new_func).parameters
+                            for param in list(params.values())[len(typs):]:
+                                if param.name in kwtyps:
+                                    typs += (kwtyps[param.name],)
+                                else:
+                                    typs += (self.typingctx.resolve_value_type(
+                                        param.default),)
                             g = copy.copy(self.func_ir.func_id.func.__globals__)
                             g['numba'] = numba
                             g['np'] = numpy
@@ -1503,7 +1781,8 @@ class ParforPass(object):
         # run stencil translation to parfor
         if self.options.stencil:
             stencil_pass = StencilPass(self.func_ir, self.typemap, self.calltypes,
-                                            self.array_analysis, self.typingctx, self.flags)
+                                            self.array_analysis, self.typingctx, self.flags,
+                                            fusion=self.options.stencil_fusion)
             stencil_pass.run()
         if self.options.setitem:
             self._convert_setitem(self.func_ir.blocks)
@@ -2535,7 +2814,8 @@ class ParforPass(object):
                         equiv_set = array_analysis.get_equiv_set(label)
                         stmt.equiv_set = equiv_set
                         next_stmt.equiv_set = equiv_set
-                        fused_node, fuse_report = try_fuse(equiv_set, stmt, next_stmt)
+                        fused_node, fuse_report = try_fuse(equiv_set, stmt, next_stmt,
+                                                           self.typemap)
                         # accumulate fusion reports
                         self.diagnostics.fusion_reports.append(fuse_report)
                         if fused_node is not None:
@@ -3020,6 +3300,8 @@ def get_parfor_reductions(func_ir, parfor, parfor_params, calltypes, reductions=
     """find variables that are updated using their previous values and an array
     item accessed with parfor index, e.g. s = s+A[i]
     """
+    # scatter reductions are only looked for in the outermost parfor
+    toplevel = reductions is None
     if reductions is None:
         reductions = {}
     if reduce_varnames is None:
@@ -3074,7 +3356,7 @@ def get_parfor_reductions(func_ir, parfor, parfor_params, calltypes, reductions=
             param_nodes[param].reverse()
             reduce_nodes = get_reduce_nodes(param, param_nodes[param], func_ir)
             check_conflicting_reduction_operators(param, reduce_nodes)
-            gri_out = guard(get_reduction_init, reduce_nodes)
+            gri_out = guard(get_reduction_init, reduce_nodes, func_ir)
             if gri_out is not None:
                 init_val, redop = gri_out
             else:
@@ -3082,8 +3364,134 @@ def get_parfor_reductions(func_ir, parfor, parfor_params, calltypes, reductions=
                 redop = None
             reductions[param] = (init_val, reduce_nodes, redop)
 
+    if toplevel:
+        get_parfor_scatter_reductions(parfor, parfor_params, calltypes,
+                                      reductions, reduce_varnames)
+
     return reduce_varnames, reductions
 
+def get_parfor_scatter_reductions(parfor, parfor_params, calltypes, reductions,
+                                  reduce_varnames):
+    """find arrays that are only updated in place at indices that do not come
+    from the parfor index, e.g. A[B[i]] += 1. Each worker accumulates into a
+    private copy of such an array, initialized to the identity of the
+    operator, and the copies are combined after the parallel region.
+    """
+    loop_indices = set(l.index_variable.name for l in parfor.loop_nests)
+    loop_indices.add(parfor.index_var.name)
+    defs = {}
+    uses = defaultdict(list)
+    setitems = defaultdict(list)
+    assigned = set()
+    nested = set()
+    for blk in parfor.loop_body.values():
+        for stmt in blk.body:
+            if isinstance(stmt, ir.Del):
+                continue
+            if isinstance(stmt, Parfor):
+                nested.update(v.name for v in stmt.list_vars())
+                continue
+            if isinstance(stmt, ir.Assign):
+                defs[stmt.target.name] = stmt.value
+                assigned.add(stmt.target.name)
+                used = stmt.value.list_vars()
+            else:
+                used = stmt.list_vars()
+            if isinstance(stmt, (ir.SetItem, ir.StaticSetItem)):
+                setitems[stmt.target.name].append(stmt)
+            for v in used:
+                uses[v.name].append(stmt)
+
+    def index_key(node):
+        # getitem/static_getitem expressions and (Static)SetItem statements
+        if (isinstance(node, ir.StaticSetItem)
+                or getattr(node, 'op', None) == 'static_getitem'):
+            return ('const', node.index)
+        return ('var', node.index.name)
+
+    def from_loop_index(key):
+        if key[0] != 'var':
+            return False
+        if key[1] in loop_indices:
+            return True
+        idx_def = defs.get(key[1], None)
+        return (isinstance(idx_def, ir.Expr) and idx_def.op == 'build_tuple'
+                and any(v.name in loop_indices for v in idx_def.items))
+
+    def single_use(name):
+        return len(uses[name]) == 1 and uses[name][0]
+
+    for param in parfor_params:
+        if (param in reduce_varnames or param in reductions
+                or param in assigned or param in nested
+                or not setitems[param]):
+            continue
+        setitem_types = [calltypes.get(st, None) for st in setitems[param]]
+        if not all(sig is not None and isinstance(sig.args[0], types.Array)
+                   and sig.args[0].ndim > 0 for sig in setitem_types):
+            continue
+        redops = set()
+        for stmt in uses[param]:
+            if isinstance(stmt, (ir.SetItem, ir.StaticSetItem)):
+                # checked when visiting the matching getitem
+                continue
+            val = stmt.value
+            if not (isinstance(val, ir.Expr)
+                    and val.op in ('getitem', 'static_getitem')
+                    and val.value.name == param):
+                break
+            key = index_key(val)
+            if from_loop_index(key):
+                break
+            acc = single_use(stmt.target.name)
+            if not (isinstance(acc, ir.Assign) and isinstance(acc.value, ir.Expr)
+                    and acc.value.op in ('binop', 'inplace_binop')):
+                break
+            acc_expr = acc.value
+            operands = [acc_expr.lhs.name, acc_expr.rhs.name]
+            # the other operand must not be read from the array itself
+            other = operands[1] if operands[0] == stmt.target.name else operands[0]
+            other_def = defs.get(other, None)
+            if (isinstance(other_def, ir.Expr)
+                    and other_def.op in ('getitem', 'static_getitem')
+                    and other_def.value.name == param):
+                break
+            fn = acc_expr.fn
+            if fn in (operator.add, operator.iadd):
+                redops.add(operator.iadd)
+            elif (fn in (operator.sub, operator.isub)
+                    and operands[0] == stmt.target.name):
+                redops.add(operator.iadd)
+            elif fn in (operator.mul, operator.imul):
+                redops.add(operator.imul)
+            else:
+                break
+            store = single_use(acc.target.name)
+            if not (isinstance(store, (ir.SetItem, ir.StaticSetItem))
+                    and store.target.name == param
+                    and store.value.name == acc.target.name
+                    and index_key(store) == key):
+                break
+        else:
+            # every read feeds exactly one update of the same element
+            nreads = len(uses[param]) - len(setitems[param])
+            if nreads != len(setitems[param]) or len(redops) != 1:
+                continue
+            redop = redops.pop()
+            init_val = 0 if redop == operator.iadd else 1
+            loc = setitems[param][0].loc
+            scope = setitems[param][0].target.scope
+            redvar = ir.Var(scope, param, loc)
+            immutable_fn = (operator.add if redop == operator.iadd
+                            else operator.mul)
+            # only describes the combine step, private copies of scatter
+            # reductions are always combined elementwise after the parfor
+            reduce_nodes = [ir.Assign(ir.Expr.inplace_binop(
+                redop, immutable_fn, redvar,
+                ir.Var(scope, param + "#init", loc), loc), redvar, loc)]
+            reduce_varnames.append(param)
+            reductions[param] = (init_val, reduce_nodes, redop)
+
 def check_conflicting_reduction_operators(param, nodes):
     """In prange, a user could theoretically specify conflicting
        reduction operators.  For example, in one spot it is += and
@@ -3103,16 +3511,20 @@ def check_conflicting_reduction_operators(param, nodes):
                            "reduction operators." % param)
                     raise errors.UnsupportedError(msg, node.loc)
 
-def get_reduction_init(nodes):
+def get_reduction_init(nodes, func_ir=None):
     """
     Get initial value for known reductions.
-    Currently, only += and *= are supported. We assume the inplace_binop node
+    Currently, only += and *= are supported, as well as calls to the functions
+    declared with numba.reduction(). We assume the inplace_binop or call node
     is followed by an assignment.
     """
     require(len(nodes) >=2)
     require(isinstance(nodes[-1].value, ir.Var))
     require(nodes[-2].target.name == nodes[-1].value.name)
     acc_expr = nodes[-2].value
+    if (func_ir is not None and isinstance(acc_expr, ir.Expr)
+            and acc_expr.op == 'call'):
+        return get_user_reduction_identity(func_ir, acc_expr), None
     require(isinstance(acc_expr, ir.Expr) and acc_expr.op=='inplace_binop')
     if acc_expr.fn == operator.iadd or acc_expr.fn == operator.isub:
         return 0, acc_expr.fn
@@ -3122,10 +3534,25 @@ def get_reduction_init(nodes):
         return 1, acc_expr.fn
     return None, None
 
+def get_user_reduction_identity(func_ir, expr):
+    """
+    Get the identity of the reduction operator called by expr, if it is a
+    function declared with numba.reduction(), raise GuardException otherwise.
+    """
+    require(isinstance(expr, ir.Expr) and expr.op == 'call')
+    callee = get_definition(func_ir, expr.func)
+    require(isinstance(callee, (ir.Global, ir.FreeVar)))
+    try:
+        return reduction.get_reduction_identity(callee.value)
+    except KeyError:
+        raise GuardException
+
 def supported_reduction(x, func_ir):
     if x.op == 'inplace_binop' or x.op == 'binop':
         return True
     if x.op == 'call':
+        if guard(get_user_reduction_identity, func_ir, x) is not None:
+            return True
         callname = guard(find_callname, func_ir, x)
         callname = tuple(i if i != '__builtin__' else 'builtins' for i in callname)
         if callname == ('max', 'builtins') or callname == ('min', 'builtins'):
@@ -3340,9 +3767,11 @@ def maximize_fusion(func_ir, blocks, typemap, up_direction=True):
         order_changed = True
         while order_changed:
             order_changed = maximize_fusion_inner(func_ir, block, call_table,
-                                                  alias_map, up_direction)
+                                                  alias_map, up_direction,
+                                                  typemap)
 
-def maximize_fusion_inner(func_ir, block, call_table, alias_map, up_direction=True):
+def maximize_fusion_inner(func_ir, block, call_table, alias_map, up_direction=True,
+                          typemap=None):
     order_changed = False
     i = 0
     # i goes to body[-3] (i+1 to body[-2]) since body[-1] is terminator and
@@ -3350,9 +3779,10 @@ def maximize_fusion_inner(func_ir, block, call_table, alias_map, up_direction=Tr
     while i < len(block.body) - 2:
         stmt = block.body[i]
         next_stmt = block.body[i+1]
-        can_reorder = (_can_reorder_stmts(stmt, next_stmt, func_ir, call_table, alias_map)
+        can_reorder = (_can_reorder_stmts(stmt, next_stmt, func_ir, call_table,
+                        alias_map, typemap)
                         if up_direction else _can_reorder_stmts(next_stmt, stmt,
-                        func_ir, call_table, alias_map))
+                        func_ir, call_table, alias_map, typemap))
         if can_reorder:
             block.body[i] = next_stmt
             block.body[i+1] = stmt
@@ -3369,7 +3799,8 @@ def expand_aliases(the_set, alias_map):
             ret.add(i)
     return ret
 
-def _can_reorder_stmts(stmt, next_stmt, func_ir, call_table, alias_map):
+def _can_reorder_stmts(stmt, next_stmt, func_ir, call_table, alias_map,
+                       typemap=None):
     """
     Check dependencies to determine if a parfor can be reordered in the IR block
     with a non-parfor statement.
@@ -3387,7 +3818,8 @@ def _can_reorder_stmts(stmt, next_stmt, func_ir, call_table, alias_map):
                 next_stmt.value, set(), call_table)
             or guard(is_assert_equiv, func_ir, next_stmt.value))):
         stmt_accesses = expand_aliases({v.name for v in stmt.list_vars()}, alias_map)
-        stmt_writes = expand_aliases(get_parfor_writes(stmt), alias_map)
+        stmt_writes = expand_aliases(get_parfor_writes(stmt, typemap),
+                                     alias_map)
         next_accesses = expand_aliases({v.name for v in next_stmt.list_vars()}, alias_map)
         next_writes = expand_aliases(get_stmt_writes(next_stmt), alias_map)
         if len((stmt_writes & next_accesses)
@@ -3400,7 +3832,24 @@ def is_assert_equiv(func_ir, expr):
     return func_name == 'assert_equiv'
 
 
-def get_parfor_writes(parfor):
+def get_atomic_writes(stmt, typemap):
+    """get the arrays updated by a statement calling one of the numba.atomic
+    functions, which are safe cross iteration writes in a parfor.
+    """
+    from numba.np import atomic
+    writes = set()
+    if (typemap is not None and isinstance(stmt, ir.Assign)
+            and isinstance(stmt.value, ir.Expr) and stmt.value.op == 'call'):
+        fnty = typemap.get(stmt.value.func.name, None)
+        if (isinstance(fnty, Function)
+                and fnty.typing_key in atomic.atomic_functions):
+            args = stmt.value.args
+            ary = args[0] if args else dict(stmt.value.kws).get('ary', None)
+            if ary is not None:
+                writes.add(ary.name)
+    return writes
+
+def get_parfor_writes(parfor, typemap=None):
     assert isinstance(parfor, Parfor)
     writes = set()
     blocks = parfor.loop_body.copy()
@@ -3408,13 +3857,14 @@ def get_parfor_writes(parfor):
     for block in blocks.values():
         for stmt in block.body:
             writes.update(get_stmt_writes(stmt))
+            writes.update(get_atomic_writes(stmt, typemap))
             if isinstance(stmt, Parfor):
-                writes.update(get_parfor_writes(stmt))
+                writes.update(get_parfor_writes(stmt, typemap))
     return writes
 
 FusionReport = namedtuple('FusionReport', ['first', 'second', 'message'])
 
-def try_fuse(equiv_set, parfor1, parfor2):
+def try_fuse(equiv_set, parfor1, parfor2, typemap=None):
     """try to fuse parfors and return a fused parfor, otherwise return None
     """
     dprint("try_fuse: trying to fuse \n", parfor1, "\n", parfor2)
@@ -3453,7 +3903,8 @@ def try_fuse(equiv_set, parfor1, parfor2):
 
     # TODO: make sure parfor1's reduction output is not used in parfor2
     # only data parallel loops
-    if has_cross_iter_dep(parfor1) or has_cross_iter_dep(parfor2):
+    if (has_cross_iter_dep(parfor1, typemap)
+            or has_cross_iter_dep(parfor2, typemap)):
         dprint("try_fuse: parfor cross iteration dependency found")
         msg = ("- fusion failed: cross iteration dependency found "
                 "between loops #%s and #%s")
@@ -3517,6 +3968,8 @@ def fuse_parfors_inner(parfor1, parfor2):
     nameset = set(x.name for x in index_dict.values())
     remove_duplicate_definitions(parfor1.loop_body, nameset)
     parfor1.patterns.extend(parfor2.patterns)
+    if parfor1.tile_shape is None:
+        parfor1.tile_shape = parfor2.tile_shape
     if config.DEBUG_ARRAY_OPT_STATS:
         print('Parallel for-loop #{} is fused into for-loop #{}.'.format(
               parfor2.id, parfor1.id))
@@ -3548,7 +4001,7 @@ def remove_duplicate_definitions(blocks, nameset):
     return
 
 
-def has_cross_iter_dep(parfor):
+def has_cross_iter_dep(parfor, typemap=None):
     # we consevatively assume there is cross iteration dependency when
     # the parfor index is used in any expression since the expression could
     # be used for indexing arrays
@@ -3556,6 +4009,10 @@ def has_cross_iter_dep(parfor):
     indices = {l.index_variable for l in parfor.loop_nests}
     for b in parfor.loop_body.values():
         for stmt in b.body:
+            # atomic updates are writes to elements of other iterations
+            if get_atomic_writes(stmt, typemap):
+                dprint("has_cross_iter_dep found atomic update", stmt)
+                return True
             # GetItem/SetItem nodes are fine since can't have expression inside
             # and only simple indices are possible
             if isinstance(stmt, (ir.SetItem, ir.StaticSetItem)):
@@ -20,7 +20,9 @@ from numba.core import types, ir, config, compiler, lowering, sigutils, cgutils
 from numba.core.ir_utils import add_offset_to_labels, replace_var_names, remove_dels, legalize_names, mk_unique_var, rename_labels, get_name_var_table, visit_vars_inner, get_definition, guard, find_callname, get_call_table, is_pure, get_np_ufunc_typ, get_unused_var_name, find_potential_aliases, is_const_call
 from numba.core.analysis import compute_use_defs, compute_live_map, compute_dead_maps, compute_cfg_from_blocks
 from numba.core.typing import signature
+from numba.core.extending import intrinsic
 from numba.parfors.parfor import print_wrapped, ensure_parallel_support
+from numba.parfors.parfor_profile import ParforProfile
 from numba.core.errors import NumbaParallelSafetyWarning
 
 
@@ -106,6 +108,25 @@ def _lower_parfor_parallel(lowerer, parfor):
             if config.DEBUG_ARRAY_OPT:
                 print("redvar_typ", redvar_typ, redarrvar_typ, reddtype, types.DType(reddtype))
 
+            init_val, _, redop = parfor_reddict[parfor_redvars[i]]
+            if _privatized_reduction_op(redvar_typ, redop) is not None:
+                # Array reductions with a known identity get private copies
+                # allocated at runtime, possibly fewer than threads when
+                # their memory is bounded.
+                max_bytes_var = ir.Var(scope, mk_unique_var("max_bytes"), loc)
+                typemap[max_bytes_var.name] = types.intp
+                lowerer.lower_inst(ir.Assign(
+                    ir.Const(_get_reduction_max_bytes(parfor.flags), loc),
+                    max_bytes_var, loc))
+                init_val_var = ir.Var(scope, mk_unique_var("init_val"), loc)
+                typemap[init_val_var.name] = types.intp
+                lowerer.lower_inst(ir.Assign(ir.Const(init_val, loc),
+                                             init_val_var, loc))
+                redarrs[redvar.name] = _lower_helper_call(
+                    lowerer, _get_private_copies_alloc(),
+                    [redvar, max_bytes_var, init_val_var], "redarr", loc)
+                continue
+
             # If this is reduction over an array,
             # the reduction array has just one added per-worker dimension.
             if isinstance(redvar_typ, types.npytypes.Array):
@@ -253,6 +274,13 @@ def _lower_parfor_parallel(lowerer, parfor):
     if config.DEBUG_ARRAY_OPT:
         print("gu_signature = ", gu_signature)
 
+    profile = None
+    if config.PARFOR_PROFILE:
+        # a slot per thread and one for the launching thread
+        profile = ParforProfile(parfor.id, parfor.loc, get_thread_count() + 1)
+        if lowerer.metadata is not None:
+            lowerer.metadata.setdefault('parfor_profile', []).append(profile)
+
     # call the func in parallel by wrapping it with ParallelGUFuncBuilder
     loop_ranges = [(l.start, l.stop, l.step) for l in parfor.loop_nests]
     if config.DEBUG_ARRAY_OPT:
@@ -271,7 +299,11 @@ def _lower_parfor_parallel(lowerer, parfor):
         redarrs,
         parfor.init_block,
         index_var_typ,
-        parfor.races)
+        parfor.races,
+        *_get_parfor_schedule(flags),
+        serial_threshold=_get_serial_threshold(flags),
+        profile=profile,
+        tile_shape=parfor.tile_shape)
     if config.DEBUG_ARRAY_OPT:
         sys.stdout.flush()
 
@@ -305,6 +337,17 @@ def _lower_parfor_parallel(lowerer, parfor):
                 print("res_print", res_print)
                 lowerer.lower_inst(res_print)
 
+            op = _privatized_reduction_op(redvar_typ, parfor_reddict[name][2])
+            if op is not None:
+                # Fold the private copies into the reduction array elementwise
+                # and in parallel.
+                combine = _get_private_copies_combine(
+                    op, redvar_typ.layout == 'C')
+                _lower_helper_call(lowerer, combine,
+                                   [redarr, ir.Var(scope, name, loc)],
+                                   "redcombine", loc)
+                continue
+
             # For each element in the reduction array created above.
             for j in range(get_thread_count()):
                 # Create index var to access that element.
@@ -621,8 +664,11 @@ def find_vars(var, varset):
     varset.add(var.name)
     return var
 
+# The attributes of an array that do not change when its data is written
+_array_invariant_attrs = ('shape', 'ndim', 'size')
+
 def _hoist_internal(inst, dep_on_param, call_table, hoisted, not_hoisted,
-                    typemap, stored_arrays):
+                    typemap, stored_arrays, invariant_arrays=()):
     if inst.target.name in stored_arrays:
         not_hoisted.append((inst, "stored array"))
         if config.DEBUG_ARRAY_OPT >= 1:
@@ -632,6 +678,12 @@ def _hoist_internal(inst, dep_on_param, call_table, hoisted, not_hoisted,
     uses = set()
     visit_vars_inner(inst.value, find_vars, uses)
     diff = uses.difference(dep_on_param)
+    if (isinstance(inst.value, ir.Expr) and inst.value.op == 'getattr' and
+        inst.value.attr in _array_invariant_attrs and
+        diff.issubset(invariant_arrays)):
+        # Arrays cannot be resized, so the shape of an array defined outside
+        # the loop is invariant even if the loop writes into the array.
+        diff = set()
     if config.DEBUG_ARRAY_OPT >= 1:
         print("_hoist_internal:", inst, "uses:", uses, "diff:", diff)
     if len(diff) == 0 and is_pure(inst.value, None, call_table):
@@ -659,9 +711,16 @@ def find_setitems_block(setitems, itemsset, block, typemap):
             # If we store a non-mutable object into an array then that is safe to hoist.
             # If the stored object is mutable and you hoist then multiple entries in the
             # outer array could reference the same object and changing one index would then
-            # change other indices.
-            if getattr(typemap[inst.value.name], "mutable", False):
+            # change other indices.  Storing an array into an array copies its
+            # elements though, so per-iteration scratch arrays copied into
+            # the output can still be hoisted.
+            if (getattr(typemap[inst.value.name], "mutable", False) and
+                not (isinstance(typemap[inst.target.name], types.npytypes.Array) and
+                     isinstance(typemap[inst.value.name], types.npytypes.Array))):
                 itemsset.add(inst.value.name)
+        elif isinstance(inst, ir.Assign):
+            # Arrays updated with numba.atomic functions are written into too
+            setitems.update(parfor.get_atomic_writes(inst, typemap))
         elif isinstance(inst, parfor.Parfor):
             find_setitems_block(setitems, itemsset, inst.init_block, typemap)
             find_setitems_body(setitems, itemsset, inst.loop_body, typemap)
@@ -688,15 +747,21 @@ def hoist(parfor_params, loop_body, typemap, wrapped_blocks):
     itemsset = set()
     find_setitems_body(setitems, itemsset, loop_body, typemap)
     dep_on_param = list(set(dep_on_param).difference(setitems))
+    # The arrays defined outside the loop, whose shapes are loop invariant
+    loop_defs = set().union(*compute_use_defs(loop_body).defmap.values())
+    invariant_arrays = set(p for p in parfor_params
+                           if isinstance(typemap[p], types.npytypes.Array) and
+                           p not in loop_defs)
     if config.DEBUG_ARRAY_OPT >= 1:
-        print("hoist - def_once:", def_once, "setitems:", setitems, "itemsset:", itemsset, "dep_on_param:", dep_on_param, "parfor_params:", parfor_params)
+        print("hoist - def_once:", def_once, "setitems:", setitems, "itemsset:", itemsset, "dep_on_param:", dep_on_param, "parfor_params:", parfor_params, "invariant_arrays:", invariant_arrays)
 
     for label, block in loop_body.items():
         new_block = []
         for inst in block.body:
             if isinstance(inst, ir.Assign) and inst.target.name in def_once:
                 if _hoist_internal(inst, dep_on_param, call_table,
-                                   hoisted, not_hoisted, typemap, itemsset):
+                                   hoisted, not_hoisted, typemap, itemsset,
+                                   invariant_arrays):
                     # don't add this instruction to the block since it is
                     # hoisted
                     continue
@@ -709,7 +774,8 @@ def hoist(parfor_params, loop_body, typemap, wrapped_blocks):
                     if (isinstance(ib_inst, ir.Assign) and
                         ib_inst.target.name in def_once):
                         if _hoist_internal(ib_inst, dep_on_param, call_table,
-                                           hoisted, not_hoisted, typemap, itemsset):
+                                           hoisted, not_hoisted, typemap, itemsset,
+                                           invariant_arrays):
                             # don't add this instuction to the block since it is hoisted
                             continue
                     new_init_block.append(ib_inst)
@@ -945,26 +1011,57 @@ def _create_gufunc_for_parfor_body(
             gufunc_txt += "    " + param_dict[var] + \
                  "=np.copy(" + param_dict[arr] + ")\n"
 
+    # With dynamic schedules, the gufunc claims chunks of the outermost
+    # dimension from the shared schedule until there are none left.
+    schedule = _get_parfor_schedule(flags)[0]
+    loop_indent = 0
+    if schedule != 'static':
+        chunk_lo = get_unused_var_name("__chunk_lo__", loop_body_var_table)
+        chunk_hi = get_unused_var_name("__chunk_hi__", loop_body_var_table)
+        gufunc_txt += "    while True:\n"
+        gufunc_txt += ("        " + chunk_lo + ", " + chunk_hi +
+                       " = get_sched_chunk(sched, " + str(parfor_dim) + ")\n")
+        gufunc_txt += "        if " + chunk_lo + " > " + chunk_hi + ":\n"
+        gufunc_txt += "            break\n"
+        loop_indent = 1
+
     # For each dimension of the parfor, create a for loop in the generated gufunc function.
     # Iterate across the proper values extracted from the schedule.
     # The form of the schedule is start_dim0, start_dim1, ..., start_dimN, end_dim0,
     # end_dim1, ..., end_dimN
+    loop_bounds = []
+    for eachdim in range(parfor_dim):
+        if schedule != 'static' and eachdim == 0:
+            loop_bounds.append((chunk_lo, chunk_hi + " + np.uint8(1)"))
+        else:
+            loop_bounds.append(("sched[" + str(eachdim) + "]",
+                                "sched[" + str(eachdim + parfor_dim) +
+                                "] + np.uint8(1)"))
+    loop_headers = []
+    # With a tile shape, the loops first iterate over the tiles of the
+    # chunk, then over the iterations of each tile.
+    tile_shape = parfor.tile_shape or ()
+    for eachdim, tile_size in enumerate(tile_shape):
+        if not tile_size:
+            continue
+        tile_var = get_unused_var_name("__tile_%d__" % eachdim,
+                                       loop_body_var_table)
+        tile_step = "np." + str(index_var_typ) + "(" + str(tile_size) + ")"
+        lo, hi = loop_bounds[eachdim]
+        loop_headers.append("for " + tile_var + " in range(" + lo + ", " +
+                            hi + ", " + tile_step + "):\n")
+        loop_bounds[eachdim] = (tile_var, "min(" + tile_var + " + " +
+                                tile_step + ", " + hi + ")")
     for eachdim in range(parfor_dim):
-        for indent in range(eachdim + 1):
-            gufunc_txt += "    "
-        sched_dim = eachdim
-        gufunc_txt += ("for " +
-                       legal_loop_indices[eachdim] +
-                       " in range(sched[" +
-                       str(sched_dim) +
-                       "], sched[" +
-                       str(sched_dim +
-                           parfor_dim) +
-                       "] + np.uint8(1)):\n")
+        lo, hi = loop_bounds[eachdim]
+        loop_headers.append("for " + legal_loop_indices[eachdim] +
+                            " in range(" + lo + ", " + hi + "):\n")
+    for depth, header in enumerate(loop_headers):
+        gufunc_txt += "    " * (depth + 1 + loop_indent) + header
+    body_indent = "    " * (len(loop_headers) + 1 + loop_indent)
 
     if config.DEBUG_ARRAY_OPT_RUNTIME:
-        for indent in range(parfor_dim + 1):
-            gufunc_txt += "    "
+        gufunc_txt += body_indent
         gufunc_txt += "print("
         for eachdim in range(parfor_dim):
             gufunc_txt += "\"" + legal_loop_indices[eachdim] + "\"," + legal_loop_indices[eachdim] + ","
@@ -972,8 +1069,7 @@ def _create_gufunc_for_parfor_body(
 
     # Add the sentinel assignment so that we can find the loop body position
     # in the IR.
-    for indent in range(parfor_dim + 1):
-        gufunc_txt += "    "
+    gufunc_txt += body_indent
     gufunc_txt += sentinel_name + " = 0\n"
     # Add assignments of reduction variables (for returning the value)
     redargstartdim = {}
@@ -993,7 +1089,7 @@ def _create_gufunc_for_parfor_body(
     if config.DEBUG_ARRAY_OPT:
         print("gufunc_txt = ", type(gufunc_txt), "\n", gufunc_txt)
     # Force gufunc outline into existence.
-    globls = {"np": np}
+    globls = {"np": np, "get_sched_chunk": get_sched_chunk}
     locls = {}
     exec(gufunc_txt, globls, locls)
     gufunc_func = locls[gufunc_name]
@@ -1165,6 +1261,177 @@ def _create_gufunc_for_parfor_body(
 
     return kernel_func, parfor_args, kernel_sig, redargstartdim, func_arg_types
 
+def _get_serial_threshold(flags):
+    """
+    Get the trip count below which parfors run serially, or 'adaptive', as
+    requested by the parallel options in flags, or else by
+    NUMBA_PARALLEL_SERIAL_THRESHOLD.
+    """
+    threshold = getattr(flags.auto_parallel, 'serial_threshold', None)
+    if threshold is None:
+        threshold = config.PARALLEL_SERIAL_THRESHOLD
+    return threshold
+
+
+def _get_parfor_schedule(flags):
+    """
+    Get the (schedule, chunksize) requested by the parallel options in flags.
+    """
+    options = flags.auto_parallel
+    return (getattr(options, 'schedule', 'static'),
+            getattr(options, 'chunksize', 0))
+
+
+@intrinsic
+def get_sched_chunk(typingctx, sched, num_dim):
+    """
+    Claim the next chunk of the outermost loop from a dynamic schedule,
+    returning its inclusive (start, end) range, which is empty once all
+    the iterations have been claimed.
+    """
+    if not isinstance(sched, types.Array) or \
+            not isinstance(num_dim, types.Integer):
+        return
+
+    def codegen(context, builder, sig, args):
+        sched, num_dim = args
+        intp_t = context.get_value_type(types.intp)
+        intp_ptr_t = lc.Type.pointer(intp_t)
+        ary = context.make_array(sig.args[0])(context, builder, sched)
+        chunk = cgutils.alloca_once(builder, intp_t, size=2, name="chunk")
+        # An empty range if there are no chunks left
+        builder.store(intp_t(1), chunk)
+        builder.store(intp_t(0), builder.gep(chunk, [intp_t(1)]))
+        fnty = lc.Type.function(intp_t, [intp_t, intp_ptr_t, intp_ptr_t])
+        fn = builder.module.get_or_insert_function(fnty,
+                                                   name="get_sched_chunk")
+        num_dim = context.cast(builder, num_dim, sig.args[1], types.intp)
+        builder.call(fn, [num_dim, builder.bitcast(ary.data, intp_ptr_t),
+                          chunk])
+        lo = builder.load(chunk)
+        hi = builder.load(builder.gep(chunk, [intp_t(1)]))
+        return context.make_tuple(builder, sig.return_type, [lo, hi])
+
+    return signature(types.UniTuple(sched.dtype, 2), sched, num_dim), codegen
+
+
+def _get_reduction_max_bytes(flags):
+    """
+    Get the bound on the memory used by the private copies of an array
+    reduction requested by the parallel options in flags, 0 if unbounded.
+    """
+    return getattr(flags.auto_parallel, 'reduction_max_bytes', 0)
+
+
+def _privatized_reduction_op(redvar_typ, redop):
+    """
+    Get the elementwise operator ('add' or 'mul') that combines the private
+    copies of an array reduction, or None if the reduction has to be combined
+    by replaying its reduction nodes once per thread.
+    """
+    if (not isinstance(redvar_typ, types.npytypes.Array)
+            or redvar_typ.ndim == 0):
+        return None
+    if redop in (operator.iadd, operator.isub):
+        return 'add'
+    if redop in (operator.imul, operator.itruediv, operator.ifloordiv):
+        return 'mul'
+    return None
+
+
+_private_reduction_helpers = {}
+
+def _get_private_copies_alloc():
+    """
+    Get the jitted function allocating the private copies of an array
+    reduction, one per thread or fewer if they would use more than
+    max_bytes, each filled with the identity of the reduction.
+    """
+    key = 'alloc'
+    if key not in _private_reduction_helpers:
+        from numba import njit
+        from numba.np.ufunc.parallel import get_num_threads
+
+        @njit(parallel=True)
+        def alloc_private_copies(red, max_bytes, init):
+            ncopies = get_num_threads()
+            if max_bytes > 0 and red.nbytes > 0:
+                ncopies = max(1, min(ncopies, max_bytes // red.nbytes))
+            return np.full((ncopies,) + red.shape, init, red.dtype)
+
+        _private_reduction_helpers[key] = alloc_private_copies
+    return _private_reduction_helpers[key]
+
+
+def _get_private_copies_combine(op, contiguous):
+    """
+    Get the jitted function combining the private copies of an array
+    reduction into the reduction array.  The elements are split among the
+    threads and each thread folds all the copies of its elements, so the
+    combine step runs in parallel rather than copy after copy on the main
+    thread.
+    """
+    key = ('combine', op, contiguous)
+    if key not in _private_reduction_helpers:
+        from numba import njit, prange
+
+        if op == 'add':
+            @njit(parallel=True)
+            def combine_c(copies, out):
+                flat = copies.reshape((copies.shape[0], -1))
+                res = out.reshape(-1)
+                for k in prange(res.size):
+                    acc = res[k]
+                    for j in range(flat.shape[0]):
+                        acc += flat[j, k]
+                    res[k] = acc
+        else:
+            @njit(parallel=True)
+            def combine_c(copies, out):
+                flat = copies.reshape((copies.shape[0], -1))
+                res = out.reshape(-1)
+                for k in prange(res.size):
+                    acc = res[k]
+                    for j in range(flat.shape[0]):
+                        acc *= flat[j, k]
+                    res[k] = acc
+
+        if contiguous:
+            combine = combine_c
+        else:
+            @njit
+            def combine(copies, out):
+                res = np.ascontiguousarray(out)
+                combine_c(copies, res)
+                out[...] = res
+
+        _private_reduction_helpers[key] = combine
+    return _private_reduction_helpers[key]
+
+
+def _lower_helper_call(lowerer, helper, args, name, loc):
+    """
+    Lower a call to a jitted helper function on the given IR vars and return
+    the var holding the result.
+    """
+    typingctx = lowerer.context.typing_context
+    typemap = lowerer.fndesc.typemap
+    scope = args[0].scope
+    fnty = types.Dispatcher(helper)
+    func_var = ir.Var(scope, mk_unique_var(name + "_func"), loc)
+    typemap[func_var.name] = fnty
+    func_assign = ir.Assign(ir.Global(name, helper, loc=loc), func_var, loc)
+    lowerer.lower_inst(func_assign)
+    sig = typingctx.resolve_function_type(
+        fnty, tuple(typemap[a.name] for a in args), {})
+    call = ir.Expr.call(func_var, args, {}, loc=loc)
+    lowerer.fndesc.calltypes[call] = sig
+    res_var = ir.Var(scope, mk_unique_var(name), loc)
+    typemap[res_var.name] = sig.return_type
+    lowerer.lower_inst(ir.Assign(call, res_var, loc))
+    return res_var
+
+
 def replace_var_with_array_in_block(vars, block, typemap, calltypes):
     new_block = []
     for inst in block.body:
@@ -1198,17 +1465,63 @@ def replace_var_with_array(vars, loop_body, typemap, calltypes):
         typemap.pop(v, None)
         typemap[v] = types.npytypes.Array(el_typ, 1, "C")
 
+def _untile_schedule(context, builder, sched, num_threads, num_dim,
+                     loop_ranges, tiles, signed):
+    """
+    Convert the static schedule of each thread from ranges of tiles to the
+    ranges of iterations they cover, for the dimensions with a tile size in
+    *tiles*.
+    """
+    one = context.get_constant(types.uintp, 1)
+    row_len = context.get_constant(types.uintp, 2 * num_dim)
+    icmp = builder.icmp_signed if signed else builder.icmp_unsigned
+    with cgutils.for_range(builder, num_threads) as loop:
+        row = builder.mul(loop.index, row_len)
+        for i in range(num_dim):
+            if tiles[i] is None:
+                continue
+            start, stop, _ = loop_ranges[i]
+            lo_ptr = builder.gep(sched, [builder.add(
+                row, context.get_constant(types.uintp, i))])
+            hi_ptr = builder.gep(sched, [builder.add(
+                row, context.get_constant(types.uintp, num_dim + i))])
+            lo_tile = builder.load(lo_ptr)
+            hi_tile = builder.load(hi_ptr)
+            lo = builder.add(start, builder.mul(lo_tile, tiles[i]))
+            hi = builder.add(start, builder.mul(builder.add(hi_tile, one),
+                                                tiles[i]))
+            hi = builder.select(icmp('<', stop, hi), stop, hi)
+            # threads without work keep an empty range
+            is_empty = builder.icmp_signed('<', hi_tile, lo_tile)
+            hi = builder.select(is_empty, lo, hi)
+            builder.store(lo, lo_ptr)
+            builder.store(builder.sub(hi, one), hi_ptr)
+
+
 def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args, expr_arg_types,
-                         loop_ranges, redvars, reddict, redarrdict, init_block, index_var_typ, races):
+                         loop_ranges, redvars, reddict, redarrdict, init_block, index_var_typ, races,
+                         schedule='static', chunksize=0, serial_threshold=0,
+                         profile=None, tile_shape=None):
     '''
     Adds the call to the gufunc function from the main function.
+    With a 'dynamic' or 'guided' schedule, all the gufunc invocations share
+    a single schedule from which they claim chunks of iterations.
+    With a *serial_threshold*, parfors with a smaller trip count (or those
+    deemed too small in 'adaptive' mode) run the gufunc once on the calling
+    thread instead of launching the thread pool.
+    With a *profile*, a ParforProfile, the calls and the chunks run by each
+    thread are timed and counted in the profile's counters.
+    With a *tile_shape*, a static schedule partitions whole tiles of the
+    iteration space between the threads.
     '''
     context = lowerer.context
     builder = lowerer.builder
 
-    from numba.np.ufunc.parallel import (build_gufunc_wrapper,
+    from numba.np.ufunc.parallel import (build_gufunc_kernel,
                            get_thread_count,
+                           emit_serial_check,
                            _launch_threads)
+    from numba.np.ufunc import ufuncbuilder
 
     if config.DEBUG_ARRAY_OPT:
         print("make_parallel_loop")
@@ -1228,8 +1541,14 @@ def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args, expr
     # These are necessary for build_gufunc_wrapper to find external symbols
     _launch_threads()
 
-    info = build_gufunc_wrapper(llvm_func, cres, sin, sout,
-                                cache=False, is_parfors=True)
+    # The kernel runs the gufunc over a chunk of the iterations, the wrapper
+    # runs the kernel on every thread
+    kernel_info = ufuncbuilder.build_gufunc_wrapper(
+        llvm_func, cres, sin, sout, cache=False, is_parfors=True)
+    inner_ndim = len(set(sym for term in sin + sout for sym in term))
+    info = build_gufunc_kernel(cres.library, cres.target_context,
+                               kernel_info, cres.signature, inner_ndim,
+                               profiled=profile is not None)
     wrapper_name = info.name
     cres.library._ensure_finalized()
 
@@ -1292,6 +1611,18 @@ def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args, expr
     dim_stops = cgutils.alloca_once(
         builder, sched_type, size=context.get_constant(
             types.uintp, num_dim), name="dims")
+    dynamic = schedule != 'static'
+    # The static schedule is computed in units of tiles for the tiled
+    # dimensions, then converted back to iterations
+    tiles = [None] * num_dim
+    if tile_shape is not None and not dynamic:
+        tiles = [context.get_constant(types.uintp, size) if size else None
+                 for size in tile_shape]
+    # The trip count of the parfor, and the number of scheduled units (tiles
+    # or iterations) along each dimension
+    count = one
+    trips = []
+    units = []
     for i in range(num_dim):
         start, stop, step = loop_ranges[i]
         if start.type != one_type:
@@ -1300,6 +1631,17 @@ def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args, expr
             stop = builder.sext(stop, one_type)
         if step.type != one_type:
             step = builder.sext(step, one_type)
+        trip = builder.sub(stop, start)
+        trip = builder.select(builder.icmp_signed('<', trip, zero), zero, trip)
+        count = builder.mul(count, trip)
+        trips.append(trip)
+        if tiles[i] is not None:
+            loop_ranges[i] = (start, stop, step)
+            start = zero
+            # the number of tiles, rounded up
+            stop = builder.udiv(builder.add(trip, builder.sub(tiles[i], one)),
+                                tiles[i])
+        units.append(stop if tiles[i] is not None else trip)
         # substract 1 because do-scheduling takes inclusive ranges
         stop = builder.sub(stop, one)
         builder.store(
@@ -1310,7 +1652,13 @@ def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args, expr
         builder.store(stop, builder.gep(dim_stops,
                                         [context.get_constant(types.uintp, i)]))
 
-    sched_size = get_thread_count() * num_dim * 2
+    if dynamic:
+        # The schedule is shared: ranges followed by the scheduling state
+        sched_len = num_dim * 2 + 4
+        sched_size = sched_len
+    else:
+        sched_len = num_dim * 2
+        sched_size = get_thread_count() * num_dim * 2
     sched = cgutils.alloca_once(
         builder, sched_type, size=context.get_constant(
             types.uintp, sched_size), name="sched")
@@ -1337,20 +1685,73 @@ def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args, expr
                                                   ("Invalid number of threads. "
                                                    "This likely indicates a bug in Numba.",))
 
-    builder.call(
-        do_scheduling, [
-            context.get_constant(
-                types.uintp, num_dim), dim_starts, dim_stops, num_threads,
-            sched, context.get_constant(
-                    types.intp, debug_flag)])
-
     # Get the LLVM vars for the Numba IR reduction array vars.
     redarrs = [lowerer.loadvar(redarrdict[x].name) for x in redvars]
 
+    # Each thread needs a row of every reduction array; private copies of
+    # array reductions can have fewer rows than threads when their memory is
+    # bounded, in which case fewer threads run the parallel region.
+    for x, redarr in zip(redvars, redarrs):
+        redarrtyp = lowerer.fndesc.typemap[redarrdict[x].name]
+        ary = context.make_array(redarrtyp)(context, builder, redarr)
+        nrows = builder.extract_value(ary.shape, 0)
+        num_threads = builder.select(
+            builder.icmp_signed('<', nrows, num_threads), nrows, num_threads)
+
+    if serial_threshold:
+        # A single chunk covers all the iterations when running serially
+        is_serial, record_time = emit_serial_check(
+            builder, count, num_threads, serial_threshold)
+        num_threads = builder.select(is_serial, num_threads.type(1),
+                                     num_threads)
+
+    if any(tile is not None for tile in tiles):
+        # Fewer tiles than threads would leave threads idle, the iterations
+        # are then scheduled one by one instead
+        nunits = one
+        for i in range(num_dim):
+            nunits = builder.mul(nunits, units[i])
+        use_tiles = builder.icmp_signed('>=', nunits, num_threads)
+        for i in range(num_dim):
+            if tiles[i] is None:
+                continue
+            tiles[i] = builder.select(use_tiles, tiles[i], tiles[i].type(1))
+            stop = builder.select(use_tiles, units[i], trips[i])
+            builder.store(builder.sub(stop, one), builder.gep(
+                dim_stops, [context.get_constant(types.uintp, i)]))
+
+    if dynamic:
+        dynamic_scheduling_fnty = lc.Type.function(
+            lc.Type.void(), [uintp_t, intp_ptr_t, intp_ptr_t, uintp_t,
+                             intp_ptr_t, intp_t, intp_t, intp_t])
+        do_dynamic_scheduling = builder.module.get_or_insert_function(
+            dynamic_scheduling_fnty, name="do_dynamic_scheduling")
+        builder.call(
+            do_dynamic_scheduling, [
+                context.get_constant(types.uintp, num_dim),
+                builder.bitcast(dim_starts, intp_ptr_t),
+                builder.bitcast(dim_stops, intp_ptr_t),
+                num_threads,
+                builder.bitcast(sched, intp_ptr_t),
+                context.get_constant(types.intp, chunksize),
+                context.get_constant(types.intp, int(schedule == 'guided')),
+                context.get_constant(types.intp, debug_flag)])
+    else:
+        builder.call(
+            do_scheduling, [
+                context.get_constant(
+                    types.uintp, num_dim), dim_starts, dim_stops, num_threads,
+                sched, context.get_constant(
+                        types.intp, debug_flag)])
+
+    if any(tile is not None for tile in tiles):
+        _untile_schedule(context, builder, sched, num_threads, num_dim,
+                         loop_ranges, tiles, index_var_typ.signed)
+
     nredvars = len(redvars)
     ninouts = len(expr_args) - nredvars
 
-    if config.DEBUG_ARRAY_OPT:
+    if config.DEBUG_ARRAY_OPT and not dynamic:
         for i in range(get_thread_count()):
             cgutils.printf(builder, "sched[" + str(i) + "] = ")
             for j in range(num_dim * 2):
@@ -1431,7 +1832,7 @@ def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args, expr
     sig_dim_dict = {}
     occurances = []
     occurances = [sched_sig[0]]
-    sig_dim_dict[sched_sig[0]] = context.get_constant(types.intp, 2 * num_dim)
+    sig_dim_dict[sched_sig[0]] = context.get_constant(types.intp, sched_len)
     assert len(expr_args) == len(all_args)
     assert len(expr_args) == len(expr_arg_types)
     assert len(expr_args) == len(sin + sout)
@@ -1488,9 +1889,10 @@ def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args, expr
     steps = cgutils.alloca_once(
         builder, intp_t, size=context.get_constant(
             types.intp, num_steps), name="psteps")
-    # First goes the step size for sched, which is 2 * num_dim
-    builder.store(context.get_constant(types.intp, 2 * num_dim * sizeof_intp),
-                  steps)
+    # First goes the step size for sched, which is 2 * num_dim, or 0 for a
+    # dynamic schedule shared by all the gufunc invocations
+    sched_step = 0 if dynamic else 2 * num_dim * sizeof_intp
+    builder.store(context.get_constant(types.intp, sched_step), steps)
     # The steps for all others are 0, except for reduction results.
     for i in range(num_args):
         if i >= ninouts:  # steps for reduction vars are abi_sizeof(typ)
@@ -1528,11 +1930,51 @@ def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args, expr
                                              intp_ptr_t, byte_ptr_t])
 
     fn = builder.module.get_or_insert_function(fnty, name=wrapper_name)
+    kernel = builder.module.get_or_insert_function(fnty,
+                                                   name=kernel_info.name)
     context.active_code_library.add_linking_library(info.library)
 
+    if profile is not None:
+        # The kernel runs through run_profiled_kernel(), which gets the
+        # kernel and the profile counters as data
+        record = builder.bitcast(
+            context.add_dynamic_addr(builder, profile.address,
+                                     info='parfor_profile'),
+            lc.Type.pointer(lc.Type.int(64)))
+        profile_data = cgutils.alloca_once(
+            builder, lc.Type.struct([byte_ptr_t, record.type, intp_t]),
+            name="profile_data")
+        for i, value in enumerate([
+                builder.bitcast(kernel, byte_ptr_t), record,
+                context.get_constant(types.intp, profile.nslots)]):
+            builder.store(value, cgutils.gep_inbounds(builder, profile_data,
+                                                      0, i))
+        data = builder.bitcast(profile_data, byte_ptr_t)
+        kernel = builder.module.get_or_insert_function(
+            fnty, name="run_profiled_kernel")
+        get_region_clock = builder.module.get_or_insert_function(
+            lc.Type.function(lc.Type.int(64), []), name="get_region_clock")
+        record_parfor_call = builder.module.get_or_insert_function(
+            lc.Type.function(lc.Type.void(),
+                             [record.type, intp_t, lc.Type.int(64)]),
+            name="record_parfor_call")
+        start = builder.call(get_region_clock, [])
+
     if config.DEBUG_ARRAY_OPT:
         cgutils.printf(builder, "before calling kernel %p\n", fn)
-    builder.call(fn, [args, shapes, steps, data])
+    if serial_threshold:
+        with builder.if_else(is_serial) as (serial, parallel):
+            with serial:
+                builder.call(kernel, [args, shapes, steps, data])
+            with parallel:
+                builder.call(fn, [args, shapes, steps, data])
+        record_time(builder)
+    else:
+        builder.call(fn, [args, shapes, steps, data])
+    if profile is not None:
+        serial = (builder.zext(is_serial, intp_t) if serial_threshold
+                  else context.get_constant(types.intp, 0))
+        builder.call(record_parfor_call, [record, serial, start])
     if config.DEBUG_ARRAY_OPT:
         cgutils.printf(builder, "after calling kernel %p\n", fn)
 
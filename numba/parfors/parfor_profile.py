@@ -0,0 +1,135 @@
+"""
+Opt-in runtime profiling of parfors, enabled with NUMBA_PARFOR_PROFILE.
+
+Every parfor lowered while profiling is enabled counts its calls and their
+wall time, and the time each thread spent running chunks of its iterations
+and how many chunks it ran.  The counters are updated by the threading
+layer as the compiled function runs; the ParforProfiles of a compiled
+function are returned by the dispatcher's parfor_profile().
+"""
+
+import threading
+
+import numpy as np
+
+
+# The layout of the counters, see record_parfor_call() and
+# run_profiled_kernel() in gufunc_scheduler.cpp
+_CALLS = 0
+_SERIAL_CALLS = 1
+_WALL_TIME = 2
+_SLOTS = 3
+
+# All the profiles recorded so far, in order of creation.  This also keeps
+# their counters alive as long as the code updating them.
+_profiles = []
+_profiles_lock = threading.Lock()
+
+
+class ParforProfile(object):
+    """
+    The runtime profile of a parfor.  Times are in seconds, and the per
+    thread statistics are arrays with one entry per thread slot: slot 0 is
+    usually the thread launching the parfor, the others the worker threads.
+    """
+
+    def __init__(self, parfor_id, loc, nslots):
+        self.parfor_id = parfor_id
+        self.loc = loc
+        self.nslots = nslots
+        self.counters = np.zeros(_SLOTS + 2 * nslots, dtype=np.int64)
+        with _profiles_lock:
+            _profiles.append(self)
+
+    @property
+    def address(self):
+        """
+        The address of the counters updated by the compiled code.
+        """
+        return self.counters.ctypes.data
+
+    @property
+    def calls(self):
+        return int(self.counters[_CALLS])
+
+    @property
+    def serial_calls(self):
+        """
+        The number of calls run serially on the calling thread, see the
+        serial_threshold parallel option.
+        """
+        return int(self.counters[_SERIAL_CALLS])
+
+    @property
+    def wall_time(self):
+        return self.counters[_WALL_TIME] * 1e-9
+
+    @property
+    def busy_time(self):
+        """
+        The time each thread spent running chunks of the parfor.
+        """
+        return self.counters[_SLOTS:_SLOTS + self.nslots] * 1e-9
+
+    @property
+    def chunks(self):
+        """
+        The number of chunks each thread ran.
+        """
+        return self.counters[_SLOTS + self.nslots:].copy()
+
+    @property
+    def imbalance(self):
+        """
+        The ratio of the busy time of the busiest thread to the average busy
+        time of the threads that ran chunks: 1.0 when the work is evenly
+        spread, up to the number of threads when one thread does it all.
+        """
+        busy = self.busy_time
+        busy = busy[busy > 0]
+        if len(busy) == 0:
+            return 1.0
+        return busy.max() / busy.mean()
+
+    def reset(self):
+        self.counters[:] = 0
+
+    def as_dict(self):
+        return {'parfor_id': self.parfor_id,
+                'loc': str(self.loc),
+                'calls': self.calls,
+                'serial_calls': self.serial_calls,
+                'wall_time': self.wall_time,
+                'busy_time': self.busy_time,
+                'chunks': self.chunks,
+                'imbalance': self.imbalance}
+
+    def __repr__(self):
+        return ("<%s parfor #%s at %s: %d calls, %.6f s, imbalance %.2f>"
+                % (self.__class__.__name__, self.parfor_id,
+                   self.loc.short(), self.calls, self.wall_time,
+                   self.imbalance))
+
+
+def get_profiles():
+    """
+    Return the list of all the ParforProfiles recorded so far.
+    """
+    with _profiles_lock:
+        return list(_profiles)
+
+
+def format_profiles(profiles):
+    """
+    Return a table of the given ParforProfiles, one line per parfor.
+    """
+    header = ("%-8s %-30s %8s %8s %12s %8s %10s"
+              % ('parfor', 'location', 'calls', 'serial', 'wall time',
+                 'threads', 'imbalance'))
+    lines = [header, '-' * len(header)]
+    for p in profiles:
+        threads = int((p.chunks > 0).sum())
+        lines.append("%-8s %-30s %8d %8d %12.6f %8d %10.2f"
+                     % (p.parfor_id, p.loc.short(), p.calls,
+                        p.serial_calls, p.wall_time, threads, p.imbalance))
+    return '\n'.join(lines)
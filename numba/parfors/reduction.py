@@ -0,0 +1,94 @@
+"""
+User-defined reduction operators for parallel loops.
+"""
+
+import numbers
+import weakref
+
+import numpy as np
+
+
+# Maps the dispatchers declared as reduction operators to their identity
+_identities = weakref.WeakKeyDictionary()
+
+
+def _check_identity(identity):
+    if isinstance(identity, tuple):
+        for item in identity:
+            _check_identity(item)
+    elif not isinstance(identity, (bool, numbers.Number)):
+        raise TypeError("Reduction identity must be a number or a tuple of "
+                        "numbers, got %r" % (identity,))
+
+
+def reduction(identity, **options):
+    """
+    Declare a function combining two values as an associative reduction
+    operator with the given *identity*, e.g.::
+
+        @reduction(identity=(np.inf, -1))
+        def argmin(a, b):
+            return b if b[0] < a[0] else a
+
+    The function is compiled with ``njit(**options)``, unless it is already a
+    jitted function.  In a ``prange`` loop, ``acc = argmin(acc, (x[i], i))``
+    is a reduction: each thread accumulates from *identity*, and the partial
+    results of the threads are then folded into ``acc`` with the function.
+    """
+    from numba.core.decorators import njit
+    from numba.core.dispatcher import Dispatcher
+
+    _check_identity(identity)
+
+    def wrapper(func):
+        if isinstance(func, Dispatcher):
+            dispatcher = func
+        else:
+            dispatcher = njit(**options)(func)
+        _identities[dispatcher] = identity
+        return dispatcher
+
+    return wrapper
+
+
+def get_reduction_identity(func):
+    """
+    Get the identity of a function declared as a reduction operator, raise
+    KeyError if it was not declared with reduction().
+    """
+    try:
+        return _identities[func]
+    except TypeError:
+        # not weak-referenceable, so cannot have been declared
+        raise KeyError(func)
+
+
+def scan(func, a, axis=None):
+    """
+    Return the inclusive scan of the array *a* with the reduction operator
+    *func*, declared with reduction(), like ``np.cumsum`` for addition: the
+    i-th element of the result is the reduction of the elements 0 to i of
+    *a* along *axis*, or of the flattened array if *axis* is None.
+
+    The result has the dtype of *a*.  With ``parallel=True`` the scan is
+    computed blockwise by all the threads.
+    """
+    try:
+        get_reduction_identity(func)
+    except KeyError:
+        raise TypeError("scan() needs a reduction operator declared with "
+                        "numba.reduction(), got %r" % (func,))
+    a = np.asarray(a)
+    if axis is None:
+        a = a.ravel()
+        axis = 0
+    out = np.empty_like(a)
+    src = np.moveaxis(a, axis, 0)
+    dst = np.moveaxis(out, axis, 0)
+    for j in range(src.shape[0]):
+        if j == 0:
+            dst[0] = src[0]
+        else:
+            for idx in np.ndindex(src.shape[1:]):
+                dst[(j,) + idx] = func(dst[(j - 1,) + idx], src[(j,) + idx])
+    return out
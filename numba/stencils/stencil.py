@@ -51,6 +51,84 @@ def slice_addition(the_slice, addend):
     """
     return slice(the_slice.start + addend, the_slice.stop + addend)
 
+@register_jitable
+def nearest_index(index, size):
+    """ Called by stencils in mode 'nearest' to map an index outside of the
+        input array to the nearest edge element: a a a | a b c d | d d d
+    """
+    if index < 0:
+        return 0
+    if index >= size:
+        return size - 1
+    return index
+
+@register_jitable
+def wrap_index(index, size):
+    """ Called by stencils in mode 'wrap' to map an index outside of the
+        input array periodically: b c d | a b c d | a b c
+    """
+    if index < 0 or index >= size:
+        return index % size
+    return index
+
+@register_jitable
+def reflect_index(index, size):
+    """ Called by stencils in mode 'reflect' to map an index outside of the
+        input array by reflection about the edge of the last element:
+        c b a | a b c d | d c b
+    """
+    if index < 0 or index >= size:
+        index = index % (2 * size)
+        if index >= size:
+            index = 2 * size - 1 - index
+    return index
+
+@register_jitable
+def mirror_index(index, size):
+    """ Called by stencils in mode 'mirror' to map an index outside of the
+        input array by reflection about the center of the last element:
+        d c b | a b c d | c b a
+    """
+    if index < 0 or index >= size:
+        if size == 1:
+            return 0
+        index = index % (2 * size - 2)
+        if index >= size:
+            index = 2 * size - 2 - index
+    return index
+
+# The functions mapping the indices outside of the input array for each
+# boundary mode, None for the modes not accessing outside elements.
+stencil_modes = {
+    'constant': None,
+    'nearest': nearest_index,
+    'wrap': wrap_index,
+    'reflect': reflect_index,
+    'mirror': mirror_index,
+}
+
+@register_jitable
+def boundary_range(region, dim, lo, hi, size):
+    """ The range of the loop over dimension dim of the region-th part of the
+        border of a stencil whose interior is [lo, hi) in that dimension.
+        Part r of the border is interior in the dimensions before r and
+        covers the whole array in the dimensions after r.
+    """
+    if dim < region:
+        return lo, hi
+    if dim == region:
+        return 0, lo + size - hi
+    return 0, size
+
+@register_jitable
+def boundary_index(region, dim, index, lo, hi):
+    """ Map the loop index of boundary_range() to the array index, skipping
+        the interior in the dimension of the region.
+    """
+    if dim == region and index >= lo:
+        return index + hi - lo
+    return index
+
 class StencilFunc(object):
     """
     A special type to hold stencil information for the IR.
@@ -119,12 +197,42 @@ class StencilFunc(object):
             block.body = new_body
         return ret_blocks
 
+    def add_boundary_index(self, index_var, dim, index_func, shape_name,
+                           new_body, scope, loc):
+        """
+        Adds to new_body a call of index_func mapping the index index_var
+        in dimension dim into the input array, whose shape is in the
+        variable shape_name.  Returns the variable of the mapped index.
+        """
+        shape_var = ir.Var(scope, shape_name, loc)
+        dim_var = ir.Var(scope, ir_utils.mk_unique_var("const_index"), loc)
+        new_body.append(ir.Assign(ir.Const(dim, loc), dim_var, loc))
+        size_var = ir.Var(scope, ir_utils.mk_unique_var("dim_size"), loc)
+        new_body.append(ir.Assign(ir.Expr.getitem(shape_var, dim_var, loc),
+                                  size_var, loc))
+        func_var = ir.Var(scope, ir_utils.mk_unique_var(index_func.__name__),
+                          loc)
+        new_body.append(ir.Assign(
+                        ir.Global(index_func.__name__, index_func, loc),
+                        func_var, loc))
+        mapped_var = ir.Var(scope, ir_utils.mk_unique_var("stencil_index"),
+                            loc)
+        new_body.append(ir.Assign(
+                        ir.Expr.call(func_var, [index_var, size_var], (), loc),
+                        mapped_var, loc))
+        return mapped_var
+
     def add_indices_to_kernel(self, kernel, index_names, ndim,
-                              neighborhood, standard_indexed, typemap, calltypes):
+                              neighborhood, standard_indexed, typemap, calltypes,
+                              index_func=None, shape_name=None):
         """
         Transforms the stencil kernel as specified by the user into one
         that includes each dimension's index variable as part of the getitem
-        calls.  So, in effect array[-1] becomes array[index0-1].
+        calls.  So, in effect array[-1] becomes array[index0-1].  If
+        index_func is given, the indices are also mapped into the input
+        array, whose shape is in the variable shape_name, by calling
+        index_func, so that array[-1] becomes
+        array[index_func(index0-1, shape[0])].
         """
         const_dict = {}
         kernel_consts = []
@@ -206,6 +314,10 @@ class StencilFunc(object):
                         # have to add the index value with a call to
                         # slice_addition.
                         if isinstance(stmt_index_var_typ, types.misc.SliceType):
+                            if index_func is not None:
+                                raise ValueError("Slices in stencil kernel "
+                                    "indices are only supported in mode "
+                                    "'constant'.")
                             sa_var = ir.Var(scope, ir_utils.mk_unique_var("slice_addition"), loc)
                             sa_func = numba.njit(slice_addition)
                             sa_func_typ = types.functions.Dispatcher(sa_func)
@@ -222,6 +334,10 @@ class StencilFunc(object):
                             acc_call = ir.Expr.binop(operator.add, stmt_index_var,
                                                      index_var, loc)
                             new_body.append(ir.Assign(acc_call, tmpvar, loc))
+                            if index_func is not None:
+                                tmpvar = self.add_boundary_index(tmpvar, 0,
+                                    index_func, shape_name, new_body, scope,
+                                    loc)
                             new_body.append(ir.Assign(
                                            ir.Expr.getitem(stmt.value.value, tmpvar, loc),
                                            stmt.target, loc))
@@ -262,6 +378,10 @@ class StencilFunc(object):
                             # have to add the index value with a call to
                             # slice_addition.
                             if isinstance(one_index_typ, types.misc.SliceType):
+                                if index_func is not None:
+                                    raise ValueError("Slices in stencil "
+                                        "kernel indices are only supported "
+                                        "in mode 'constant'.")
                                 sa_var = ir.Var(scope, ir_utils.mk_unique_var("slice_addition"), loc)
                                 sa_func = numba.njit(slice_addition)
                                 sa_func_typ = types.functions.Dispatcher(sa_func)
@@ -275,6 +395,10 @@ class StencilFunc(object):
                                 acc_call = ir.Expr.binop(operator.add, getitemvar,
                                                          index_vars[dim], loc)
                                 new_body.append(ir.Assign(acc_call, tmpvar, loc))
+                                if index_func is not None:
+                                    ind_stencils[-1] = self.add_boundary_index(
+                                        tmpvar, dim, index_func, shape_name,
+                                        new_body, scope, loc)
 
                         tuple_call = ir.Expr.build_tuple(ind_stencils, loc)
                         new_body.append(ir.Assign(tuple_call, s_index_var, loc))
@@ -470,6 +594,17 @@ class StencilFunc(object):
         if config.DEBUG_ARRAY_OPT >= 1:
             print("name_var_table", name_var_table, sentinel_name)
 
+        # In the modes other than 'constant', the border of the output array
+        # is computed by a second copy of the kernel whose accesses are
+        # mapped into the input array, so that the loops over the interior
+        # don't pay for the mapping.
+        index_func = stencil_modes[self.mode]
+        if index_func is not None:
+            (boundary_copy, boundary_calltypes) = self.copy_ir_with_calltypes(
+                                                    kernel_copy, copy_calltypes)
+            boundary_sentinel_name = ir_utils.get_unused_var_name(
+                                        "__boundary_sentinel__", name_var_table)
+
         the_array = args[0]
 
         if config.DEBUG_ARRAY_OPT >= 1:
@@ -513,6 +648,8 @@ class StencilFunc(object):
             raise ValueError("Standard indexing requested for an array name "
                              "not present in the stencil kernel definition.")
 
+        shape_name = ir_utils.get_unused_var_name("full_shape", name_var_table)
+
         # Add index variables to getitems in the IR to transition the accesses
         # in the kernel from relative to regular Python indexing.  Returns the
         # computed size of the stencil kernel and a list of the relatively indexed
@@ -522,6 +659,10 @@ class StencilFunc(object):
                 self.neighborhood, standard_indexed, typemap, copy_calltypes)
         if self.neighborhood is None:
             self.neighborhood = kernel_size
+        if index_func is not None:
+            self.add_indices_to_kernel(boundary_copy, index_vars,
+                the_array.ndim, kernel_size, standard_indexed, typemap,
+                boundary_calltypes, index_func, shape_name)
 
         if config.DEBUG_ARRAY_OPT >= 1:
             print("After add_indices_to_kernel")
@@ -531,6 +672,12 @@ class StencilFunc(object):
         # particular point in the iteration space.
         ret_blocks = self.replace_return_with_setitem(kernel_copy.blocks,
                                                       index_vars, out_name)
+        kernels = [(sentinel_name, kernel_copy, ret_blocks)]
+        if index_func is not None:
+            boundary_ret_blocks = self.replace_return_with_setitem(
+                boundary_copy.blocks, index_vars, out_name)
+            kernels.append((boundary_sentinel_name, boundary_copy,
+                            boundary_ret_blocks))
 
         if config.DEBUG_ARRAY_OPT >= 1:
             print("After replace_return_with_setitem", ret_blocks)
@@ -564,17 +711,20 @@ class StencilFunc(object):
             func_text += ")\n"
 
         # Get the shape of the first input array.
-        shape_name = ir_utils.get_unused_var_name("full_shape", name_var_table)
         func_text += "    {} = {}.shape\n".format(shape_name, first_arg)
 
 
         # If we have to allocate the output array (the out argument was not used)
         # then us numpy.full if the user specified a cval stencil decorator option
-        # or np.zeros if they didn't to allocate the array.
+        # or np.zeros if they didn't to allocate the array.  Outside of mode
+        # 'constant' every element is computed so np.empty is enough.
         if result is None:
             return_type_name = numpy_support.as_dtype(
                                return_type.dtype).type.__name__
-            if "cval" in self.options:
+            if index_func is not None:
+                out_init ="{} = np.empty({}, dtype=np.{})\n".format(
+                            out_name, shape_name, return_type_name)
+            elif "cval" in self.options:
                 cval = self.options["cval"]
                 if return_type.dtype != typing.typeof.typeof(cval):
                     raise ValueError(
@@ -624,6 +774,53 @@ class StencilFunc(object):
         # remove this sentinel assignment and replace it with the IR for the
         # stencil kernel body.
         func_text += "{} = 0\n".format(sentinel_name)
+
+        if index_func is not None:
+            # Add the loops over the border of the output array: for each
+            # dimension r, a loop nest over the elements that are interior
+            # in the dimensions before r but not in dimension r.  The bounds
+            # of the interior are clipped to the array for arrays smaller
+            # than the kernel.
+            lo_names = []
+            hi_names = []
+            for i in range(the_array.ndim):
+                lo_name = ir_utils.get_unused_var_name("interior_lo" + str(i),
+                                                       name_var_table)
+                hi_name = ir_utils.get_unused_var_name("interior_hi" + str(i),
+                                                       name_var_table)
+                func_text += "    {} = min(-min(0,{}),{}[{}])\n".format(
+                                lo_name, ranges[i][0], shape_name, i)
+                func_text += "    {} = max({},{}[{}]-max(0,{}))\n".format(
+                                hi_name, lo_name, shape_name, i, ranges[i][1])
+                lo_names.append(lo_name)
+                hi_names.append(hi_name)
+            region_name = ir_utils.get_unused_var_name("region",
+                                                       name_var_table)
+            func_text += "    for {} in range({}):\n".format(region_name,
+                                                           the_array.ndim)
+            offset = 2
+            for i in range(the_array.ndim):
+                indent = "    " * offset
+                start_name = ir_utils.get_unused_var_name("start" + str(i),
+                                                          name_var_table)
+                stop_name = ir_utils.get_unused_var_name("stop" + str(i),
+                                                         name_var_table)
+                loop_name = ir_utils.get_unused_var_name("boundary" + str(i),
+                                                         name_var_table)
+                func_text += ("{}{}, {} = boundary_range({}, {}, {}, {}, "
+                              "{}[{}])\n").format(indent, start_name,
+                                stop_name, region_name, i, lo_names[i],
+                                hi_names[i], shape_name, i)
+                func_text += "{}for {} in range({}, {}):\n".format(indent,
+                                loop_name, start_name, stop_name)
+                func_text += ("{}    {} = boundary_index({}, {}, {}, {}, "
+                              "{})\n").format(indent, index_vars[i],
+                                region_name, i, loop_name, lo_names[i],
+                                hi_names[i])
+                offset += 1
+            func_text += "{}{} = 0\n".format("    " * offset,
+                                              boundary_sentinel_name)
+
         func_text += "    return {}\n".format(out_name)
 
         if config.DEBUG_ARRAY_OPT >= 1:
@@ -646,67 +843,73 @@ class StencilFunc(object):
         new_var_dict = {}
         reserved_names = ([sentinel_name, out_name, neighborhood_name,
                            shape_name] + kernel_copy.arg_names + index_vars)
+        if index_func is not None:
+            reserved_names.append(boundary_sentinel_name)
         for name, var in var_table.items():
             if not name in reserved_names:
                 new_var_dict[name] = ir_utils.mk_unique_var(name)
         ir_utils.replace_var_names(stencil_ir.blocks, new_var_dict)
 
-        stencil_stub_last_label = max(stencil_ir.blocks.keys()) + 1
-
-        # Shift labels in the kernel copy so they are guaranteed unique
-        # and don't conflict with any labels in the stencil_ir.
-        kernel_copy.blocks = ir_utils.add_offset_to_labels(
-                                kernel_copy.blocks, stencil_stub_last_label)
-        new_label = max(kernel_copy.blocks.keys()) + 1
-        # Adjust ret_blocks to account for addition of the offset.
-        ret_blocks = [x + stencil_stub_last_label for x in ret_blocks]
-
-        if config.DEBUG_ARRAY_OPT >= 1:
-            print("ret_blocks w/ offsets", ret_blocks, stencil_stub_last_label)
-            print("before replace sentinel stencil_ir")
-            ir_utils.dump_blocks(stencil_ir.blocks)
-            print("before replace sentinel kernel_copy")
-            ir_utils.dump_blocks(kernel_copy.blocks)
-
-        # Search all the block in the stencil outline for the sentinel.
-        for label, block in stencil_ir.blocks.items():
-            for i, inst in enumerate(block.body):
-                if (isinstance( inst, ir.Assign) and
-                    inst.target.name == sentinel_name):
-                    # We found the sentinel assignment.
-                    loc = inst.loc
-                    scope = block.scope
-                    # split block across __sentinel__
-                    # A new block is allocated for the statements prior to the
-                    # sentinel but the new block maintains the current block
-                    # label.
-                    prev_block = ir.Block(scope, loc)
-                    prev_block.body = block.body[:i]
-                    # The current block is used for statements after sentinel.
-                    block.body = block.body[i + 1:]
-                    # But the current block gets a new label.
-                    body_first_label = min(kernel_copy.blocks.keys())
-
-                    # The previous block jumps to the minimum labelled block of
-                    # the parfor body.
-                    prev_block.append(ir.Jump(body_first_label, loc))
-                    # Add all the parfor loop body blocks to the gufunc
-                    # function's IR.
-                    for (l, b) in kernel_copy.blocks.items():
-                        stencil_ir.blocks[l] = b
-
-                    stencil_ir.blocks[new_label] = block
-                    stencil_ir.blocks[label] = prev_block
-                    # Add a jump from all the blocks that previously contained
-                    # a return in the stencil kernel to the block
-                    # containing statements after the sentinel.
-                    for ret_block in ret_blocks:
-                        stencil_ir.blocks[ret_block].append(
-                            ir.Jump(new_label, loc))
-                    break
-            else:
-                continue
-            break
+        # Splice each copy of the kernel in place of its sentinel.
+        for sentinel, kernel, kernel_ret_blocks in kernels:
+            stencil_stub_last_label = max(stencil_ir.blocks.keys()) + 1
+
+            # Shift labels in the kernel copy so they are guaranteed unique
+            # and don't conflict with any labels in the stencil_ir.
+            kernel.blocks = ir_utils.add_offset_to_labels(
+                                    kernel.blocks, stencil_stub_last_label)
+            new_label = max(kernel.blocks.keys()) + 1
+            # Adjust kernel_ret_blocks to account for addition of the offset.
+            kernel_ret_blocks = [x + stencil_stub_last_label
+                                 for x in kernel_ret_blocks]
+
+            if config.DEBUG_ARRAY_OPT >= 1:
+                print("ret_blocks w/ offsets", kernel_ret_blocks,
+                      stencil_stub_last_label)
+                print("before replace sentinel stencil_ir")
+                ir_utils.dump_blocks(stencil_ir.blocks)
+                print("before replace sentinel kernel")
+                ir_utils.dump_blocks(kernel.blocks)
+
+            # Search all the block in the stencil outline for the sentinel.
+            for label, block in stencil_ir.blocks.items():
+                for i, inst in enumerate(block.body):
+                    if (isinstance( inst, ir.Assign) and
+                        inst.target.name == sentinel):
+                        # We found the sentinel assignment.
+                        loc = inst.loc
+                        scope = block.scope
+                        # split block across __sentinel__
+                        # A new block is allocated for the statements prior to the
+                        # sentinel but the new block maintains the current block
+                        # label.
+                        prev_block = ir.Block(scope, loc)
+                        prev_block.body = block.body[:i]
+                        # The current block is used for statements after sentinel.
+                        block.body = block.body[i + 1:]
+                        # But the current block gets a new label.
+                        body_first_label = min(kernel.blocks.keys())
+
+                        # The previous block jumps to the minimum labelled block of
+                        # the parfor body.
+                        prev_block.append(ir.Jump(body_first_label, loc))
+                        # Add all the parfor loop body blocks to the gufunc
+                        # function's IR.
+                        for (l, b) in kernel.blocks.items():
+                            stencil_ir.blocks[l] = b
+
+                        stencil_ir.blocks[new_label] = block
+                        stencil_ir.blocks[label] = prev_block
+                        # Add a jump from all the blocks that previously contained
+                        # a return in the stencil kernel to the block
+                        # containing statements after the sentinel.
+                        for ret_block in kernel_ret_blocks:
+                            stencil_ir.blocks[ret_block].append(
+                                ir.Jump(new_label, loc))
+                        break
+                else:
+                    continue
+                break
 
         stencil_ir.blocks = ir_utils.rename_labels(stencil_ir.blocks)
         ir_utils.remove_dels(stencil_ir.blocks)
@@ -775,17 +978,28 @@ def stencil(func_or_mode='constant', **options):
         func = None
 
     for option in options:
-        if option not in ["cval", "standard_indexing", "neighborhood"]:
+        if option not in ["cval", "standard_indexing", "neighborhood",
+                          "tile"]:
             raise ValueError("Unknown stencil option " + option)
 
+    tile = options.get("tile")
+    if tile is not None and (not isinstance(tile, tuple) or
+                             not all(isinstance(t, int) and t >= 0
+                                     for t in tile)):
+        raise ValueError("stencil tile must be a tuple of non-negative "
+                         "integers")
+
     wrapper = _stencil(mode, options)
     if func is not None:
         return wrapper(func)
     return wrapper
 
 def _stencil(mode, options):
-    if mode != 'constant':
+    if mode not in stencil_modes:
         raise ValueError("Unsupported mode style " + mode)
+    if stencil_modes[mode] is not None and "cval" in options:
+        raise ValueError("cval is only supported in mode 'constant', the "
+                         "other modes compute the whole output.")
 
     def decorated(func):
         from numba.core import compiler
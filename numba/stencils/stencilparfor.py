@@ -6,6 +6,7 @@
 import numbers
 import copy
 import types as pytypes
+from collections import namedtuple
 from operator import add
 import operator
 
@@ -15,6 +16,8 @@ import numba.parfors.parfor
 from numba.core import types, ir, rewrites, config, ir_utils
 from numba.core.typing.templates import infer_global, AbstractTemplate
 from numba.core.typing import signature
+from numba.core.extending import register_jitable
+from numba.core.analysis import compute_cfg_from_blocks
 from numba.core import  utils, typing
 from numba.core.ir_utils import (get_call_table, mk_unique_var,
                             compile_to_numba_ir, replace_arg_nodes, guard,
@@ -28,19 +31,72 @@ def _compute_last_ind(dim_size, index_const):
     else:
         return dim_size
 
+@register_jitable
+def _compute_boundary_stop(start_ind, dim_size):
+    return min(start_ind, dim_size)
+
+@register_jitable
+def _compute_boundary_start(start_ind, last_ind, dim_size):
+    return max(last_ind, min(start_ind, dim_size))
+
+@register_jitable
+def _stencil_index_inside(inside, index, start_ind, last_ind):
+    return inside and start_ind <= index and index < last_ind
+
+# A stencil call whose output is only read by another stencil can be fused
+# into it, so that its kernel is computed where the other kernel reads its
+# output instead of in a parfor writing an intermediate array.  Each read
+# computes the kernel again, behind a bounds check, which soon costs more
+# than the memory traffic saved, so they are fused only if that doesn't
+# compute it more than this many times per element of the final output.
+MAX_FUSED_ACCESSES = 2
+
+# A stencil call fused into another: the call statement, the StencilFunc,
+# the arguments of the call and their types, the arguments by position, the
+# index_offsets option, and the stencils fused into it in turn by argument
+# name.
+_FusedStencil = namedtuple('_FusedStencil', ['stmt', 'stencil_func',
+    'in_args', 'arg_typemap', 'input_dict', 'index_offsets', 'fused'])
+
+def _get_fused_shape_arr(arr, fused):
+    """ Returns the array that gives the shape of arr, which is arr itself
+        unless it is the output of a fused stencil.
+    """
+    while fused and arr.name in fused:
+        fused_stencil = fused[arr.name]
+        arr = fused_stencil.in_args[0]
+        fused = fused_stencil.fused
+    return arr
+
+def _default_tile_shape(ndim, size):
+    """
+    The tile shape of stencils of ndim dimensions without a tile option,
+    with about size iterations per tile, or None to not tile them.
+    1D stencils already stream through their input and are not tiled.
+    """
+    if ndim < 2 or size <= 0:
+        return None
+    # keep long runs of contiguous iterations in the innermost dimension
+    inner = min(size, 512)
+    outer = max(1, int(round((size // inner) ** (1.0 / (ndim - 1)))))
+    return (outer,) * (ndim - 1) + (inner,)
+
 class StencilPass(object):
-    def __init__(self, func_ir, typemap, calltypes, array_analysis, typingctx, flags):
+    def __init__(self, func_ir, typemap, calltypes, array_analysis, typingctx,
+                 flags, fusion=False):
         self.func_ir = func_ir
         self.typemap = typemap
         self.calltypes = calltypes
         self.array_analysis = array_analysis
         self.typingctx = typingctx
         self.flags = flags
+        # whether to fuse stencils whose output is read by another stencil
+        self.fusion = fusion
 
     def run(self):
         """ Finds all calls to StencilFuncs in the IR and converts them to parfor.
         """
-        from numba.stencils.stencil import StencilFunc
+        from numba.stencils.stencil import StencilFunc, stencil_modes
 
         # Get all the calls in the function IR.
         call_table, _ = get_call_table(self.func_ir.blocks)
@@ -55,11 +111,22 @@ class StencilPass(object):
         if not stencil_calls:
             return  # return early if no stencil calls found
 
+        if self.fusion:
+            uses = {}
+            def count_uses(var, uses):
+                uses[var.name] = uses.get(var.name, 0) + 1
+                return var
+            ir_utils.visit_vars(self.func_ir.blocks, count_uses, uses)
+        # ids of the stencil calls fused into later ones, to remove
+        fused_stmts = set()
+
         # find and transform stencil calls
         for label, block in self.func_ir.blocks.items():
             for i, stmt in reversed(list(enumerate(block.body))):
+                if id(stmt) in fused_stmts:
+                    block.body = block.body[:i] + block.body[i+1:]
                 # Found a call to a StencilFunc.
-                if (isinstance(stmt, ir.Assign)
+                elif (isinstance(stmt, ir.Assign)
                         and isinstance(stmt.value, ir.Expr)
                         and stmt.value.op == 'call'
                         and stmt.value.func.name in stencil_calls):
@@ -84,9 +151,36 @@ class StencilPass(object):
                             block.scope, block.loc, input_dict,
                             self.typemap, self.calltypes)
                     index_offsets = sf.options.get('index_offsets', None)
+                    fused = None
+                    if self.fusion:
+                        chain = []
+                        fused = self._get_fused_stencils(block, i, i,
+                            stmt.value, stencil_ir, stencil_dict, uses, 1,
+                            chain)
+                        fused_stmts.update(id(x) for x in chain)
                     gen_nodes = self._mk_stencil_parfor(label, in_args, out_arr,
                             stencil_ir, index_offsets, stmt.target, rt, sf,
-                            arg_to_arr_dict)
+                            arg_to_arr_dict, fused=fused)
+                    if stencil_modes[sf.mode] is not None:
+                        # Outside of mode 'constant', the border of the
+                        # output is computed by one parfor per side of each
+                        # dimension, with a fresh copy of the kernel whose
+                        # accesses are mapped into the input array.
+                        target_assign = gen_nodes.pop()
+                        ndims = self.typemap[in_args[0].name].ndim
+                        for dim in range(ndims):
+                            for side in range(2):
+                                stencil_ir, rt, arg_to_arr_dict = \
+                                    get_stencil_ir(sf, self.typingctx,
+                                        arg_typemap, block.scope, block.loc,
+                                        input_dict, self.typemap,
+                                        self.calltypes)
+                                gen_nodes += self._mk_stencil_parfor(label,
+                                    in_args, target_assign.value, stencil_ir,
+                                    index_offsets, None, rt, sf,
+                                    arg_to_arr_dict, boundary=(dim, side),
+                                    fused=fused)
+                        gen_nodes.append(target_assign)
                     block.body = block.body[:i] + gen_nodes + block.body[i+1:]
                 # Found a call to a stencil via numba.stencil().
                 elif (isinstance(stmt, ir.Assign)
@@ -124,9 +218,18 @@ class StencilPass(object):
 
     def _mk_stencil_parfor(self, label, in_args, out_arr, stencil_ir,
                            index_offsets, target, return_type, stencil_func,
-                           arg_to_arr_dict):
-        """ Converts a set of stencil kernel blocks to a parfor.
+                           arg_to_arr_dict, boundary=None, fused=None):
+        """ Converts a set of stencil kernel blocks to a parfor.  The parfor
+            computes the interior of the output, or if boundary is given as
+            (dim, side), the low (side 0) or high (side 1) border of the
+            output in dimension dim that is interior in the dimensions
+            before dim.  Border parfors write to the existing out_arr and
+            return no nodes when the border is empty.  The kernels of the
+            stencils in fused (see _get_fused_stencils) are inlined where
+            their outputs are read.
         """
+        from numba.stencils.stencil import stencil_modes
+        index_func = stencil_modes[stencil_func.mode]
         gen_nodes = []
         stencil_blocks = stencil_ir.blocks
 
@@ -136,25 +239,10 @@ class StencilPass(object):
             ir_utils.dump_blocks(stencil_blocks)
 
         in_arr = in_args[0]
-        # run copy propagate to replace in_args copies (e.g. a = A)
+        # the output of a fused stencil has the shape of its first input
+        shape_arr = _get_fused_shape_arr(in_arr, fused)
         in_arr_typ = self.typemap[in_arr.name]
-        in_cps, out_cps = ir_utils.copy_propagate(stencil_blocks, self.typemap)
-        name_var_table = ir_utils.get_name_var_table(stencil_blocks)
-
-        ir_utils.apply_copy_propagate(
-            stencil_blocks,
-            in_cps,
-            name_var_table,
-            self.typemap,
-            self.calltypes)
-        if config.DEBUG_ARRAY_OPT >= 1:
-            print("stencil_blocks after copy_propagate")
-            ir_utils.dump_blocks(stencil_blocks)
-        ir_utils.remove_dead(stencil_blocks, self.func_ir.arg_names, stencil_ir,
-                             self.typemap)
-        if config.DEBUG_ARRAY_OPT >= 1:
-            print("stencil_blocks after removing dead code")
-            ir_utils.dump_blocks(stencil_blocks)
+        self._simplify_stencil_ir(stencil_ir)
 
         # create parfor vars
         ndims = self.typemap[in_arr.name].ndim
@@ -167,25 +255,49 @@ class StencilPass(object):
             self.typemap[parfor_var.name] = types.intp
             parfor_vars.append(parfor_var)
 
+        equiv_set = self.array_analysis.get_equiv_set(label)
+        in_arr_dim_sizes = equiv_set.get_shape(shape_arr)
+        assert ndims == len(in_arr_dim_sizes)
+
+        fused_accesses = {name: [] for name in fused} if fused else None
         start_lengths, end_lengths = self._replace_stencil_accesses(
              stencil_ir, parfor_vars, in_args, index_offsets, stencil_func,
-             arg_to_arr_dict)
+             arg_to_arr_dict,
+             index_func if boundary is not None else None, in_arr_dim_sizes,
+             fused_accesses)
 
         if config.DEBUG_ARRAY_OPT >= 1:
             print("stencil_blocks after replace stencil accesses")
             ir_utils.dump_blocks(stencil_blocks)
 
+        if fused:
+            self._inline_fused_stencils(stencil_blocks, fused, fused_accesses,
+                                        equiv_set, gen_nodes, scope, loc)
+            if config.DEBUG_ARRAY_OPT >= 1:
+                print("stencil_blocks after inlining fused stencils")
+                ir_utils.dump_blocks(stencil_blocks)
+
+        if boundary is not None:
+            # skip the borders that are known to be empty
+            dim, side = boundary
+            if side == 0 and isinstance(start_lengths[dim], int):
+                if start_lengths[dim] >= 0:
+                    return []
+            if side == 1 and isinstance(end_lengths[dim], int):
+                if end_lengths[dim] <= 0:
+                    return []
+
         # create parfor loop nests
         loopnests = []
-        equiv_set = self.array_analysis.get_equiv_set(label)
-        in_arr_dim_sizes = equiv_set.get_shape(in_arr)
-
-        assert ndims == len(in_arr_dim_sizes)
         for i in range(ndims):
             last_ind = self._get_stencil_last_ind(in_arr_dim_sizes[i],
                                         end_lengths[i], gen_nodes, scope, loc)
             start_ind = self._get_stencil_start_ind(
                                         start_lengths[i], gen_nodes, scope, loc)
+            if boundary is not None:
+                start_ind, last_ind = self._get_stencil_boundary_range(i,
+                    boundary, start_ind, last_ind, in_arr_dim_sizes[i],
+                    gen_nodes, scope, loc)
             # start from stencil size to avoid invalid array access
             loopnests.append(numba.parfors.parfor.LoopNest(parfor_vars[i],
                                 start_ind, last_ind, 1))
@@ -222,7 +334,7 @@ class StencilPass(object):
 
             shape_name = ir_utils.mk_unique_var("in_arr_shape")
             shape_var = ir.Var(scope, shape_name, loc)
-            shape_getattr = ir.Expr.getattr(in_arr, "shape", loc)
+            shape_getattr = ir.Expr.getattr(shape_arr, "shape", loc)
             self.typemap[shape_name] = types.containers.UniTuple(types.intp,
                                                                in_arr_typ.ndim)
             init_block.body.extend([ir.Assign(shape_getattr, shape_var, loc)])
@@ -260,13 +372,23 @@ class StencilPass(object):
             dtype_attr_assign = ir.Assign(dtype_np_attr_call, dtype_attr_var, loc)
             init_block.body.append(dtype_attr_assign)
 
-            stmts = ir_utils.gen_np_call("full",
-                                       np.full,
-                                       out_arr,
-                                       [shape_var, zero_var, dtype_attr_var],
-                                       self.typingctx,
-                                       self.typemap,
-                                       self.calltypes)
+            if index_func is None:
+                stmts = ir_utils.gen_np_call("full",
+                                           np.full,
+                                           out_arr,
+                                           [shape_var, zero_var, dtype_attr_var],
+                                           self.typingctx,
+                                           self.typemap,
+                                           self.calltypes)
+            else:
+                # the border parfors write every element not in the interior
+                stmts = ir_utils.gen_np_call("empty",
+                                           np.empty,
+                                           out_arr,
+                                           [shape_var, dtype_attr_var],
+                                           self.typingctx,
+                                           self.typemap,
+                                           self.calltypes)
             equiv_set.insert_equiv(out_arr, in_arr_dim_sizes)
             init_block.body.extend(stmts)
         else: # out is present
@@ -353,13 +475,268 @@ class StencilPass(object):
             print("stencil_blocks after adding SetItem")
             ir_utils.dump_blocks(stencil_blocks)
 
+        if boundary is not None:
+            # the borders are thin slabs, not worth tiling
+            tile_shape = None
+        elif "tile" in stencil_func.options:
+            tile_shape = stencil_func.options["tile"]
+            if tile_shape is not None and len(tile_shape) != ndims:
+                raise ValueError("%d dimensional tile specified for %d "
+                                 "dimensional input array" %
+                                 (len(tile_shape), ndims))
+        else:
+            tile_shape = _default_tile_shape(ndims, config.STENCIL_TILE_SIZE)
+
         pattern = ('stencil', [start_lengths, end_lengths])
         parfor = numba.parfors.parfor.Parfor(loopnests, init_block, stencil_blocks,
-                                     loc, parfor_ind_var, equiv_set, pattern, self.flags)
+                                     loc, parfor_ind_var, equiv_set, pattern, self.flags,
+                                     tile_shape=tile_shape)
         gen_nodes.append(parfor)
-        gen_nodes.append(ir.Assign(out_arr, target, loc))
+        if target is not None:
+            gen_nodes.append(ir.Assign(out_arr, target, loc))
         return gen_nodes
 
+    def _simplify_stencil_ir(self, stencil_ir):
+        """ Copy propagates and removes the dead code of the stencil kernel
+            blocks, so that their accesses refer to the input arrays.
+        """
+        stencil_blocks = stencil_ir.blocks
+        # run copy propagate to replace in_args copies (e.g. a = A)
+        in_cps, out_cps = ir_utils.copy_propagate(stencil_blocks, self.typemap)
+        name_var_table = ir_utils.get_name_var_table(stencil_blocks)
+
+        ir_utils.apply_copy_propagate(
+            stencil_blocks,
+            in_cps,
+            name_var_table,
+            self.typemap,
+            self.calltypes)
+        if config.DEBUG_ARRAY_OPT >= 1:
+            print("stencil_blocks after copy_propagate")
+            ir_utils.dump_blocks(stencil_blocks)
+        ir_utils.remove_dead(stencil_blocks, self.func_ir.arg_names, stencil_ir,
+                             self.typemap)
+        if config.DEBUG_ARRAY_OPT >= 1:
+            print("stencil_blocks after removing dead code")
+            ir_utils.dump_blocks(stencil_blocks)
+
+    def _get_fused_stencils(self, block, index, end, call, consumer_ir,
+                            stencil_dict, uses, recompute, chain):
+        """ Finds the arguments of the stencil call at position index in
+            block that can be fused into it, with the stencils fused into
+            them in turn, and returns them as a dictionary from argument
+            name to _FusedStencil.  The fused stencils are moved to position
+            end, where the outermost stencil call is.  consumer_ir is the
+            typed IR of the kernel of call, which is computed recompute
+            times per output element.  The fused call statements are
+            appended to chain.
+        """
+        from numba.stencils.stencil import stencil_modes
+        fused = {}
+        sf = stencil_dict[call.func.name]
+        standard_indexed = sf.options.get("standard_indexing", [])
+        # the number of reads must be known statically
+        if compute_cfg_from_blocks(consumer_ir.blocks).loops():
+            return fused
+        for arg_name, arg in zip(sf.kernel_ir.arg_names, call.args):
+            if arg_name in standard_indexed:
+                continue
+            # the argument must only be defined by a stencil call, possibly
+            # through copies, and read by this one
+            copies = []
+            name = arg.name
+            j = index
+            while uses.get(name) == 2:
+                j = self._find_def(block, j, name)
+                if j is None or not isinstance(block.body[j].value, ir.Var):
+                    break
+                copies.append(block.body[j])
+                name = block.body[j].value.name
+            if j is None or uses.get(name) != 2:
+                continue
+            stmt = block.body[j]
+            value = stmt.value
+            if not (isinstance(value, ir.Expr) and value.op == 'call'
+                    and value.func.name in stencil_dict
+                    and not value.kws and value.vararg is None):
+                continue
+            producer = stencil_dict[value.func.name]
+            # the border of other modes would need a mapped kernel too
+            if stencil_modes[producer.mode] is not None:
+                continue
+            arg_typemap = tuple(self.typemap[v.name] for v in value.args)
+            if any(isinstance(t, types.BaseTuple) for t in arg_typemap):
+                continue
+            count = self._count_fused_accesses(consumer_ir, arg)
+            if count is None or recompute * count > MAX_FUSED_ACCESSES:
+                continue
+            if not self._can_move_stencil_call(block, j, end, value.args,
+                                               chain):
+                continue
+            input_dict = {k: v for k, v in enumerate(value.args)}
+            producer_ir, _, _ = get_stencil_ir(producer, self.typingctx,
+                arg_typemap, block.scope, block.loc, input_dict,
+                self.typemap, self.calltypes)
+            chain.append(stmt)
+            chain.extend(copies)
+            fused[arg.name] = _FusedStencil(stmt, producer, value.args,
+                arg_typemap, input_dict,
+                producer.options.get('index_offsets', None),
+                self._get_fused_stencils(block, j, end, value, producer_ir,
+                    stencil_dict, uses, recompute * count, chain))
+        return fused
+
+    def _find_def(self, block, index, name):
+        """ Returns the position of the last definition of the variable name
+            before position index in block, or None.
+        """
+        for j in range(index - 1, -1, -1):
+            stmt = block.body[j]
+            if isinstance(stmt, ir.Assign) and stmt.target.name == name:
+                return j
+        return None
+
+    def _count_fused_accesses(self, consumer_ir, arr):
+        """ Returns the number of reads of the array arr in the typed kernel
+            IR consumer_ir, or None if arr is used other than by reading
+            elements.
+        """
+        aliases = {arr.name}
+        stmts = [stmt for block in consumer_ir.blocks.values()
+                      for stmt in block.body]
+        for stmt in stmts:
+            if (isinstance(stmt, ir.Assign) and isinstance(stmt.value, ir.Var)
+                    and stmt.value.name in aliases):
+                aliases.add(stmt.target.name)
+        count = 0
+        for stmt in stmts:
+            if (isinstance(stmt, ir.Assign) and isinstance(stmt.value, ir.Var)
+                    and stmt.value.name in aliases):
+                continue
+            if (isinstance(stmt, ir.Assign)
+                    and isinstance(stmt.value, ir.Expr)
+                    and stmt.value.op in ['static_getitem', 'getitem']
+                    and stmt.value.value.name in aliases):
+                # reading a slice would need the whole array
+                if isinstance(self.typemap[stmt.target.name],
+                              types.ArrayCompatible):
+                    return None
+                count += 1
+                continue
+            if any(v.name in aliases for v in stmt.list_vars()):
+                return None
+        return count
+
+    def _can_move_stencil_call(self, block, start, end, args, chain):
+        """ Whether the stencil call at position start in block can be
+            moved to position end, that is if the statements in between
+            can't modify or redefine its arguments args.  The statements of
+            chain are moved too.
+        """
+        arg_names = set(v.name for v in args)
+        for stmt in block.body[start + 1:end]:
+            if any(stmt is x for x in chain):
+                continue
+            if not isinstance(stmt, ir.Assign) or stmt.target.name in arg_names:
+                return False
+            value = stmt.value
+            if isinstance(value, (ir.Global, ir.FreeVar, ir.Const, ir.Var)):
+                continue
+            if not (isinstance(value, ir.Expr) and value.op in ['getattr',
+                    'build_tuple', 'static_getitem', 'getitem', 'binop',
+                    'unary']):
+                return False
+        return True
+
+    def _inline_fused_stencils(self, stencil_blocks, fused, fused_accesses,
+                               equiv_set, gen_nodes, scope, loc):
+        """ Replaces the reads of the outputs of the fused stencils in the
+            stencil kernel blocks, recorded in fused_accesses as the read
+            statements and their index variables, by the kernels of the fused
+            stencils.  The bounds of their interiors are computed in
+            gen_nodes.
+        """
+        for name, accesses in fused_accesses.items():
+            fused_stencil = fused[name]
+            sf = fused_stencil.stencil_func
+            in_arr = fused_stencil.in_args[0]
+            bounds = None
+            for stmt, index_vars in accesses:
+                stencil_ir, return_type, arg_to_arr_dict = get_stencil_ir(sf,
+                    self.typingctx, fused_stencil.arg_typemap, scope, loc,
+                    fused_stencil.input_dict, self.typemap, self.calltypes)
+                self._simplify_stencil_ir(stencil_ir)
+                inner_accesses = {n: [] for n in fused_stencil.fused}
+                start_lengths, end_lengths = self._replace_stencil_accesses(
+                    stencil_ir, index_vars, fused_stencil.in_args,
+                    fused_stencil.index_offsets, sf, arg_to_arr_dict,
+                    fused=inner_accesses)
+                self._inline_fused_stencils(stencil_ir.blocks,
+                    fused_stencil.fused, inner_accesses, equiv_set,
+                    gen_nodes, scope, loc)
+
+                if bounds is None:
+                    # the ranges of the loops of the fused stencil
+                    dim_sizes = equiv_set.get_shape(_get_fused_shape_arr(
+                                    in_arr, fused_stencil.fused))
+                    bounds = []
+                    for i in range(len(index_vars)):
+                        bounds.append((
+                            self._get_stencil_start_ind(start_lengths[i],
+                                                        gen_nodes, scope, loc),
+                            self._get_stencil_last_ind(dim_sizes[i],
+                                end_lengths[i], gen_nodes, scope, loc)))
+                    if "cval" in sf.options:
+                        cval = sf.options["cval"]
+                        if return_type.dtype != typing.typeof.typeof(cval):
+                            raise ValueError(
+                                "cval type does not match stencil return type.")
+                    else:
+                        cval = 0
+                    cval = return_type.dtype(cval)
+
+                self._splice_fused_stencil(stencil_blocks, stmt, index_vars,
+                    stencil_ir.blocks, bounds, cval, scope, loc)
+
+    def _splice_fused_stencil(self, stencil_blocks, stmt, index_vars,
+                              fused_blocks, bounds, cval, scope, loc):
+        """ Replaces the read statement stmt in the stencil kernel blocks by
+            the blocks of the kernel of a fused stencil, at the index
+            index_vars, if it is within the bounds of the loops of the fused
+            stencil, and by cval otherwise.
+        """
+        for label, block in stencil_blocks.items():
+            pos = [i for i, inst in enumerate(block.body) if inst is stmt]
+            if pos:
+                pos = pos[0]
+                break
+
+        check_nodes = []
+        inside_var = ir.Var(scope, mk_unique_var("$stencil_inside"), loc)
+        self.typemap[inside_var.name] = types.boolean
+        check_nodes.append(ir.Assign(ir.Const(True, loc), inside_var, loc))
+        for index_var, (start_ind, last_ind) in zip(index_vars, bounds):
+            inside_var = self._call_index_func(_stencil_index_inside,
+                [inside_var, index_var, start_ind, last_ind], check_nodes,
+                scope, loc)
+
+        cval_label = ir_utils.next_label()
+        after_label = ir_utils.next_label()
+        after_block = ir.Block(scope, loc)
+        after_block.body = block.body[pos + 1:]
+        block.body = block.body[:pos] + check_nodes
+        block.body.append(ir.Branch(inside_var, min(fused_blocks.keys()),
+                                    cval_label, loc))
+        cval_block = ir.Block(scope, loc)
+        cval_block.body = [ir.Assign(ir.Const(cval, loc), stmt.target, loc),
+                           ir.Jump(after_label, loc)]
+        # the returns of the fused kernel become assignments of the read value
+        self.replace_return_with_setitem(fused_blocks, stmt.target,
+                                         after_label)
+        stencil_blocks.update(fused_blocks)
+        stencil_blocks[cval_label] = cval_block
+        stencil_blocks[after_label] = after_block
+
     def _get_stencil_last_ind(self, dim_size, end_length, gen_nodes, scope,
                                                                         loc):
         last_ind = dim_size
@@ -394,6 +771,57 @@ class StencilPass(object):
 
         return last_ind
 
+    def _get_stencil_boundary_range(self, dim, boundary, start_ind, last_ind,
+                                    dim_size, gen_nodes, scope, loc):
+        """ Returns the start and stop of the loop over dimension dim of the
+            border parfor of boundary (see _mk_stencil_parfor), given the
+            range [start_ind, last_ind) of the interior in that dimension.
+        """
+        bdim, side = boundary
+        if dim < bdim:
+            return start_ind, last_ind
+        if dim > bdim:
+            return 0, dim_size
+        # clip the interior to the array for arrays smaller than the kernel
+        if side == 0:
+            stop = self._call_index_func(_compute_boundary_stop,
+                                         [start_ind, dim_size],
+                                         gen_nodes, scope, loc)
+            return 0, stop
+        start = self._call_index_func(_compute_boundary_start,
+                                      [start_ind, last_ind, dim_size],
+                                      gen_nodes, scope, loc)
+        return start, dim_size
+
+    def _call_index_func(self, func, args, gen_nodes, scope, loc):
+        """ Adds to gen_nodes a call of the register_jitable func on the
+            integer constants or variables args.  Returns the variable of
+            the result.
+        """
+        arg_vars = []
+        for arg in args:
+            if isinstance(arg, int):
+                arg_var = ir.Var(scope, mk_unique_var("stencil_const_var"),
+                                 loc)
+                self.typemap[arg_var.name] = types.intp
+                gen_nodes.append(ir.Assign(ir.Const(arg, loc), arg_var, loc))
+                arg = arg_var
+            arg_vars.append(arg)
+        g_var = ir.Var(scope, mk_unique_var(func.__name__), loc)
+        func_typ = self.typingctx.resolve_value_type(func)
+        self.typemap[g_var.name] = func_typ
+        g_obj = ir.Global(func.__name__, func, loc)
+        gen_nodes.append(ir.Assign(g_obj, g_var, loc))
+        call = ir.Expr.call(g_var, arg_vars, (), loc)
+        sig = func_typ.get_call_type(self.typingctx,
+                                     [self.typemap[v.name] for v in arg_vars],
+                                     {})
+        self.calltypes[call] = sig
+        res_var = ir.Var(scope, mk_unique_var("stencil_index_var"), loc)
+        self.typemap[res_var.name] = sig.return_type
+        gen_nodes.append(ir.Assign(call, res_var, loc))
+        return res_var
+
     def _get_stencil_start_ind(self, start_length, gen_nodes, scope, loc):
         if isinstance(start_length, int):
             return abs(min(start_length, 0))
@@ -409,10 +837,16 @@ class StencilPass(object):
         return ret_var
 
     def _replace_stencil_accesses(self, stencil_ir, parfor_vars, in_args,
-                                  index_offsets, stencil_func, arg_to_arr_dict):
+                                  index_offsets, stencil_func, arg_to_arr_dict,
+                                  index_func=None, dim_sizes=None,
+                                  fused=None):
         """ Convert relative indexing in the stencil kernel to standard indexing
             by adding the loop index variables to the corresponding dimensions
-            of the array index tuples.
+            of the array index tuples.  If index_func is given, the indices
+            are also mapped into the input array of shape dim_sizes by
+            calling index_func.  The reads of the arrays named in fused are
+            appended to their lists as the read statement and its index
+            variables.
         """
         stencil_blocks = stencil_ir.blocks
         in_arr = in_args[0]
@@ -511,6 +945,17 @@ class StencilPass(object):
                     # update access indices
                     index_vars = self._add_index_offsets(parfor_vars,
                                 list(index_list), new_body, scope, loc)
+                    if index_func is not None:
+                        for i in range(ndims):
+                            if self.typemap[index_vars[i].name] != types.intp:
+                                raise ValueError("Slices in stencil kernel "
+                                    "indices are only supported in mode "
+                                    "'constant'.")
+                            index_vars[i] = self._call_index_func(index_func,
+                                [index_vars[i], dim_sizes[i]], new_body,
+                                scope, loc)
+                    if fused is not None and stmt.value.value.name in fused:
+                        fused[stmt.value.value.name].append((stmt, index_vars))
 
                     # new access index tuple
                     if ndims == 1:
@@ -5,7 +5,8 @@ There was a deadlock problem when work count is smaller than number of threads.
 import numpy as np
 
 from numba import float32, float64, int32, uint32
-from numba.np.ufunc import Vectorize
+from numba.np.ufunc import Vectorize, GUVectorize
+from numba.tests.support import override_config
 import unittest
 
 
@@ -13,6 +14,11 @@ def vector_add(a, b):
     return a + b
 
 
+def gufunc_add(a, b, out):
+    for i in range(a.shape[0]):
+        out[i] = a[i] + b[i]
+
+
 class TestParallelLowWorkCount(unittest.TestCase):
 
     _numba_parallel_test_ = False
@@ -39,6 +45,25 @@ class TestParallelLowWorkCount(unittest.TestCase):
         test(np.int32)
         test(np.uint32)
 
+    def test_serial_threshold(self):
+        # small calls run on the calling thread
+        for threshold in (1, 1000, 'adaptive'):
+            with override_config('PARALLEL_SERIAL_THRESHOLD', threshold):
+                pv = Vectorize(vector_add, target='parallel')
+                pv.add(float64(float64, float64))
+                para_ufunc = pv.build_ufunc()
+                pgv = GUVectorize(gufunc_add, '(n),(n)->(n)',
+                                  target='parallel')
+                pgv.add('void(float64[:], float64[:], float64[:])')
+                para_gufunc = pgv.build_ufunc()
+
+            for n in (1, 10, 100000):
+                data = np.arange(n, dtype=np.float64)
+                for i in range(100 if threshold == 'adaptive' else 1):
+                    np.testing.assert_equal(para_ufunc(data, data), 2 * data)
+                data = data.reshape((n, 1))
+                np.testing.assert_equal(para_gufunc(data, data), 2 * data)
+
 
 if __name__ == '__main__':
     unittest.main()
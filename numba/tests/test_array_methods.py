@@ -1186,17 +1186,22 @@ class TestArrayMethods(MemoryLeakMixin, TestCase):
     def test_cumsum(self):
         pyfunc = array_cumsum
         cfunc = jit(nopython=True)(pyfunc)
-        # OK
-        a = np.ones((2, 3))
+        a = np.arange(6.).reshape((2, 3))
         self.assertPreciseEqual(pyfunc(a), cfunc(a))
-        # BAD: with axis
-        with self.assertRaises(TypingError):
-            cfunc(a, 1)
-        # BAD: with kw axis
+        # with axis
+        for axis in (0, 1, -1, None):
+            self.assertPreciseEqual(pyfunc(a, axis), cfunc(a, axis))
+        # with kw axis
         pyfunc = array_cumsum_kws
         cfunc = jit(nopython=True)(pyfunc)
+        self.assertPreciseEqual(pyfunc(a, axis=1), cfunc(a, axis=1))
+        # BAD: axis out of bounds
+        with self.assertRaises(ValueError) as raises:
+            cfunc(a, axis=2)
+        self.assertIn("axis is out of bounds", str(raises.exception))
+        # BAD: axis on a 0d array
         with self.assertRaises(TypingError):
-            cfunc(a, axis=1)
+            cfunc(np.array(1.), axis=0)
 
     def test_take(self):
         pyfunc = array_take
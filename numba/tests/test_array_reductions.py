@@ -38,6 +38,12 @@ def array_cumsum_global(arr):
 def array_nancumsum(arr):
     return np.nancumsum(arr)
 
+def array_cumsum_axis(arr, axis):
+    return np.cumsum(arr, axis=axis)
+
+def array_cumprod_axis(arr, axis):
+    return arr.cumprod(axis)
+
 def array_sum(arr):
     return arr.sum()
 
@@ -597,6 +603,26 @@ class TestArrayReductions(MemoryLeakMixin, TestCase):
     def test_array_cumprod_global(self):
         self.check_cumulative(array_cumprod_global)
 
+    def check_cumulative_axis(self, pyfunc):
+        cfunc = jit(nopython=True)(pyfunc)
+        arr = np.arange(1, 25, dtype=np.int32).reshape((2, 3, 4)) % 5
+        for a in (arr, arr.astype(np.float64), arr.T, arr[:, ::2]):
+            for axis in (0, 1, 2, -1, -3, None):
+                # the result is always C contiguous
+                expected = np.ascontiguousarray(pyfunc(a, axis))
+                self.assertPreciseEqual(cfunc(a, axis), expected)
+        # empty scanned axis
+        a = np.ones((3, 0, 2))
+        self.assertPreciseEqual(cfunc(a, 1), pyfunc(a, 1))
+        with self.assertRaises(ValueError):
+            cfunc(arr, 3)
+
+    def test_array_cumsum_axis(self):
+        self.check_cumulative_axis(array_cumsum_axis)
+
+    def test_array_cumprod_axis(self):
+        self.check_cumulative_axis(array_cumprod_axis)
+
     def check_aggregation_magnitude(self, pyfunc, is_prod=False):
         """
         Check that integer overflows are avoided (issue #931).
@@ -0,0 +1,171 @@
+import numpy as np
+
+from numba import njit, prange, atomic
+from numba.core import errors
+from numba.tests.support import TestCase, skip_parfors_unsupported
+import unittest
+
+
+def atomic_add(ary, idx, val):
+    return atomic.add(ary, idx, val)
+
+
+def atomic_max(ary, idx, val):
+    return atomic.max(ary, idx, val)
+
+
+def atomic_min(ary, idx, val):
+    return atomic.min(ary, idx, val)
+
+
+def atomic_cas(ary, idx, old, val):
+    return atomic.cas(ary, idx, old, val)
+
+
+def prange_histogram(bins, nbins):
+    hist = np.zeros(nbins, np.int64)
+    for i in prange(bins.shape[0]):
+        atomic.add(hist, bins[i], 1)
+    return hist
+
+
+def prange_float_sums(values, keys, nkeys):
+    sums = np.zeros(nkeys)
+    for i in prange(values.shape[0]):
+        atomic.add(sums, keys[i], values[i])
+    return sums
+
+
+def prange_extrema(values):
+    res = np.array([values[0], values[0]])
+    for i in prange(values.shape[0]):
+        atomic.max(res, 0, values[i])
+        atomic.min(res, 1, values[i])
+    return res
+
+
+def prange_cas_claim(n, nslots):
+    # every iteration claims the first free slot
+    slots = np.full(nslots, -1, np.int64)
+    for i in prange(n):
+        for j in range(nslots):
+            if atomic.cas(slots, j, -1, i) == -1:
+                break
+    return slots
+
+
+def prange_histogram_then_read(bins):
+    n = bins.shape[0]
+    hist = np.zeros(n, np.int64)
+    for i in prange(n):
+        atomic.add(hist, bins[i], 1)
+    out = np.empty(n, np.int64)
+    for i in prange(n):
+        out[i] = hist[i] * 2
+    return out
+
+
+class TestAtomic(TestCase):
+
+    def check(self, pyfunc, ary, *args):
+        cfunc = njit(pyfunc)
+        expected_ary = ary.copy()
+        got_ary = ary.copy()
+        expected = pyfunc(expected_ary, *args)
+        got = cfunc(got_ary, *args)
+        self.assertEqual(got, expected)
+        self.assertPreciseEqual(got_ary, expected_ary)
+
+    def test_add(self):
+        for dtype in (np.int32, np.int64, np.uint32, np.float32, np.float64):
+            ary = np.arange(6, dtype=dtype)
+            self.check(atomic_add, ary, 2, dtype(5))
+            self.check(atomic_add, ary, -1, dtype(3))
+        self.check(atomic_add, np.arange(6.).reshape((2, 3)), (1, 2), 0.5)
+        self.check(atomic_add, np.arange(6.), 3, 2)
+
+    def test_max_min(self):
+        for pyfunc in (atomic_max, atomic_min):
+            for dtype in (np.int8, np.int64, np.uint64, np.float32,
+                          np.float64):
+                ary = np.arange(6, dtype=dtype)
+                self.check(pyfunc, ary, 3, dtype(1))
+                self.check(pyfunc, ary, 3, dtype(5))
+            self.check(pyfunc, np.arange(6.).reshape((3, 2)), (2, 0), -1.5)
+
+    def test_cas(self):
+        for dtype in (np.int32, np.int64, np.uint32):
+            ary = np.arange(6, dtype=dtype)
+            # swaps
+            self.check(atomic_cas, ary, 4, dtype(4), dtype(9))
+            # does not swap
+            self.check(atomic_cas, ary, 4, dtype(3), dtype(9))
+
+    def test_index_out_of_bounds(self):
+        cfunc = njit(atomic_add)
+        with self.assertRaises(IndexError):
+            cfunc(np.zeros(3), 3, 1.)
+
+    def test_typing_errors(self):
+        cases = [(atomic_add, (np.zeros(3, np.complex128), 0, 1j),
+                  "only supported for integer and floating point arrays"),
+                 (atomic_add, (np.zeros(3, np.int64), 0, 1.5),
+                  "cannot update an integer array with a floating point"),
+                 (atomic_add, (np.zeros((2, 2)), 0, 1.),
+                  "needs 2 indices for a 2D array"),
+                 (atomic_max, (np.zeros(3), 0.5, 1.),
+                  "index must be an integer or a tuple of integers"),
+                 (atomic_cas, (np.zeros(3), 0, 0., 1.),
+                  "atomic.cas() is only supported for integer arrays")]
+        for pyfunc, args, msg in cases:
+            with self.assertRaises(errors.TypingError) as raises:
+                njit(pyfunc)(*args)
+            self.assertIn(msg, str(raises.exception))
+
+    def test_interpreter(self):
+        ary = np.arange(4)
+        self.assertEqual(atomic.add(ary, 1, 5), 1)
+        self.assertEqual(atomic.max(ary, 2, 7), 2)
+        self.assertEqual(atomic.min(ary, 3, 0), 3)
+        self.assertEqual(atomic.cas(ary, 0, 0, 8), 0)
+        np.testing.assert_equal(ary, [8, 6, 7, 0])
+
+
+@skip_parfors_unsupported
+class TestAtomicParallel(TestCase):
+
+    _numba_parallel_test_ = False
+
+    def test_histogram(self):
+        bins = np.arange(10000) * 7 % 13
+        cfunc = njit(parallel=True)(prange_histogram)
+        np.testing.assert_equal(cfunc(bins, 13), np.bincount(bins))
+
+    def test_float_sums(self):
+        keys = np.arange(10000) % 5
+        values = np.ones(10000) * 0.5
+        cfunc = njit(parallel=True)(prange_float_sums)
+        np.testing.assert_equal(cfunc(values, keys, 5), np.full(5, 1000.))
+
+    def test_extrema(self):
+        values = np.sin(np.arange(10000.))
+        cfunc = njit(parallel=True)(prange_extrema)
+        np.testing.assert_equal(cfunc(values),
+                                [values.max(), values.min()])
+
+    def test_cas(self):
+        cfunc = njit(parallel=True)(prange_cas_claim)
+        slots = cfunc(50, 50)
+        np.testing.assert_equal(np.sort(slots), np.arange(50))
+
+    def test_not_fused(self):
+        # the second loop reads elements updated by other iterations of the
+        # first one, so the loops must not be fused
+        bins = np.arange(1000)[::-1].copy()
+        cfunc = njit(parallel=True)(prange_histogram_then_read)
+        np.testing.assert_equal(cfunc(bins),
+                                prange_histogram_then_read(bins))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import json
+import os
+
+import numpy as np
+
+from numba import njit, prange
+from numba.core import compile_profile
+from numba.tests.support import (TestCase, override_config, temp_directory,
+                                 skip_parfors_unsupported)
+import unittest
+
+
+def add_one(x):
+    y = x + 1
+    return y
+
+
+def parallel_sum(a):
+    acc = 0
+    for i in prange(a.shape[0]):
+        acc += a[i]
+    return acc
+
+
+class TestCompileProfile(TestCase):
+
+    def setUp(self):
+        compile_profile.clear_profiles()
+
+    def tearDown(self):
+        compile_profile.clear_profiles()
+
+    def compile_profiled(self, pyfunc, *args, **options):
+        with override_config('COMPILE_PROFILE', 1):
+            cfunc = njit(**options)(pyfunc)
+            cfunc(*args)
+        [md] = cfunc.get_metadata().values()
+        return md['compile_profile']
+
+    def test_disabled(self):
+        cfunc = njit(add_one)
+        cfunc(1)
+        [md] = cfunc.get_metadata().values()
+        self.assertNotIn('compile_profile', md)
+        self.assertEqual(compile_profile.get_profiles(), [])
+
+    def test_passes(self):
+        profile = self.compile_profiled(add_one, 1)
+        self.assertIn('add_one', profile.func_name)
+        self.assertEqual(len(profile.args), 1)
+        self.assertEqual(compile_profile.get_profiles(), [profile])
+
+        stages = dict((s.name, s) for s in profile.stages)
+        for name in ('translate_bytecode', 'nopython_type_inference',
+                     'native_lowering', 'llvm_optimize_functions',
+                     'llvm_optimize_module', 'llvm_codegen'):
+            self.assertIn(name, stages)
+            self.assertGreaterEqual(stages[name].duration, 0)
+        info = stages['nopython_type_inference'].info
+        self.assertEqual(info['pipeline'], 'nopython')
+        self.assertGreater(info['ir_blocks'], 0)
+        self.assertGreater(info['ir_stmts'], 0)
+        info = stages['llvm_codegen'].info
+        self.assertGreater(info['llvm_functions'], 0)
+        self.assertGreater(info['llvm_bitcode_size'], 0)
+
+        # LLVM stages run within the lowering pass
+        lowering = stages['native_lowering']
+        codegen = stages['llvm_codegen']
+        self.assertGreaterEqual(codegen.start, lowering.start)
+        self.assertLessEqual(codegen.start + codegen.duration,
+                             lowering.start + lowering.duration)
+
+        self.assertGreater(profile.total_time, 0)
+        summary = profile.summary()
+        self.assertEqual(sorted(summary, key=lambda item: -item[1]), summary)
+
+    @skip_parfors_unsupported
+    def test_parfor_pass(self):
+        profile = self.compile_profiled(parallel_sum, np.arange(10.),
+                                        parallel=True)
+        self.assertIn('parfor_pass', [s.name for s in profile.stages])
+
+    def test_chrome_trace(self):
+        profile = self.compile_profiled(add_one, 1)
+        path = os.path.join(temp_directory('test_compile_profile'),
+                            'trace.json')
+        compile_profile.dump_chrome_trace(path)
+        with open(path) as f:
+            trace = json.load(f)
+        events = trace['traceEvents']
+        self.assertEqual(len(events), len(profile.stages) + 1)
+        self.assertEqual(events[0]['cat'], 'function')
+        self.assertIn('add_one(int64)', events[0]['name'])
+        for event in events:
+            self.assertEqual(event['ph'], 'X')
+            self.assertEqual(event['pid'], os.getpid())
+            self.assertGreaterEqual(event['dur'], 0)
+        self.assertEqual(set(e['cat'] for e in events[1:]), {'pass', 'llvm'})
+
+
+if __name__ == '__main__':
+    unittest.main()
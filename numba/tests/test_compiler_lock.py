@@ -18,6 +18,30 @@ class TestCompilerLock(TestCase):
 
         func()
 
+    def test_gcl_released(self):
+        with global_compiler_lock:
+            with global_compiler_lock.released():
+                self.assertFalse(global_compiler_lock.is_locked())
+            require_global_compiler_lock()
+        self.assertFalse(global_compiler_lock.is_locked())
+
+    def test_gcl_released_nested(self):
+        # All the acquisitions beyond the given depth are released
+        with global_compiler_lock:
+            with global_compiler_lock:
+                self.assertEqual(global_compiler_lock.depth, 2)
+                with global_compiler_lock.released():
+                    self.assertFalse(global_compiler_lock.is_locked())
+                    self.assertEqual(global_compiler_lock.depth, 0)
+                self.assertEqual(global_compiler_lock.depth, 2)
+                # The lock is kept for the outer frames holding it
+                with global_compiler_lock.released(1):
+                    require_global_compiler_lock()
+                    self.assertEqual(global_compiler_lock.depth, 1)
+                self.assertEqual(global_compiler_lock.depth, 2)
+        self.assertFalse(global_compiler_lock.is_locked())
+        self.assertEqual(global_compiler_lock.depth, 0)
+
 
 if __name__ == '__main__':
     unittest.main()
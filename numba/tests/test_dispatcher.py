@@ -6,25 +6,30 @@ import shutil
 import subprocess
 import sys
 import threading
+import time
 import warnings
 import inspect
 import pickle
 import weakref
 from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
 
 import numpy as np
 
+import numba
 from numba import jit, generated_jit, typeof
-from numba.core import types, errors, codegen
+from numba.core import types, errors, codegen, config
 from numba import _dispatcher
 from numba.core.compiler import compile_isolated
+from numba.core.compiler_lock import global_compiler_lock
 from numba.core.errors import NumbaWarning
 from numba.tests.support import (TestCase, temp_directory, import_dynamic,
                                  override_env_config, capture_cache_log,
                                  captured_stdout)
 from numba.np.numpy_support import as_dtype
-from numba.core.caching import _UserWideCacheLocator
+from numba.core.caching import (_UserWideCacheLocator, PackedCacheFile,
+                                 IndexDataCacheFile, get_cache_stats)
 from numba.core.dispatcher import Dispatcher
 from numba.tests.support import skip_parfors_unsupported, needs_lapack
 
@@ -634,6 +639,41 @@ class TestSignatureHandling(BaseTest):
             f(y=6, z=7)
         self.assertIn("missing argument 'x'", str(cm.exception))
 
+    def test_cached_keyword_layouts(self):
+        """
+        Test repeated calls with the same keywords, which bind arguments
+        using the dispatcher's cached keyword layouts.
+        """
+        f, check = self.compile_func(addsub_defaults)
+        for i in range(3):
+            check(3, z=10, y=4)
+            check(3, y=4, z=10)
+            check(3, z=10)
+            check(z=10, x=3)
+            check(x=3)
+        # More layouts than the cache holds, with the same number of
+        # positional and keyword arguments
+        for i in range(2):
+            for pos, kws in [((3,), dict(y=4)), ((3,), dict(z=4)),
+                             ((), dict(x=3)), ((3, 4), dict(z=5)),
+                             ((), dict(x=3, z=5)), ((), dict(y=4, x=3)),
+                             ((), dict(z=5, x=3)), ((3,), dict(y=4, z=5)),
+                             ((3,), dict(z=5, y=4))]:
+                check(*pos, **kws)
+        # Errors are still detected for keywords seen before
+        with self.assertRaises(TypeError) as cm:
+            f(3, 4, y=6)
+        self.assertIn("some keyword arguments unexpected", str(cm.exception))
+        with self.assertRaises(TypeError) as cm:
+            f(3, w=6)
+        self.assertIn("some keyword arguments unexpected", str(cm.exception))
+        # Keyword names which aren't interned
+        name = ''.join(['z'])
+        check(3, **{name: 10})
+        check(3, **{name: 11})
+        # Omitted arguments don't create new specializations
+        self.assertEqual(len(f.overloads), 4)
+
     def test_star_args(self):
         """
         Test a compiled function with starargs in the signature.
@@ -744,6 +784,93 @@ class TestDispatcherMethods(TestCase):
         self.assertPreciseEqual(foo(1), 3)
         self.assertPreciseEqual(foo(1.5), 3)
 
+    def test_compile_many(self):
+        @jit(nopython=True)
+        def foo(x, y):
+            return x + y
+
+        sigs = [(types.int64, types.int64), (types.float64, types.int64),
+                (types.complex128, types.float64), (types.int32, types.int8)]
+        entry_points = foo.compile_many(sigs, workers=4)
+        self.assertEqual(len(entry_points), len(sigs))
+        self.assertEqual(set(foo.signatures), set(sigs))
+        for sig, entry_point in zip(sigs, entry_points):
+            self.assertIs(foo.overloads[sig].entry_point, entry_point)
+        self.assertPreciseEqual(foo(1, 2), 3)
+        self.assertPreciseEqual(foo(1.5, 2), 3.5)
+        self.assertPreciseEqual(foo(1j, 2.0), 2 + 1j)
+        # Already compiled signatures are reused
+        self.assertEqual(foo.compile_many(sigs[:2]), entry_points[:2])
+
+    def test_compile_many_callees(self):
+        # Concurrent compilations of a function and its callers
+        @jit(nopython=True)
+        def inner(x):
+            return x * 2
+
+        @jit(nopython=True)
+        def outer(x):
+            return inner(x) + 1
+
+        sigs = [(types.int64,), (types.float64,), (types.int32,)]
+        outer.compile_many(sigs, workers=3)
+        inner.compile_many(sigs, workers=3)
+        self.assertPreciseEqual(outer(3), 7)
+        self.assertPreciseEqual(outer(1.5), 4.0)
+
+    def test_compile_many_releases_lock(self):
+        # Another thread can take the compiler lock while a signature's
+        # final module is being optimized
+        @jit(nopython=True)
+        def inner(x):
+            return x * 2
+
+        @jit(nopython=True)
+        def foo(x):
+            return inner(x) + 1
+
+        optimizing = threading.Event()
+        proceed = threading.Event()
+        acquired = threading.Event()
+        released = []
+        orig = codegen.CodeLibrary._optimize_final_module
+
+        def _optimize_final_module(library):
+            name = library._name.rsplit('.', 1)[-1]
+            released.append((name, not global_compiler_lock.is_locked()))
+            if name == 'foo':
+                optimizing.set()
+                proceed.wait(timeout=60)
+            return orig(library)
+
+        def take_lock():
+            with global_compiler_lock:
+                acquired.set()
+
+        codegen.CodeLibrary._optimize_final_module = _optimize_final_module
+        try:
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                future = pool.submit(foo.compile_many,
+                                     [(types.int64,), (types.float64,)])
+                self.assertTrue(optimizing.wait(timeout=60))
+                taker = threading.Thread(target=take_lock)
+                taker.start()
+                try:
+                    self.assertTrue(acquired.wait(timeout=60))
+                finally:
+                    proceed.set()
+                    taker.join()
+                future.result()
+        finally:
+            codegen.CodeLibrary._optimize_final_module = orig
+        # The callee was compiled holding the lock, the signatures of foo
+        # without it
+        self.assertEqual({r for name, r in released if name == 'foo'}, {True})
+        self.assertEqual({r for name, r in released if name == 'inner'},
+                         {False})
+        self.assertPreciseEqual(foo(3), 7)
+        self.assertPreciseEqual(foo(1.5), 4.0)
+
     def test_inspect_llvm(self):
         # Create a jited function
         @jit
@@ -1104,6 +1231,21 @@ class TestCache(BaseCacheUsecasesTest):
         # Check the code runs ok from another process
         self.run_in_separate_process()
 
+    def test_caching_compile_many(self):
+        # The machine code emitted outside the compiler lock is cached
+        mod = self.import_module()
+        f = mod.add_usecase
+        f.compile_many([(types.int64, types.int64),
+                        (types.float64, types.float64)], workers=2)
+        self.check_pycache(3)  # 1 index, 2 data
+        self.check_hits(f, 0, 2)
+
+        mod = self.import_module()
+        f = mod.add_usecase
+        self.assertPreciseEqual(f(2, 3), 6)
+        self.assertPreciseEqual(f(2.5, 3.5), 7.0)
+        self.check_hits(f, 2, 0)
+
     def test_caching_nrt_pruned(self):
         self.check_pycache(0)
         mod = self.import_module()
@@ -1521,6 +1663,500 @@ class TestCacheWithCpuSetting(BaseCacheUsecasesTest):
         self.assertEqual(key_generic[1][2], my_cpu_features)
 
 
+class TestContentStampCache(BaseCacheUsecasesTest):
+    # Disable parallel testing due to envvars modification
+    _numba_parallel_test_ = False
+
+    def setUp(self):
+        super(TestContentStampCache, self).setUp()
+        self._old_stamp = os.environ.get('NUMBA_CACHE_STAMP')
+        os.environ['NUMBA_CACHE_STAMP'] = 'content'
+        config.reload_config()
+
+    def tearDown(self):
+        if self._old_stamp is None:
+            del os.environ['NUMBA_CACHE_STAMP']
+        else:
+            os.environ['NUMBA_CACHE_STAMP'] = self._old_stamp
+        config.reload_config()
+        super(TestContentStampCache, self).tearDown()
+
+    def append_source(self, text):
+        with open(self.modfile, "a") as f:
+            f.write(text)
+
+    def test_unrelated_changes(self):
+        mod = self.import_module()
+        self.assertPreciseEqual(mod.add_usecase(2, 3), 6)
+        self.assertPreciseEqual(mod.outer(3, 2), 2)
+        self.check_hits(mod.add_usecase, 0, 1)
+
+        # Neither touching the file nor adding code invalidates the cache
+        os.utime(self.modfile, None)
+        self.append_source("\ndef unrelated():\n    pass\n")
+        mod = self.import_module()
+        self.assertPreciseEqual(mod.add_usecase(2, 3), 6)
+        self.check_hits(mod.add_usecase, 1, 0)
+        self.assertPreciseEqual(mod.outer(3, 2), 2)
+        self.check_hits(mod.outer, 1, 0)
+
+        # Check the code runs ok from another process
+        self.run_in_separate_process()
+
+    def test_global_change(self):
+        mod = self.import_module()
+        self.assertPreciseEqual(mod.add_usecase(2, 3), 6)
+
+        self.append_source("\nZ = 10\n")
+        mod = self.import_module()
+        self.assertPreciseEqual(mod.add_usecase(2, 3), 15)
+        self.check_hits(mod.add_usecase, 0, 1)
+
+    def test_callee_change(self):
+        mod = self.import_module()
+        self.assertPreciseEqual(mod.outer(3, 2), 2)
+        self.assertPreciseEqual(mod.add_usecase(2, 3), 6)
+
+        # Redefining the callee invalidates the caller only
+        self.append_source("""
+@jit(cache=True, nopython=True)
+def inner(x, y):
+    return x * y
+""")
+        mod = self.import_module()
+        self.assertPreciseEqual(mod.outer(3, 2), -6)
+        self.check_hits(mod.outer, 0, 1)
+        self.assertPreciseEqual(mod.add_usecase(2, 3), 6)
+        self.check_hits(mod.add_usecase, 1, 0)
+
+
+class TestCacheWarmup(BaseCacheUsecasesTest):
+
+    def populate_cache(self):
+        mod = self.import_module()
+        mod.add_usecase(2, 3)
+        mod.add_usecase(2.5, 3.5)
+        mod.add_objmode_usecase(2, 3)
+        self.check_pycache(5)  # 2 index, 3 data
+
+    def test_warmup_dispatcher(self):
+        self.populate_cache()
+        mod = self.import_module()
+        f = mod.add_usecase
+        self.assertEqual(len(f.cached_signatures()), 2)
+        self.assertEqual(len(f.overloads), 0)
+        res = numba.warmup(f, threads=2).result()
+        self.assertEqual(res, 2)
+        self.assertEqual(len(f.overloads), 2)
+        self.check_hits(f, 2, 0)
+        # Calls don't need to load from the cache anymore
+        self.assertPreciseEqual(f(2, 3), 6)
+        self.assertPreciseEqual(f(2.5, 3.5), 7.0)
+        self.check_hits(f, 2, 0)
+        # Warming up again is a no-op
+        self.assertEqual(f.warmup(), 2)
+        self.check_hits(f, 2, 0)
+        # Nothing was compiled
+        self.check_pycache(5)
+
+    def test_warmup_module(self):
+        self.populate_cache()
+        mod = self.import_module()
+        res = numba.warmup(mod).result()
+        self.assertEqual(res, 3)
+        self.check_hits(mod.add_usecase, 2, 0)
+        self.check_hits(mod.add_objmode_usecase, 1, 0)
+        self.assertEqual(len(mod.outer.overloads), 0)
+        self.assertPreciseEqual(mod.add_objmode_usecase(2, 3), 6)
+        self.check_hits(mod.add_objmode_usecase, 1, 0)
+
+    def test_warmup_stale(self):
+        self.populate_cache()
+        # Invalidate the cache
+        with open(self.modfile, "a") as f:
+            f.write("\nZ = 10\n")
+        mod = self.import_module()
+        self.assertEqual(mod.add_usecase.cached_signatures(), [])
+        self.assertEqual(numba.warmup(mod).result(), 0)
+        self.assertPreciseEqual(mod.add_usecase(2, 3), 15)
+
+    def test_warmup_errors(self):
+        with self.assertRaises(TypeError) as raises:
+            numba.warmup([dummy])
+        self.assertIn("expected a module or a dispatcher",
+                      str(raises.exception))
+
+
+class TestSiteCache(BaseCacheUsecasesTest):
+    # Disable parallel testing due to envvars modification
+    _numba_parallel_test_ = False
+
+    precompile_source = """if 1:
+        from numba import njit
+
+        @njit("float64(float64)", cache=True)
+        def declared(x):
+            return x * 2
+
+        @njit(cache=True)
+        def lazy(x):
+            return x * 3
+        """
+
+    def setUp(self):
+        super(TestSiteCache, self).setUp()
+        self.site_dir = os.path.join(self.tempdir, "site_cache")
+        self._old_site_dirs = os.environ.get('NUMBA_CACHE_SITE_DIRS')
+
+    def tearDown(self):
+        if self._old_site_dirs is None:
+            os.environ.pop('NUMBA_CACHE_SITE_DIRS', None)
+        else:
+            os.environ['NUMBA_CACHE_SITE_DIRS'] = self._old_site_dirs
+        config.reload_config()
+        super(TestSiteCache, self).tearDown()
+
+    def set_site_dirs(self, *dirs):
+        os.environ['NUMBA_CACHE_SITE_DIRS'] = os.pathsep.join(dirs)
+        config.reload_config()
+
+    def site_cache_contents(self):
+        res = []
+        for dirpath, dirnames, filenames in os.walk(self.site_dir):
+            res.extend(filenames)
+        return res
+
+    def test_site_cache(self):
+        # Populate the site cache from another process
+        with override_env_config('NUMBA_CACHE_DIR', self.site_dir):
+            self.run_in_separate_process()
+        self.assertTrue(self.site_cache_contents())
+        self.check_pycache(0)
+
+        self.set_site_dirs(os.path.join(self.tempdir, "missing"),
+                           self.site_dir)
+        mod = self.import_module()
+        f = mod.add_usecase
+        self.assertPreciseEqual(f(2, 3), 6)
+        self.check_hits(f, 1, 0)
+        self.assertEqual(len(f.cached_signatures()), 1)
+        # Nothing was written into the writable cache
+        self.check_pycache(0)
+
+        # New signatures are saved into the writable cache
+        self.assertPreciseEqual(f(2.5, 3), 6.5)
+        self.check_hits(f, 1, 1)
+        self.check_pycache(2)  # 1 index, 1 data
+        mod = self.import_module()
+        f = mod.add_usecase
+        self.assertEqual(len(f.cached_signatures()), 2)
+        self.assertPreciseEqual(f(2.5, 3), 6.5)
+        self.check_hits(f, 1, 0)
+
+    def test_site_cache_stats(self):
+        with override_env_config('NUMBA_CACHE_DIR', self.site_dir):
+            self.run_in_separate_process()
+        site_mtimes = dict(
+            (os.path.join(dirpath, fn),
+             os.path.getmtime(os.path.join(dirpath, fn)))
+            for dirpath, _, filenames in os.walk(self.site_dir)
+            for fn in filenames)
+
+        self.set_site_dirs(self.site_dir, self.site_dir)
+        with override_env_config('NUMBA_CACHE_STATS', '1'):
+            mod = self.import_module()
+            f = mod.add_usecase
+            self.assertPreciseEqual(f(2, 3), 6)
+            self.assertPreciseEqual(f(2.5, 3), 6.5)
+            self.check_hits(f, 1, 1)
+            [stats] = get_cache_stats(self.cache_dir)
+        # The usage of the site caches isn't recorded, and a lookup missing
+        # in all the tiers is counted once
+        for path, mtime in site_mtimes.items():
+            self.assertEqual(os.path.getmtime(path), mtime, path)
+        self.assertEqual(stats.misses, 1)
+
+    def test_recompile(self):
+        with override_env_config('NUMBA_CACHE_DIR', self.site_dir):
+            self.run_in_separate_process()
+        self.set_site_dirs(self.site_dir)
+        mod = self.import_module()
+        f = mod.add_usecase
+        mod.Z = 10
+        self.assertPreciseEqual(f(2, 3), 6)
+        # Recompiling ignores the site cache
+        f.recompile()
+        self.assertPreciseEqual(f(2, 3), 15)
+
+    def test_precompile_package(self):
+        modname = "site_cache_precompile_fodder"
+        with open(os.path.join(self.tempdir, modname + ".py"), "w") as f:
+            f.write(self.precompile_source)
+        self.addCleanup(sys.modules.pop, modname, None)
+
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join([self.tempdir] + sys.path)
+        cmd = [sys.executable, '-m', 'numba', '--precompile-cache', modname,
+               '--cache-dir', self.site_dir]
+        popen = subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                                 stderr=subprocess.PIPE, env=env)
+        out, err = popen.communicate()
+        self.assertEqual(popen.returncode, 0, err.decode())
+        out = out.decode()
+        self.assertIn("%s.declared" % modname, out)
+        self.assertIn("1 signature(s)", out)
+        self.assertIn("skipped (no declared signatures)", out)
+        self.assertTrue(self.site_cache_contents())
+
+        self.set_site_dirs(self.site_dir)
+        mod = import_dynamic(modname)
+        self.check_hits(mod.declared, 1, 0)
+        self.assertPreciseEqual(mod.declared(2.0), 4.0)
+        self.check_pycache(0)
+
+
+class TestPackedCache(BaseCacheUsecasesTest):
+    # Disable parallel testing due to envvars modification
+    _numba_parallel_test_ = False
+
+    def setUp(self):
+        super(TestPackedCache, self).setUp()
+        self._old_format = os.environ.get('NUMBA_CACHE_FORMAT')
+        os.environ['NUMBA_CACHE_FORMAT'] = 'packed'
+        config.reload_config()
+
+    def tearDown(self):
+        if self._old_format is None:
+            del os.environ['NUMBA_CACHE_FORMAT']
+        else:
+            os.environ['NUMBA_CACHE_FORMAT'] = self._old_format
+        config.reload_config()
+        super(TestPackedCache, self).tearDown()
+
+    def test_caching(self):
+        self.check_pycache(0)
+        mod = self.import_module()
+        self.check_pycache(0)
+
+        f = mod.add_usecase
+        self.assertPreciseEqual(f(2, 3), 6)
+        self.check_pycache(2)  # 1 pack, 1 lock
+        self.assertPreciseEqual(f(2.5, 3), 6.5)
+        f = mod.add_objmode_usecase
+        self.assertPreciseEqual(f(2, 3), 6)
+        self.assertPreciseEqual(f(2.5, 3), 6.5)
+        self.check_pycache(2)  # same
+        self.assertIsInstance(f._cache._cache_file, PackedCacheFile)
+
+        mod2 = self.import_module()
+        f = mod2.add_usecase
+        f(2, 3)
+        self.check_hits(f, 1, 0)
+        f(2.5, 3.5)
+        self.check_hits(f, 2, 0)
+        f = mod2.add_objmode_usecase
+        f(2, 3)
+        self.check_hits(f, 1, 0)
+
+        # Check the code runs ok from another process
+        self.run_in_separate_process()
+        self.check_pycache(2)
+
+    def test_cache_invalidate(self):
+        mod = self.import_module()
+        f = mod.add_usecase
+        self.assertPreciseEqual(f(2, 3), 6)
+
+        # This should change the functions' results
+        with open(self.modfile, "a") as f:
+            f.write("\nZ = 10\n")
+
+        mod = self.import_module()
+        f = mod.add_usecase
+        self.assertPreciseEqual(f(2, 3), 15)
+        self.check_hits(f, 0, 1)
+
+    def test_recompile(self):
+        # Explicit call to recompile() should overwrite the cache
+        mod = self.import_module()
+        f = mod.add_usecase
+        self.assertPreciseEqual(f(2, 3), 6)
+
+        mod = self.import_module()
+        f = mod.add_usecase
+        mod.Z = 10
+        self.assertPreciseEqual(f(2, 3), 6)
+        f.recompile()
+        self.assertPreciseEqual(f(2, 3), 15)
+
+        # Freshly recompiled version is re-used from other imports
+        mod = self.import_module()
+        f = mod.add_usecase
+        self.assertPreciseEqual(f(2, 3), 15)
+        self.check_hits(f, 1, 0)
+
+    def test_many_overloads(self):
+        # Enough entries to force the pack file to grow its table
+        mod = self.import_module()
+        f = mod.add_usecase
+        cache_file = f._cache._cache_file
+        pack = cache_file._pack
+        nslots = pack._initial_slots
+        for i in range(nslots):
+            cache_file.save(('dummy', i), i)
+        for i in range(nslots):
+            self.assertEqual(cache_file.load(('dummy', i)), i)
+        self.assertIsNone(cache_file.load(('dummy', nslots)))
+        self.assertGreater(pack._read_header()[0], nslots)
+        cache_file.flush()
+        self.assertIsNone(cache_file.load(('dummy', 0)))
+
+
+class TestCacheEviction(BaseCacheUsecasesTest):
+    # Disable parallel testing due to envvars modification
+    _numba_parallel_test_ = False
+
+    def setUp(self):
+        super(TestCacheEviction, self).setUp()
+        self._old_environ = {}
+
+    def tearDown(self):
+        for name, value in self._old_environ.items():
+            if value is None:
+                del os.environ[name]
+            else:
+                os.environ[name] = value
+        config.reload_config()
+        super(TestCacheEviction, self).tearDown()
+
+    def set_env(self, **kwargs):
+        for name, value in kwargs.items():
+            self._old_environ.setdefault(name, os.environ.get(name))
+            os.environ[name] = value
+        config.reload_config()
+
+    def compile_overloads(self, f):
+        self.assertPreciseEqual(f(2, 3), 6)
+        self.assertPreciseEqual(f(2.5, 3), 6.5)
+        self.assertPreciseEqual(f(2j, 3), 6 + 2j)
+
+    def test_max_entries(self):
+        self.set_env(NUMBA_CACHE_MAX_ENTRIES='2')
+        mod = self.import_module()
+        f = mod.add_usecase
+        self.compile_overloads(f)
+        self.check_pycache(4)  # 1 index, 2 data, 1 index lock
+        [stats] = get_cache_stats(self.cache_dir)
+        self.assertEqual(stats.format, 'index')
+        self.assertEqual(stats.evictions, 1)
+        [func] = stats.functions
+        self.assertEqual(func.entries, 2)
+
+        # The least recently used overload was evicted
+        mod = self.import_module()
+        f = mod.add_usecase
+        f(2.5, 3)
+        f(2j, 3)
+        self.check_hits(f, 2, 0)
+        f(2, 3)
+        self.check_hits(f, 2, 1)
+
+    def test_max_size(self):
+        mod = self.import_module()
+        self.compile_overloads(mod.add_usecase)
+        [stats] = get_cache_stats(self.cache_dir)
+        [func] = stats.functions
+        self.assertEqual(func.entries, 3)
+        self.set_env(NUMBA_CACHE_MAX_SIZE=str(func.size // 2))
+        mod = self.import_module()
+        self.assertPreciseEqual(mod.add_usecase(2, 3), 6)
+        self.assertPreciseEqual(mod.add_objmode_usecase(2, 3), 6)
+        [stats] = get_cache_stats(self.cache_dir)
+        self.assertLessEqual(sum(func.size for func in stats.functions),
+                             config.CACHE_MAX_SIZE)
+        self.assertGreater(stats.evictions, 0)
+
+    def test_within_bounds(self):
+        # Saves only scan the indices when the files are over the bounds
+        self.set_env(NUMBA_CACHE_MAX_ENTRIES='10')
+        mod = self.import_module()
+        self.compile_overloads(mod.add_usecase)
+        [stats] = get_cache_stats(self.cache_dir)
+        self.assertEqual(stats.evictions, 0)
+        [func] = stats.functions
+        within_bounds = IndexDataCacheFile._within_bounds
+        self.assertTrue(within_bounds(self.cache_dir, 0, 3))
+        self.assertFalse(within_bounds(self.cache_dir, 0, 2))
+        self.assertTrue(within_bounds(self.cache_dir, 10 * func.size, 0))
+        self.assertFalse(within_bounds(self.cache_dir, func.size, 0))
+
+    def test_stats(self):
+        self.set_env(NUMBA_CACHE_STATS='1')
+        mod = self.import_module()
+        f = mod.add_usecase
+        self.assertPreciseEqual(f(2, 3), 6)
+        mod = self.import_module()
+        f = mod.add_usecase
+        f(2, 3)
+        f(2, 3)
+        f(2.5, 3)
+        [stats] = get_cache_stats(self.cache_dir)
+        [func] = stats.functions
+        self.assertIn('add_usecase', func.name)
+        self.assertEqual(func.entries, 2)
+        self.assertEqual(func.hits, 1)
+        # One miss per compiled overload
+        self.assertEqual(stats.misses, 2)
+        self.assertEqual(stats.evictions, 0)
+
+    def test_stats_untracked(self):
+        # Without a bound or NUMBA_CACHE_STATS, loads don't write the index
+        mod = self.import_module()
+        self.assertPreciseEqual(mod.add_usecase(2, 3), 6)
+        mtimes = self.get_cache_mtimes()
+        mod = self.import_module()
+        mod.add_usecase(2, 3)
+        self.assertEqual(self.get_cache_mtimes(), mtimes)
+        [stats] = get_cache_stats(self.cache_dir)
+        self.assertEqual(stats.functions[0].hits, 0)
+
+    def test_stale_files(self):
+        self.set_env(NUMBA_CACHE_MAX_ENTRIES='10')
+        stale = os.path.join(self.cache_dir, 'gone-1.py00.1.nbc')
+        os.makedirs(self.cache_dir)
+        with open(stale, 'wb') as f:
+            f.write(b'x' * 100)
+        old = time.time() - 3600
+        os.utime(stale, (old, old))
+        [stats] = get_cache_stats(self.cache_dir)
+        self.assertEqual(stats.stale_size, 100)
+        self.set_env(NUMBA_CACHE_MAX_SIZE='1')
+        mod = self.import_module()
+        mod.add_usecase(2, 3)
+        self.assertFalse(os.path.exists(stale))
+
+    def test_packed(self):
+        self.set_env(NUMBA_CACHE_FORMAT='packed', NUMBA_CACHE_MAX_ENTRIES='2')
+        mod = self.import_module()
+        f = mod.add_usecase
+        self.compile_overloads(f)
+        [stats] = get_cache_stats(self.cache_dir)
+        self.assertEqual(stats.format, 'packed')
+        self.assertEqual(stats.evictions, 1)
+        [func] = stats.functions
+        self.assertIn('add_usecase', func.name)
+        self.assertEqual(func.entries, 2)
+
+        mod = self.import_module()
+        f = mod.add_usecase
+        f(2j, 3)
+        f(2, 3)
+        self.check_hits(f, 1, 1)
+        [stats] = get_cache_stats(self.cache_dir)
+        self.assertEqual(stats.misses, 4)
+        self.assertEqual(stats.functions[0].hits, 1)
+
+
 class TestMultiprocessCache(BaseCacheTest):
 
     # Nested multiprocessing.Pool raises AssertionError:
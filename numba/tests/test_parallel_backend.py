@@ -272,7 +272,7 @@ class TestParallelBackendBase(TestCase):
         'concurrent_mix_use_masks': mask_impls,
     }
 
-    safe_backends = {'omp', 'tbb'}
+    safe_backends = {'omp', 'tbb', 'workqueue'}
 
     def run_compile(self, fnlist, parallelism='threading'):
         self._cache_dir = temp_directory(self.__class__.__name__)
@@ -415,11 +415,6 @@ class TestSpecificBackend(TestInSubprocess, TestParallelBackendBase):
                             sys.platform.startswith('linux')):
                         continue
 
-                    # workqueue is not thread safe
-                    if (p in ('threading', 'random') and
-                            backend == 'workqueue'):
-                        continue
-
                     cls._inject(p, name, backend, backend_guard)
 
 
@@ -582,9 +577,9 @@ class TestMiscBackendIssues(ThreadLayerTestHelper):
             print(out, err)
         self.assertIn("@tbb@", out)
 
-    def test_workqueue_aborts_on_nested_parallelism(self):
+    def test_workqueue_nested_parallelism(self):
         """
-        Tests workqueue raises sigabrt if a nested parallel call is performed
+        Tests workqueue supports nested parallel calls
         """
         runme = """if 1:
             from numba import njit, prange
@@ -603,24 +598,216 @@ class TestMiscBackendIssues(ThreadLayerTestHelper):
                     nested(Z[i])
                 return Z
 
-            main()
+            np.testing.assert_equal(main(), np.ones((5, 10)))
+            print("OK")
         """
         cmdline = [sys.executable, '-c', runme]
         env = os.environ.copy()
         env['NUMBA_THREADING_LAYER'] = "workqueue"
         env['NUMBA_NUM_THREADS'] = "4"
+        out, err = self.run_cmd(cmdline, env=env)
+        if self._DEBUG:
+            print(out, err)
+        self.assertIn("OK", out)
 
-        try:
+    def test_workqueue_concurrent_launches(self):
+        """
+        Tests workqueue supports parallel calls from several threads at once
+        """
+        runme = """if 1:
+            import threading
+            from numba import njit, prange
+            import numpy as np
+
+            @njit(parallel=True, nogil=True)
+            def work(x):
+                acc = 0.
+                for i in prange(len(x)):
+                    acc += x[i]
+                return acc
+
+            x = np.arange(100000.)
+            expected = x.sum()
+            results = []
+
+            def run():
+                for i in range(50):
+                    results.append(work(x))
+
+            work(x)
+            threads = [threading.Thread(target=run) for i in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            assert len(results) == 400
+            np.testing.assert_allclose(results, expected)
+            print("OK")
+        """
+        cmdline = [sys.executable, '-c', runme]
+        env = os.environ.copy()
+        env['NUMBA_THREADING_LAYER'] = "workqueue"
+        env['NUMBA_NUM_THREADS'] = "4"
+        out, err = self.run_cmd(cmdline, env=env)
+        if self._DEBUG:
+            print(out, err)
+        self.assertIn("OK", out)
+
+
+@skip_parfors_unsupported
+class TestThreadAffinity(ThreadLayerTestHelper):
+    """
+    Checks the pinning of the threads and the first-touch scheduling
+    """
+    _DEBUG = False
+
+    backends = {'tbb': skip_no_tbb,
+                'omp': skip_no_omp,
+                'workqueue': unittest.skipIf(False, '')}
+
+    def test_parse_cpu_list(self):
+        from numba.np.ufunc.parallel import _parse_cpu_list
+        self.assertEqual(_parse_cpu_list('0-3,8, 10-11,'),
+                         [0, 1, 2, 3, 8, 10, 11])
+        self.assertEqual(_parse_cpu_list(''), [])
+        with self.assertRaises(ValueError):
+            _parse_cpu_list('0-a')
+
+    def test_compute_thread_affinity(self):
+        from numba.np.ufunc.parallel import (_compute_thread_affinity,
+                                             _get_available_cpus)
+        available = _get_available_cpus()
+        self.assertEqual(_compute_thread_affinity(''), [])
+        self.assertEqual(_compute_thread_affinity('compact'), available)
+        self.assertEqual(sorted(_compute_thread_affinity('Scatter')),
+                         available)
+        cpu = str(available[-1])
+        self.assertEqual(_compute_thread_affinity(cpu), [available[-1]])
+        for policy in ('spread', '1-', str(max(available) + 1)):
+            with self.assertRaises(ValueError) as raises:
+                _compute_thread_affinity(policy)
+            self.assertIn("Invalid thread affinity", str(raises.exception))
+
+    @classmethod
+    def _inject(cls, backend, backend_guard):
+
+        def test_template(self):
+            body = """if 1:
+                from numba import prange, get_thread_affinity
+
+                @njit(parallel=True)
+                def init(n):
+                    x = np.empty(n)
+                    for i in prange(n):
+                        x[i] = i
+                    return x
+
+                @njit(parallel=True)
+                def total(x):
+                    acc = 0.
+                    for i in prange(len(x)):
+                        acc += x[i]
+                    return acc
+
+                x = init(100000)
+                for i in range(10):
+                    assert total(x) == x.sum()
+                assert numba.threading_layer() == '%s'
+                print("@%%s@" %% get_thread_affinity())
+            """
+            runme = self.template % (body % backend)
+            cmdline = [sys.executable, '-c', runme]
+            env = os.environ.copy()
+            env['NUMBA_THREADING_LAYER'] = str(backend)
+            env['NUMBA_NUM_THREADS'] = "4"
+            env['NUMBA_THREAD_AFFINITY'] = "compact"
+            env['NUMBA_FIRST_TOUCH'] = "1"
             out, err = self.run_cmd(cmdline, env=env)
-        except AssertionError as e:
             if self._DEBUG:
                 print(out, err)
-            e_msg = str(e)
-            self.assertIn("failed with code", e_msg)
-            # raised a SIGABRT, but the value is platform specific so just check
-            # the error message
-            self.assertIn("Terminating: Nested parallel kernel launch detected",
-                          e_msg)
+            from numba.np.ufunc.parallel import _get_available_cpus
+            if _osx:
+                # The threads cannot be pinned on macOS
+                self.assertIn("NUMBA_THREAD_AFFINITY is ignored", err)
+                self.assertIn("@[]@", out)
+            else:
+                self.assertIn("@%s@" % _get_available_cpus(), out)
+        injected_test = "test_thread_affinity_%s" % backend
+        setattr(cls, injected_test, backend_guard(test_template))
+
+        def test_placement_template(self):
+            body = """if 1:
+                import ctypes
+                import threading
+                from numba import prange, get_thread_affinity
+
+                libc = ctypes.CDLL(None)
+                pthread_self = libc.pthread_self
+                pthread_self.restype = ctypes.c_ulong
+                pthread_self.argtypes = []
+                sched_getcpu = libc.sched_getcpu
+                sched_getcpu.restype = ctypes.c_int
+                sched_getcpu.argtypes = []
+
+                @njit(parallel=True)
+                def placement(n):
+                    threads = np.empty(n, np.uint64)
+                    cpus = np.empty(n, np.int64)
+                    for i in prange(n):
+                        threads[i] = pthread_self()
+                        cpus[i] = sched_getcpu()
+                    return threads, cpus
+
+                n = 10 ** 6
+                threads1, cpus1 = placement(n)
+                threads2, cpus2 = placement(n)
+                assert numba.threading_layer() == '%s'
+                launcher = threading.get_ident()
+                affinity = get_thread_affinity()
+
+                # Each worker stays on the one CPU it is pinned to, the
+                # launching thread isn't pinned
+                threads = np.concatenate((threads1, threads2))
+                cpus = np.concatenate((cpus1, cpus2))
+                workers = np.unique(threads[threads != launcher])
+                assert len(workers), "no iteration ran on a worker"
+                for worker in workers:
+                    on = np.unique(cpus[threads == worker])
+                    assert len(on) == 1 and on[0] in affinity, (worker, on)
+
+                # With first-touch scheduling, the workers run the same
+                # iterations on every call, while the launching thread may
+                # take over those of the workers not started yet
+                if numba.threading_layer() != 'tbb':
+                    both = (threads1 != launcher) & (threads2 != launcher)
+                    assert both.any(), "no iteration ran on a worker twice"
+                    assert (threads1[both] == threads2[both]).all()
+                print("@placement ok@")
+            """
+            runme = self.template % (body % backend)
+            cmdline = [sys.executable, '-c', runme]
+            env = os.environ.copy()
+            env['NUMBA_THREADING_LAYER'] = str(backend)
+            env['NUMBA_NUM_THREADS'] = "4"
+            env['NUMBA_THREAD_AFFINITY'] = "compact"
+            env['NUMBA_FIRST_TOUCH'] = "1"
+            out, err = self.run_cmd(cmdline, env=env)
+            if self._DEBUG:
+                print(out, err)
+            self.assertIn("@placement ok@", out)
+        injected_test = "test_thread_placement_%s" % backend
+        linux_guard = unittest.skipUnless(sys.platform.startswith('linux'),
+                                          "sched_getcpu() is Linux only")
+        setattr(cls, injected_test,
+                linux_guard(backend_guard(test_placement_template)))
+
+    @classmethod
+    def generate(cls):
+        for backend, backend_guard in cls.backends.items():
+            cls._inject(backend, backend_guard)
+
+
+TestThreadAffinity.generate()
 
 
 # 32bit or windows py27 (not that this runs on windows)
@@ -20,6 +20,9 @@ from collections import defaultdict
 
 import numba.parfors.parfor
 from numba import njit, prange, set_num_threads, get_num_threads
+from numba.np.ufunc.parallel import _get_thread_id
+from numba.parfors.parfor_profile import (get_profiles as get_parfor_profiles,
+                                          format_profiles as format_parfor_profiles)
 from numba.core import types, utils, typing, errors, ir, rewrites, typed_passes, inline_closurecall, config, compiler, cpu
 from numba.core.registry import cpu_target
 from numba.core.annotations import type_annotations
@@ -43,6 +46,38 @@ x86_only = unittest.skipIf(platform.machine() not in ('i386', 'x86_64'), 'x86 on
 _GLOBAL_INT_FOR_TESTING1 = 17
 _GLOBAL_INT_FOR_TESTING2 = 5
 
+
+@numba.reduction(identity=(np.inf, -1))
+def _argmin_reduction(a, b):
+    # keeps the first minimum since partial results are combined in order
+    return b if b[0] < a[0] else a
+
+
+@numba.reduction(identity=(0, 0., 0.))
+def _welford_reduction(a, b):
+    # combines (count, mean, sum of squared deviations) triples
+    n = a[0] + b[0]
+    if n == 0:
+        return a
+    delta = b[1] - a[1]
+    mean = a[1] + delta * b[0] / n
+    m2 = a[2] + b[2] + delta * delta * a[0] * b[0] / n
+    return (n, mean, m2)
+
+
+@numba.reduction(identity=1)
+def _lcm_reduction(a, b):
+    x, y = a, b
+    while y:
+        x, y = y, x % y
+    return a // x * b
+
+
+@numba.reduction(identity=-np.inf)
+def _max_reduction(a, b):
+    return max(a, b)
+
+
 class TestParforsBase(TestCase):
     """
     Base class for testing parfors.
@@ -1386,6 +1421,173 @@ class TestParfors(TestParforsBase):
 
         self.check(test_impl, 100)
 
+    @skip_parfors_unsupported
+    def test_user_reduction(self):
+        def argmin(a):
+            best = (np.inf, -1)
+            for i in numba.prange(a.shape[0]):
+                best = _argmin_reduction(best, (a[i], i))
+            return best
+
+        def variance(a):
+            acc = (0, 0., 0.)
+            for i in numba.prange(a.shape[0]):
+                acc = _welford_reduction(acc, (1, a[i], 0.))
+            return acc[2] / acc[0]
+
+        def lcm(a):
+            acc = 1
+            for i in numba.prange(a.shape[0]):
+                acc = _lcm_reduction(acc, a[i])
+            return acc
+
+        a = np.cos(np.arange(100.))
+        # repeated minimum, the first one is expected
+        a[[17, 70]] = -2.
+        self.check(argmin, a)
+        self.check(variance, a)
+        self.check(lcm, np.arange(1, 16))
+
+    @skip_parfors_unsupported
+    def test_user_reduction_initial_value(self):
+        # the value before the loop is combined with the partial results
+        def test_impl(a):
+            acc = 6
+            for i in numba.prange(a.shape[0]):
+                acc = _lcm_reduction(acc, a[i])
+            return acc
+
+        self.check(test_impl, np.array([4, 10, 15]))
+
+    @skip_parfors_unsupported
+    def test_user_reduction_identity(self):
+        with self.assertRaises(TypeError) as raises:
+            numba.reduction(identity=[0])(lambda a, b: a + b)
+        self.assertIn("Reduction identity must be a number or a tuple of "
+                      "numbers", str(raises.exception))
+
+    @skip_parfors_unsupported
+    def test_cumulative(self):
+        def test_cumsum(a):
+            return np.cumsum(a)
+
+        def test_cumprod(a):
+            return a.cumprod()
+
+        def test_cumsum_axis(a, axis):
+            return np.cumsum(a, axis=axis)
+
+        def test_cumprod_axis(a, axis):
+            return np.cumprod(a, axis)
+
+        for a in (np.arange(1000.), np.arange(1001) % 7, np.ones(3),
+                  np.arange(24.).reshape((4, 6)).T):
+            self.check(test_cumsum, a)
+            self.check(test_cumprod, (a % 3 + 1) / 2)
+        a = np.arange(60.).reshape((3, 4, 5))
+        for axis in (0, 1, 2, -1):
+            self.check(test_cumsum_axis, a, axis)
+            self.check(test_cumprod_axis, (a % 3 + 1) / 2, axis)
+        self.check(test_cumsum_axis, np.arange(10000.).reshape((2, 5000)), 1)
+        self.check(test_cumsum_axis, np.ones((5, 0)), 1)
+        self.assertTrue(countParfors(test_cumsum,
+                                     (types.float64[::1],)) >= 1)
+
+    @skip_parfors_unsupported
+    def test_scan(self):
+        def test_impl(a):
+            return numba.scan(_lcm_reduction, a)
+
+        def test_impl_axis(a, axis):
+            return numba.scan(_max_reduction, a, axis=axis)
+
+        self.check(test_impl, np.arange(1, 200) % 12 + 1)
+        a = np.sin(np.arange(3000.)).reshape((3, 1000))
+        self.check(test_impl_axis, a, 1)
+        self.check(test_impl_axis, a, 0)
+        self.assertTrue(countParfors(test_impl,
+                                     (types.int64[::1],)) >= 1)
+
+    def test_scan_not_reduction(self):
+        @njit
+        def add(a, b):
+            return a + b
+
+        with self.assertRaises(TypeError) as raises:
+            numba.scan(add, np.arange(3))
+        self.assertIn("scan() needs a reduction operator declared with "
+                      "numba.reduction()", str(raises.exception))
+
+    @skip_parfors_unsupported
+    def test_sort(self):
+        def test_np_sort(a):
+            return np.sort(a)
+
+        def test_sort_inplace(a):
+            a.sort()
+            return a
+
+        def test_argsort(a):
+            return np.argsort(a)
+
+        def test_argsort_stable(a):
+            return a.argsort(kind='mergesort')
+
+        np.random.seed(0)
+        n = 100003
+        floats = np.random.random(n)
+        floats[np.random.random(n) < 0.1] = np.nan
+        ints = np.random.randint(0, 100, n)
+        for a in (floats, ints, floats[:10], ints[::3], np.ones(0)):
+            self.check(test_np_sort, a)
+            self.check(test_sort_inplace, a)
+        # stable argsorts agree whatever the duplicates, but NaNs compare
+        # less than each other
+        for a in (ints, ints[::3], np.round(np.nan_to_num(floats), 2),
+                  np.ones(0)):
+            self.check(test_argsort_stable, a)
+        for a in (np.random.permutation(n), np.random.permutation(7) * 1.5):
+            self.check(test_argsort, a)
+        for pyfunc in (test_np_sort, test_sort_inplace, test_argsort,
+                       test_argsort_stable):
+            self.assertTrue(countParfors(pyfunc,
+                                         (types.float64[::1],)) >= 1)
+
+    @skip_parfors_unsupported
+    def test_scatter_reduction(self):
+        def test_impl(bins, nbins):
+            hist = np.zeros(nbins, np.int_)
+            for i in numba.prange(bins.shape[0]):
+                hist[bins[i]] += 1
+            return hist
+
+        self.check(test_impl, np.arange(1000) % 7, 7)
+
+    @skip_parfors_unsupported
+    def test_scatter_reduction_variants(self):
+        def two_d(a):
+            acc = np.ones((4, 3))
+            for i in numba.prange(a.shape[0]):
+                acc[i % 4, 2 - i % 3] += a[i]
+            return acc
+
+        def const_index(a):
+            acc = np.zeros(2)
+            for i in numba.prange(a.shape[0]):
+                acc[1] -= a[i]
+            return acc
+
+        def prod(a):
+            acc = np.ones(5)
+            for i in numba.prange(a.shape[0]):
+                acc[i % 5] *= a[i]
+            return acc
+
+        a = np.linspace(0.5, 1.5, 100)
+        self.check(two_d, a)
+        self.check(const_index, a)
+        self.check(prod, a)
+
     @skip_parfors_unsupported
     def test_preparfor_canonicalize_kws(self):
         # test canonicalize_array_math typing for calls with kw args
@@ -2935,6 +3137,200 @@ class TestParforsOptions(TestParforsBase):
                          comprehension=False, setitem=False, prange=False,
                          reduction=False, numpy=False), 0)
 
+    @skip_parfors_unsupported
+    def test_parfor_schedules(self):
+        def skewed(a):
+            # Iterations have very different costs
+            acc = 0.
+            for i in prange(a.shape[0]):
+                for j in range(i % 17 * 10):
+                    acc += a[i] * j
+            return acc
+
+        def nested(a):
+            b = np.empty_like(a)
+            m, n = a.shape
+            for i in prange(m):
+                for j in prange(n):
+                    b[i, j] = a[i, j] * (i + j)
+            return b, b.sum()
+
+        def array_reduction(a):
+            acc = np.zeros(3)
+            for i in prange(a.shape[0]):
+                acc += a[i]
+            return acc
+
+        def offset_range(a, lo, hi):
+            acc = 0
+            for i in prange(lo, hi):
+                acc += a[i]
+            return acc
+
+        cases = [(skewed, (np.arange(1000.),)),
+                 (nested, (np.arange(91.).reshape((7, 13)),)),
+                 (array_reduction, (np.arange(30.).reshape((10, 3)),)),
+                 (offset_range, (np.arange(100), 3, 97)),
+                 (offset_range, (np.arange(100), 50, 50)),
+                 (offset_range, (np.arange(100), -20, -10))]
+        for schedule in ('dynamic', 'guided'):
+            for chunksize in (0, 1, 7, 1000):
+                options = dict(schedule=schedule, chunksize=chunksize)
+                for pyfunc, args in cases:
+                    cfunc = njit(parallel=options)(pyfunc)
+                    np.testing.assert_almost_equal(cfunc(*args),
+                                                   pyfunc(*args))
+                    sig = cfunc.signatures[0]
+                    self.assertIn('@do_dynamic_scheduling',
+                                  cfunc.inspect_llvm(sig))
+
+    @skip_parfors_unsupported
+    def test_parfor_schedule_invalid(self):
+        with self.assertRaises(ValueError) as raises:
+            njit(parallel={'schedule': 'random'})
+        self.assertIn("Expected parallel schedule to be one of",
+                      str(raises.exception))
+        with self.assertRaises(ValueError) as raises:
+            njit(parallel={'chunksize': -1})
+        self.assertIn("Expected parallel chunksize to be a non-negative "
+                      "integer", str(raises.exception))
+
+    @skip_parfors_unsupported
+    def test_parfor_reduction_max_bytes(self):
+        def array_reduction(a):
+            acc = np.zeros(16)
+            for i in prange(a.shape[0]):
+                acc += a[i]
+            return acc
+
+        def scatter_reduction(a):
+            acc = np.zeros(16)
+            for i in prange(a.shape[0]):
+                acc[i % 16] += a[i, 0]
+            return acc
+
+        a = np.arange(800.).reshape((50, 16))
+        # bounds allowing a single copy, a few copies and one per thread
+        for max_bytes in (1, 3 * 16 * 8, 0):
+            options = dict(reduction_max_bytes=max_bytes)
+            for pyfunc in (array_reduction, scatter_reduction):
+                cfunc = njit(parallel=options)(pyfunc)
+                np.testing.assert_almost_equal(cfunc(a), pyfunc(a))
+
+        with self.assertRaises(ValueError) as raises:
+            njit(parallel={'reduction_max_bytes': -1})
+        self.assertIn("Expected parallel reduction_max_bytes to be a "
+                      "non-negative integer", str(raises.exception))
+
+    @skip_parfors_unsupported
+    def test_parfor_serial_threshold(self):
+        def scalar_reduction(a):
+            acc = 0.
+            for i in prange(a.shape[0]):
+                acc += a[i] * i
+            return acc
+
+        def array_reduction(a):
+            acc = np.zeros(3)
+            for i in prange(a.shape[0]):
+                acc += a[i]
+            return acc
+
+        def nested(a):
+            b = np.empty_like(a)
+            m, n = a.shape
+            for i in prange(m):
+                for j in prange(n):
+                    b[i, j] = a[i, j] * (i + j)
+            return b
+
+        def thread_ids(n):
+            tid = np.empty(n, np.int64)
+            for i in prange(n):
+                tid[i] = _get_thread_id()
+            return tid
+
+        cases = [(scalar_reduction, (np.arange(10.),)),
+                 (scalar_reduction, (np.arange(5000.),)),
+                 (array_reduction, (np.arange(30.).reshape((10, 3)),)),
+                 (nested, (np.arange(91.).reshape((7, 13)),)),
+                 (nested, (np.arange(0.).reshape((0, 13)),))]
+        for threshold in (0, 1, 50, 10 ** 6, 'adaptive'):
+            options = dict(serial_threshold=threshold)
+            for pyfunc, args in cases:
+                cfunc = njit(parallel=options)(pyfunc)
+                # adaptive mode changes its mind as it learns the costs
+                for i in range(100 if threshold == 'adaptive' else 1):
+                    np.testing.assert_almost_equal(cfunc(*args),
+                                                   pyfunc(*args))
+                sig = cfunc.signatures[0]
+                self.assertEqual('@choose_serial' in cfunc.inspect_llvm(sig),
+                                 threshold == 'adaptive')
+
+        # small parfors run on the calling thread only
+        cfunc = njit(parallel=dict(serial_threshold=10 ** 6))(thread_ids)
+        self.assertEqual(len(np.unique(cfunc(1000))), 1)
+
+        with override_env_config('NUMBA_PARALLEL_SERIAL_THRESHOLD',
+                                 'adaptive'):
+            cfunc = njit(parallel=True)(scalar_reduction)
+            a = np.arange(100.)
+            self.assertEqual(cfunc(a), scalar_reduction(a))
+            self.assertIn('@choose_serial',
+                          cfunc.inspect_llvm(cfunc.signatures[0]))
+
+        for threshold in (-1, 1.5, 'always'):
+            with self.assertRaises(ValueError) as raises:
+                njit(parallel={'serial_threshold': threshold})
+            self.assertIn("Expected parallel serial_threshold to be a "
+                          "non-negative integer or 'adaptive'",
+                          str(raises.exception))
+
+    @skip_parfors_unsupported
+    def test_parfor_profile(self):
+        def scalar_reduction(a):
+            acc = 0.
+            for i in prange(a.shape[0]):
+                acc += a[i] * i
+            return acc
+
+        a = np.arange(10000.)
+        ncalls = 5
+        with override_env_config('NUMBA_PARFOR_PROFILE', '1'):
+            for options in (True, dict(schedule='dynamic', chunksize=100),
+                            dict(serial_threshold=10 ** 6)):
+                cfunc = njit(parallel=options)(scalar_reduction)
+                for i in range(ncalls):
+                    self.assertEqual(cfunc(a), scalar_reduction(a))
+                profiles = cfunc.parfor_profile(cfunc.signatures[0])
+                self.assertEqual(len(profiles), 1)
+                [profile] = profiles
+                self.assertEqual(profile.calls, ncalls)
+                self.assertGreater(profile.wall_time, 0)
+                self.assertGreaterEqual(profile.imbalance, 1.0)
+                chunks = profile.chunks.sum()
+                if isinstance(options, dict) and 'serial_threshold' in options:
+                    self.assertEqual(profile.serial_calls, ncalls)
+                    self.assertEqual(chunks, ncalls)
+                elif isinstance(options, dict):
+                    self.assertEqual(profile.serial_calls, 0)
+                    self.assertGreaterEqual(chunks, ncalls * 100)
+                else:
+                    self.assertEqual(profile.serial_calls, 0)
+                    self.assertGreaterEqual(chunks, ncalls)
+                self.assertIn(profile, get_parfor_profiles())
+                self.assertIn(profile.loc.short(),
+                              format_parfor_profiles(profiles))
+                profile.reset()
+                self.assertEqual(profile.calls, 0)
+                self.assertEqual(profile.chunks.sum(), 0)
+
+        cfunc = njit(parallel=True)(scalar_reduction)
+        cfunc(a)
+        with self.assertRaises(ValueError) as raises:
+            cfunc.parfor_profile(cfunc.signatures[0])
+        self.assertIn("No parfor profile available", str(raises.exception))
+
 
 class TestParforsBitMask(TestParforsBase):
 
@@ -3248,6 +3644,42 @@ class TestParforsDiagnostics(TestParforsBase):
         diagnostics = cpfunc.metadata['parfor_diagnostics']
         self.assert_diagnostics(diagnostics, hoisted_allocations=1)
 
+    def test_scratch_allocation_hoisting(self):
+        # the scratch array is sized from the shape of an array written by
+        # the loop, and copied into it
+        def test_impl(a):
+            for i in prange(a.shape[0]):
+                tmp = np.empty(a.shape[1])
+                for j in range(a.shape[1]):
+                    tmp[j] = a[i, a.shape[1] - j - 1] + i
+                a[i, :] = tmp
+            return a
+
+        def test_impl_dependent(n):
+            acc = 0.
+            for i in prange(n):
+                tmp = np.ones(i + 1)
+                acc += tmp.sum()
+            return acc
+
+        a = np.arange(35.).reshape((5, 7))
+        self.check(test_impl, a)
+        cpfunc = self.compile_parallel(test_impl, (numba.typeof(a),))
+        diagnostics = cpfunc.metadata['parfor_diagnostics']
+        self.assert_diagnostics(diagnostics, hoisted_allocations=1)
+        self.assertEqual(diagnostics.not_hoisted_allocations(), [])
+
+        self.check(test_impl_dependent, 10)
+        cpfunc = self.compile_parallel(test_impl_dependent, (types.intp,))
+        diagnostics = cpfunc.metadata['parfor_diagnostics']
+        self.assert_diagnostics(diagnostics, hoisted_allocations=0)
+        reasons = [r for _, r in diagnostics.not_hoisted_allocations()]
+        self.assertEqual(reasons, ['dependency'])
+        with captured_stdout() as out:
+            diagnostics.dump(3)
+        self.assertIn("is performed in every iteration of the parallel loop",
+                      out.getvalue())
+
 
 if __name__ == "__main__":
     unittest.main()
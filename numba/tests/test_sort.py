@@ -11,10 +11,12 @@ from numba import jit, njit
 from numba.core import types, utils, errors
 import unittest
 from numba import testing
-from numba.tests.support import TestCase, MemoryLeakMixin, tag
+from numba.tests.support import (TestCase, MemoryLeakMixin, tag,
+                                 skip_parfors_unsupported)
 
 from numba.misc.quicksort import make_py_quicksort, make_jit_quicksort
 from numba.misc.mergesort import make_jit_mergesort
+from numba.misc.parallelsort import MIN_PARALLEL_BLOCK
 from numba.misc.timsort import make_py_timsort, make_jit_timsort, MergeRun
 
 
@@ -68,6 +70,42 @@ def np_argsort_kind_usecase(val, is_stable=False):
     else:
         return np.argsort(val, kind='quicksort')
 
+def sort_parallel_usecase(val):
+    val.sort(kind='parallel')
+
+def np_sort_parallel_usecase(val):
+    return np.sort(val, kind='parallel')
+
+def argsort_parallel_usecase(val):
+    return val.argsort(kind='parallel')
+
+def np_argsort_parallel_usecase(val):
+    return np.argsort(val, kind='parallel')
+
+def radix_sort_usecase(val):
+    val.sort(kind='radix')
+
+def np_radix_sort_usecase(val):
+    return np.sort(val, kind='radix')
+
+def radix_argsort_usecase(val):
+    return val.argsort(kind='radix')
+
+def np_stable_argsort_usecase(val):
+    return np.argsort(val, kind='stable')
+
+def sort_axis_usecase(val, axis):
+    val.sort(axis)
+
+def np_sort_axis_usecase(val, axis):
+    return np.sort(val, axis=axis, kind='radix')
+
+def argsort_axis_usecase(val, axis):
+    return val.argsort(axis=axis, kind='stable')
+
+def np_argsort_axis_usecase(val, axis):
+    return np.argsort(val, axis)
+
 def list_sort_usecase(n):
     np.random.seed(42)
     l = []
@@ -845,6 +883,159 @@ class TestNumpySort(TestCase):
         check(np_argsort_kind_usecase, is_stable=False)
 
 
+@skip_parfors_unsupported
+class TestParallelSort(TestCase):
+
+    _numba_parallel_test_ = False
+
+    def setUp(self):
+        np.random.seed(42)
+
+    def arrays(self):
+        for size in (5, 500, 2 * MIN_PARALLEL_BLOCK + 1,
+                     7 * MIN_PARALLEL_BLOCK):
+            yield np.random.randint(99, size=size)
+            yield np.random.random(size=size) * 100
+            orig = np.random.random(size=size) * 100
+            orig[np.random.random(size=size) < 0.1] = float('nan')
+            yield orig
+        # non-contiguous, and already sorted
+        yield np.random.random(size=6 * MIN_PARALLEL_BLOCK)[::2]
+        yield np.arange(4 * MIN_PARALLEL_BLOCK)
+
+    def test_sort(self):
+        for pyfunc in (sort_parallel_usecase, np_sort_parallel_usecase):
+            cfunc = njit(pyfunc)
+            for orig in self.arrays():
+                expected = np.sort(orig)
+                got = orig.copy()
+                res = cfunc(got)
+                if res is not None:
+                    self.assertPreciseEqual(got, orig)
+                    got = res
+                self.assertPreciseEqual(got, expected)
+
+    def test_argsort(self):
+        for pyfunc in (argsort_parallel_usecase,
+                       np_argsort_parallel_usecase):
+            cfunc = njit(pyfunc)
+            for orig in self.arrays():
+                got = cfunc(orig)
+                self.assertEqual(got.dtype, np.intp)
+                self.assertPreciseEqual(orig[got], np.sort(orig))
+                np.testing.assert_equal(np.sort(got), np.arange(orig.size))
+
+    def test_unsupported_kind(self):
+        def sort_kind(val):
+            val.sort(kind='heapsort')
+
+        def np_argsort_kind(val):
+            return np.argsort(val, kind='heapsort')
+
+        for pyfunc in (sort_kind, np_argsort_kind):
+            with self.assertRaises(errors.TypingError) as raises:
+                njit(pyfunc)(np.arange(3))
+            self.assertIn("Unsupported sort kind 'heapsort'",
+                          str(raises.exception))
+
+
+class TestRadixSort(TestCase):
+
+    def setUp(self):
+        np.random.seed(42)
+
+    def arrays(self):
+        for size in (0, 1, 5, 500):
+            for dtype in (np.int8, np.int16, np.int32, np.int64,
+                          np.uint8, np.uint64):
+                info = np.iinfo(dtype)
+                yield np.random.randint(info.min, info.max, size=size,
+                                        dtype=dtype)
+            yield np.random.randint(50, size=size).astype(np.int64)
+            yield np.random.random(size=size) < 0.5
+            for dtype in (np.float32, np.float64):
+                orig = (np.random.random(size=size) - 0.5) * 100
+                orig[np.random.random(size=size) < 0.1] = 0.0
+                orig[np.random.random(size=size) < 0.1] = -0.0
+                orig[np.random.random(size=size) < 0.1] = np.inf
+                orig[np.random.random(size=size) < 0.1] = -np.inf
+                orig[np.random.random(size=size) < 0.1] = float('nan')
+                yield orig.astype(dtype)
+            orig = np.random.randint(-1000, 1000, size=size)
+            orig = orig.astype('M8[D]')
+            orig[np.random.random(size=size) < 0.1] = np.datetime64('NaT')
+            yield orig
+            yield orig - np.datetime64('2000-01-01')
+        # non-contiguous
+        yield np.random.randint(-1000, 1000, size=100)[::3]
+        yield np.random.random(size=100)[::3]
+
+    def test_sort(self):
+        for pyfunc in (radix_sort_usecase, np_radix_sort_usecase):
+            cfunc = njit(pyfunc)
+            for orig in self.arrays():
+                expected = np.sort(orig)
+                got = orig.copy()
+                res = cfunc(got)
+                if res is not None:
+                    self.assertPreciseEqual(got, orig)
+                    got = res
+                np.testing.assert_array_equal(got, expected)
+
+    def test_argsort(self):
+        for pyfunc in (radix_argsort_usecase, np_stable_argsort_usecase):
+            cfunc = njit(pyfunc)
+            for orig in self.arrays():
+                got = cfunc(orig)
+                self.assertEqual(got.dtype, np.intp)
+                # the radix sort is stable
+                self.assertPreciseEqual(got,
+                                        np.argsort(orig, kind='stable'))
+
+    def test_axis(self):
+        arrays = [np.random.randint(-50, 50, size=(7, 11)),
+                  np.random.random(size=(7, 11)),
+                  np.asfortranarray(np.random.random(size=(7, 11))),
+                  np.random.random(size=(14, 11))[::2]]
+        sort_inplace = njit(sort_axis_usecase)
+        np_sort = njit(np_sort_axis_usecase)
+        argsort = njit(argsort_axis_usecase)
+        np_argsort = njit(np_argsort_axis_usecase)
+        for orig, axis in itertools.product(arrays, (0, 1, -1, -2)):
+            expected = np.sort(orig, axis)
+            got = orig.copy(order='A')
+            sort_inplace(got, axis)
+            np.testing.assert_array_equal(got, expected)
+            got = np_sort(orig, axis)
+            self.assertEqual(got.dtype, orig.dtype)
+            np.testing.assert_array_equal(got, expected)
+            # the stable argsort is the one of Numpy
+            got = argsort(orig, axis)
+            self.assertEqual(got.dtype, np.intp)
+            np.testing.assert_array_equal(
+                got, np.argsort(orig, axis, kind='stable'))
+            got = np_argsort(orig, axis)
+            np.testing.assert_array_equal(
+                np.take_along_axis(orig, got, axis), expected)
+
+    def test_axis_out_of_bounds(self):
+        for pyfunc in (sort_axis_usecase, np_sort_axis_usecase,
+                       argsort_axis_usecase):
+            cfunc = njit(pyfunc)
+            for orig, axis in [(np.arange(3), 1), (np.arange(3), -2),
+                               (np.ones((2, 3)), 2)]:
+                with self.assertRaises(ValueError) as raises:
+                    cfunc(orig, axis)
+                self.assertIn("axis is out of bounds",
+                              str(raises.exception))
+
+    def test_unsupported_dtype(self):
+        with self.assertRaises(errors.TypingError) as raises:
+            njit(np_radix_sort_usecase)(np.ones(3, np.complex128))
+        self.assertIn("Unsupported dtype complex128 for radix sort",
+                      str(raises.exception))
+
+
 class TestPythonSort(TestCase):
 
     def test_list_sort(self):
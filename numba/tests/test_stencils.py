@@ -583,6 +583,248 @@ class TestStencil(TestStencilBase):
                 raise AssertionError("Expected error was not raised")
 
 
+    @skip_unsupported
+    def test_stencil_tile(self):
+        """Tests stencils in parallel mode with tiles of various shapes,
+           including tiles not dividing the iteration space or larger than
+           it.
+        """
+        def kernel(a):
+            return 0.25 * (a[0, 1] + a[1, 0] + a[0, -1] + a[-1, 0])
+
+        def test_impl_seq(A):
+            B = np.zeros_like(A)
+            for i in range(1, A.shape[0] - 1):
+                for j in range(1, A.shape[1] - 1):
+                    B[i, j] = 0.25 * (A[i, j + 1] + A[i + 1, j] +
+                                      A[i, j - 1] + A[i - 1, j])
+            return B
+
+        A = np.arange(37 * 53.).reshape((37, 53))
+        for tile in ((7, 5), (1, 1), (0, 16), (8, 0), (1000, 1000), None):
+            stencil_fn = numba.stencil(kernel, tile=tile)
+
+            def test_impl(A):
+                return stencil_fn(A)
+
+            self.check(test_impl_seq, test_impl, A)
+
+    @skip_unsupported
+    def test_stencil_tile_3d(self):
+        """Tests 3D stencils in parallel mode with the default tiles and
+           explicit ones.
+        """
+        def kernel(a):
+            return (a[-1, 0, 0] + a[1, 0, 0] + a[0, -1, 0] + a[0, 1, 0] +
+                    a[0, 0, -1] + a[0, 0, 1]) / 6.
+
+        def test_impl_seq(A):
+            B = np.zeros_like(A)
+            for i in range(1, A.shape[0] - 1):
+                for j in range(1, A.shape[1] - 1):
+                    for k in range(1, A.shape[2] - 1):
+                        B[i, j, k] = (A[i - 1, j, k] + A[i + 1, j, k] +
+                                      A[i, j - 1, k] + A[i, j + 1, k] +
+                                      A[i, j, k - 1] + A[i, j, k + 1]) / 6.
+            return B
+
+        A = np.random.random((20, 21, 22))
+        for stencil_fn in (numba.stencil(kernel),
+                           numba.stencil(kernel, tile=(2, 3, 4))):
+            def test_impl(A):
+                return stencil_fn(A)
+
+            self.check(test_impl_seq, test_impl, A)
+
+    def test_default_tile_shape(self):
+        from numba.stencils.stencilparfor import _default_tile_shape
+        self.assertIsNone(_default_tile_shape(1, 32768))
+        self.assertIsNone(_default_tile_shape(2, 0))
+        self.assertEqual(_default_tile_shape(2, 32768), (64, 512))
+        self.assertEqual(_default_tile_shape(3, 32768), (8, 8, 512))
+        self.assertEqual(_default_tile_shape(2, 100), (1, 100))
+
+    @skip_unsupported
+    def test_stencil_tile_errors(self):
+        def kernel(a):
+            return a[0, 1] - a[0, -1]
+
+        with self.assertRaises(ValueError) as raises:
+            numba.stencil(kernel, tile=(1, -1))
+        self.assertIn("stencil tile must be a tuple of non-negative integers",
+                      str(raises.exception))
+
+        stencil_fn = numba.stencil(kernel, tile=(4,))
+
+        def test_impl(A):
+            return stencil_fn(A)
+
+        msg = "1 dimensional tile specified for 2 dimensional input array"
+        try:
+            self.compile_parallel(test_impl, (numba.float64[:, :],))
+        except(ValueError, LoweringError) as e:
+            self.assertIn(msg, str(e))
+        else:
+            raise AssertionError("Expected error was not raised")
+
+    # The np.pad modes equivalent to the stencil boundary modes
+    _pad_modes = {'nearest': 'edge', 'wrap': 'wrap', 'reflect': 'symmetric',
+                  'mirror': 'reflect'}
+
+    @skip_unsupported
+    def test_stencil_modes_1d(self):
+        """Tests the boundary modes against padded copies of the input,
+           including arrays smaller than the kernel.
+        """
+        def kernel(a):
+            return a[-2] + 2 * a[0] - a[3]
+
+        for mode, pad_mode in self._pad_modes.items():
+            def test_impl_seq(A):
+                P = np.pad(A, 3, mode=pad_mode)
+                n = A.shape[0]
+                return P[1:n + 1] + 2 * P[3:n + 3] - P[6:n + 6]
+
+            stencil_fn = numba.stencil(kernel, func_or_mode=mode)
+
+            def test_impl(A):
+                return stencil_fn(A)
+
+            for n in (20, 4, 3):
+                self.check(test_impl_seq, test_impl, np.arange(n) ** 2.)
+
+    @skip_unsupported
+    def test_stencil_modes_2d(self):
+        """Tests the boundary modes of 2D stencils, with the default tiles
+           and explicit ones.
+        """
+        def kernel(a):
+            return a[-1, 0] + 2 * a[0, 1] - a[1, -2]
+
+        A = np.arange(13 * 17.).reshape((13, 17)) ** 2
+        for mode, pad_mode in self._pad_modes.items():
+            def test_impl_seq(A):
+                P = np.pad(A, 2, mode=pad_mode)
+                n, m = A.shape
+                return (P[1:n + 1, 2:m + 2] + 2 * P[2:n + 2, 3:m + 3] -
+                        P[3:n + 3, 0:m])
+
+            for stencil_fn in (numba.stencil(kernel, func_or_mode=mode),
+                               numba.stencil(kernel, func_or_mode=mode,
+                                             tile=(4, 5))):
+                def test_impl(A):
+                    return stencil_fn(A)
+
+                self.check(test_impl_seq, test_impl, A)
+
+    @skip_unsupported
+    def test_stencil_modes_out(self):
+        """Tests that the boundary modes write the whole out array.
+        """
+        def kernel(a):
+            return a[0, -1] + a[0, 1]
+
+        stencil_fn = numba.stencil(kernel, func_or_mode='wrap')
+
+        def test_impl_seq(A):
+            return np.roll(A, 1, axis=1) + np.roll(A, -1, axis=1)
+
+        def test_impl(A):
+            B = np.full(A.shape, np.nan)
+            stencil_fn(A, out=B)
+            return B
+
+        self.check(test_impl_seq, test_impl, np.arange(30.).reshape((5, 6)))
+
+    @skip_unsupported
+    def test_stencil_modes_errors(self):
+        with self.assertRaises(ValueError) as raises:
+            numba.stencil('padded')
+        self.assertIn("Unsupported mode style padded", str(raises.exception))
+
+        with self.assertRaises(ValueError) as raises:
+            numba.stencil('wrap', cval=7.)
+        self.assertIn("cval is only supported in mode 'constant'",
+                      str(raises.exception))
+
+        @numba.stencil('nearest')
+        def kernel(a):
+            return np.sum(a[-1:2])
+
+        with self.assertRaises(ValueError) as raises:
+            kernel(np.arange(10.))
+        self.assertIn("Slices in stencil kernel indices are only supported "
+                      "in mode 'constant'", str(raises.exception))
+
+    @skip_unsupported
+    def test_stencil_fusion(self):
+        """Tests that the stencils whose output is only read by another
+           stencil are fused into it, and computed as without fusion.
+        """
+        def kernel1(a):
+            return a[0, 1] + a[0, -1] - 2. * a[-1, 0]
+
+        def kernel2(a, b):
+            return a[1, 0] * b[0, 0] + a[0, -1]
+
+        def kernel3(a):
+            return 3. * a[1, -1] - 1.
+
+        def kernel4(a):
+            return a[-1, 0] + a[1, 0] + a[0, -1] + a[0, 1]
+
+        s1 = numba.stencil(kernel1)
+        s1_cval = numba.stencil(kernel1, cval=1.5)
+        s2 = numba.stencil(kernel2)
+        s2_wrap = numba.stencil(kernel2, func_or_mode='wrap')
+        s3 = numba.stencil(kernel3, cval=-2.)
+        s4 = numba.stencil(kernel4)
+
+        def test_impl1(A):
+            return s2(s1(A), A)
+
+        def test_impl2(A):
+            B = s1_cval(A)
+            return s2(B, A)
+
+        def test_impl3(A):
+            # the innermost stencil would be computed 6 times per element
+            return s2(s1(s1(A)), A)
+
+        def test_impl4(A):
+            return s2_wrap(s1(A), A)
+
+        def test_impl5(A):
+            return s2(s3(s3(A)), A)
+
+        def test_impl6(A):
+            # B is also read outside of the second stencil
+            B = s1(A)
+            return s2(B, A) + B
+
+        def test_impl7(A):
+            # the inner stencil would be computed 4 times per element
+            return s4(s1(A))
+
+        A = np.arange(12 * 15.).reshape((12, 15)) ** 1.5
+        sig = (numba.typeof(A),)
+        # the number of stencil calls that are fused away
+        cases = ((test_impl1, 1), (test_impl2, 1), (test_impl3, 1),
+                 (test_impl4, 1), (test_impl5, 2), (test_impl6, 0),
+                 (test_impl7, 0))
+        for test_impl, nfused in cases:
+            self.check(test_impl, test_impl, A)
+            fused = self.compile_parallel(test_impl, sig)
+            unfused = self.compile_parallel(test_impl, sig,
+                                            stencil_fusion=False)
+            # the same operations run in the same order
+            np.testing.assert_equal(fused.entry_point(A),
+                                    unfused.entry_point(A))
+            nparfors = [len(cres.metadata['parfor_diagnostics']
+                            .initial_parfors) for cres in (fused, unfused)]
+            self.assertEqual(nparfors[0], nparfors[1] - nfused)
+
+
 class pyStencilGenerator:
     """
     Holds the classes and methods needed to generate a python stencil
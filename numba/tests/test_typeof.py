@@ -10,8 +10,11 @@ import numpy as np
 
 import unittest
 import numba.core.typing.cffi_utils as cffi_support
+from numba import njit
 from numba.core import types
+from numba.experimental import jitclass
 from numba.misc.special import typeof
+from numba.typed import Dict, List
 from numba.core.dispatcher import OmittedArg
 from numba._dispatcher import compute_fingerprint
 
@@ -549,5 +552,71 @@ class TestFingerprint(TestCase):
         s = compute_fingerprint(t)
 
 
+class TestNumbaTypeFastPath(TestCase):
+    """
+    Tests for the dispatcher's typeof fast path for values carrying their
+    Numba type (typed containers, jitclass instances).
+    """
+
+    def check_dispatch(self, make_value, other_value):
+        @njit
+        def f(x):
+            pass
+
+        a = make_value()
+        b = make_value()
+        f(a)
+        f(b)
+        self.assertEqual(len(f.signatures), 1)
+        self.assertEqual(f.signatures[0], (typeof(a),))
+        # A value of another type gets its own overload
+        f(other_value)
+        self.assertEqual(len(f.signatures), 2)
+        self.assertEqual(f.signatures[1], (typeof(other_value),))
+
+    def test_typed_dict(self):
+        def make_dict(value_type=types.float64):
+            d = Dict.empty(types.int64, value_type)
+            d[1] = 2
+            return d
+
+        d = make_dict()
+        self.assertEqual(d._numba_typecode_, typeof(d)._code)
+        self.check_dispatch(make_dict, make_dict(types.int64))
+
+        # Lazily typed dict
+        d = Dict()
+        self.assertFalse(hasattr(d, '_numba_typecode_'))
+        d[1] = 2.5
+        self.assertEqual(d._numba_typecode_, typeof(d)._code)
+
+        # Dict boxed from compiled code
+        d = njit(lambda: Dict.empty(types.int64, types.float64))()
+        self.assertEqual(d._numba_typecode_, typeof(d)._code)
+
+    def test_typed_list(self):
+        def make_list(item=1.5):
+            lst = List()
+            lst.append(item)
+            return lst
+
+        lst = make_list()
+        self.assertEqual(lst._numba_typecode_, typeof(lst)._code)
+        self.check_dispatch(make_list, make_list(1))
+
+    def test_jitclass(self):
+        @jitclass([('x', types.int64)])
+        class IntBox(object):
+            def __init__(self, x):
+                self.x = x
+
+        @jitclass([('x', types.float64)])
+        class FloatBox(object):
+            def __init__(self, x):
+                self.x = x
+
+        self.check_dispatch(lambda: IntBox(1), FloatBox(1.5))
+
+
 if __name__ == '__main__':
     unittest.main()
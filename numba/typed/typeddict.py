@@ -115,6 +115,9 @@ class Dict(MutableMapping):
         """
         if kwargs:
             self._dict_type, self._opaque = self._parse_arg(**kwargs)
+            # Let the dispatchers find the type without calling
+            # _numba_type_ (see typecode_numba_type() in _typeof.c)
+            self._numba_typecode_ = self._dict_type._code
         else:
             self._dict_type = None
 
@@ -143,6 +146,7 @@ class Dict(MutableMapping):
     def _initialise_dict(self, key, value):
         dcttype = types.DictType(typeof(key), typeof(value))
         self._dict_type, self._opaque = self._parse_arg(dcttype)
+        self._numba_typecode_ = self._dict_type._code
 
     def __getitem__(self, key):
         if not self._typed:
@@ -195,6 +195,9 @@ class List(MutableSequence):
         """
         if kwargs:
             self._list_type, self._opaque = self._parse_arg(**kwargs)
+            # Let the dispatchers find the type without calling
+            # _numba_type_ (see typecode_numba_type() in _typeof.c)
+            self._numba_typecode_ = self._list_type._code
         else:
             self._list_type = None
 
@@ -223,6 +226,7 @@ class List(MutableSequence):
     def _initialise_list(self, item):
         lsttype = types.ListType(typeof(item))
         self._list_type, self._opaque = self._parse_arg(lsttype)
+        self._numba_typecode_ = self._list_type._code
 
     def __len__(self):
         if not self._typed: